@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of the multiprocess invoker's chunk sizes
+===========================================================
+
+Generations of 100 calls are invoked at once via invoke_many, like SAES and
+CMA-ES do. The objective function returns immediately, so the measured time is
+spent almost entirely on passing calls between the invoker and its workers. The
+benchmark compares single tasks with fixed and adaptive chunks.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+GENERATIONS = 20
+LAMBDA = 100
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f(x):
+    return x
+
+
+class Caller(BaseCaller):
+    """Caller that just counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    args = ArgsCreator(f.param_spec).args()
+
+    for transport in ["manager", "pipe"]:
+        for chunk_size in [1, 10, None]:
+            invoker = MultiProcessInvoker(transport=transport,
+                                          chunk_size=chunk_size)
+            invoker.f = f
+            caller = Caller()
+
+            start = time()
+            for _ in range(GENERATIONS):
+                invoker.invoke_many(caller=caller, fargs_list=[args] * LAMBDA)
+                invoker.wait()
+            duration = time() - start
+            invoker.stop()
+
+            assert caller.count == GENERATIONS * LAMBDA
+            print("%-8s chunk size %-8s %8.1f calls per second" %
+                  (transport, chunk_size, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
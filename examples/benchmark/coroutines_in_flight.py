@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of the asyncio invoker and the thread pool invoker
+====================================================================
+
+Both invokers evaluate generations of 500 calls via invoke_many for an
+objective function that waits 0.1 seconds, e.g. for a remote service. The
+asyncio invoker awaits a coroutine for it, so all calls of a generation are in
+flight at once on a single event loop. The thread pool invoker blocks one of
+its threads per call, so it is limited by its number of threads.
+
+Needs Python 3.4 or later for asyncio.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import asyncio
+from time import sleep, time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+GENERATIONS = 3
+LAMBDA = 500
+CONCURRENCY = 500
+WORKERS = 16
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_awaiting(x):
+    return asyncio.sleep(0.1, result=x)
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_blocking(x):
+    sleep(0.1)
+    return x
+
+
+class Caller(BaseCaller):
+    """Caller that just counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.eventloop import AsyncioInvoker
+    from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
+
+    invokers = [
+        ("asyncio", f_awaiting,
+         lambda: AsyncioInvoker(concurrency=CONCURRENCY)),
+        ("threads", f_blocking,
+         lambda: ThreadPoolInvoker(resources=WORKERS, chunk_size=1)),
+    ]
+
+    for name, function, create_invoker in invokers:
+        invoker = create_invoker()
+        invoker.f = function
+        caller = Caller()
+        args = ArgsCreator(function.param_spec).args()
+
+        start = time()
+        for _ in range(GENERATIONS):
+            invoker.invoke_many(caller=caller, fargs_list=[args] * LAMBDA)
+            invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.1f calls per second" % (name, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of a NumPy objective function with and without pinning
+========================================================================
+
+The multiprocess invoker evaluates 64 calls of an objective function that
+multiplies matrices with NumPy, with a worker per CPU. NumPy's BLAS starts a
+thread per CPU in each worker by default, so the workers together run as many
+threads as the square of the CPUs, which compete for the CPUs and their caches.
+
+With pinning, each worker runs on a CPU of its own and its BLAS starts a single
+thread, so the machine runs as many threads as it has CPUs.
+
+NumPy is imported by this process, as usual, so forked workers inherit its
+BLAS with a thread per CPU. Pinned workers resize it at runtime, since it does
+not read the environment anymore.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import time
+
+# Third Party
+import numpy
+
+# First Party
+from metaopt.concurrent.employer.util.determine_worker_count import \
+    determine_worker_count
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+CALLS = 64
+SIZE = 1000
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_numpy(x):
+    matrix = numpy.random.RandomState(x).rand(SIZE, SIZE)
+    for _ in range(5):
+        matrix = numpy.dot(matrix, matrix)
+        matrix /= numpy.abs(matrix).max()
+    return float(matrix.sum())
+
+
+class Caller(BaseCaller):
+    """Caller that counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    for name, pin in [("no pinning", False), ("pinning", True)]:
+        invoker = MultiProcessInvoker(resources=determine_worker_count(),
+                                      transport="pipe", pin=pin)
+        invoker.f = f_numpy
+        caller = Caller()
+        fargs_list = [ArgsCreator(f_numpy.param_spec).args(values=[x % 10 + 1])
+                      for x in range(CALLS)]
+
+        start = time()
+        invoker.invoke_many(caller=caller, fargs_list=fargs_list)
+        invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.2f calls per second" % (name, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
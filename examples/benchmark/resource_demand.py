@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of parallel objective functions with and without demands
+=========================================================================
+
+The multiprocess invoker evaluates 64 calls of an objective function that is
+parallel itself, like a random forest with ``n_jobs``. Half of the calls hash
+data with 4 threads, the other half with one. Hashing releases the interpreter
+lock, so the threads of a call keep as many CPUs busy.
+
+Without a demand, the invoker starts a call per CPU, so the parallel calls
+oversubscribe the machine and their threads compete for the CPUs. With the
+demand declared, the invoker packs calls by their number of threads, so the
+machine runs at most as many threads as it has CPUs.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import hashlib
+from multiprocessing import cpu_count
+from threading import Thread
+from time import time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.demand.util.decorator import demand
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+CALLS = 64
+DATA = b"x" * 64 * 1024 * 1024
+
+
+def hash_in_threads(n_jobs):
+    """Hashes the data in the given number of threads."""
+    threads = [Thread(target=hashlib.sha256, args=(DATA,))
+               for _ in range(n_jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_jobs
+
+
+@minimize("y")
+@param.int("n_jobs", interval=[1, 4])
+def f_parallel(n_jobs):
+    return hash_in_threads(n_jobs)
+
+
+@demand(cpus=lambda n_jobs: n_jobs)
+@minimize("y")
+@param.int("n_jobs", interval=[1, 4])
+def f_parallel_demanding(n_jobs):
+    return hash_in_threads(n_jobs)
+
+
+class Caller(BaseCaller):
+    """Caller that counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    for name, f in [("no demand", f_parallel),
+                    ("demand", f_parallel_demanding)]:
+        invoker = MultiProcessInvoker(resources=cpu_count(), transport="pipe")
+        invoker.f = f
+        caller = Caller()
+        fargs_list = [ArgsCreator(f.param_spec).args(values=[n_jobs])
+                      for n_jobs in [1, 4] * (CALLS // 2)]
+
+        start = time()
+        invoker.invoke_many(caller=caller, fargs_list=fargs_list)
+        invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.2f calls per second" % (name, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Seconds until the first generation with a large dataset in extra_kwargs ended
+=============================================================================
+
+The multiprocess invoker evaluates a generation of 100 calls of an objective
+function that gets a dataset of 200 MB via extra_kwargs. The workers were
+started for an earlier job already, so each of them needs to get the dataset
+before its first call. The dataset is wrapped in SharedBytes to share it via a
+memory-mapped file, so workers map it instead of unpickling a copy each.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+DATA_SIZE = 200 * 1024 * 1024
+LAMBDA = 100
+WORKERS = 4
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f(x, data):
+    return x + len(data)
+
+
+class Caller(BaseCaller):
+    """Caller that just counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from copy import deepcopy
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.concurrent.invoker.util.shared_data import SharedBytes
+
+    for transport in ["manager", "pipe"]:
+        invoker = MultiProcessInvoker(resources=WORKERS, transport=transport)
+        invoker.f = f
+        caller = Caller()
+        args = ArgsCreator(f.param_spec).args()
+
+        # start all workers for an earlier job with a small dataset
+        invoker.param_spec = deepcopy(f.param_spec)
+        invoker.param_spec.extra_kwargs = dict(data=b"x")
+        invoker.invoke_many(caller=caller, fargs_list=[args] * LAMBDA)
+        invoker.wait()
+        caller.count = 0
+
+        invoker.param_spec = deepcopy(f.param_spec)
+        invoker.param_spec.extra_kwargs = dict(
+            data=SharedBytes(b"x" * DATA_SIZE))
+
+        start = time()
+        invoker.invoke_many(caller=caller, fargs_list=[args] * LAMBDA)
+        invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.2f seconds for %s calls" %
+              (transport, duration, caller.count))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Time to the first completed evaluation for each start method
+=============================================================
+
+The multiprocess invoker evaluates one call per worker of an objective function
+that imports a number of modules first, like objective functions built on
+scikit-learn do. For each start method, the workers are either started on
+demand and import the modules themselves, or they are started up front with
+the modules preloaded. The times are measured from creating the invoker.
+
+Each scenario runs in an interpreter of its own, so no scenario inherits the
+modules or the fork server of another one.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import subprocess
+import sys
+from time import time
+
+# First Party
+from metaopt.concurrent.employer.util.start_method import get_context, \
+    import_modules
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+WORKERS = 4
+
+# name of this module, to run each scenario with python -m
+NAME = "examples.benchmark.startup_latency"
+
+# modules the objective function depends on
+MODULES = ["argparse", "decimal", "difflib", "email.mime.multipart",
+           "logging.handlers", "pydoc", "tarfile", "unittest",
+           "xml.dom.minidom", "zipfile"]
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_importing(x):
+    import_modules(MODULES)
+    return x
+
+
+class Caller(BaseCaller):
+    """Caller that notes the time of each outcome it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.times = []
+
+    def on_result(self, value, fargs, **kwargs):
+        self.times.append(time())
+
+    def on_error(self, value, fargs, **kwargs):
+        self.times.append(time())
+
+
+def measure(start_method, prewarm):
+    """Prints the times to the first and to all outcomes of one scenario."""
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    start = time()
+    invoker = MultiProcessInvoker(resources=WORKERS, transport="pipe",
+                                  start_method=start_method, prewarm=prewarm,
+                                  preload=MODULES if prewarm else None)
+    invoker.f = f_importing
+    caller = Caller()
+    args = ArgsCreator(f_importing.param_spec).args()
+
+    invoker.invoke_many(caller=caller, fargs_list=[args] * WORKERS)
+    invoker.wait()
+    invoker.stop()
+
+    name = "%s, %s" % (start_method,
+                       "prewarmed" if prewarm else "on demand")
+    print("%-22s %8.3f s to first %8.3f s to all outcomes" %
+          (name, caller.times[0] - start, caller.times[-1] - start))
+
+
+def main():
+    for start_method in ["fork", "spawn", "forkserver"]:
+        try:
+            get_context(start_method)
+        except ValueError:
+            # not available on this platform or Python version
+            continue
+
+        for prewarm in ["", "prewarm"]:
+            output = subprocess.check_output(
+                [sys.executable, "-m", NAME, start_method, prewarm])
+            print(output.decode("utf-8"), end="")
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        measure(start_method=sys.argv[1], prewarm=bool(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Latency of stopping the multiprocess invoker
+============================================
+
+A grid search evaluates an objective function that hangs on a few workers. A
+timer stops the invoker after a short while, like a global timeout does. The
+benchmark measures the time from that call of stop till the optimization
+returns.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Timer
+from time import sleep, time
+
+# First Party
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.core.stoppable.util.exception import StoppedError
+
+REPETITIONS = 5
+TIMEOUT = 0.5
+WORKERS = 4
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f(x):
+    sleep(60)
+    return x
+
+
+class Stopper(object):
+    """Stops an invoker and notes the time it did so."""
+
+    def __init__(self, invoker):
+        self._invoker = invoker
+        self.time = None
+
+    def stop(self):
+        self.time = time()
+        try:
+            self._invoker.stop()
+        except StoppedError:
+            pass
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+    from metaopt.core.optimize.optimize import custom_optimize
+    from metaopt.optimizer.gridsearch import GridSearchOptimizer
+
+    for transport in ["manager", "pipe"]:
+        latencies = []
+        for _ in range(REPETITIONS):
+            invoker = PluggableInvoker(
+                MultiProcessInvoker(resources=WORKERS, transport=transport))
+            stopper = Stopper(invoker)
+            Timer(TIMEOUT, stopper.stop).start()
+
+            custom_optimize(f, invoker=invoker,
+                            optimizer=GridSearchOptimizer())
+            latencies.append(time() - stopper.time)
+
+        print("%-8s mean %6.3f s, max %6.3f s from stop till return" %
+              (transport, sum(latencies) / len(latencies), max(latencies)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Duration of SAES generations with heavy-tailed call durations
+==============================================================
+
+SAES optimizes an objective function whose calls usually take 10 ms, but
+whose durations follow a Pareto distribution, so now and then a call takes
+seconds. Each generation either waits for all of its calls or is closed once
+90 % of them ended. The calls still running then are either cancelled or
+executed a second time on idle workers, where the first outcome wins. A second
+execution draws a new duration, which is short in all likelihood.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from random import paretovariate
+from time import sleep, time
+
+# First Party
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.saes import SAESOptimizer
+
+GENERATIONS = 20
+WORKERS = 4
+
+
+@minimize("y")
+@param.float("a", interval=[-1, 1])
+@param.float("b", interval=[-1, 1])
+def f(a, b):
+    sleep(min(0.01 * paretovariate(1.2), 5))
+    return a ** 2 + b ** 2
+
+
+class GenerationsSAESOptimizer(SAESOptimizer):
+    """SAES that stops after a fixed number of generations."""
+
+    def exit_condition(self):
+        return self.generation > GENERATIONS
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.core.optimize.optimize import custom_optimize
+
+    for name, quorum, stragglers in [("wait", None, "cancel"),
+                                     ("cancel", 0.9, "cancel"),
+                                     ("speculate", 0.9, "speculate")]:
+        invoker = MultiProcessInvoker(resources=WORKERS, transport="pipe",
+                                      grace_period=1)
+        optimizer = GenerationsSAESOptimizer(mu=5, lamb=20, quorum=quorum,
+                                             stragglers=stragglers)
+
+        start = time()
+        custom_optimize(f, invoker=invoker, optimizer=optimizer)
+        duration = time() - start
+
+        print("%-10s %6.2f s for %s generations" %
+              (name, duration, GENERATIONS))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of the thread pool invoker and the multiprocess invoker
+=========================================================================
+
+Both invokers evaluate generations of 100 calls via invoke_many for three kinds
+of objective functions:
+
+* trivial, which returns immediately, so dispatching calls dominates.
+* releasing, which sleeps like code that releases the interpreter lock does,
+  e.g. NumPy, BLAS or I/O.
+* holding, which computes in pure Python, holding the interpreter lock.
+
+Threads win for trivial and releasing objective functions, since they neither
+pickle calls nor pass them between processes. Processes win for holding
+objective functions on machines with several CPUs, since threads can not run
+pure Python code in parallel.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import sleep, time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+GENERATIONS = 5
+LAMBDA = 100
+WORKERS = 4
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_trivial(x):
+    return x
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_releasing(x):
+    sleep(0.005)
+    return x
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_holding(x):
+    y = 0
+    for i in range(50000):
+        y += i % x
+    return y
+
+
+class Caller(BaseCaller):
+    """Caller that just counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
+
+    invokers = [
+        ("threads", lambda: ThreadPoolInvoker(resources=WORKERS,
+                                              chunk_size=None)),
+        ("processes", lambda: MultiProcessInvoker(resources=WORKERS,
+                                                  transport="pipe",
+                                                  chunk_size=None)),
+    ]
+
+    for function in [f_trivial, f_releasing, f_holding]:
+        for name, create_invoker in invokers:
+            invoker = create_invoker()
+            invoker.f = function
+            caller = Caller()
+            args = ArgsCreator(function.param_spec).args()
+
+            start = time()
+            for _ in range(GENERATIONS):
+                invoker.invoke_many(caller=caller, fargs_list=[args] * LAMBDA)
+                invoker.wait()
+            duration = time() - start
+            invoker.stop()
+
+            print("%-12s %-10s %8.1f calls per second" %
+                  (function.__name__, name, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
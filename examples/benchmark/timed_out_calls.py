@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Duration of a grid search with frequent timeouts
+================================================
+
+A grid search evaluates 100 calls of an objective function that hangs for
+every other parameter, so the timeout plugin stops half of the calls after
+50 ms. Each worker sets up a context that takes 50 ms, like importing
+scientific libraries does. Stopped calls either restart their worker, have
+a spare worker that started up in advance take its place, or the worker
+interrupts them itself and carries on.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import sleep, time
+
+# First Party
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+
+TIMEOUT = 0.05
+WORKERS = 4
+
+
+def initialize():
+    sleep(0.05)
+    return 1
+
+
+@minimize("y")
+@param.int("x", interval=[1, 100])
+def f(x, context):
+    if x % 2:
+        sleep(60)
+    return x * context
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+    from metaopt.core.optimize.optimize import custom_optimize
+    from metaopt.optimizer.gridsearch import GridSearchOptimizer
+    from metaopt.plugin.timeout import TimeoutPlugin
+
+    for name, grace_period, spares in [("restart", None, 0),
+                                       ("spares", None, WORKERS),
+                                       ("interrupt", 1, 0)]:
+        invoker = PluggableInvoker(
+            MultiProcessInvoker(resources=WORKERS, transport="pipe",
+                                initializer=initialize,
+                                grace_period=grace_period, spares=spares),
+            plugins=[TimeoutPlugin(TIMEOUT)])
+
+        start = time()
+        result = custom_optimize(f, invoker=invoker,
+                                 optimizer=GridSearchOptimizer())
+        duration = time() - start
+
+        print("%-10s %6.2f s for the grid search, best %s" %
+              (name, duration, result))
+
+if __name__ == '__main__':
+    main()
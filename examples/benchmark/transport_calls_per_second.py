@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second of the multiprocess invoker's transports
+==========================================================
+
+A grid search evaluates an objective function that returns immediately, so the
+measured time is spent almost entirely on passing tasks, starts and outcomes
+between the invoker and its workers. The benchmark compares the manager
+transport with the pipe transport.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import time
+
+# First Party
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+
+CALLS = 2000
+
+
+@minimize("y")
+@param.int("x", interval=[1, CALLS])
+def f(x):
+    return x
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+    from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+    from metaopt.core.optimize.optimize import custom_optimize
+    from metaopt.optimizer.gridsearch import GridSearchOptimizer
+
+    for transport in ["manager", "pipe"]:
+        invoker = PluggableInvoker(MultiProcessInvoker(transport=transport))
+
+        start = time()
+        custom_optimize(f, invoker=invoker, optimizer=GridSearchOptimizer())
+        duration = time() - start
+
+        print("%-8s %8.1f calls per second" % (transport, CALLS / duration))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Calls per second with setup per call and with setup per worker
+==============================================================
+
+The multiprocess invoker evaluates 200 calls of an objective function that
+needs a dataset, which takes 20 ms to set up, like loading and splitting a
+small dataset does. Either each call sets up the dataset itself, or an
+initializer sets it up once per worker and passes it to every call as context.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import sleep, time
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+CALLS = 200
+WORKERS = 4
+
+
+def load_data():
+    sleep(0.02)
+    return list(range(100))
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_setup_per_call(x):
+    data = load_data()
+    return x + len(data)
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_setup_per_worker(x, context):
+    data = context
+    return x + len(data)
+
+
+class Caller(BaseCaller):
+    """Caller that just counts the outcomes it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    invokers = [
+        ("per call", f_setup_per_call, None),
+        ("per worker", f_setup_per_worker, load_data),
+    ]
+
+    for name, function, initializer in invokers:
+        invoker = MultiProcessInvoker(resources=WORKERS, transport="pipe",
+                                      initializer=initializer)
+        invoker.f = function
+        caller = Caller()
+        args = ArgsCreator(function.param_spec).args()
+
+        start = time()
+        invoker.invoke_many(caller=caller, fargs_list=[args] * CALLS)
+        invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.1f calls per second" % (name, caller.count / duration))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Peak memory of workers with and without recycling
+=================================================
+
+The multiprocess invoker evaluates 200 calls of an objective function that
+leaks 1 MB per call, like caches of some scientific libraries do. Each call
+returns the resident memory of its worker. Either the workers live as long as
+the invoker, or they are recycled after a number of tasks or once their
+resident memory exceeds a threshold.
+
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from time import time
+
+# First Party
+from metaopt.concurrent.worker.util.memory import measure_rss
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.base import BaseCaller
+
+CALLS = 200
+WORKERS = 4
+
+# memory leaked by all calls of the current worker
+LEAKED = []
+
+
+@minimize("y")
+@param.int("x", interval=[1, 10])
+def f_leaking(x):
+    del x
+    LEAKED.append(bytearray(1024 * 1024))
+    return measure_rss()
+
+
+class Caller(BaseCaller):
+    """Caller that keeps the largest value it gets."""
+
+    def __init__(self):
+        super(Caller, self).__init__()
+        self.count = 0
+        self.value_max = 0
+
+    def on_result(self, value, fargs, **kwargs):
+        self.count += 1
+        self.value_max = max(self.value_max, value.raw_values)
+
+    def on_error(self, value, fargs, **kwargs):
+        self.count += 1
+
+
+def main():
+    from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+
+    limits = [
+        ("none", dict()),
+        ("20 tasks", dict(max_tasks=20)),
+        ("32 MB RSS", dict(max_rss=32 * 1024 * 1024)),
+    ]
+
+    for name, kwargs in limits:
+        invoker = MultiProcessInvoker(resources=WORKERS, transport="pipe",
+                                      **kwargs)
+        invoker.f = f_leaking
+        caller = Caller()
+        args = ArgsCreator(f_leaking.param_spec).args()
+
+        start = time()
+        invoker.invoke_many(caller=caller, fargs_list=[args] * CALLS)
+        invoker.wait()
+        duration = time() - start
+        invoker.stop()
+
+        print("%-10s %8.1f MB peak RSS %8.1f calls per second" %
+              (name, caller.value_max / 1024 / 1024,
+               caller.count / duration))
+
+if __name__ == '__main__':
+    main()
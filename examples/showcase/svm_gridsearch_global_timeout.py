@@ -19,15 +19,20 @@ from metaopt.core.paramspec.util import param
 from metaopt.core.returnspec.util.decorator import maximize
 
 
-@maximize("Score")
-@param.float("C-Exp", interval=[0, 4], step=0.1)
-@param.float("Gamma-Exp", interval=[-6, 0], step=0.1)
-def f(C_exp, gamma_exp):
+def load_iris():
+    """Splits the Iris data set once per worker, not once per call."""
     iris = datasets.load_iris()
 
-    X_train, X_test, y_train, y_test = cross_validation.train_test_split(
+    return cross_validation.train_test_split(
         iris.data, iris.target, test_size=0.4, random_state=0)
 
+
+@maximize("Score")
+@param.float("C-Exp", interval=[0, 4], step=0.1)
+@param.float("Gamma-Exp", interval=[-6, 0], step=0.1)
+def f(C_exp, gamma_exp, context):
+    X_train, X_test, y_train, y_test = context
+
     C = 10 ** C_exp
     gamma = 10 ** gamma_exp
 
@@ -62,7 +67,8 @@ def main():
         visualize_best_fitness_plugin,
     ]
 
-    optimum = optimize(f, timeout=timeout, optimizer=optimizer, plugins=plugins)
+    optimum = optimize(f, timeout=timeout, optimizer=optimizer,
+                       plugins=plugins, initializer=load_iris)
 
     print("The optimal parameters are %s." % str(optimum))
 
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Employer of the workers of remote agents for the distributed invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Lock
+
+# First Party
+from metaopt.concurrent.employer.employer import Employer
+from metaopt.concurrent.employer.util.exception import LayoffError
+from metaopt.concurrent.model.call_lifecycle import Layoff
+
+
+class AgentEmployer(Employer):
+    """
+    Keeps track of the workers of agents connected via a TCP transport.
+
+    Agents start, replace and retire their worker processes themselves, so this
+    employer can not employ any worker. It counts the slots the connected
+    agents advertised and lays off a remote worker by asking its agent to
+    replace it.
+    """
+
+    def __init__(self, queue_outcome, status_db, transport):
+        """
+        :param:    transport    TCP transport the agents connect to
+        """
+        super(AgentEmployer, self).__init__()
+        self._queue_outcome = queue_outcome
+        self._status_db = status_db
+        self._transport = transport
+        self._lock = Lock()
+
+    @property
+    def worker_count_max(self):
+        """Returns the number of slots of all connected agents."""
+        return self._transport.slot_count
+
+    @property
+    def worker_count(self):
+        """Returns the number of slots of all connected agents."""
+        return self._transport.slot_count
+
+    @property
+    def sizing_reason(self):
+        """Returns why this employer has as many workers as it does."""
+        return "A worker for each of the %s slots of the connected agents." % \
+            self._transport.slot_count
+
+    def employ(self, number_of_workers=1):
+        """
+        Raises IndexError for any workers to employ, since agents employ their
+        workers themselves.
+        """
+        if number_of_workers > 0:
+            raise IndexError("Agents employ their workers themselves.")
+
+    def wait_for_workers(self):
+        """Blocks till an agent is connected or the transport was closed."""
+        self._transport.wait_for_slots()
+
+    def lay_off(self, call_id, reason=None):
+        """
+        Lays off the remote worker that started the call given by id, if any.
+
+        :param call_id: ID of the call whose executing worker to lay off.
+        :param reason: Reason for the lay off. (optional)
+        """
+        with self._lock:
+            try:
+                worker_id = self._status_db.get_worker_id(call_id=call_id)
+            except KeyError:
+                # No worker started the call or it ended already.
+                # So we have nothing to do here.
+                return
+            self._lay_off(worker_id, reason, call_id=call_id)
+
+    def interrupt(self, call_id):
+        """Returns False, since remote workers can not be interrupted."""
+        del call_id
+        return False
+
+    def executes(self, call_id):
+        """Returns False, since remote workers are never interrupted."""
+        del call_id
+        return False
+
+    def retire(self, worker_id, dismissed=False):
+        """Does nothing, since agents replace retiring workers themselves."""
+        del worker_id
+        del dismissed
+
+    def _lay_off(self, worker_id, reason, call_id=None):
+        """
+        Lays off the remote worker given by id for the given reason.
+
+        If it was laid off for the call given by id, the other calls of its
+        chunk are handed to another worker instead of being laid off, too.
+        """
+        self._transport.lay_off(worker_id)
+
+        calls = self._status_db.get_running_calls(worker_id)
+        if call_id is not None:
+            # The worker runs the calls of a chunk one after another, so the
+            # others of the given call's chunk may not even have started.
+            call_ids_chunk = self._status_db.get_chunk_call_ids(call_id)
+            if call_ids_chunk:
+                self._status_db.requeue(call_ids_chunk)
+                calls = [call for call in calls
+                         if call.id not in call_ids_chunk]
+
+        # send manually constructed layoff outcomes
+        for call in calls:
+            layoff = Layoff(worker_id=worker_id, call=call, value=reason)
+            self._queue_outcome.put(layoff)
+
+    def abandon(self, reason=None):
+        """
+        Lays off all busy remote workers and gives up all calls no worker
+        started yet.
+        """
+        with self._lock:
+            if reason is None:
+                reason = LayoffError("Releasing all workers.")
+            for worker_id in self._status_db.get_busy_worker_ids():
+                self._lay_off(worker_id, reason)
+
+            while True:
+                try:
+                    call = self._status_db.pop_idle_call()
+                except ValueError:
+                    break
+                layoff = Layoff(worker_id=None, call=call, value=reason)
+                self._queue_outcome.put(layoff)
@@ -31,11 +31,24 @@ class Employer(BaseEmployer):
 
         self._worker_count -= 1
 
+    def dismiss(self, number_of_workers=1):
+        """Dismisses the given number of idle workers."""
+        self._worker_count -= number_of_workers
+
     def abandon(self, reason=None):
         del reason
 
         self._worker_count = 0
 
+    def reserve(self, call_ids, demand):
+        """Reserves nothing, since this employer does not track resources."""
+        del call_ids
+        del demand
+
+    def release(self, call_id):
+        """Releases nothing, since this employer does not track resources."""
+        del call_id
+
     @property
     def worker_count(self):
         return self._worker_count
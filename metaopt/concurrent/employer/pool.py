@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Pool of worker slots that several invokers share with fair-share scheduling.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Condition
+
+# First Party
+from metaopt.concurrent.employer.util.determine_worker_count import \
+    determine_worker_count
+
+
+class WorkerPool(object):
+    """
+    Pool of worker slots that several invokers share, e.g. the invokers of
+    studies optimized concurrently by one service.
+
+    Each invoker attaches to the pool as a tenant and employs a worker only
+    once the pool grants it a slot. While tenants wait for slots, the pool
+    grants free slots to the tenant of the highest priority, and among tenants
+    of the same priority to the one holding the fewest slots for its weight.
+    Tenants holding more than their share yield idle workers to waiting ones,
+    so a greedy tenant can not starve the others.
+    """
+
+    def __init__(self, resources=None):
+        """
+        :param resources: Number of worker slots of all tenants together.
+                          Defaults to the CPUs this process may use.
+        """
+        self._capacity = determine_worker_count(resources)
+        self._tenants = []
+        self._condition = Condition()
+
+    @property
+    def capacity(self):
+        """Returns the number of worker slots of all tenants together."""
+        return self._capacity
+
+    @property
+    def slot_count(self):
+        """Returns the number of slots granted to tenants."""
+        with self._condition:
+            return self._count_slots()
+
+    def attach(self, weight=1, priority=0, max_workers=None):
+        """
+        Returns a new tenant of this pool, e.g. to pass to an invoker.
+
+        :param      weight: Share of the slots relative to the other tenants
+                            of the same priority.
+        :param    priority: Tenants of a higher priority get slots first.
+        :param max_workers: Number of slots this tenant holds at most.
+                            (optional)
+        """
+        if weight <= 0:
+            raise ValueError("Weight needs to be greater 0.")
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers needs to be greater 0.")
+
+        tenant = Tenant(pool=self, weight=weight, priority=priority,
+                        max_workers=max_workers)
+        with self._condition:
+            self._tenants.append(tenant)
+        return tenant
+
+    def detach(self, tenant):
+        """Releases all slots of the given tenant and removes it."""
+        with self._condition:
+            self._tenants.remove(tenant)
+            tenant._count = 0
+            tenant._waiting = False
+            self._condition.notify_all()
+
+    def _acquire(self, tenant, count):
+        """
+        Grants the given number of slots to the given tenant, if they are free
+        and no waiting tenant is ahead of it. Otherwise the tenant is marked as
+        waiting, unless it is at its limit, and False is returned.
+        """
+        with self._condition:
+            if tenant.max_workers is not None and \
+                    tenant._count + count > tenant.max_workers:
+                # Waiting would not help the tenant, so do not let others
+                # yield to it.
+                return False
+
+            if self._count_slots() + count > self._capacity or \
+                    any(self._is_ahead(other, tenant)
+                        for other in self._tenants_waiting(tenant)):
+                tenant._waiting = True
+                return False
+
+            tenant._count += count
+            tenant._waiting = False
+            return True
+
+    def _release(self, tenant, count):
+        """Releases the given number of slots of the given tenant."""
+        with self._condition:
+            tenant._count = max(tenant._count - count, 0)
+            self._condition.notify_all()
+
+    def _should_yield(self, tenant, idle):
+        """
+        Returns whether the given tenant holds more slots than its share while
+        another tenant waits for a slot, or any slot if it is idle.
+        """
+        with self._condition:
+            if self._count_slots() < self._capacity:
+                # The waiting tenants can take the free slots.
+                return False
+            for other in self._tenants_waiting(tenant):
+                if idle:
+                    return True
+                if other.priority != tenant.priority:
+                    if other.priority > tenant.priority:
+                        return True
+                    continue
+                # Yield only if the other tenant stays below this one.
+                if (other._count + 1) / other.weight < \
+                        tenant._count / tenant.weight:
+                    return True
+            return False
+
+    def _stop_waiting(self, tenant):
+        """Makes the other tenants no longer yield to the given one."""
+        with self._condition:
+            tenant._waiting = False
+
+    def _wait(self, timeout):
+        """Blocks till a slot was released or the given seconds passed."""
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def _count_slots(self):
+        """Returns the number of slots granted to tenants."""
+        return sum(tenant._count for tenant in self._tenants)
+
+    def _tenants_waiting(self, tenant):
+        """Returns the tenants other than the given one waiting for slots."""
+        return [other for other in self._tenants
+                if other is not tenant and other._waiting]
+
+    def _is_ahead(self, tenant, other):
+        """Returns whether the first tenant gets a free slot before another."""
+        if tenant.priority != other.priority:
+            return tenant.priority > other.priority
+        return tenant._count / tenant.weight < other._count / other.weight
+
+
+class Tenant(object):
+    """
+    Tenant of a worker pool, which employers ask for slots.
+    """
+
+    def __init__(self, pool, weight, priority, max_workers):
+        """
+        :param pool: Pool this tenant is attached to.
+        """
+        self._pool = pool
+        self._weight = weight
+        self._priority = priority
+        self._max_workers = max_workers
+        self._count = 0  # number of slots held
+        self._waiting = False
+
+    @property
+    def pool(self):
+        return self._pool
+
+    @property
+    def weight(self):
+        return self._weight
+
+    @property
+    def priority(self):
+        return self._priority
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @property
+    def worker_count_max(self):
+        """Returns the number of slots this tenant may hold at most."""
+        if self._max_workers is None:
+            return self._pool.capacity
+        return min(self._max_workers, self._pool.capacity)
+
+    @property
+    def slot_count(self):
+        """Returns the number of slots this tenant holds."""
+        return self._count
+
+    def acquire(self, count=1):
+        """
+        Returns whether the pool granted the given number of slots. If not,
+        other tenants holding more than their share yield to this one.
+        """
+        return self._pool._acquire(self, count)
+
+    def release(self, count=1):
+        """Gives the given number of slots back to the pool."""
+        self._pool._release(self, count)
+
+    def should_yield(self, idle=False):
+        """
+        Returns whether this tenant should give the slot of an idle worker up.
+
+        :param idle: Whether this tenant needs no workers for now, e.g. since
+                     its invoker issues no tasks, so that it yields to any
+                     waiting tenant regardless of its share.
+        """
+        return self._pool._should_yield(self, idle)
+
+    def stop_waiting(self):
+        """Tells the pool that this tenant needs no further slot for now."""
+        self._pool._stop_waiting(self)
+
+    def wait(self, timeout=None):
+        """Blocks till any tenant released a slot or the seconds passed."""
+        self._pool._wait(timeout)
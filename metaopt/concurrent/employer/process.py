@@ -7,15 +7,28 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
-from multiprocessing.synchronize import Lock
+from collections import namedtuple
+from multiprocessing import Lock
+from threading import Thread
 
 # First Party
 from metaopt.concurrent.employer.employer import Employer
+from metaopt.concurrent.employer.util.cpu_sets import split_cpus
+from metaopt.concurrent.employer.util.determine_memory import \
+    explain_memory
 from metaopt.concurrent.employer.util. \
-    determine_worker_count import determine_worker_count
+    determine_worker_count import explain_worker_count
 from metaopt.concurrent.employer.util.exception import LayoffError
-from metaopt.concurrent.model.call_lifecycle import Layoff
+from metaopt.concurrent.employer.util.start_method import get_context, \
+    preload_modules
+from metaopt.concurrent.model.call_lifecycle import Dismissal, Layoff
 from metaopt.concurrent.worker.process import ProcessWorker
+from metaopt.concurrent.worker.util.memory import check_address_space_limit
+
+
+# data structure for the resources reserved for calls that one worker executes
+# one after another (each call refers to the same reservation till it ends)
+Reservation = namedtuple("Reservation", ["cpus", "memory"])
 
 
 class ProcessWorkerEmployer(Employer):
@@ -29,42 +42,327 @@ class ProcessWorkerEmployer(Employer):
     _lock = Lock()
     _worker_processes = []
 
+    # Calls of all employers share the CPUs and memory, too.
+    # So their reservations are kept in the shared space, by call id.
+    _reservations = dict()
+
     def __init__(self, queue_tasks, queue_outcome, queue_start,
-                 status_db, resources=None):
+                 status_db, resources=None, transport=None, job_store=None,
+                 initializer=None, max_tasks=None, max_rss=None,
+                 max_memory=None, start_method=None, preload=None,
+                 spares=0, memory=None, pin=False, tenant=None):
         """
         :param:    resources    number of (possibly virtual) CPUs to use,
-                                defaults to all
+                                defaults to all this process may use
+        :param:    transport    transport that connects new worker processes,
+                                defaults to sharing the given queues
+        :param:    job_store    store the worker processes look up jobs in
+        :param:  initializer    function each worker process calls once to set
+                                up the context passed to its calls
+        :param:    max_tasks    number of tasks after which a worker process
+                                retires, defaults to never
+        :param:      max_rss    bytes of resident memory after exceeding which
+                                a worker process retires, defaults to never
+        :param:   max_memory    bytes of address space each worker process is
+                                limited to, defaults to unlimited
+        :param: start_method    either "fork", "spawn" or "forkserver",
+                                defaults to the platform's default
+        :param:      preload    names of modules to import once for all
+                                worker processes, e.g. heavy dependencies of
+                                the objective function
+        :param:       spares    number of idle worker processes to keep
+                                started up, which take the place of laid off
+                                or retired ones right away
+        :param:       memory    bytes of memory that calls may reserve at once,
+                                defaults to the physical memory or the
+                                cgroup memory limit, whichever is lower
+        :param:          pin    whether to pin each worker process to its own
+                                set of CPUs, NUMA node by NUMA node, and to
+                                limit the threads of OpenMP, MKL and OpenBLAS
+                                in it to their number
+        :param:       tenant    tenant of a worker pool, which grants a slot
+                                for each employed worker process, instead of
+                                sharing the CPUs with all other employers
         """
         super(ProcessWorkerEmployer, self).__init__()
+        check_address_space_limit(max_memory)
 
         with self._lock:
             # use the given queues
             self._queue_outcome = queue_outcome
             self._queue_start = queue_start
             self._queue_task = queue_tasks
-            # use up to all CPUs
-            self._worker_count_max = determine_worker_count(resources)
+            self._transport = transport
+            self._job_store = job_store
+            self._initializer = initializer
+            self._max_tasks = max_tasks
+            self._max_rss = max_rss
+            self._max_memory = max_memory
+            self._start_method = start_method
+            self._preload = list(preload or [])
+            preload_modules(get_context(start_method), self._preload)
+            # spares belong to this employer, since they use its transport
+            self._spares = spares
+            self._spare_processes = []
+            # number of spares being started in the background
+            self._spares_starting = 0
+            self._abandoned = False
+            # number of workers asked to retire, which did not retire yet
+            self._dismissals = 0
+            # use up to all CPUs and all memory this process may use
+            self._worker_count_max, self._worker_count_reason = \
+                explain_worker_count(resources)
+            self._memory_max, self._memory_reason = explain_memory(memory)
+            self._call_ids_reserved = set()
             self._status_db = status_db
+            self._tenant = tenant
+            if tenant is not None:
+                # The pool shares the slots between its tenants, so do not
+                # share the workers or their reservations with other employers.
+                self._worker_processes = []
+                self._reservations = dict()
+                self._worker_count_max = tenant.worker_count_max
+                self._worker_count_reason = \
+                    "%s workers at most, as granted by the worker pool." % \
+                    self._worker_count_max
+            # split the CPUs into a set per worker, the same for all workers
+            self._cpu_sets = split_cpus(self._worker_count_max) if pin else []
+
+        self._replenish_unlocked()
 
     @property
     def worker_count_max(self):
         return self._worker_count_max
 
+    @property
+    def sizing_reason(self):
+        """
+        Returns why this employer runs as many workers and lets calls reserve
+        as much memory as it does.
+        """
+        return "%s %s" % (self._worker_count_reason, self._memory_reason)
+
     def employ(self, number_of_workers=1):
         """
         Employs a given number worker processes for future tasks.
         """
         with self._lock:
-            if self._worker_count_max < \
+            if self._tenant is not None:
+                if not self._tenant.acquire(number_of_workers):
+                    raise IndexError("The worker pool grants no more slots.")
+            elif self._worker_count_max < \
                     (len(self._worker_processes) + number_of_workers):
                 raise IndexError("Cannot employ so many worker processes.")
 
+            if self._abandoned:
+                # All workers were abandoned before, so start spares anew.
+                self._abandoned = False
+                self._replenish_in_background()
+
             for _ in range(number_of_workers):
-                worker_process = \
-                    ProcessWorker(queue_tasks=self._queue_task,
-                                  queue_outcome=self._queue_outcome,
-                                  queue_start=self._queue_start)
-                self._worker_processes.append(worker_process)
+                if not self._promote():
+                    self._worker_processes.append(self._start_worker())
+
+    def dismiss(self, number_of_workers=1):
+        """
+        Asks the given number of idle worker processes to retire, e.g. to
+        shrink the pool while there are no tasks.
+
+        Whichever workers get the dismissals from the task queue retire, so
+        they no longer count as employed right away. They are released once
+        their retirements arrive.
+        """
+        with self._lock:
+            self._dismissals += number_of_workers
+            if self._tenant is not None:
+                self._tenant.release(number_of_workers)
+        for _ in range(number_of_workers):
+            self._queue_task.put(Dismissal(value="Dismissed while idle."))
+
+    def reserve(self, call_ids, demand):
+        """
+        Reserves the resources of the given demand for the calls given by ids,
+        which one worker executes one after another.
+
+        Raises IndexError if the demand does not fit into the CPUs and memory
+        left by the reservations of running calls. Demands exceeding all CPUs
+        or all memory are cut down to them, so their calls run alone.
+        """
+        cpus = min(demand.cpus, self._worker_count_max)
+        memory = demand.memory
+        if self._memory_max is not None:
+            memory = min(memory, self._memory_max)
+
+        with self._lock:
+            reservations = dict((id(reservation), reservation) for reservation
+                                in self._reservations.values()).values()
+            cpus_reserved = sum(reservation.cpus
+                                for reservation in reservations)
+            memory_reserved = sum(reservation.memory
+                                  for reservation in reservations)
+            if cpus_reserved + cpus > self._worker_count_max or \
+                    (self._memory_max is not None and
+                     memory_reserved + memory > self._memory_max):
+                raise IndexError("Cannot reserve so many resources.")
+
+            reservation = Reservation(cpus=cpus, memory=memory)
+            for call_id in call_ids:
+                self._reservations[call_id] = reservation
+            self._call_ids_reserved.update(call_ids)
+
+    def release(self, call_id):
+        """
+        Releases the reservation of the call given by id, which ended. The
+        resources are free again once all calls of the reservation ended.
+        """
+        with self._lock:
+            self._release(call_id)
+
+    def _release(self, call_id):
+        """Releases the reservation of the call given by id, if any."""
+        self._call_ids_reserved.discard(call_id)
+        self._reservations.pop(call_id, None)
+
+    def _start_worker(self, spare=False):
+        """Creates and starts a worker connected via the transport, if any."""
+        if self._transport is None:
+            return self._create_worker(queue_tasks=self._queue_task,
+                                       queue_outcome=self._queue_outcome,
+                                       queue_start=self._queue_start,
+                                       spare=spare)
+
+        queues = self._transport.connect()
+        worker_process = self._create_worker(spare=spare, **queues)
+        self._transport.connected(queues)
+        return worker_process
+
+    def _create_worker(self, queue_tasks, queue_outcome, queue_start,
+                       spare=False):
+        """Creates and starts a worker that uses the given queues."""
+        return ProcessWorker(queue_tasks=queue_tasks,
+                             queue_outcome=queue_outcome,
+                             queue_start=queue_start,
+                             job_store=self._job_store,
+                             initializer=self._initializer,
+                             max_tasks=self._max_tasks,
+                             max_rss=self._max_rss,
+                             max_memory=self._max_memory,
+                             start_method=self._start_method,
+                             preload=self._preload,
+                             spare=spare,
+                             cpus=self._choose_cpus())
+
+    def _choose_cpus(self):
+        """
+        Returns the set of CPUs that the fewest started worker processes are
+        pinned to, or None if workers are not pinned.
+        """
+        if not self._cpu_sets:
+            return None
+
+        workers = self._worker_processes + self._spare_processes
+        pinned = [getattr(worker, "cpus", None) for worker in workers]
+        return min(self._cpu_sets, key=pinned.count)
+
+    def _promote(self):
+        """
+        Makes a spare worker process take tasks, if there is one, and starts a
+        new spare in the background.
+
+        Returns whether a spare was promoted.
+        """
+        if not self._spare_processes:
+            return False
+
+        worker_process = self._spare_processes.pop(0)
+        worker_process.promote()
+        self._worker_processes.append(worker_process)
+
+        self._replenish_in_background()
+        return True
+
+    def _replace(self):
+        """
+        Makes a spare take the place of a worker process that was removed, if
+        there is one. Otherwise gives the slot of the worker back to the pool.
+        """
+        if not self._promote() and self._tenant is not None:
+            self._tenant.release()
+
+    def _replenish_in_background(self):
+        """
+        Starts spare worker processes till there are enough of them on a
+        thread of its own, since starting a process takes a while.
+        """
+        replenisher = Thread(target=self._replenish_unlocked)
+        replenisher.daemon = True
+        replenisher.start()
+
+    def _replenish_unlocked(self):
+        """
+        Starts spare worker processes till there are enough of them.
+
+        The lock is shared by all employers, so it is only held to count the
+        spares and to add a new one, but not while the new one starts up.
+        """
+        while True:
+            with self._lock:
+                if self._abandoned or self._spares <= \
+                        len(self._spare_processes) + self._spares_starting:
+                    return
+                self._spares_starting += 1
+            worker_process = None
+            try:
+                worker_process = self._start_worker(spare=True)
+            finally:
+                with self._lock:
+                    self._spares_starting -= 1
+                    abandoned = self._abandoned
+                    if worker_process is not None and not abandoned:
+                        self._spare_processes.append(worker_process)
+            if abandoned:
+                # All workers were abandoned while the spare started up.
+                self._dismiss(worker_process)
+
+    def _dismiss(self, worker_process):
+        """Terminates the given worker and waits for it to end."""
+        # send kill signal and wait for the process to die
+        # TODO assert worker_process.is_alive()
+        worker_process.terminate()
+        try:
+            worker_process.join()
+        except OSError:
+            # The worker has already terminated.
+            # That is OK, just carry on.
+            pass
+
+    def retire(self, worker_id, dismissed=False):
+        """
+        Releases the worker process given by id, which quit by itself.
+
+        The worker reported all of its outcomes before it retired, so no layoff
+        is reported. A spare takes the place of the worker, unless it was
+        dismissed.
+        """
+        with self._lock:
+            if dismissed:
+                # The dismissals were forgotten, if all workers were abandoned.
+                self._dismissals = max(self._dismissals - 1, 0)
+            try:
+                worker_process = self._get_worker_process_for_id(worker_id)
+            except KeyError:
+                # The worker was laid off meanwhile.
+                # So we have nothing to do here.
+                return
+            self._worker_processes.remove(worker_process)
+            if not dismissed:
+                self._replace()
+        try:
+            worker_process.join()
+        except OSError:
+            # The worker has already terminated.
+            # That is OK, just carry on.
+            pass
 
     def lay_off(self, call_id, reason=None):
         """
@@ -75,60 +373,120 @@ class ProcessWorkerEmployer(Employer):
         """
         with self._lock:
             try:
-                worker_id = self._status_db.get_worker_id(call_id=call_id)
+                worker_process = self._get_worker_process_for_call(call_id)
             except KeyError:
                 # All workers were killed before one could start the task.
                 # The worker for the given task (None) is already terminated.
                 # So we have nothing to do here.
                 return
+            self._remove(worker_process)
+
+        # The lock is shared by all employers, so do not hold it while waiting
+        # for the worker to end.
+        self._lay_off(worker_process, reason, call_id=call_id)
+
+    def interrupt(self, call_id):
+        """
+        Asks the worker process that started the call given by id to interrupt
+        it and carry on with its next task.
+
+        Returns whether the worker was asked, which is not the case if no
+        worker executes the call or if workers can not be interrupted.
+        """
+        with self._lock:
             try:
-                worker_process = self._get_worker_process_for_id(worker_id)
+                worker_process = self._get_worker_process_for_call(call_id)
             except KeyError:
-                # nothing to do
-                return
-            self._lay_off(worker_process, reason)
+                return False
+            return worker_process.interrupt(call_id=call_id)
 
-    def _lay_off(self, worker_process, reason):
-        """Lays off the given process workers for the given reason."""
+    def executes(self, call_id):
+        """Returns whether a worker process still executes the given call."""
+        with self._lock:
+            try:
+                worker_process = self._get_worker_process_for_call(call_id)
+            except KeyError:
+                return False
+            return worker_process.executes(call_id=call_id)
 
-        # send kill signal and wait for the process to die
-        # TODO assert worker_process.is_alive()
-        worker_process.terminate()
-        try:
-            worker_process.join()
-        except OSError:
-            # The worker has already terminated.
-            # That is OK, just carry on.
-            pass
+    def _remove(self, worker_process, replace=True):
+        """
+        Removes the given worker process from the employed ones, letting a
+        spare take its place before waiting for its end.
+        """
         self._worker_processes.remove(worker_process)
+        if replace:
+            self._replace()
 
-        try:
-            call = self._status_db.get_running_call(worker_process.worker_id)
-        except KeyError:
+    def _lay_off(self, worker_process, reason, call_id=None):
+        """
+        Lays off the given removed worker process for the given reason.
+
+        If it was laid off for the call given by id, the other calls of its
+        chunk are handed to another worker instead of being laid off, too.
+        """
+        self._dismiss(worker_process)
+
+        # A worker that got a chunk of tasks runs several calls at once.
+        calls = self._status_db.get_running_calls(worker_process.worker_id)
+        if call_id is not None:
+            # The worker runs the calls of a chunk one after another, so the
+            # others of the given call's chunk may not even have started.
+            call_ids_chunk = self._status_db.get_chunk_call_ids(call_id)
+            if call_ids_chunk:
+                self._status_db.requeue(call_ids_chunk)
+                calls = [call for call in calls
+                         if call.id not in call_ids_chunk]
+        if not calls:
             # The terminated worker was idle
             try:
-                call = self._status_db.pop_idle_call()
+                calls = [self._status_db.pop_idle_call()]
             except ValueError:
                 # No task was started for this worker process.
                 # Construct a None "call" manually to use as a dummy pay load.
-                call = None
+                calls = [None]
 
-        # send manually constructed layoff outcome
-        layoff = Layoff(worker_id=worker_process.worker_id, call=call,
-                        value=reason)
-        self._queue_outcome.put(layoff)
+        # send manually constructed layoff outcomes
+        for call in calls:
+            layoff = Layoff(worker_id=worker_process.worker_id, call=call,
+                            value=reason)
+            self._queue_outcome.put(layoff)
 
     def abandon(self, reason=None):
         """
-        Lays off all worker processes.
+        Lays off all worker processes, including spare ones.
         """
         with self._lock:
+            # stop promoting and replenishing spares, then dismiss them
+            self._abandoned = True
+            # dismissed workers gave their slots back already
+            if self._tenant is not None:
+                self._tenant.release(
+                    len(self._worker_processes) - self._dismissals)
+            self._dismissals = 0
+            for worker_process in self._spare_processes:
+                self._dismiss(worker_process)
+            self._spare_processes = []
+
             # copy worker processes so that _lay_off does not modify
             if reason is None:
                 reason = LayoffError("Releasing all workers.")
             for worker_process in self._worker_processes[:]:
+                self._remove(worker_process=worker_process, replace=False)
                 self._lay_off(worker_process=worker_process, reason=reason)
 
+            # free the resources of all calls of this employer
+            for call_id in list(self._call_ids_reserved):
+                self._release(call_id)
+
+    def _get_worker_process_for_call(self, call_id):
+        """
+        Utility method to resolve a call id to the worker process that started
+        the call. Raises KeyError if there is none.
+        """
+        worker_id = self._status_db.get_worker_id(call_id=call_id)
+        return self._get_worker_process_for_id(worker_id)
+
     def _get_worker_process_for_id(self, worker_id):
         """Utility method to resolve a worker id to a worker process."""
         for worker_process in self._worker_processes:
@@ -139,6 +497,15 @@ class ProcessWorkerEmployer(Employer):
 
     @property
     def worker_count(self):
-        """Returns the number of currently running worker processes."""
+        """
+        Returns the number of currently running worker processes, not counting
+        dismissed ones.
+        """
+        with self._lock:
+            return len(self._worker_processes) - self._dismissals
+
+    @property
+    def spare_count(self):
+        """Returns the number of started up spare worker processes."""
         with self._lock:
-            return len(self._worker_processes)
+            return len(self._spare_processes)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Employer of worker threads for the thread pool invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# First Party
+from metaopt.concurrent.employer.process import ProcessWorkerEmployer
+from metaopt.concurrent.worker.thread import ThreadWorker
+
+
+class ThreadWorkerEmployer(ProcessWorkerEmployer):
+    """
+    Keeps track of up to as many worker threads as there are CPUs.
+
+    Unlike worker processes, worker threads belong to a single employer.
+    """
+
+    def __init__(self, queue_tasks, queue_outcome, queue_start,
+                 status_db, resources=None, transport=None, job_store=None,
+                 initializer=None):
+        """
+        :param:    resources    number of (possibly virtual) CPUs to use,
+                                defaults to all
+        :param:    transport    transport that connects new worker threads,
+                                defaults to sharing the given queues
+        :param:    job_store    store the worker threads look up jobs in
+        :param:  initializer    function each worker thread calls once to set
+                                up the context passed to its calls
+        """
+        super(ThreadWorkerEmployer, self).__init__(
+            queue_tasks=queue_tasks, queue_outcome=queue_outcome,
+            queue_start=queue_start, status_db=status_db,
+            resources=resources, transport=transport, job_store=job_store,
+            initializer=initializer)
+
+        # do not share the workers or their reservations with other employers
+        self._worker_processes = []
+        self._reservations = dict()
+
+    def _create_worker(self, queue_tasks, queue_outcome, queue_start,
+                       spare=False):
+        """Creates and starts a worker thread that uses the given queues."""
+        del spare  # worker threads start up instantly, so there are no spares
+        return ThreadWorker(queue_tasks=queue_tasks,
+                            queue_outcome=queue_outcome,
+                            queue_start=queue_start,
+                            job_store=self._job_store,
+                            initializer=self._initializer)
+
+    def _dismiss(self, worker_process):
+        """
+        Terminates the given worker thread without waiting for it to end.
+
+        The thread finishes its current call in the background. Its outcome
+        arrives after the layoff, so the status database discards it.
+        """
+        worker_process.terminate()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities to read the CPU quota and memory limit of the cgroups of a process.
+
+Containers limit the resources of their processes by cgroups, either of
+version 1, where each controller has a hierarchy of its own, or of version 2,
+where all controllers share one. A limit of any ancestor cgroup applies, too.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+
+
+def read_cpu_quota(root=""):
+    """
+    Returns the smallest CPU quota of the cgroups of this process in CPUs,
+    along with the path of the file that sets it. Returns (None, None) without
+    quota.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    limits = []
+
+    for directory in _directories("", root):
+        path = os.path.join(directory, "cpu.max")
+        content = _read(path)
+        if content is None:
+            continue
+        quota, _, period = content.partition(" ")
+        if quota != "max":
+            limits.append((int(quota) / int(period or 100000), path))
+
+    for directory in _directories("cpu", root):
+        path = os.path.join(directory, "cpu.cfs_quota_us")
+        quota = _read(path)
+        period = _read(os.path.join(directory, "cpu.cfs_period_us"))
+        if quota is not None and period is not None and int(quota) > 0:
+            limits.append((int(quota) / int(period), path))
+
+    if not limits:
+        return None, None
+    return min(limits)
+
+
+def read_memory_limit(root=""):
+    """
+    Returns the smallest memory limit of the cgroups of this process in bytes,
+    along with the path of the file that sets it. Returns (None, None) without
+    limit.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    limits = []
+
+    for directory in _directories("", root):
+        path = os.path.join(directory, "memory.max")
+        content = _read(path)
+        if content is not None and content != "max":
+            limits.append((int(content), path))
+
+    for directory in _directories("memory", root):
+        # Version 1 has no value for no limit, but a huge number instead.
+        # So callers take the physical memory if it is smaller.
+        path = os.path.join(directory, "memory.limit_in_bytes")
+        content = _read(path)
+        if content is not None:
+            limits.append((int(content), path))
+
+    if not limits:
+        return None, None
+    return min(limits)
+
+
+def read_memory_left(root=""):
+    """
+    Returns the smallest number of bytes the cgroups of this process may
+    allocate before reaching their memory limits. Returns None without limit.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    lefts = []
+
+    for directory in _directories("", root):
+        limit = _read(os.path.join(directory, "memory.max"))
+        usage = _read(os.path.join(directory, "memory.current"))
+        if limit is not None and limit != "max" and usage is not None:
+            lefts.append(int(limit) - int(usage))
+
+    for directory in _directories("memory", root):
+        limit = _read(os.path.join(directory, "memory.limit_in_bytes"))
+        usage = _read(os.path.join(directory, "memory.usage_in_bytes"))
+        if limit is not None and usage is not None:
+            lefts.append(int(limit) - int(usage))
+
+    if not lefts:
+        return None
+    return max(min(lefts), 0)
+
+
+def _read(path):
+    """Returns the stripped content of the file at the given path, if any."""
+    try:
+        with open(path) as limit_file:
+            return limit_file.read().strip()
+    except (IOError, OSError):
+        return None
+
+
+def _directories(controller, root):
+    """
+    Returns the directories of the cgroup of this process and its ancestors
+    for the given version 1 controller, or for version 2 if it is "".
+    """
+    groups = dict()
+    for line in (_read(root + "/proc/self/cgroup") or "").splitlines():
+        _, controllers, path = line.split(":", 2)
+        for controller_group in controllers.split(","):
+            groups[controller_group] = path
+
+    path = groups.get(controller)
+    if path is None:
+        return []
+
+    for mount_root, mount_point, fstype, options in _mounts(root):
+        if controller == "" and fstype != "cgroup2":
+            continue
+        if controller != "" and \
+                (fstype != "cgroup" or controller not in options):
+            continue
+
+        # A mount shows the part of the hierarchy below its root, only.
+        # Containers mount their own cgroup as root, which is outside of it.
+        relative = os.path.relpath(path, mount_root)
+        if relative.startswith(".."):
+            relative = "."
+
+        mount_point = os.path.normpath(root + mount_point)
+        directory = os.path.normpath(os.path.join(mount_point, relative))
+        directories = [directory]
+        while directory != mount_point:
+            directory = os.path.dirname(directory)
+            directories.append(directory)
+        return directories
+
+    return []
+
+
+def _mounts(root):
+    """
+    Yields the root, mount point, file system type and super options of each
+    cgroup mount of this process.
+    """
+    for line in (_read(root + "/proc/self/mountinfo") or "").splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index("-")
+        except ValueError:
+            continue
+        fstype = fields[separator + 1]
+        if fstype in ("cgroup", "cgroup2"):
+            options = fields[separator + 3].split(",") \
+                if len(fields) > separator + 3 else []
+            yield fields[3], fields[4], fstype, options
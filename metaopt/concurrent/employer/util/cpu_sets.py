@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities to split the CPUs of a process into sets to pin workers to.
+
+CPUs of the same NUMA node share their memory and caches, so each set is cut
+from the CPUs of as few nodes as possible.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import glob
+import os
+from multiprocessing import cpu_count
+
+
+def split_cpus(count, cpus=None, root=""):
+    """
+    Splits the CPUs this process may use into the given number of disjoint
+    sets of equal size, CPUs of a NUMA node next to each other.
+
+    Returns fewer sets, if there are fewer CPUs, and leaves over the CPUs that
+    do not make up a whole set.
+
+    :param count: Number of sets to split the CPUs into.
+    :param  cpus: CPUs to split, defaults to those this process may use.
+    :param  root: Path to prepend to /sys, for testing.
+    """
+    if cpus is None:
+        cpus = read_available_cpus()
+    nodes = read_numa_nodes(root)
+    cpus = sorted(cpus, key=lambda cpu: (nodes.get(cpu, 0), cpu))
+
+    size = max(len(cpus) // count, 1)
+    return [frozenset(cpus[index * size:(index + 1) * size])
+            for index in range(min(count, len(cpus)))]
+
+
+def read_available_cpus():
+    """Returns the CPUs in the affinity mask of this process, or all CPUs."""
+    try:
+        return set(os.sched_getaffinity(0))
+    except AttributeError:
+        # The affinity mask is only available on Linux with Python 3.
+        # So fall back to all CPUs.
+        return set(range(cpu_count()))
+
+
+def read_numa_nodes(root=""):
+    """
+    Returns the NUMA node of each CPU by CPU number, which is empty if the
+    machine tells no NUMA nodes.
+
+    :param root: Path to prepend to /sys, for testing.
+    """
+    nodes = dict()
+    pattern = root + "/sys/devices/system/node/node[0-9]*/cpulist"
+    for path in glob.glob(pattern):
+        node = int(os.path.basename(os.path.dirname(path))[len("node"):])
+        try:
+            with open(path) as cpu_list:
+                content = cpu_list.read()
+        except (IOError, OSError):
+            continue
+        for cpu in parse_cpu_list(content):
+            nodes[cpu] = node
+    return nodes
+
+
+def parse_cpu_list(content):
+    """Returns the CPUs of a list like "0-3,8,10-11" as a set."""
+    cpus = set()
+    for part in content.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Utility to determine the memory that calls can reserve.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+
+# First Party
+from metaopt.concurrent.employer.util.cgroup import read_memory_left, \
+    read_memory_limit
+
+
+def determine_memory(request=None):
+    """
+    Determines the bytes of memory that running calls may reserve at once.
+
+    Defaults to the memory this process may use, or None for unlimited memory
+    if it can not be determined.
+    """
+    return explain_memory(request)[0]
+
+
+def explain_memory(request=None, root=""):
+    """
+    Determines the bytes of memory that running calls may reserve at once,
+    returning them along with a sentence that says why.
+
+    Without a request, that is the physical memory of this machine, unless the
+    memory limit of the cgroups of this process, e.g. of a container, is lower.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    if request is not None:
+        if request <= 0:
+            raise ValueError("Request parameter needs to be greater 0.")
+        return request, "%s bytes of memory as requested." % request
+
+    try:
+        # attempt automatic configuration
+        memory = os.sysconf(str("SC_PAGE_SIZE")) * \
+            os.sysconf(str("SC_PHYS_PAGES"))
+        reason = "%s bytes of physical memory of this machine." % memory
+    except (AttributeError, ValueError, OSError):
+        # os.sysconf is Unix only
+        memory = None
+        reason = "Unlimited memory, since the physical memory is unknown."
+
+    limit, path = read_memory_limit(root=root)
+    if limit is not None and (memory is None or limit < memory):
+        memory = limit
+        reason = "%s bytes of memory for the limit set by %s." % (limit, path)
+
+    return memory, reason
+
+
+def measure_available_memory(root=""):
+    """
+    Returns the bytes of memory that are available to new processes, e.g. new
+    workers, or None if that can not be measured.
+
+    That is the memory available on this machine, unless the memory left by
+    the limits of the cgroups of this process is lower.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    available = None
+    try:
+        with open(root + "/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (IOError, OSError, ValueError, IndexError):
+        # There is no proc file system, e.g. on Mac OS X.
+        # So the available memory is unknown.
+        pass
+
+    left = read_memory_left(root=root)
+    if left is not None and (available is None or left < available):
+        available = left
+    return available
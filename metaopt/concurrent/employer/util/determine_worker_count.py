@@ -7,8 +7,13 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
+import os
+from math import ceil
 from multiprocessing import cpu_count
 
+# First Party
+from metaopt.concurrent.employer.util.cgroup import read_cpu_quota
+
 
 def determine_worker_count(request=None):
     """
@@ -17,16 +22,57 @@ def determine_worker_count(request=None):
     If there are more physical or virtual CPUs available on this machine than
     the number of requested request, the latter is returned.
     """
-    if request is None:
-        try:
-            # attempt automatic configuration
-            return cpu_count()
-        except NotImplementedError:
-            # assume single core, to be safe
-            return 1
-    if type(request) is not int:
-        raise NotImplementedError("Request parameter needs to be of type int.")
-    if request <= 0:
-        raise NotImplementedError("Request parameter needs to be greater 0.")
-
-    return request
+    return explain_worker_count(request)[0]
+
+
+def explain_worker_count(request=None, root=""):
+    """
+    Determines the maximum number of worker processes or threads, returning it
+    along with a sentence that says why.
+
+    Without a request, there is a worker for each CPU this process may use.
+    That is the number of CPUs of this machine, unless the affinity mask of
+    this process or the CPU quota of its cgroups, e.g. of a container, allow
+    fewer. Quotas of a fraction of a CPU are rounded up.
+
+    :param root: Path to prepend to /proc and the cgroup mounts, for testing.
+    """
+    if request is not None:
+        if type(request) is not int:
+            raise NotImplementedError(
+                "Request parameter needs to be of type int.")
+        if request <= 0:
+            raise NotImplementedError(
+                "Request parameter needs to be greater 0.")
+        return request, "%s as requested." % _workers(request)
+
+    try:
+        # attempt automatic configuration
+        count = cpu_count()
+    except NotImplementedError:
+        # assume single core, to be safe
+        return 1, "%s, since the number of CPUs is unknown." % _workers(1)
+    reason = "%s for the CPUs of this machine." % _workers(count)
+
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Only Python 3.3 or later on Linux tell the affinity mask.
+        affinity = None
+    if affinity is not None and affinity < count:
+        count = affinity
+        reason = "%s for the CPUs in the affinity mask of this process." % \
+            _workers(count)
+
+    quota, path = read_cpu_quota(root=root)
+    if quota is not None and int(ceil(quota)) < count:
+        count = max(int(ceil(quota)), 1)
+        reason = "%s for the CPU quota of %.4g CPUs set by %s." % \
+            (_workers(count), quota, path)
+
+    return count, reason
+
+
+def _workers(count):
+    """Returns the given number of workers in words."""
+    return "1 worker" if count == 1 else "%s workers" % count
@@ -12,3 +12,10 @@ class LayoffError(Exception):
 
     def __init__(self, message=None):
         super(LayoffError, self).__init__(message)
+
+
+class MemoryLimitError(LayoffError):
+    """Indicates that a worker got laid off for exceeding its memory limit."""
+
+    def __init__(self, message=None):
+        super(MemoryLimitError, self).__init__(message)
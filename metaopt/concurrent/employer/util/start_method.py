@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities that start worker processes with a given start method.
+
+Python 3 starts processes by forking, by spawning a fresh interpreter or by
+forking a server process that was started once ("forkserver"). Python 2 always
+forks. Modules can be preloaded, so workers do not import them one by one.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import multiprocessing
+from importlib import import_module
+
+try:
+    # Python 2 starts processes via its forking module.
+    from multiprocessing.forking import Popen as ForkingPopen
+except ImportError:
+    # Python 3 starts them via the Popen of its contexts.
+    ForkingPopen = None
+
+
+def get_context(start_method=None):
+    """
+    Returns the multiprocessing context of the given start method.
+
+    Returns the multiprocessing module itself on Python 2, which forks only.
+    Raises ValueError for unknown or unsupported start methods.
+
+    :param start_method: Either "fork", "spawn" or "forkserver". Defaults to
+                         the platform's default start method.
+    """
+    try:
+        return multiprocessing.get_context(start_method)
+    except AttributeError:
+        # Python 2 has no contexts, it always forks.
+        if start_method not in (None, "fork"):
+            raise ValueError("Start method %s needs Python 3.4 or later." %
+                             start_method)
+        return multiprocessing
+
+
+def get_popen(start_method=None):
+    """
+    Returns the function that starts a given process with a start method.
+
+    :param start_method: Either "fork", "spawn" or "forkserver". Defaults to
+                         the platform's default start method.
+    """
+    return get_context(start_method).Process._Popen or ForkingPopen
+
+
+def get_start_method(context):
+    """Returns the name of the start method of the given context."""
+    try:
+        return context.get_start_method()
+    except AttributeError:
+        # Python 2 always forks.
+        return "fork"
+
+
+def preload_modules(context, modules):
+    """
+    Imports the given modules once for all workers of the given context.
+
+    Forked workers inherit the modules imported by this process. The fork
+    server imports them once when it starts, before it forks any worker.
+    Spawned workers have to import them themselves, see :func:`import_modules`.
+    """
+    start_method = get_start_method(context)
+    if start_method == "forkserver":
+        # Only takes effect if the fork server is not running already.
+        # Workers import the modules themselves otherwise.
+        context.set_forkserver_preload(list(modules))
+    elif start_method == "fork":
+        import_modules(modules)
+
+
+def import_modules(modules):
+    """Imports the modules given by name, if not imported already."""
+    for module in modules:
+        import_module(module)
@@ -102,6 +102,31 @@ class BaseInvoker(Stoppable):
         """
         pass
 
+    @abc.abstractmethod
+    @stoppable
+    def invoke_many(self, caller, fargs_list, kwargs_list=None,
+                    on_issue=None):
+        """
+        Invoke an objective function with each of the given arguments.
+
+        Implementations of this method are expected to behave like calling
+        :meth:`invoke` for each element of `fargs_list` (and the corresponding
+        element of `kwargs_list`), but may hand the calls to their executors
+        in fewer messages.
+
+        Since this method may block till the last calls were issued, it calls
+        back `on_issue` with the index of each call and its TaskHandle as soon
+        as that call was issued, e.g. to start a timeout for it right away.
+
+        :param caller: Caller
+        :param fargs_list: List of arguments `f` should be applied to
+        :param kwargs_list: List of additional data arguments (optional)
+        :param on_issue: Function to call back for each issued call (optional)
+
+        :rtype: List of TaskHandles, one for each element of `fargs_list`.
+        """
+        pass
+
     @abc.abstractmethod
     def wait(self):
         """
@@ -118,3 +143,38 @@ class BaseInvoker(Stoppable):
         :rtype: None
         """
         pass
+
+    def wait_for_one(self, timeout=None):
+        """
+        Wait until `on_result` or `on_error` were called for the next call to
+        end, e.g. to go on once enough calls of a generation ended.
+
+        Returns whether an outcome was reported, which is not the case if no
+        call was awaited or none ended within the given seconds. Invokers that
+        can not tell their calls apart wait for all of them, like
+        :meth:`wait`, and return False.
+
+        :param timeout: Seconds to wait at most, or None to wait as long as
+                        it takes.
+        :rtype: bool
+        """
+        del timeout  # waiting for all calls can not be cut short
+        self.wait()
+        return False
+
+    def as_completed(self, handles, timeout=None):
+        """
+        Yields the given call handles, as returned by :meth:`invoke`, as their
+        calls end, like :func:`concurrent.futures.as_completed`.
+
+        Invokers that can not tell their calls apart wait for all of them,
+        like :meth:`wait`, and yield the handles afterwards.
+
+        :param handles: Handles of calls of this invoker
+        :param timeout: Seconds to wait at most for all calls to end, or None
+                        to wait as long as it takes.
+        """
+        del timeout  # waiting for all calls can not be cut short
+        self.wait()
+        for handle in handles:
+            yield handle
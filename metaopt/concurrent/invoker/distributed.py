@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Invoker that uses worker agents connected via TCP, e.g. on other machines.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# First Party
+from metaopt.concurrent.employer.agent import AgentEmployer
+from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+from metaopt.concurrent.invoker.util.job_store import TransportJobStore
+from metaopt.concurrent.invoker.util.transport import TCPTransport
+
+
+class DistributedInvoker(MultiProcessInvoker):
+    """
+    Invoker that invokes objective functions in parallel on worker agents.
+
+    Run ``metaopt-worker HOST:PORT`` on each machine that should execute calls,
+    where HOST:PORT is the :attr:`address` of this invoker. Each agent starts
+    a worker process per slot and connects via TCP. Agents may connect and
+    disconnect at any time. Calls of an agent that disconnects are handed to
+    the remaining agents again.
+
+    Calls and jobs are pickled, so the objective function must be importable
+    on every agent. Stopping a call makes the agent replace the worker that
+    executes it.
+    """
+
+    def __init__(self, address=("localhost", 0), authkey=None, chunk_size=1):
+        """
+        :param    address: Host and port to listen on for agents. Port 0 picks
+                           a free one, see :attr:`address`.
+        :param    authkey: Bytes that agents must know to connect. Messages are
+                           pickled, so anyone who can connect can run code in
+                           this process. Required unless the host is a
+                           loopback address, which only this machine can
+                           reach. Raises ValueError if missing otherwise.
+        :param chunk_size: Number of calls handed to a worker at once by
+                           :meth:`invoke_many`. Adapts to the measured
+                           duration of calls, if None.
+        """
+        self._address = address
+        self._authkey = authkey
+        super(DistributedInvoker, self).__init__(transport=None,
+                                                 chunk_size=chunk_size)
+
+    @property
+    def address(self):
+        """Returns the host and port that agents connect to."""
+        return self._transport.address
+
+    def _create_transport(self, transport):
+        """Creates a TCP transport, ignoring the given one."""
+        del transport  # agents always connect via TCP
+        return TCPTransport(address=self._address, authkey=self._authkey)
+
+    def _create_job_store(self):
+        """Creates a store that sends the jobs to the agents."""
+        return TransportJobStore(transport=self._transport)
+
+    def _create_employer(self, resources):
+        """Creates the employer of the workers of the agents."""
+        del resources  # the agents advertise their slots themselves
+        return AgentEmployer(queue_outcome=self._queue_outcome,
+                             status_db=self._status_db,
+                             transport=self._transport)
+
+    def _wait_for_worker(self):
+        """Waits till an agent is connected, then for one of its workers."""
+        self._employer.wait_for_workers()
+        super(DistributedInvoker, self)._wait_for_worker()
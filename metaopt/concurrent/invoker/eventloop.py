@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Invoker that awaits coroutine objective functions on an asyncio event loop.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import uuid
+from functools import partial
+from threading import Lock, Thread
+
+# First Party
+from metaopt.concurrent.employer.util.exception import LayoffError
+from metaopt.concurrent.invoker.invoker import Invoker
+from metaopt.concurrent.model.call_lifecycle import Call, Error, Layoff, \
+    Result, Wakeup
+from metaopt.core.call.call import call
+from metaopt.core.optimize.util.exception import MissingRequirementsError
+from metaopt.core.returnspec.util.wrap_return_values import wrap_return_values
+from metaopt.core.stoppable.util.decorator import stoppable, stopping
+from metaopt.core.stoppable.util.exception import StoppedError
+
+try:
+    import asyncio
+except ImportError:
+    raise MissingRequirementsError('asyncio')
+
+try:
+    from Queue import Empty, Queue
+except ImportError:
+    # Queue was renamed to queue in Python 3
+    from queue import Empty, Queue
+
+# number of calls awaited at once, by default
+CONCURRENCY = 256
+
+
+class AsyncioInvoker(Invoker):
+    """
+    Invoker that awaits coroutine objective functions on an asyncio event loop.
+
+    The event loop runs in a thread of its own, so invoke and wait are called
+    as usual. Since awaiting a call occupies neither a process nor a thread,
+    many calls are awaited at once, e.g. to wait for an external service.
+    Objective functions that are no coroutine functions are called right away.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY):
+        """
+        :param concurrency: Number of calls to await at once at most.
+        """
+        super(AsyncioInvoker, self).__init__()
+
+        if type(concurrency) is not int or concurrency <= 0:
+            raise ValueError("Concurrency needs to be an int greater 0.")
+        self._concurrency = concurrency
+
+        # outcomes of calls, delivered by the event loop
+        self._queue_outcome = Queue()
+
+        # calls awaited and their futures, by call id
+        self._calls_running = dict()
+
+        # we can not prohibit others to use us in parallel, so
+        # make this invoker thread-safe
+        self._lock = Lock()
+
+        self._loop = asyncio.new_event_loop()
+        thread = Thread(target=self._run_loop)
+        thread.daemon = True
+        thread.start()
+
+    def _run_loop(self):
+        """Runs the event loop till this invoker stops."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @stoppable
+    def invoke(self, caller, fargs, **kwargs):
+        """
+        Invokes call(f, fargs) with the given function and the given arguments.
+
+        Blocks while as many calls as the concurrency allows are awaited.
+        """
+        with self._lock:
+            self._caller = caller
+
+            while len(self._calls_running) >= self._concurrency:
+                # wait for a free slot by getting and handling an outcome
+                self._handle_outcome_received(self._wait_for_one_outcome())
+
+            job = self.job
+            call_ = Call(id=uuid.uuid4(), job_id=job.id, args=fargs,
+                         kwargs=kwargs)
+            handle = self._create_handle(call_.id)
+
+            try:
+                value = call(f=job.function, fargs=call_.args,
+                             param_spec=job.param_spec).raw_values
+            except Exception as error:
+                # The objective function could not be called.
+                self._calls_running[call_.id] = (call_, None)
+                self._queue_outcome.put(Error(worker_id=None, call=call_,
+                                              value=error))
+                return handle
+
+            if not asyncio.iscoroutine(value):
+                # The objective function was no coroutine function.
+                # So it returned its value right away.
+                self._calls_running[call_.id] = (call_, None)
+                self._queue_outcome.put(self._create_result(job, call_,
+                                                            value))
+                return handle
+
+            future = asyncio.run_coroutine_threadsafe(value, self._loop)
+            self._calls_running[call_.id] = (call_, future)
+            future.add_done_callback(partial(self._done, job, call_))
+
+            return handle
+
+    def _create_result(self, job, call_, value):
+        """Wraps the given raw return value into a result for the call."""
+        return Result(worker_id=None, call=call_,
+                      value=wrap_return_values(value, job.return_spec))
+
+    def _done(self, job, call_, future):
+        """Reports the outcome of the given future, once it is done."""
+        if future.cancelled():
+            # The call was stopped, which reported a layoff already.
+            return
+
+        error = future.exception()
+        if error is None:
+            self._queue_outcome.put(self._create_result(job, call_,
+                                                        future.result()))
+        else:
+            self._queue_outcome.put(Error(worker_id=None, call=call_,
+                                          value=error))
+
+    def _wait_for_one_outcome(self, timeout=None):
+        """
+        Blocks till an outcome was gotten from the outcome queue, or raises
+        Empty if none arrived within the given seconds.
+
+        Raises StoppedError if woken up by a concurrent stop, instead. The
+        wake-up is put back, so further threads waiting on the queue wake up,
+        too.
+        """
+        outcome = self._queue_outcome.get(timeout=timeout)
+        if isinstance(outcome, Wakeup):
+            self._queue_outcome.put(outcome)
+            raise StoppedError()
+        return outcome
+
+    def _handle_outcome_received(self, outcome):
+        """
+        Handles the given outcome, unless its call ended already.
+
+        This is the case for the result of a call that was stopped before the
+        result arrived.
+        """
+        if self._calls_running.pop(outcome.call.id, None) is None:
+            return
+        self._handle_outcome(outcome)
+
+    def wait(self):
+        """Blocks till all currently invoked calls terminate."""
+        while self._calls_running and not self._stopped:
+            try:
+                outcome = self._wait_for_one_outcome()
+            except StoppedError:
+                # This invoker was stopped via self.stop() meanwhile.
+                # The stop reports all remaining outcomes itself.
+                return
+            with self._lock:
+                self._handle_outcome_received(outcome)
+
+    def wait_for_one(self, timeout=None):
+        """
+        Blocks till the next outcome was handled or the given seconds passed.
+        Returns whether an outcome arrived.
+        """
+        if not self._calls_running or self._stopped:
+            return False
+        try:
+            outcome = self._wait_for_one_outcome(timeout=timeout)
+        except Empty:
+            # No call ended in time.
+            return False
+        except StoppedError:
+            # This invoker was stopped via self.stop() meanwhile.
+            # The stop reports all remaining outcomes itself.
+            return False
+        with self._lock:
+            self._handle_outcome_received(outcome)
+        return True
+
+    def stop_call(self, call_id, reason):
+        """
+        Stops a call given by its id, by cancelling its coroutine.
+
+        Gets called by a timer in an individual thread.
+        """
+        try:
+            call_, future = self._calls_running[call_id]
+        except KeyError:
+            # The call ended already.
+            # So there is nothing left to do here.
+            return
+
+        if future is not None:
+            future.cancel()
+        self._queue_outcome.put(Layoff(worker_id=None, call=call_,
+                                       value=reason))
+
+    @stoppable
+    @stopping
+    def stop(self, reason=None):
+        """
+        Cancels all awaited calls and stops the event loop.
+
+        Gets called by a timer in an individual thread.
+        """
+        if reason is None:
+            reason = LayoffError("Stopping all calls.")
+
+        for call_id in list(self._calls_running.keys()):
+            self.stop_call(call_id=call_id, reason=reason)
+
+        # wake up invoke and wait, so that they release the lock
+        self._queue_outcome.put(Wakeup())
+
+        # report all outcomes that invoke and wait did not get to the caller
+        with self._lock:
+            while True:
+                try:
+                    outcome = self._queue_outcome.get_nowait()
+                except Empty:
+                    break
+                if isinstance(outcome, Wakeup):
+                    continue
+                try:
+                    self._handle_outcome_received(outcome)
+                except StoppedError:
+                    # The caller tried to invoke again, e.g. to retry a call.
+                    # That is not possible anymore, so just carry on.
+                    pass
+
+        # wake up waiting threads again, in case this took their wake-up
+        self._queue_outcome.put(Wakeup())
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -6,8 +6,17 @@ Minimal invoker implementation.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+import uuid
+from threading import Condition
+from time import time
+
 # First Party
 from metaopt.concurrent.invoker.base import BaseInvoker
+from metaopt.concurrent.invoker.util.call_handle import CallHandle, \
+    TimeoutError
+from metaopt.concurrent.model.call_lifecycle import Error, Job, Layoff, \
+    Result
 from metaopt.core.call.call import call
 from metaopt.core.returnspec.returnspec import ReturnSpec
 from metaopt.core.stoppable.stoppable import stoppable
@@ -25,6 +34,12 @@ class Invoker(BaseInvoker):
         self._caller = None
         self._param_spec = None
         self._return_spec = None
+        self._job = None
+
+        # handles of calls whose outcomes were not handled yet, by call id
+        self._handles = dict()
+        # notified whenever a handle got the outcome of its call
+        self._condition_handles = Condition()
 
     @property
     def f(self):
@@ -37,6 +52,7 @@ class Invoker(BaseInvoker):
         self._f = function
         self._param_spec = function.param_spec
         self._return_spec = ReturnSpec(function)
+        self._job = None
 
     @property
     def param_spec(self):
@@ -47,6 +63,7 @@ class Invoker(BaseInvoker):
     def param_spec(self, param_spec):
         """Property setter for the parameter specification attribute."""
         self._param_spec = param_spec
+        self._job = None
 
     @property
     def return_spec(self):
@@ -57,6 +74,133 @@ class Invoker(BaseInvoker):
     def return_spec(self, return_spec):
         """Property setter for the return specification attribute."""
         self._return_spec = return_spec
+        self._job = None
+
+    @property
+    def job(self):
+        """
+        Property getter for the job of the function and specifications.
+
+        Setting any of them starts a new job, so calls invoked before keep
+        referring to the job they were invoked with.
+        """
+        if self._job is None:
+            self._job = Job(id=uuid.uuid4(), function=self._f,
+                            param_spec=self._param_spec,
+                            return_spec=self._return_spec)
+        return self._job
+
+    def _get_caller_for_call(self, call):
+        """Returns the caller to report the outcome of the given call to."""
+        del call  # there is only one caller at a time
+        return self._caller
+
+    def _handle_error(self, error):
+        """"""
+        assert isinstance(error, Error)
+        caller = self._get_caller_for_call(error.call)
+        try:
+            caller.on_error(value=error.value, fargs=error.call.args,
+                            **error.call.kwargs)
+        except TypeError:
+            # error.kwargs was None
+            caller.on_error(value=error.value, fargs=error.call.args)
+        finally:
+            self._resolve_handle(call=error.call, error=error.value)
+
+    def _handle_result(self, result):
+        """"""
+        assert isinstance(result, Result)
+        assert result.value
+        assert result.call.args
+
+        caller = self._get_caller_for_call(result.call)
+        try:
+            caller.on_result(value=result.value, fargs=result.call.args,
+                             **result.call.kwargs)
+        except TypeError:
+            # result.kwargs was None
+            caller.on_result(value=result.value, fargs=result.call.args)
+        finally:
+            self._resolve_handle(call=result.call, value=result.value)
+
+    def _handle_layoff(self, layoff):
+        assert isinstance(layoff, Layoff)
+
+        try:
+            self._get_caller_for_call(layoff.call).on_error(
+                value=layoff.value, fargs=layoff.call.args,
+                **layoff.call.kwargs)
+        except AttributeError:
+            # layoff.call was None
+            # This means, the WPP constructed the "call" object manually.
+            # The caller is not expecting a result for those calls.
+            # Nothing to do here.
+            return
+        finally:
+            self._resolve_handle(call=layoff.call, error=layoff.value)
+
+    def _create_handle(self, call_id):
+        """
+        Returns a handle of the call given by id, which gets the outcome of the
+        call once it is handled.
+        """
+        handle = CallHandle(invoker=self, call_id=call_id)
+        self._handles[call_id] = handle
+        return handle
+
+    def _resolve_handle(self, call, value=None, error=None):
+        """Passes the outcome of the given call to its handle, if any."""
+        if call is None:
+            return
+        handle = self._handles.pop(call.id, None)
+        if handle is None:
+            return
+        handle._resolve(value=value, error=error)
+        with self._condition_handles:
+            self._condition_handles.notify_all()
+
+    def _is_started(self, call_id):
+        """
+        Returns whether the call given by id was started. Calls are started as
+        soon as they are invoked, unless an invoker queues them.
+        """
+        del call_id
+        return True
+
+    def _wait_for_any(self, handles, timeout=None):
+        """
+        Handles outcomes till any of the given handles got the outcome of its
+        call or the given seconds passed.
+        """
+        time_end = None if timeout is None else time() + timeout
+        while not any(handle.done() for handle in handles):
+            remaining = None if time_end is None else time_end - time()
+            if remaining is not None and remaining <= 0:
+                return
+            if self.wait_for_one(timeout=remaining):
+                continue
+
+            # Another thread handles the outcomes, so wait for it to pass them
+            # to their handles. Check again every now and then, in case it
+            # left this invoker to wait for outcomes meanwhile.
+            with self._condition_handles:
+                if not any(handle.done() for handle in handles):
+                    self._condition_handles.wait(
+                        0.1 if remaining is None else min(remaining, 0.1))
+
+    def _handle_outcome(self, outcome):
+        """"""
+        if isinstance(outcome, Error):
+            self._handle_error(error=outcome)
+        elif isinstance(outcome, Result):
+            self._handle_result(result=outcome)
+        elif isinstance(outcome, Layoff):
+            self._handle_layoff(layoff=outcome)
+        else:
+            # Will not happen
+            raise ValueError("Objects of this type are not allowed in the " +
+                             "outcome queue: %s" % type(outcome))
 
     @stoppable
     def invoke(self, caller, fargs, **kwargs):
@@ -64,5 +208,41 @@ class Invoker(BaseInvoker):
         del caller
         call(self.f, fargs, **kwargs)
 
+    @stoppable
+    def invoke_many(self, caller, fargs_list, kwargs_list=None,
+                    on_issue=None):
+        if kwargs_list is None:
+            kwargs_list = [dict() for _ in fargs_list]
+        handles = []
+        for index, (fargs, kwargs) in enumerate(zip(fargs_list, kwargs_list)):
+            handles.append(self.invoke(caller, fargs, **kwargs))
+            if on_issue is not None:
+                on_issue(index, handles[index])
+        return handles
+
     def wait(self):
         return
+
+    def as_completed(self, handles, timeout=None):
+        """
+        Yields the given call handles as their calls end, handling outcomes
+        while none of them ended.
+
+        Raises a TimeoutError if not all calls ended within the given seconds.
+        """
+        time_end = None if timeout is None else time() + timeout
+        handles = list(handles)
+        handles_pending = list(handles)
+        while handles_pending:
+            for handle in [handle for handle in handles_pending
+                           if handle.done()]:
+                handles_pending.remove(handle)
+                yield handle
+            if not handles_pending:
+                return
+
+            remaining = None if time_end is None else time_end - time()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("%s of %s calls did not end in time." %
+                                   (len(handles_pending), len(handles)))
+            self._wait_for_any(handles=handles_pending, timeout=remaining)
@@ -7,26 +7,39 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
+import logging
 import uuid
-from multiprocessing import Manager
-from threading import Lock
+from threading import Condition, Event, Lock, Thread, Timer, current_thread
+from time import sleep, time
 
 # First Party
 from metaopt.concurrent.employer.process import ProcessWorkerEmployer
+from metaopt.concurrent.employer.util.start_method import get_context
 from metaopt.concurrent.invoker.invoker import Invoker
-from metaopt.concurrent.invoker.util.call_handle import CallHandle
+from metaopt.concurrent.invoker.util.determine_chunk_size import \
+    determine_chunk_size
 from metaopt.concurrent.invoker.util.determine_package import determine_package
+from metaopt.concurrent.invoker.util.job_store import FileJobStore
 from metaopt.concurrent.invoker.util.status_db import StatusDB
-from metaopt.concurrent.model.call_lifecycle import Call, Error, Layoff, \
-    Result, Task
+from metaopt.concurrent.invoker.util.transport import create_transport
+from metaopt.concurrent.model.call_lifecycle import Call, Chunk, Dismissal, \
+    Layoff, Retirement, Task, Wakeup
+from metaopt.concurrent.worker.util.memory import check_address_space_limit
+from metaopt.core.demand.demand import Demand
+from metaopt.core.returnspec.util.wrap_return_values import wrap_return_values
 from metaopt.core.stoppable.util.decorator import stoppable, stopping
 from metaopt.core.stoppable.util.exception import StoppedError
 
-
 try:
-    xrange  # will work in python2, only @UndefinedVariable
-except NameError:
-    xrange = range  # rename range to xrange in python3
+    from Queue import Empty, Queue
+except ImportError:
+    # Queue was renamed to queue in Python 3
+    from queue import Empty, Queue
+
+# number of outcomes that may wait for the dispatcher thread
+BACKLOG = 64
+
+LOGGER = logging.getLogger(__name__)
 
 
 class MultiProcessInvoker(Invoker):
@@ -34,21 +47,140 @@ class MultiProcessInvoker(Invoker):
     Invoker that invokes objective functions in parallel using processes.
     """
 
-    def __init__(self, resources=None):
+    def __init__(self, resources=None, transport="manager", chunk_size=1,
+                 initializer=None, max_tasks=None, max_rss=None,
+                 max_memory=None, start_method=None, preload=None,
+                 prewarm=False, grace_period=None, spares=0, memory=None,
+                 pin=False, scaling=None, tenant=None, dispatch=False,
+                 backlog=BACKLOG):
         """
         :param  resources: Number of CPUs to use at most. Will automatically
-                           configure itself, if None.
+                           configure itself to the CPUs this process may use,
+                           if None, respecting its affinity mask and the CPU
+                           quota of its cgroups. See :attr:`sizing_reason`.
+        :param  transport: Name of the transport between this invoker and its
+                           workers. Either "manager" for queues proxied by a
+                           manager process or "pipe" for a pipe per worker.
+        :param chunk_size: Number of calls handed to a worker at once by
+                           :meth:`invoke_many`. Adapts to the measured
+                           duration of calls, if None.
+        :param initializer: Function each worker calls once when it starts,
+                            e.g. to load a dataset. Its return value is passed
+                            to every call of the worker as the kwarg
+                            ``context``. Must be picklable. (optional)
+        :param  max_tasks: Number of tasks after which a worker is replaced by
+                           a fresh one, e.g. to free memory leaked by the
+                           objective function. (optional)
+        :param    max_rss: Bytes of resident memory after exceeding which a
+                           worker is replaced by a fresh one. (optional)
+        :param max_memory: Bytes of address space each worker is limited to,
+                           including the interpreter itself. Calls exceeding it
+                           are laid off with a MemoryLimitError, the worker is
+                           replaced and the optimization carries on. Needs the
+                           resource module, i.e. Unix. (optional)
+        :param start_method: Either "fork", "spawn" or "forkserver". Spawning
+                             needs a picklable objective function and
+                             initializer. Defaults to the platform's default
+                             start method.
+        :param    preload: Names of modules to import once for all workers,
+                           e.g. heavy dependencies of the objective function.
+                           Forked workers inherit them from this process and
+                           the fork server imports them before forking any
+                           worker. (optional)
+        :param    prewarm: Whether to start all workers right away, so they
+                           start up in parallel before the first call instead
+                           of one by one on demand.
+        :param grace_period: Seconds a worker gets to interrupt a stopped call
+                             itself and carry on with its next task. Workers
+                             that do not manage to are terminated. Stopping a
+                             call terminates its worker right away, if None.
+                             Interrupting needs a Unix signal, SIGUSR1, which
+                             the objective function must leave alone.
+        :param     spares: Number of idle workers to keep started up in
+                           addition to the busy ones. A spare takes the place
+                           of a laid off or retired worker right away, so the
+                           pool does not wait for a fresh worker to start up.
+        :param     memory: Bytes of memory that calls may reserve at once.
+                           Objective functions declare the CPUs and memory
+                           their calls need with
+                           :func:`metaopt.core.demand.util.decorator.demand`.
+                           Calls start only once their demand fits into the
+                           CPUs and memory left. Defaults to the physical
+                           memory or the memory limit of the cgroups of this
+                           process, whichever is lower.
+        :param        pin: Whether to pin each worker to its own set of CPUs,
+                           keeping the sets within NUMA nodes, and to limit
+                           the threads of OpenMP, MKL and OpenBLAS in it to
+                           their number. So numerical libraries in parallel
+                           workers do not start a thread per CPU each.
+                           Libraries imported before a worker started, e.g.
+                           by this process or preloaded ones, are resized in
+                           the worker. Pinning and resizing need Linux.
+        :param    scaling: Policy that lets workers be employed only while
+                           the machine has CPUs and memory to spare, and
+                           dismisses idle workers, e.g. a ScalingPolicy of
+                           :mod:`metaopt.concurrent.invoker.util.scaling`.
+                           Without one, workers are employed whenever tasks
+                           wait, up to the resources, and kept till this
+                           invoker is stopped.
+        :param     tenant: Tenant of a WorkerPool of
+                           :mod:`metaopt.concurrent.employer.pool` shared with
+                           other invokers, as returned by its attach method.
+                           Workers are employed only as the pool grants
+                           slots, and idle workers are dismissed while other
+                           tenants wait for more than their share. (optional)
+        :param   dispatch: Whether to report outcomes to the callers on a
+                           dedicated thread instead of on the threads that
+                           invoke and wait. Invokes then wait for idle workers
+                           without running callbacks, e.g. those of plugins,
+                           so slow callbacks do not hold up issuing calls.
+        :param    backlog: Number of outcomes that may wait for the dispatcher
+                           thread. Once that many wait, workers are not freed
+                           till the callbacks caught up, which holds up
+                           invokes in turn.
         """
         super(MultiProcessInvoker, self).__init__()
 
-        # managed queues common to all worker processes
-        self._manager = Manager()
-        queue_task = self._manager.Queue(maxsize=1)
-        queue_start = self._manager.Queue()
-        queue_outcome = self._manager.Queue()
+        self._initializer = initializer
+        self._max_tasks = max_tasks
+        self._max_rss = max_rss
+        self._max_memory = max_memory
+        self._start_method = start_method
+        self._preload = preload
+        self._context = get_context(start_method)
+        check_address_space_limit(max_memory)
+        self._grace_period = grace_period
+        self._spares = spares
+        self._memory = memory
+        self._pin = pin
+        self._scaling = scaling
+        self._tenant = tenant
+
+        # reasons for stopping calls that their workers were asked to
+        # interrupt, by call id
+        self._reasons_interrupt = dict()
+
+        # callers to report the outcomes of pending calls to, by call id, so
+        # consecutive optimizations on this invoker get their own outcomes
+        self._callers = dict()
+
+        # number of pending calls of each job and the jobs to remove from the
+        # job store once none of their calls is pending anymore, by job id
+        self._call_counts = dict()
+        self._job_ids_dropped = set()
+        self._lock_jobs = Lock()
+
+        # validate the requested chunk size right away
+        if chunk_size is not None:
+            determine_chunk_size(request=chunk_size)
+        self._chunk_size = chunk_size
+
+        # queues common to all worker processes
+        self._transport = self._create_transport(transport)
+        queue_task = self._transport.queue_task
+        queue_start = self._transport.queue_start
+        queue_outcome = self._transport.queue_outcome
 
-        # TODO don't
-        self._clean_workers = 0
         self._queue_task = queue_task
         self._queue_start = queue_start
         self._queue_outcome = queue_outcome
@@ -57,11 +189,12 @@ class MultiProcessInvoker(Invoker):
                                    queue_start=queue_start,
                                    queue_outcome=queue_outcome)
 
-        self._employer = ProcessWorkerEmployer(resources=resources,
-                                    queue_outcome=queue_outcome,
-                                    queue_start=queue_start,
-                                    queue_tasks=queue_task,
-                                    status_db=self._status_db)
+        # jobs are shipped to each worker once, calls only refer to them
+        self._job_store = self._create_job_store()
+
+        self._employer = self._create_employer(resources=resources)
+        if prewarm:
+            self._prewarm()
 
         # we can not prohibit others to use us in parallel, so
         # make this invoker thread-safe
@@ -72,54 +205,84 @@ class MultiProcessInvoker(Invoker):
         self._param_spec = None  # parameter specification
         self._return_spec = None  # return specification
 
-    def _handle_error(self, error):
-        """"""
-        assert isinstance(error, Error)
-        try:
-            self._caller.on_error(value=error.value, fargs=error.call.args,
-                                  **error.call.kwargs)
-        except TypeError:
-            # error.kwargs was None
-            self._caller.on_error(value=error.value, fargs=error.call.args)
-
-    def _handle_result(self, result):
-        """"""
-        assert isinstance(result, Result)
-        assert result.value
-        assert result.call.args
-
-        try:
-            self._caller.on_result(value=result.value, fargs=result.call.args,
-                                   **result.call.kwargs)
-        except TypeError:
-            # result.kwargs was None
-            self._caller.on_result(value=result.value, fargs=result.call.args)
-
-    def _handle_layoff(self, layoff):
-        assert isinstance(layoff, Layoff)
-
+        # dismiss idle workers in the background, if scaling or sharing a
+        # pool, whose other tenants may wait while this invoker is idle
+        self._time_issued = time()
+        self._scaling_stopped = Event()
+        if scaling is not None or tenant is not None:
+            scaler = Thread(target=self._scale)
+            scaler.daemon = True
+            scaler.start()
+
+        # notified whenever the collector thread freed a worker or queued an
+        # outcome for the dispatcher thread, if dispatching
+        self._condition_outcome = Condition(self._lock)
+
+        # notified whenever an outcome was reported to its caller
+        self._condition_reported = Condition()
+        self._outcomes_reported = 0
+
+        # report outcomes on a dispatcher thread, which a collector thread
+        # hands them to after freeing their workers
+        self._queue_dispatch = None
+        self._collector = None
+        self._dispatcher = None
+        if dispatch:
+            self._queue_dispatch = Queue(maxsize=backlog)
+            self._collector = Thread(target=self._collect)
+            self._collector.daemon = True
+            self._collector.start()
+            self._dispatcher = Thread(target=self._dispatch)
+            self._dispatcher.daemon = True
+            self._dispatcher.start()
+
+    @property
+    def sizing_reason(self):
+        """
+        Returns why this invoker runs as many workers as it does, e.g.
+        "4 workers for the CPU quota of 4 CPUs set by
+        /sys/fs/cgroup/cpu.max."
+        """
+        return self._employer.sizing_reason
+
+    def _create_transport(self, transport):
+        """Creates the transport given by name."""
+        return create_transport(transport, context=self._context)
+
+    def _create_job_store(self):
+        """Creates the store that ships jobs to the workers."""
+        return FileJobStore()
+
+    def _create_employer(self, resources):
+        """Creates the employer of the workers that execute calls."""
+        return ProcessWorkerEmployer(resources=resources,
+                                     queue_outcome=self._queue_outcome,
+                                     queue_start=self._queue_start,
+                                     queue_tasks=self._queue_task,
+                                     status_db=self._status_db,
+                                     transport=self._transport,
+                                     job_store=self._job_store,
+                                     initializer=self._initializer,
+                                     max_tasks=self._max_tasks,
+                                     max_rss=self._max_rss,
+                                     max_memory=self._max_memory,
+                                     start_method=self._start_method,
+                                     preload=self._preload,
+                                     spares=self._spares,
+                                     memory=self._memory,
+                                     pin=self._pin,
+                                     tenant=self._tenant)
+
+    def _prewarm(self):
+        """Employs as many workers as possible for future calls right away."""
+        number_of_workers = \
+            self._employer.worker_count_max - self._employer.worker_count
         try:
-            self._caller.on_error(value=layoff.value, fargs=layoff.call.args,
-                                  **layoff.call.kwargs)
-        except AttributeError:
-            # layoff.call was None
-            # This means, the WPP constructed the "call" object manually.
-            # The caller is not expecting a result for those calls.
-            # Nothing to do here.
-            return
-
-    def _handle_outcome(self, outcome):
-        """"""
-        if isinstance(outcome, Error):
-            self._handle_error(error=outcome)
-        elif isinstance(outcome, Result):
-            self._handle_result(result=outcome)
-        elif isinstance(outcome, Layoff):
-            self._handle_layoff(layoff=outcome)
-        else:
-            # Will not happen
-            raise ValueError("Objects of this type are not allowed in the " +
-                             "outcome queue: %s" % type(outcome))
+            self._employer.employ(number_of_workers=max(number_of_workers, 0))
+        except IndexError:
+            # Another invoker employed workers meanwhile.
+            # That is OK, the remaining ones are employed on demand.
+            pass
 
     @stoppable
     def invoke(self, caller, fargs, **kwargs):
@@ -131,59 +294,443 @@ class MultiProcessInvoker(Invoker):
         Can be called asynchronously, but will block if the call can not be
         executed immediately, especially when using multiple processes/threads.
         """
+        return self.invoke_many(caller=caller, fargs_list=[fargs],
+                                kwargs_list=[kwargs])[0]
+
+    @stoppable
+    def invoke_many(self, caller, fargs_list, kwargs_list=None,
+                    on_issue=None, job=None):
+        """
+        Invokes call(f, fargs) for each of the given lists of arguments.
+
+        The calls are handed to the workers in chunks of the configured size,
+        so a worker needs only one message per chunk and reports the outcomes
+        of a chunk at once. Blocks till all chunks were started, but calls
+        back on_issue(index, handle) for the calls of each chunk once it was
+        started.
+
+        The calls belong to the given job, e.g. that of one of several
+        optimizations on this invoker, or to the job of this invoker's own
+        function and specifications, if None.
+        """
+        if kwargs_list is None:
+            kwargs_list = [dict() for _ in fargs_list]
+
         with self._lock:
             self._caller = caller
 
-            # employ one new worker
-            if self._clean_workers <= 0:
+            # ship the function and specifications to the workers only once
+            if job is None:
+                job = self.job
+            self._job_store.publish(job)
+
+            calls = [Call(id=uuid.uuid4(), job_id=job.id, args=fargs,
+                          kwargs=kwargs)
+                     for fargs, kwargs in zip(fargs_list, kwargs_list)]
+            for call in calls:
+                self._callers[call.id] = caller
+            with self._lock_jobs:
+                self._call_counts[job.id] = \
+                    self._call_counts.get(job.id, 0) + len(calls)
+
+            # create the handles right away, since the outcomes of the first
+            # calls may be handled before the last ones are issued
+            handles = [self._create_handle(call.id) for call in calls]
+
+            # resources each call needs, if the objective function declares
+            # them, by call id
+            demand = getattr(job.function, "demand", None)
+            if demand is None:
+                demands = None
+            else:
+                demands = dict((call.id, demand.resolve(call.args))
+                               for call in calls)
+
+            index = 0
+            while index < len(calls):
+                self._wait_for_worker()
+
+                # determine the chunk size only now, since waiting for a
+                # worker may have measured the duration of calls
+                chunk_size = determine_chunk_size(
+                    request=self._chunk_size,
+                    call_duration=self._status_db.call_duration,
+                    call_count=len(calls) - index,
+                    worker_count=self._employer.worker_count_max)
+                tasks = [Task(call=call)
+                         for call in calls[index:index + chunk_size]]
+                index += len(tasks)
+                if demands is not None:
+                    self._reserve(tasks=tasks, demands=demands)
+
+                # issue task, the first worker to become idle will execute it
+                # Adaptive chunk sizes always issue chunks, since only the
+                # outcomes of chunks carry the measured duration of calls.
+                if self._chunk_size == 1:
+                    task = tasks[0]
+                else:
+                    task = Chunk(tasks=tasks)
+
+                try:
+                    self._status_db.issue_task(task)
+                    self._time_issued = time()
+                except StoppedError:
+                    # The status database was already stopped.
+                    # This means we are stopped, too.
+                    # So abort this invoke.
+                    raise StoppedError()
+
+                # wait for any worker to start working on the task
+                # Besides it, only requeued tasks may be in the queue, whose
+                # starts are handled meanwhile.
                 try:
-                    self._employer.employ()
-                except IndexError:
-                    # The worker process provider was at its worker limit, already.
-                    # So no new worker could be employed.
-                    # We can not assume this invoke's task will be started immediately.
-                    # So wait for a free worker by getting and handling an outcome.
-                    outcome = self._status_db.wait_for_one_outcome()
-                    self._handle_outcome(outcome)
-
-            # issue task, the first worker to become idle will execute it
-            call = Call(id=uuid.uuid4(),
-                        function=self._f, args=fargs,
-                        kwargs=kwargs,
-                        param_spec=self._param_spec,
-                        return_spec=self.return_spec)
-            task = Task(call=call)
+                    self._status_db.wait_for_start(task)
+                except EOFError:
+                    # All workers were stopped before this task was started.
+                    # That is OK, just return a regular task handle anyway.
+                    pass
+
+                if self._stopped:
+                    raise StoppedError()
+
+                if on_issue is not None:
+                    for index_issued in range(index - len(tasks), index):
+                        on_issue(index_issued, handles[index_issued])
+
+            return handles
+
+    def _wait_for_worker(self):
+        """Employs a new worker or waits till a busy worker becomes idle."""
+        self._yield_workers()
+        try:
+            # A retired worker stays busy till its last outcomes were handled.
+            # So keep waiting till an employed worker is idle.
+            while self._status_db.count_busy_workers() >= \
+                    self._employer.worker_count:
+                if self._stopped:
+                    # This invoker was stopped while waiting for an outcome.
+                    # So employ no worker that nobody would lay off anymore.
+                    raise StoppedError()
+
+                if self._may_employ():
+                    try:
+                        self._employer.employ()
+                        return
+                    except IndexError:
+                        # The worker process provider was at its worker limit,
+                        # already. So no new worker could be employed.
+                        # We can not assume this invoke's task will be started
+                        # immediately. So wait for a free worker by getting and
+                        # handling an outcome.
+                        pass
+
+                if self._tenant is not None and \
+                        self._status_db.outcomes_awaited == 0:
+                    # No call of this invoker runs, so only another tenant of
+                    # the pool can free a slot.
+                    self._tenant.wait(timeout=0.1)
+                else:
+                    self._wait_for_outcomes()
+        finally:
+            if self._tenant is not None:
+                self._tenant.stop_waiting()
+
+    def _yield_workers(self, idle=False):
+        """
+        Dismisses idle workers while this invoker's tenant holds more than its
+        share of the worker pool and other tenants wait for slots. Between
+        invokes, idle workers are dismissed whenever other tenants wait.
+        """
+        if self._tenant is None or self._stopped:
+            return
+        idle_count = self._employer.worker_count - \
+            self._status_db.count_busy_workers()
+        while idle_count > 0 and self._tenant.should_yield(idle=idle):
+            self._employer.dismiss(number_of_workers=1)
+            idle_count -= 1
 
+    def _may_employ(self):
+        """
+        Returns whether the scaling policy, if any, lets another worker be
+        employed. Without busy workers, one is employed anyway, since nothing
+        would ever free one.
+        """
+        if self._scaling is None:
+            return True
+        return self._status_db.count_busy_workers() == 0 or \
+            self._scaling.may_employ()
+
+    def _scale(self):
+        """
+        Dismisses idle workers as the scaling policy and the worker pool say,
+        till stopped.
+        """
+        interval = 0.1 if self._scaling is None else self._scaling.interval
+        if self._tenant is not None:
+            interval = min(interval, 0.1)
+
+        while not self._scaling_stopped.wait(interval):
+            # Invokes hold the lock, so only dismiss workers between them.
+            if not self._lock.acquire(False):
+                continue
             try:
-                self._status_db.issue_task(task)
-                self._clean_workers -= 1
+                self._yield_workers(idle=True)
+                if self._scaling is None:
+                    continue
+                worker_count = self._employer.worker_count
+                idle_count = \
+                    worker_count - self._status_db.count_busy_workers()
+                count = self._scaling.count_dismissals(
+                    worker_count=worker_count, idle_count=idle_count,
+                    idle_duration=time() - self._time_issued)
+                if count > 0:
+                    self._employer.dismiss(number_of_workers=count)
             except StoppedError:
-                # The status database was already stopped.
-                # This means we are stopped, too.
-                # So abort this invoke.
-                raise StoppedError()
+                # This invoker was stopped meanwhile.
+                break
+            finally:
+                self._lock.release()
 
-            # wait for any worker to start working on the task
-            # there is always only one task in the queue
-            # so the task that gets started is the one we just issued
+    def _reserve(self, tasks, demands):
+        """
+        Reserves the CPUs and memory the given tasks demand, which one worker
+        executes one after another. Waits till running calls ended that hold
+        the resources needed.
+        """
+        call_ids = [task.call.id for task in tasks]
+        demand = Demand(cpus=max(demands[call_id].cpus
+                                 for call_id in call_ids),
+                        memory=max(demands[call_id].memory
+                                   for call_id in call_ids))
+        while True:
             try:
-                _ = self._status_db.wait_for_one_start()
-            except EOFError:
-                # All workers were stopped before this task was started.
-                # That is OK, just return a regular task handle anyway.
+                self._employer.reserve(call_ids=call_ids, demand=demand)
+                return
+            except IndexError:
+                # Running calls hold the resources, so wait for one to end.
                 pass
 
             if self._stopped:
                 raise StoppedError()
+            if self._status_db.outcomes_awaited > 0:
+                self._wait_for_outcomes()
+            else:
+                # Only calls of other invokers hold the resources.
+                sleep(0.01)
+
+    def _wait_for_outcomes(self):
+        """
+        Handles the next outcome and the rest of its batch, if any.
+
+        With a dispatcher thread, waits till the collector thread freed a
+        worker or queued an outcome, instead.
+        """
+        if self._dispatcher is not None:
+            if current_thread() is self._dispatcher:
+                # A callback invokes, e.g. to retry a call. Nobody else
+                # reports outcomes meanwhile, so it reports them itself, like
+                # without a dispatcher thread. Their callbacks may invoke
+                # again, so do not hold the lock meanwhile.
+                self._lock.release()
+                try:
+                    if self._report_queued(timeout=0):
+                        return
+                finally:
+                    self._lock.acquire()
+            self._condition_outcome.wait()
+            return
+
+        outcome = self._status_db.wait_for_one_outcome()
+        self._handle_outcome(outcome)
+
+        # A worker reports the outcomes of a whole chunk at once.
+        # So handle the rest of them, too, since they freed no other worker.
+        while self._status_db.outcomes_buffered > 0:
+            outcome = self._status_db.wait_for_one_outcome()
+            self._handle_outcome(outcome)
+
+    def _handle_outcome(self, outcome):
+        """Replaces retired workers and reports all other outcomes."""
+        outcome = self._settle_outcome(outcome)
+        if outcome is not None:
+            self._report_outcome(outcome)
 
-            return CallHandle(invoker=self, call_id=call.id)
+    def _settle_outcome(self, outcome):
+        """
+        Frees the resources of the call of the given outcome and replaces
+        retired workers. Returns the outcome to report, or None for
+        retirements, which concern no call.
+        """
+        if not isinstance(outcome, Retirement):
+            if outcome.call is not None:
+                self._employer.release(call_id=outcome.call.id)
+                reason = self._reasons_interrupt.pop(outcome.call.id, None)
+                if reason is not None and isinstance(outcome, Layoff):
+                    # The worker interrupted the call as asked.
+                    # So report why it was stopped.
+                    outcome = outcome._replace(value=reason)
+            # The worker of the call may be idle now, so give it up if other
+            # tenants of the pool wait for it.
+            self._yield_workers()
+            return outcome
+
+        # The worker exceeded one of its limits and quit by itself, or it was
+        # dismissed to shrink the pool, in which case nobody takes its place.
+        dismissed = isinstance(outcome.value, Dismissal)
+        self._employer.retire(worker_id=outcome.worker_id, dismissed=dismissed)
+        if self._stopped or dismissed:
+            return None
+        try:
+            self._employer.employ(number_of_workers=1)
+        except IndexError:
+            # An invoke call employed another worker, already.
+            # That is OK, moving on.
+            pass
+        return None
+
+    def _report_outcome(self, outcome):
+        """Reports the given outcome to the caller of its call."""
+        try:
+            super(MultiProcessInvoker, self)._handle_outcome(outcome)
+        finally:
+            if outcome.call is not None and \
+                    self._callers.pop(outcome.call.id, None) is not None:
+                self._forget_call(outcome.call)
+            with self._condition_reported:
+                self._outcomes_reported += 1
+                self._condition_reported.notify_all()
+
+    def _forget_call(self, call):
+        """
+        Notes that the given call is not pending anymore, removing its job
+        from the job store if it was dropped and this was its last call.
+        """
+        with self._lock_jobs:
+            count = self._call_counts.pop(call.job_id, 0) - 1
+            if count > 0:
+                self._call_counts[call.job_id] = count
+                return
+            if call.job_id not in self._job_ids_dropped:
+                return
+            self._job_ids_dropped.discard(call.job_id)
+        self._job_store.discard(call.job_id)
+
+    def drop_job(self, job_id):
+        """
+        Removes the job given by id from the job store, e.g. once the
+        optimization that invoked its calls ended. Pending calls of the job
+        still get their outcomes, the job is removed after their last one.
+        """
+        with self._lock_jobs:
+            if self._call_counts.get(job_id, 0) > 0:
+                self._job_ids_dropped.add(job_id)
+                return
+        self._job_store.discard(job_id)
+
+    def _collect(self):
+        """
+        Gets the outcomes of calls and frees their workers, till stopped.
+        Hands the outcomes to the dispatcher thread to report them.
+        """
+        while True:
+            try:
+                outcome = self._status_db.wait_for_one_outcome()
+            except (StoppedError, IOError):
+                # This invoker was stopped via self.stop() meanwhile.
+                # The stop reports all remaining outcomes itself.
+                return
+
+            with self._lock:
+                try:
+                    outcome = self._settle_outcome(outcome)
+                except StoppedError:
+                    # This invoker was stopped while replacing a worker.
+                    return
+                finally:
+                    self._condition_outcome.notify_all()
+            if outcome is None:
+                continue
+
+            # blocks while the backlog of the dispatcher thread is full
+            self._queue_dispatch.put(outcome)
+            with self._lock:
+                self._condition_outcome.notify_all()
+
+    def _dispatch(self):
+        """Reports the outcomes the collector thread got, till stopped."""
+        while True:
+            outcome = self._queue_dispatch.get()
+            if isinstance(outcome, Wakeup):
+                return
+            try:
+                self._report_outcome(outcome)
+            except StoppedError:
+                # A callback tried to invoke again, but this invoker was
+                # stopped meanwhile. That is OK, moving on.
+                pass
+            except Exception:
+                # A failing callback must not keep the remaining outcomes
+                # from being reported.
+                LOGGER.exception("A callback failed to handle %s.", outcome)
+
+    def _report_queued(self, timeout=None):
+        """
+        Reports the next outcome queued for the dispatcher thread right here,
+        e.g. since a callback waits on the dispatcher thread.
+
+        Returns whether an outcome was queued within the given seconds.
+        """
+        try:
+            outcome = self._queue_dispatch.get(timeout=timeout)
+        except Empty:
+            return False
+        if isinstance(outcome, Wakeup):
+            # This invoker is being stopped, which the dispatch loop needs to
+            # notice, too.
+            self._queue_dispatch.put(outcome)
+            return False
+        self._report_outcome(outcome)
+        return True
+
+    def _is_started(self, call_id):
+        """
+        Returns whether a worker started the call given by id and it did not
+        end yet, as recorded by the status database.
+        """
+        try:
+            self._status_db.get_worker_id(call_id=call_id)
+        except KeyError:
+            # No worker started the call yet or it ended already.
+            return False
+        return True
+
+    def _get_caller_for_call(self, call):
+        """Returns the caller that invoked the given call."""
+        if call is None:
+            return self._caller
+        return self._callers.get(call.id, self._caller)
+
+    def _handle_result(self, result):
+        """Wraps the raw return values a worker sent back for the caller."""
+        return_spec = self._job_store.get(result.call.job_id).return_spec
+        value = wrap_return_values(result.value, return_spec)
+        super(MultiProcessInvoker, self)._handle_result(
+            result=result._replace(value=value))
 
     def wait(self):
         """Blocks till all currently invoked tasks terminate."""
+        if self._dispatcher is not None:
+            self._wait_for_reports()
+            return
+
         while self._status_db.outcomes_awaited > 0:
             # we are still expecting another outcome
             try:
                 outcome = self._status_db.wait_for_one_outcome()
+            except StoppedError:
+                # This invoker was stopped via self.stop() meanwhile.
+                # The stop reports all remaining outcomes itself.
+                return
             except IOError as e:
                 # This invoker was stopped via self.stop()
                 # All workers were killed and the queue closed.
@@ -194,18 +741,110 @@ class MultiProcessInvoker(Invoker):
             with self._lock:
                 self._handle_outcome(outcome=outcome)
 
-        #self._stop_workers(reason="wait")
-        self._clean_workers = self._employer.worker_count_max
+    def wait_for_one(self, timeout=None):
+        """
+        Blocks till the next outcome was handled or the given seconds passed.
+        Returns whether an outcome was handled.
+        """
+        if self._dispatcher is not None:
+            return self._wait_for_reports(count=1, timeout=timeout)
+
+        if self._status_db.outcomes_awaited == 0:
+            return False
+        try:
+            outcome = self._status_db.wait_for_one_outcome(timeout=timeout)
+        except Empty:
+            # No call ended in time.
+            return False
+        except (StoppedError, IOError):
+            # This invoker was stopped via self.stop() meanwhile.
+            # The stop reports all remaining outcomes itself.
+            return False
+        with self._lock:
+            self._handle_outcome(outcome=outcome)
+        return True
 
+    def _wait_for_reports(self, count=None, timeout=None):
+        """
+        Blocks till the dispatcher thread reported the given number of
+        outcomes, or all outcomes of pending calls if None, or till the given
+        seconds passed. Returns whether any outcome was reported meanwhile.
+        """
+        time_end = None if timeout is None else time() + timeout
+        with self._condition_reported:
+            reported = self._outcomes_reported
+        while True:
+            with self._condition_reported:
+                if not self._callers or self._stopped or \
+                        (count is not None and
+                         self._outcomes_reported - reported >= count):
+                    break
+                remaining = None if time_end is None else time_end - time()
+                if remaining is not None and remaining <= 0:
+                    break
+                if current_thread() is not self._dispatcher:
+                    self._condition_reported.wait(remaining)
+                    continue
+
+            # A callback waits, so nobody else reports outcomes meanwhile.
+            self._report_queued(timeout=remaining)
+        return self._outcomes_reported > reported
+
+    @stoppable
     def stop_call(self, call_id, reason):
         """
-        Stop a call given by its id, by restarting the executing worker.
+        Stop a call given by its id.
+
+        With a grace period, the executing worker is asked to interrupt the
+        call itself and terminated only if it still executes the call after the
+        grace period. Otherwise, the executing worker is restarted right away.
 
         Gets called by a timer in an individual thread.
         """
 
         assert call_id is not None
+        if self._grace_period is not None:
+            # note the reason first, since the interrupted call may be
+            # reported before the interrupt returns
+            self._reasons_interrupt[call_id] = reason
+            if self._employer.interrupt(call_id=call_id):
+                timer = Timer(self._grace_period, self._escalate,
+                              kwargs=dict(call_id=call_id, reason=reason))
+                timer.daemon = True
+                timer.start()
+                return
+            self._reasons_interrupt.pop(call_id, None)
+
+        self._restart_worker(call_id=call_id, reason=reason)
+
+    @stoppable
+    def stop_calls(self, caller, reason):
+        """
+        Stops all pending calls invoked by the given caller, e.g. those of one
+        optimization, leaving the calls of other callers and the workers for
+        later calls.
+        """
+        call_ids = [call_id for call_id, caller_call in
+                    list(self._callers.items()) if caller_call is caller]
+        for call_id in call_ids:
+            self.stop_call(call_id=call_id, reason=reason)
+
+    def _escalate(self, call_id, reason):
+        """
+        Restarts the worker of the call given by id, if it did not manage to
+        interrupt the call within the grace period.
+        """
+        if self._stopped or not self._employer.executes(call_id=call_id):
+            return
+        self._restart_worker(call_id=call_id, reason=reason)
+
+    def _restart_worker(self, call_id, reason):
+        """Replaces the worker executing the call given by id by a new one."""
         self._employer.lay_off(call_id=call_id, reason=reason)
+        if self._stopped:
+            # This invoker was stopped meanwhile.
+            # So employ no worker that nobody would lay off anymore.
+            return
         try:
             self._employer.employ(number_of_workers=1)
         except IndexError:
@@ -222,30 +861,50 @@ class MultiProcessInvoker(Invoker):
 
         Gets called by a timer in an individual thread.
         """
-        self._stop_workers(reason=reason)
+        # terminate all workers, which reports a layoff for each of their calls
+        self._scaling_stopped.set()
+        self._employer.abandon(reason=reason)
 
+        # wake up invoke and wait, so that they release the lock
         self._status_db.stop(reason=reason)
+        if self._dispatcher is not None:
+            self._stop_dispatching()
 
-        self._stop_manager()
-
-    def _stop_manager(self):
-        try:
-            self._manager.shutdown()
-        except OSError:
-            # The manager has already shutdown.
-            # This may happen when all it's queue got closed.
-            # That is OK since we wanted to shut it down anyway.
-            pass
+        # report all outcomes that invoke and wait did not get to the caller
+        with self._lock:
+            for outcome in self._status_db.pop_outcomes():
+                try:
+                    self._handle_outcome(outcome=outcome)
+                except StoppedError:
+                    # The caller tried to invoke again, e.g. to retry a call.
+                    # That is not possible anymore, so just carry on.
+                    pass
+            self._condition_outcome.notify_all()
+        with self._condition_reported:
+            self._condition_reported.notify_all()
+
+        self._transport.close()
+        self._job_store.close()
+
+    def _stop_dispatching(self):
+        """
+        Waits till the collector thread quit and the dispatcher thread reported
+        all outcomes it got, so the stop reports the remaining ones.
+        """
+        # wake up invokes of callbacks, which the dispatcher thread waits for
+        with self._lock:
+            self._condition_outcome.notify_all()
+
+        if current_thread() is self._dispatcher:
+            # A callback stops this invoker. So report the backlog right here,
+            # which unblocks the collector thread if the backlog is full.
+            while self._collector.is_alive():
+                self._report_queued(timeout=0.1)
+            while self._report_queued(timeout=0):
+                pass
+            self._queue_dispatch.put(Wakeup())
+            return
 
-    def _stop_workers(self, reason):
-        # terminate all workers and handle their lay_off outcomes
-        count_workers_killed = self._employer.worker_count
-        self._employer.abandon()
-        for _ in xrange(count_workers_killed - 1):
-            outcome = self._status_db.wait_for_one_outcome()
-            self._handle_outcome(outcome=outcome)
-        #self._employer = ProcessWorkerEmployer(resources=self._resources,
-        #                                       queue_outcome=self._queue_outcome,
-        #                                       queue_start=self._queue_start,
-        #                                       queue_tasks=self._queue_task,
-        #                                       status_db=self._status_db)
+        self._collector.join()
+        self._queue_dispatch.put(Wakeup())
+        self._dispatcher.join()
@@ -95,6 +95,56 @@ class PluggableInvoker(BaseInvoker, BaseCaller):
 
         return invocation.current_task
 
+    @stoppable
+    def invoke_many(self, caller, fargs_list, kwargs_list=None,
+                    on_issue=None):
+        """Implementation of the inherited abstract invoke_many method."""
+        self._caller = caller
+
+        if kwargs_list is None:
+            kwargs_list = [dict() for _ in fargs_list]
+
+        invocations = []
+        for fargs, kwargs in zip(fargs_list, kwargs_list):
+            invocation = Invocation()
+
+            invocation.function = self.f
+            invocation.fargs = fargs
+            invocation.kwargs = kwargs
+
+            for plugin in self._plugins:
+                plugin.setup(self.f, self.param_spec, self.return_spec)
+
+            for plugin in self._plugins:
+                plugin.before_invoke(invocation)
+
+            invocation.tries += 1
+            invocations.append(invocation)
+
+        def on_issue_invocation(index, task):
+            # The wrapped invoker may block till the last calls were issued,
+            # while the first ones already run. So let plugins know about each
+            # call right away, e.g. to time it out if it hangs.
+            invocation = invocations[index]
+            invocation.current_task = task
+
+            # FIXME: This should not be required somehow
+            if invocation.current_task:
+                for plugin in self._plugins:
+                    plugin.on_invoke(invocation)
+
+            if on_issue is not None:
+                on_issue(index, task)
+
+        try:
+            return self._invoker.invoke_many(
+                caller=self, fargs_list=fargs_list,
+                kwargs_list=[dict(invocation=invocation)
+                             for invocation in invocations],
+                on_issue=on_issue_invocation)
+        except StoppedError:
+            return [invocation.current_task for invocation in invocations]
+
     def on_result(self, value, fargs, invocation, **kwargs):
         """Implementation of the inherited abstract on_result method."""
         del kwargs
@@ -129,6 +179,14 @@ class PluggableInvoker(BaseInvoker, BaseCaller):
         """Implementation of the inherited abstract wait method."""
         return self._invoker.wait()
 
+    def wait_for_one(self, timeout=None):
+        """Waits for the next call of the wrapped invoker to end."""
+        return self._invoker.wait_for_one(timeout=timeout)
+
+    def as_completed(self, handles, timeout=None):
+        """Yields the given handles as the calls of the wrapped invoker end."""
+        return self._invoker.as_completed(handles=handles, timeout=timeout)
+
     @stoppable
     @stopping
     def stop(self, reason=None):
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Invoker for one optimization on a long-lived invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import uuid
+from threading import Lock
+
+# First Party
+from metaopt.concurrent.employer.util.exception import LayoffError
+from metaopt.concurrent.invoker.base import BaseInvoker
+from metaopt.concurrent.model.call_lifecycle import Job
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.stoppable.util.decorator import stoppable, stopping
+from metaopt.core.stoppable.util.exception import StoppedError
+
+
+class InvokerSession(BaseInvoker):
+    """
+    Invoker for one optimization on a long-lived invoker, e.g. a
+    :class:`metaopt.concurrent.invoker.multiprocess.MultiProcessInvoker`.
+
+    The long-lived invoker keeps its workers started up between optimizations,
+    so optimizations run back to back do not set up and tear down workers each.
+    Each session keeps the objective function and specifications of its
+    optimization and invokes its calls with a job of its own. Outcomes are
+    reported to the caller of each call, so every session gets the outcomes of
+    its own calls, only, even if optimizations run at the same time. Stopping
+    a session stops its pending calls, but not the long-lived invoker.
+    """
+
+    def __init__(self, invoker):
+        """
+        :param invoker: Long-lived invoker that executes the calls, which
+                        needs to stop calls by their caller and to invoke
+                        them with a given job.
+        """
+        super(InvokerSession, self).__init__()
+
+        self._invoker = invoker
+        self._callers = []
+
+        self._f = None
+        self._param_spec = None
+        self._return_spec = None
+        self._job = None
+
+        # ids of the jobs this session invoked calls with
+        self._job_ids = set()
+        # handles of the calls of this session, which may not have ended yet
+        self._handles = []
+        self._lock = Lock()
+
+    @property
+    def f(self):
+        return self._f
+
+    @f.setter
+    def f(self, function):
+        self._f = function
+        self._param_spec = function.param_spec
+        self._return_spec = ReturnSpec(function)
+        self._job = None
+
+    @property
+    def param_spec(self):
+        return self._param_spec
+
+    @param_spec.setter
+    def param_spec(self, param_spec):
+        self._param_spec = param_spec
+        self._job = None
+
+    @property
+    def return_spec(self):
+        return self._return_spec
+
+    @return_spec.setter
+    def return_spec(self, return_spec):
+        self._return_spec = return_spec
+        self._job = None
+
+    @property
+    def job(self):
+        """
+        Property getter for the job of the function and specifications of
+        this session, which its calls are invoked with.
+
+        Setting any of them starts a new job, so calls invoked before keep
+        referring to the job they were invoked with.
+        """
+        if self._job is None:
+            self._job = Job(id=uuid.uuid4(), function=self._f,
+                            param_spec=self._param_spec,
+                            return_spec=self._return_spec)
+        return self._job
+
+    @property
+    def invoker(self):
+        """Property for the invoker attribute."""
+        return self._invoker
+
+    @stoppable
+    def invoke(self, caller, fargs, **kwargs):
+        """Invokes the call with the long-lived invoker."""
+        return self.invoke_many(caller=caller, fargs_list=[fargs],
+                                kwargs_list=[kwargs])[0]
+
+    @stoppable
+    def invoke_many(self, caller, fargs_list, kwargs_list=None,
+                    on_issue=None):
+        """Invokes the calls with the long-lived invoker."""
+        job = self.job
+        with self._lock:
+            if not any(caller_known is caller
+                       for caller_known in self._callers):
+                self._callers.append(caller)
+            self._job_ids.add(job.id)
+
+        def on_issue_session(index, handle):
+            # Remember each handle right away, since the long-lived invoker
+            # may block till the last calls were issued.
+            with self._lock:
+                self._handles.append(handle)
+            if on_issue is not None:
+                on_issue(index, handle)
+
+        return self._invoker.invoke_many(caller=caller, fargs_list=fargs_list,
+                                         kwargs_list=kwargs_list,
+                                         on_issue=on_issue_session, job=job)
+
+    def wait(self):
+        """
+        Blocks till all calls of this session terminated, handling the
+        outcomes of other sessions meanwhile.
+        """
+        while True:
+            with self._lock:
+                self._handles = [handle for handle in self._handles
+                                 if not handle.done()]
+                handles = list(self._handles)
+            if not handles:
+                return
+            # Callbacks may invoke calls again, so check for those afterwards.
+            for _ in self._invoker.as_completed(handles=handles):
+                pass
+
+    def wait_for_one(self, timeout=None):
+        """Blocks till the next call of the long-lived invoker terminated."""
+        return self._invoker.wait_for_one(timeout=timeout)
+
+    def as_completed(self, handles, timeout=None):
+        """Yields the given handles as the calls of this session end."""
+        return self._invoker.as_completed(handles=handles, timeout=timeout)
+
+    @stoppable
+    @stopping
+    def stop(self, reason=None):
+        """
+        Stops all pending calls of this session, which are reported as errors
+        to their callers. The long-lived invoker and its workers carry on.
+        """
+        if reason is None:
+            reason = LayoffError("The session was stopped.")
+
+        for caller in self._callers:
+            try:
+                self._invoker.stop_calls(caller=caller, reason=reason)
+            except StoppedError:
+                # The long-lived invoker was stopped meanwhile.
+                # That stopped the calls of this session, too.
+                break
+
+        # Later optimizations use jobs of their own, so let the long-lived
+        # invoker forget the jobs of this one.
+        for job_id in self._job_ids:
+            self._invoker.drop_job(job_id=job_id)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Invoker that uses a pool of threads.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# First Party
+from metaopt.concurrent.employer.thread import ThreadWorkerEmployer
+from metaopt.concurrent.invoker.multiprocess import BACKLOG, \
+    MultiProcessInvoker
+from metaopt.concurrent.invoker.util.job_store import JobStore
+from metaopt.concurrent.invoker.util.transport import LocalTransport
+
+
+class ThreadPoolInvoker(MultiProcessInvoker):
+    """
+    Invoker that invokes objective functions in parallel using threads.
+
+    Threads share the interpreter lock, so they only run in parallel while an
+    objective function releases it, e.g. in NumPy or I/O. On the other hand,
+    they need neither new processes nor pickled calls or jobs.
+
+    Stopping a call reports a layoff for it right away, but the thread that
+    executes it can not be terminated. It finishes the call in the background
+    and a new thread takes its place.
+    """
+
+    def __init__(self, resources=None, chunk_size=1, initializer=None,
+                 prewarm=False, dispatch=False, backlog=BACKLOG):
+        """
+        :param  resources: Number of threads to use at most. Will automatically
+                           configure itself to the number of CPUs, if None.
+        :param chunk_size: Number of calls handed to a worker at once by
+                           :meth:`invoke_many`. Adapts to the measured
+                           duration of calls, if None.
+        :param initializer: Function each worker thread calls once when it
+                            starts. Its return value is passed to every call of
+                            the thread as the kwarg ``context``. (optional)
+        :param    prewarm: Whether to start all threads right away, e.g. to run
+                           their initializers before the first call.
+        :param   dispatch: Whether to report outcomes to the callers on a
+                           dedicated thread instead of on the threads that
+                           invoke and wait.
+        :param    backlog: Number of outcomes that may wait for the dispatcher
+                           thread.
+        """
+        super(ThreadPoolInvoker, self).__init__(resources=resources,
+                                                transport=None,
+                                                chunk_size=chunk_size,
+                                                initializer=initializer,
+                                                prewarm=prewarm,
+                                                dispatch=dispatch,
+                                                backlog=backlog)
+
+    def _create_transport(self, transport):
+        """Creates a transport for threads, ignoring the given one."""
+        del transport  # threads always share plain queues
+        return LocalTransport()
+
+    def _create_job_store(self):
+        """Creates a store for threads, which share the jobs in memory."""
+        return JobStore()
+
+    def _create_employer(self, resources):
+        """Creates the employer of the worker threads."""
+        return ThreadWorkerEmployer(resources=resources,
+                                    queue_outcome=self._queue_outcome,
+                                    queue_start=self._queue_start,
+                                    queue_tasks=self._queue_task,
+                                    status_db=self._status_db,
+                                    transport=self._transport,
+                                    job_store=self._job_store,
+                                    initializer=self._initializer)
@@ -1,20 +1,54 @@
 # -*- coding: utf-8 -*-
 """
-Means to stop tasks for invokers.
+Means to stop tasks and to get their outcomes for invokers.
 """
 # Future
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+import logging
+from threading import Lock
+
 # First Party
 from metaopt.concurrent.employer.util.exception import LayoffError
 from metaopt.core.stoppable.stoppable import Stoppable
 from metaopt.core.stoppable.util.decorator import stoppable, stopping
 from metaopt.core.stoppable.util.exception import StoppedError
 
+try:
+    from concurrent.futures import CancelledError, TimeoutError
+except ImportError:
+    # concurrent.futures is part of the standard library in Python 3, only.
+    # So define the exceptions its futures raise.
+    class CancelledError(Exception):
+        """Indicates that a call was cancelled."""
+
+    class TimeoutError(Exception):
+        """Indicates that a call did not end in time."""
+
+
+LOGGER = logging.getLogger(__name__)
+
 
 class CallHandle(Stoppable):
-    """A means to stopped a task."""
+    """
+    A means to stop a call and to get its outcome.
+
+    Besides reporting the outcome to the caller, the invoker passes it to the
+    handle of the call, which offers the interface of a
+    :class:`concurrent.futures.Future`. So callers may wait for calls one by
+    one, e.g. to create further arguments while calls are executed.
+
+    Outcomes are handled while the invoker waits for them, so waiting for an
+    outcome of this handle makes the invoker handle outcomes of other calls,
+    too, and report them to their callers.
+
+    Like for futures, :meth:`cancel` only cancels calls no worker started yet.
+    Most invokers start calls as soon as they are invoked, so to interrupt a
+    running call, use :meth:`stop`, which lays off its worker and reports a
+    LayoffError, or the given reason, as the error of the call.
+    """
 
     def __init__(self, invoker, call_id):
         super(CallHandle, self).__init__()
@@ -22,11 +56,24 @@ class CallHandle(Stoppable):
         self._invoker = invoker
         self._call_id = call_id
 
+        self._lock = Lock()
+        self._done = False
+        self._cancelled = False
+        self._value = None
+        self._error = None
+        self._callbacks = []
+
+    @property
+    def call_id(self):
+        """Returns the id of the call."""
+        return self._call_id
+
     @stoppable
     @stopping
     def stop(self, reason=None):
         """
-        Cancels the worker executing this call.
+        Stops this call, laying off the worker executing it, if any, unlike
+        :meth:`cancel`, which leaves running calls alone.
 
         Gets called by a timer from another thread.
         """
@@ -39,3 +86,110 @@ class CallHandle(Stoppable):
             # The invoker was already stopped.
             # So there is nothing left to do here
             pass
+
+    def cancel(self):
+        """
+        Cancels the call, unless a worker started it or it ended already, so
+        that :meth:`result` raises a CancelledError right away. Returns whether
+        the call was cancelled, like :meth:`concurrent.futures.Future.cancel`.
+        """
+        if self.running():
+            return False
+        with self._lock:
+            if self._done:
+                return self._cancelled
+            self._cancelled = True
+
+        # A worker may have started the call meanwhile, so stop it then.
+        try:
+            self.stop(reason=CancelledError())
+        except StoppedError:
+            # The call was stopped already.
+            pass
+        self._resolve(error=CancelledError())
+        return True
+
+    def cancelled(self):
+        """Returns whether the call was cancelled."""
+        return self._cancelled
+
+    def running(self):
+        """
+        Returns whether a worker started the call and it did not end yet, so
+        it is False while the call waits for a worker.
+        """
+        if self._done:
+            return False
+        return self._invoker._is_started(call_id=self._call_id)
+
+    def done(self):
+        """Returns whether the call ended or was cancelled."""
+        return self._done
+
+    def result(self, timeout=None):
+        """
+        Returns the return value of the call, wrapped like for the caller.
+
+        Waits the given seconds for the call to end, or as long as it takes if
+        None, and raises a TimeoutError if it did not. Raises the error of the
+        call, if any, or a CancelledError if it was cancelled.
+        """
+        error = self.exception(timeout=timeout)
+        if error is not None:
+            raise error
+        return self._value
+
+    def exception(self, timeout=None):
+        """
+        Returns the error of the call, e.g. a LayoffError if it was stopped, or
+        None if it returned a value.
+
+        Waits the given seconds for the call to end, or as long as it takes if
+        None, and raises a TimeoutError if it did not. Raises a CancelledError
+        if it was cancelled.
+        """
+        if not self._done:
+            self._invoker._wait_for_any(handles=[self], timeout=timeout)
+        if not self._done:
+            raise TimeoutError("The call did not end in time.")
+        if self._cancelled:
+            raise CancelledError()
+        return self._error
+
+    def add_done_callback(self, function):
+        """
+        Calls the given function with this handle once the call ended, or
+        right away if it ended already.
+
+        The function is called by the thread that handles the outcome, while
+        the invoker may be locked. So it must not invoke calls itself.
+        """
+        with self._lock:
+            if not self._done:
+                self._callbacks.append(function)
+                return
+        self._call_back(function)
+
+    def _resolve(self, value=None, error=None):
+        """Notes the outcome of the call and calls back the done callbacks."""
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+            self._value = value
+            self._error = error
+            callbacks = self._callbacks
+            self._callbacks = []
+
+        for function in callbacks:
+            self._call_back(function)
+
+    def _call_back(self, function):
+        """Calls the given done callback with this handle."""
+        try:
+            function(self)
+        except Exception:
+            # Like for futures, a failing callback must not keep the
+            # remaining ones from being called.
+            LOGGER.exception("A done callback of call %s failed.",
+                             self._call_id)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Utility to determine the number of calls handed to a worker at once.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from math import ceil
+
+# time in seconds a worker should spend on one chunk of calls
+CHUNK_DURATION = 0.1
+
+
+def determine_chunk_size(request=None, call_duration=None, call_count=1,
+                         worker_count=1):
+    """
+    Determines the number of calls to hand to a worker at once.
+
+    If a chunk size is requested, it is returned. Otherwise the chunk size is
+    chosen such that a worker spends about CHUNK_DURATION seconds per chunk,
+    given the measured duration of a single call. Adaptive chunks never leave
+    workers without calls, if there are enough calls to go around.
+    """
+    if request is not None:
+        if type(request) is not int:
+            raise NotImplementedError("Request parameter needs to be of " +
+                                      "type int.")
+        if request <= 0:
+            raise NotImplementedError("Request parameter needs to be " +
+                                      "greater 0.")
+        return request
+
+    if call_duration is None:
+        # nothing was measured yet, so start carefully
+        return 1
+
+    chunk_size = int(CHUNK_DURATION / max(call_duration, 1e-6))
+    chunk_size_fair = int(ceil(call_count / max(worker_count, 1)))
+
+    return max(1, min(chunk_size, chunk_size_fair))
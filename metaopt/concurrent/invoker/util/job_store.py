@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Stores that ship jobs from invokers to their workers once per worker.
+
+A job holds the objective function and its specifications, which are the same
+for all calls of an optimization. So invokers publish a job once and calls only
+refer to it by its id. Workers look a job up by id the first time they execute
+one of its calls and keep it from then on.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+import pickle
+import shutil
+from tempfile import mkdtemp
+
+# First Party
+from metaopt.concurrent.invoker.util.shared_data import SharedData, \
+    map_extra_kwargs, share_extra_kwargs
+
+
+class JobStore(object):
+    """
+    Store that keeps jobs in memory.
+
+    The jobs can not be shared with other processes, so this store is meant for
+    workers running in the invoker's own process.
+    """
+
+    def __init__(self):
+        # jobs published or looked up so far, by job id
+        self._jobs = dict()
+
+    def publish(self, job):
+        """Makes the given job available to all workers."""
+        self._jobs[job.id] = job
+
+    def get(self, job_id):
+        """
+        Returns the job given by id.
+
+        Raises KeyError if no such job was published.
+        """
+        return self._jobs[job_id]
+
+    def discard(self, job_id):
+        """
+        Frees the job given by id, if any, which must not be looked up
+        anymore, e.g. since all of its calls ended.
+        """
+        self._jobs.pop(job_id, None)
+
+    def close(self):
+        """Frees all jobs, which must not be looked up anymore."""
+        self._jobs.clear()
+
+
+class FileJobStore(JobStore):
+    """
+    Store that writes each job to a file in a temporary directory.
+
+    Worker processes get a copy of this store. They read a job from its file
+    the first time they execute one of its calls and keep it from then on.
+    Large NumPy arrays and bytes objects marked as SharedBytes among the extra
+    kwargs of a job get files of their own, which workers map into memory
+    read-only. Closing the store removes all files.
+    """
+
+    def __init__(self):
+        super(FileJobStore, self).__init__()
+        self._directory = mkdtemp(prefix="metaopt-jobs-")
+        # files of the large extra kwargs of each published job, by job id
+        self._paths_shared = dict()
+
+    def __getstate__(self):
+        """
+        Returns the state of this store without the jobs it keeps.
+
+        Spawned worker processes get a pickled copy of this store. They read
+        the jobs from their files, so do not ship them along with the store.
+        """
+        state = self.__dict__.copy()
+        state["_jobs"] = dict()
+        state["_paths_shared"] = dict()
+        return state
+
+    def _path(self, job_id):
+        """Returns the path of the file of the job given by id."""
+        return os.path.join(self._directory, "%s.pickle" % job_id)
+
+    def publish(self, job):
+        """Writes the given job to its file, unless published already."""
+        if job.id in self._jobs:
+            return
+
+        # write large extra kwargs to files of their own, which the workers
+        # map into memory instead of unpickling a copy each
+        job_shared = share_extra_kwargs(job, self._directory)
+
+        # write to a temporary file first, so no worker reads a partial job
+        path = self._path(job.id)
+        with open(path + ".tmp", "wb") as job_file:
+            pickle.dump(job_shared, job_file, pickle.HIGHEST_PROTOCOL)
+        os.rename(path + ".tmp", path)
+
+        param_spec = job_shared.param_spec
+        if param_spec is not None and param_spec.extra_kwargs:
+            self._paths_shared[job.id] = [
+                value.path for value in param_spec.extra_kwargs.values()
+                if isinstance(value, SharedData)]
+
+        super(FileJobStore, self).publish(job)
+
+    def get(self, job_id):
+        """
+        Returns the job given by id, reading it from its file if needed.
+
+        Raises KeyError if no such job was published.
+        """
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            # This is the first call of the job this copy of the store sees.
+            # So read the job from its file, moving on to keep it.
+            pass
+
+        try:
+            with open(self._path(job_id), "rb") as job_file:
+                job = pickle.load(job_file)
+        except (IOError, OSError):
+            raise KeyError("No job published for ID %s" % job_id)
+        job = map_extra_kwargs(job)
+
+        self._jobs[job_id] = job
+        return job
+
+    def discard(self, job_id):
+        """
+        Removes the files of the job given by id, if any, which must not be
+        looked up anymore. Workers that read the job already keep it.
+        """
+        super(FileJobStore, self).discard(job_id)
+        paths = [self._path(job_id)] + self._paths_shared.pop(job_id, [])
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                # The store was closed or the job not published by this copy.
+                # That is OK, moving on.
+                pass
+
+    def close(self):
+        """Removes all files of jobs, which must not be looked up anymore."""
+        super(FileJobStore, self).close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+class TransportJobStore(JobStore):
+    """
+    Store that keeps jobs in memory and sends each one via a transport.
+
+    Meant for workers on other machines, which can not read the files of a
+    :class:`FileJobStore`. The transport sends every job to each connected
+    agent once, and agents keep the jobs in stores of their own.
+    """
+
+    def __init__(self, transport):
+        """
+        :param transport: Transport that sends jobs to agents, e.g. a
+                          :class:`TCPTransport`.
+        """
+        super(TransportJobStore, self).__init__()
+        self._transport = transport
+
+    def publish(self, job):
+        """Sends the given job via the transport, unless published already."""
+        if job.id in self._jobs:
+            return
+        super(TransportJobStore, self).publish(job)
+        self._transport.publish(job)
+
+    def discard(self, job_id):
+        """Frees the job given by id and makes the agents free it, too."""
+        super(TransportJobStore, self).discard(job_id)
+        self._transport.discard(job_id)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Policy that scales the workers of an invoker with its tasks and the load of the
+machine.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+
+# First Party
+from metaopt.concurrent.employer.util.cpu_sets import read_available_cpus
+from metaopt.concurrent.employer.util.determine_memory import \
+    measure_available_memory
+
+
+class ScalingPolicy(object):
+    """
+    Policy that scales the workers of an invoker with its tasks and the load of
+    the machine, e.g. one shared with other services.
+
+    The invoker employs workers on demand, while tasks wait for a worker. This
+    policy lets it do so only while the load average leaves a CPU free and
+    enough memory is available. Once all tasks are running, idle workers are
+    dismissed after a cooldown, or right away if memory runs short.
+    """
+
+    def __init__(self, min_workers=0, cooldown=30.0, min_available_memory=None,
+                 max_load=None, interval=1.0):
+        """
+        :param          min_workers: Number of workers never to dismiss.
+        :param             cooldown: Seconds without new tasks after which
+                                     idle workers are dismissed.
+        :param min_available_memory: Bytes of memory available to other
+                                     processes, below which no worker is
+                                     employed and idle workers are dismissed
+                                     right away. Defaults to no threshold.
+        :param             max_load: Load average at which no worker is
+                                     employed. Defaults to the number of CPUs
+                                     this process may use.
+        :param             interval: Seconds between checks for idle workers.
+        """
+        if min_workers < 0:
+            raise ValueError("min_workers needs to be 0 or greater.")
+        self._min_workers = min_workers
+        self._cooldown = cooldown
+        self._min_available_memory = min_available_memory
+        if max_load is None:
+            max_load = len(read_available_cpus())
+        self._max_load = max_load
+        self._interval = interval
+
+    @property
+    def interval(self):
+        """Returns the seconds between checks for idle workers."""
+        return self._interval
+
+    def may_employ(self):
+        """
+        Returns whether another worker may be employed, which is the case while
+        the load average leaves a CPU free and memory is not short.
+        """
+        if self._memory_short():
+            return False
+
+        try:
+            load = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            # The load average is Unix only.
+            # So assume a CPU is free.
+            return True
+        return load < self._max_load
+
+    def count_dismissals(self, worker_count, idle_count, idle_duration):
+        """
+        Returns the number of idle workers to dismiss.
+
+        :param   worker_count: Number of employed workers.
+        :param     idle_count: Number of employed workers without a call.
+        :param  idle_duration: Seconds since the last task was issued.
+        """
+        if idle_duration < self._cooldown and not self._memory_short():
+            return 0
+        return max(min(idle_count, worker_count - self._min_workers), 0)
+
+    def _memory_short(self):
+        """Returns whether less memory is available than the threshold."""
+        if self._min_available_memory is None:
+            return False
+        available = measure_available_memory()
+        return available is not None and \
+            available < self._min_available_memory
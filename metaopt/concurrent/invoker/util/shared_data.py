@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities that share large extra kwargs with workers via memory-mapped files.
+
+Large NumPy arrays and bytes objects marked as :class:`SharedBytes` are
+written to a file once. Jobs refer to the file instead of carrying the data.
+Workers map the file into memory read-only, so all of them share the same pages
+of the operating system's page cache instead of each unpickling a copy of their
+own.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import mmap
+import os
+import uuid
+from collections import namedtuple
+from copy import copy
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional, without it only SharedBytes objects are shared.
+    numpy = None
+
+# number of bytes from which on arrays in extra kwargs are shared via files
+SHARE_SIZE = 1024 * 1024
+
+# data structure for referring to a value that was written to a file
+# (the dtype, shape and order are None for bytes objects)
+SharedData = namedtuple("SharedData", ["path", "dtype", "shape", "order"])
+
+
+class SharedBytes(bytes):
+    """
+    Bytes object to share with worker processes via a memory-mapped file.
+
+    Wrap large bytes objects in extra kwargs in this class to opt in to
+    sharing them. Objective functions executed by worker processes then get a
+    read-only :class:`mmap.mmap` instead of a bytes object, which supports
+    slicing, ``len`` and the buffer interface, but is no bytes object, e.g.
+    ``data[:]`` copies the data into a bytes object again. Functions executed
+    in the invoker's process, e.g. by the thread pool invoker, get this object
+    as it is. Wrapping copies the data once.
+    """
+
+
+def share_extra_kwargs(job, directory, share_size=SHARE_SIZE):
+    """
+    Returns the given job with its SharedBytes objects and large NumPy arrays
+    among the extra kwargs written to files.
+
+    The job's parameter specification is copied, so the given job still
+    carries the original values.
+
+    :param directory: Directory to write the files to.
+    :param share_size: Number of bytes from which on arrays are shared.
+    """
+    param_spec = job.param_spec
+    if param_spec is None or not param_spec.extra_kwargs:
+        return job
+
+    extra_kwargs = dict()
+    for key, value in param_spec.extra_kwargs.items():
+        extra_kwargs[key] = _share(value, directory, share_size)
+
+    param_spec = copy(param_spec)
+    param_spec.extra_kwargs = extra_kwargs
+    return job._replace(param_spec=param_spec)
+
+
+def map_extra_kwargs(job):
+    """
+    Returns the given job with its shared extra kwargs mapped into memory.
+
+    SharedBytes objects are mapped as read-only mmap objects, see
+    :class:`SharedBytes`, and NumPy arrays as read-only arrays. Neither copies
+    the data.
+    """
+    param_spec = job.param_spec
+    if param_spec is None or not param_spec.extra_kwargs:
+        return job
+
+    param_spec.extra_kwargs = dict(
+        (key, _map(value) if isinstance(value, SharedData) else value)
+        for key, value in param_spec.extra_kwargs.items())
+    return job
+
+
+def _share(value, directory, share_size):
+    """
+    Writes the given value to a file, if marked as SharedBytes or an array
+    large enough to be shared.
+    """
+    if isinstance(value, SharedBytes):
+        path = _create_path(directory)
+        with open(path, "wb") as data_file:
+            data_file.write(value)
+        return SharedData(path=path, dtype=None, shape=None, order=None)
+
+    if numpy is not None and isinstance(value, numpy.ndarray) and \
+            value.nbytes >= share_size and not value.dtype.hasobject:
+        # keep Fortran ordered arrays, e.g. column-major training sets
+        order = "F" if numpy.isfortran(value) else "C"
+        path = _create_path(directory)
+        with open(path, "wb") as data_file:
+            data_file.write(value.tobytes(order=order))
+        return SharedData(path=path, dtype=value.dtype.str,
+                          shape=value.shape, order=order)
+
+    return value
+
+
+def _create_path(directory):
+    """Returns the path of a new file in the given directory."""
+    return os.path.join(directory, "%s.data" % uuid.uuid4())
+
+
+def _map(shared_data):
+    """Maps the file of the given shared value into memory, read-only."""
+    with open(shared_data.path, "rb") as data_file:
+        # The mapping stays valid after the file was closed.
+        data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if shared_data.dtype is None:
+        return data
+
+    array = numpy.frombuffer(data, dtype=numpy.dtype(str(shared_data.dtype)))
+    return array.reshape(shared_data.shape, order=shared_data.order)
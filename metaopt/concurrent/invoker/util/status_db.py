@@ -7,12 +7,13 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
-import time
-from multiprocessing.synchronize import Lock
+from collections import OrderedDict, deque
+from multiprocessing import Lock
+from time import time
 
 # First Party
-from metaopt.concurrent.model.call_lifecycle import Error, Layoff, Result, \
-    Start, Task
+from metaopt.concurrent.model.call_lifecycle import Batch, Call, Chunk, \
+    Error, Layoff, Result, Retirement, Start, Task, Wakeup
 from metaopt.core.stoppable.stoppable import Stoppable
 from metaopt.core.stoppable.util.decorator import stoppable, stopping
 from metaopt.core.stoppable.util.exception import StoppedError
@@ -24,11 +25,29 @@ except ImportError:
     # Queue was renamed to queue in Python 3
     from queue import Empty
 
+# number of ended calls whose outcomes are kept to recognize late duplicates
+ARCHIVE_SIZE = 1024
+
+# seconds after which a thread waiting for the start of its task checks whether
+# another thread got that start meanwhile
+POLL_START = 0.1
+
 
 class StatusDB(Stoppable):
-    """Database that keeps track of worker task relations."""
+    """
+    Database that keeps track of worker task relations.
 
-    def __init__(self, queue_start, queue_task, queue_outcome):
+    Calls are indexed by their stage in the call lifecycle, so every lifecycle
+    operation takes constant time. Calls that ended are kept in an archive of
+    limited size, only, so the memory needed does not grow with the number of
+    calls made.
+    """
+
+    def __init__(self, queue_start, queue_task, queue_outcome,
+                 archive_size=ARCHIVE_SIZE):
+        """
+        :param archive_size: Number of ended calls to keep track of.
+        """
         super(StatusDB, self).__init__()
 
         # queues for communicating with workers
@@ -36,20 +55,69 @@ class StatusDB(Stoppable):
         self._queue_task = queue_task
         self._queue_outcome = queue_outcome
 
-        # central data structure this class takes care of
-        self._call_status_dict = dict()
+        # tasks issued, but not yet started by a worker, by call id
+        self._tasks_idle = OrderedDict()
+
+        # idle tasks given up for a laid off worker, but not yet ended
+        self._tasks_lost = dict()
+
+        # ids of the idle tasks that a worker got before, but did not end
+        self._call_ids_requeued = set()
+
+        # ids of the calls a worker started in one chunk, by call id
+        self._chunks = dict()
 
-        # counter for messages passed through this class
-        self._count_task = 0
-        self._count_start = 0
-        self._count_outcome = 0
+        # ids of requeued calls, whose first worker may still send outcomes
+        self._call_ids_rerun = set()
+
+        # starts of calls that did not end yet, by call id
+        self._starts_running = dict()
+
+        # ids of the calls each busy worker is running, by worker id
+        self._call_ids_by_worker = dict()
+
+        # outcomes of the most recently ended calls, by call id
+        self._outcomes_archived = OrderedDict()
+        self._archive_size = archive_size
+
+        # outcomes received in a batch, but not yet handed to the invoker
+        self._outcomes_buffered = deque()
+
+        # moving average of the duration of a call in seconds, if measured
+        self._call_duration = None
 
         # lock for public methods
         self._lock = Lock()
 
+    def _attach(self, message):
+        """
+        Returns the given message of a worker, referring to the full call.
+
+        Workers get and send back detached calls, only. So the full call with
+        its args and kwargs is looked up by id among the pending calls. If the
+        call is not pending, the message is returned as is.
+        """
+        call_id = message.call.id
+        try:
+            call = self._starts_running[call_id].call
+        except KeyError:
+            try:
+                call = self._tasks_idle[call_id].call
+            except KeyError:
+                try:
+                    call = self._tasks_lost[call_id].call
+                except KeyError:
+                    # The call is not pending.
+                    # So there is no full call to refer to.
+                    return message
+
+        if call is message.call:
+            return message
+        return message._replace(call=call)
+
     def _handle_task(self, idle):
         """Handles an initially idle task issued by the invoker."""
-        self._call_status_dict[idle.call.id] = idle
+        self._tasks_idle[idle.call.id] = idle
 
     def _handle_start(self, start):
         """Handles a start received from the worker via the status queue."""
@@ -57,266 +125,460 @@ class StatusDB(Stoppable):
             raise TypeError("%s objects are not allowed in the start queue" %
                             type(start))
 
-        try:
-            if isinstance(self._call_status_dict[start.call.id], Start):
-                raise KeyError("Got duplicate start for task %s" % \
-                               start.call.id +
-                               "Make sure IDs are unique.")
-        except KeyError:
-            # There was no entry for this task's uuid in the status database.
-            # That is OK, moving on to create one.
-            pass
-
-        self._call_status_dict[start.call.id] = start
-
-    def _handle_result(self, result):
-        """Handles a result received from the worker via the result queue."""
-
-        if result.call.id not in self._call_status_dict.keys():
-            raise KeyError("No task to be stopped for ID %s" % result.call.id)
-
-        status = self._call_status_dict[result.call.id]
-        if status == result:
-            # nothing to do here
+        call_id = start.call.id
+        start_running = self._starts_running.get(call_id)
+        if call_id in self._outcomes_archived or \
+                (start_running is not None and
+                 start_running.worker_id == start.worker_id):
+            # This is a duplicate start or the call ended already.
+            # Either way, there is nothing new to record.
             return
 
-        if isinstance(status, Result):
-            raise ValueError("Got duplicate unequal result for call." +
-                             "Make sure the call ids are unique:" +
-                             "\n    " + repr(result) + "\n    " + repr(status))
-
-        self._call_status_dict[result.call.id] = result
+        start = self._attach(start)
+        if start_running is not None:
+            # The call was handed to another worker again, e.g. since the
+            # agent of the first one disconnected. So it moves to this worker.
+            self._release(start_running)
+        self._tasks_idle.pop(call_id, None)
+        self._call_ids_requeued.discard(call_id)
+        self._starts_running[call_id] = start
+        self._call_ids_by_worker.setdefault(start.worker_id, set()).\
+            add(call_id)
+
+    def _handle_chunk(self, batch):
+        """Notes which calls the given batch of starts started together."""
+        call_ids = tuple(start.call.id for start in batch.messages)
+        if len(call_ids) < 2:
+            return
+        for call_id in call_ids:
+            if call_id in self._starts_running:
+                self._chunks[call_id] = call_ids
 
-    def _handle_error(self, error):
-        """Handles an error received from the worker via the result queue."""
-        self._call_status_dict[error.call.id] = error
+    def _handle_outcome(self, outcome):
+        """
+        Handles an outcome received from the worker via the outcome queue.
 
-    def _handle_layoff(self, layoff):
-        for (task_id, status) in self._call_status_dict.items():
-            try:
-                if layoff.worker_id == status.worker_id:
-                    self._call_status_dict[task_id] = layoff
-            except AttributeError:
-                # The status is idle.
-                # We do not know the worker, yet.
-                # So just check the next status
-                continue
+        Returns the outcome referring to the full call, or None for stale
+        outcomes, which must not be handed out. This is the case for outcomes
+        of calls that ended already, e.g. the result of a call whose worker was
+        laid off before the result arrived, even once the outcome the call
+        ended with was evicted from the archive.
+        """
+        if not isinstance(outcome, (Result, Error, Layoff, Retirement)):
+            raise TypeError("%s objects are not allowed in the result queue" %
+                            type(outcome))
 
-    def _handle_outcome(self, outcome):
-        """"""
-        if isinstance(outcome, Result):
-            self._handle_result(result=outcome)
+        if isinstance(outcome, Retirement):
+            # The worker reports the outcomes of its calls separately.
+            # So there is no call to end.
             return outcome
 
-        if isinstance(outcome, Error):
-            self._handle_error(error=outcome)
+        if outcome.call is None:
+            # The employer laid off a worker that had no call.
+            # There is no call to end.
             return outcome
 
-        if isinstance(outcome, Layoff):
-            self._handle_layoff(layoff=outcome)
-            return outcome
+        call_id = outcome.call.id
+        try:
+            outcome_archived = self._outcomes_archived[call_id]
+        except KeyError:
+            # The call did not end yet.
+            # That is the common case, moving on to end it.
+            pass
+        else:
+            # The archived outcome refers to the full call, so compare the
+            # rest of the outcomes only.
+            if isinstance(outcome, Result) and \
+                    isinstance(outcome_archived, Result) and \
+                    call_id not in self._call_ids_rerun and \
+                    (outcome.worker_id, outcome.value) != \
+                    (outcome_archived.worker_id, outcome_archived.value):
+                raise ValueError("Got duplicate unequal result for call." +
+                                 "Make sure the call ids are unique:" +
+                                 "\n    " + repr(outcome) +
+                                 "\n    " + repr(outcome_archived))
+            return None
+
+        if call_id not in self._starts_running and \
+                call_id not in self._tasks_idle and \
+                call_id not in self._tasks_lost:
+            # The call is not pending, so it ended so long ago that its
+            # outcome was evicted from the archive, e.g. the late result of a
+            # worker that was laid off. That is stale, too.
+            return None
+
+        outcome = self._attach(outcome)
+        self._end(call_id)
+        self._archive(outcome)
+        return outcome
 
-        raise TypeError("%s objects are not allowed in the result queue" %
-                        type(outcome))
+    def _end(self, call_id):
+        """Removes the call given by id from the indexes of pending calls."""
+        self._tasks_idle.pop(call_id, None)
+        self._tasks_lost.pop(call_id, None)
+        self._call_ids_requeued.discard(call_id)
+        self._chunks.pop(call_id, None)
+
+        start = self._starts_running.pop(call_id, None)
+        if start is not None:
+            self._release(start)
+
+    def _release(self, start):
+        """Removes the call of the given start from the calls of its worker."""
+        call_ids = self._call_ids_by_worker[start.worker_id]
+        call_ids.discard(start.call.id)
+        if not call_ids:
+            del self._call_ids_by_worker[start.worker_id]
+
+    def _archive(self, outcome):
+        """Archives the given outcome, evicting the oldest ones if full."""
+        self._outcomes_archived[outcome.call.id] = outcome
+        while len(self._outcomes_archived) > self._archive_size:
+            call_id, _ = self._outcomes_archived.popitem(last=False)
+            self._call_ids_rerun.discard(call_id)
 
     @stoppable
     def wait_for_one_task(self):
         """
         Blocks till one task was gotten from the task queue and processed.
         """
+        task = self._queue_task.get()
         with self._lock:
-            task = self._queue_task.get()
             self._handle_task(task)
-            self._count_task += 1
-            self._queue_task.task_done()
-            return task
+        self._queue_task.task_done()
+        return task
+
+    def _get(self, queue, timeout=None):
+        """
+        Blocks till a message was gotten from the given queue, or raises Empty
+        if none arrived within the given seconds.
+
+        Raises StoppedError if woken up by a concurrent stop, instead. The
+        wake-up is put back, so further threads waiting on the queue wake up,
+        too.
+        """
+        message = queue.get(timeout=timeout)
+        if isinstance(message, Wakeup):
+            queue.task_done()
+            try:
+                queue.put(message)
+            except (EOFError, IOError):
+                # The queue was closed meanwhile, so nobody waits on it.
+                pass
+            raise StoppedError()
+        return message
 
     @stoppable
-    def wait_for_one_start(self):
+    def wait_for_one_start(self, timeout=None):
         """
-        Blocks till one start was gotten from the start queue and processed.
+        Blocks till one start was gotten from the start queue and processed,
+        or raises Empty if none arrived within the given seconds.
         """
         try:
-            # TODO this is polling which is bad.
-            # Unfortunately this is necessary because of the concurrent stop.
-            while True:
-                try:
-                    start = self._queue_start.get(timeout=1)
-                    break
-                except Empty:
-                    pass
-                if self._stopped:
-                    raise StoppedError()
+            start = self._get(self._queue_start, timeout=timeout)
         except IOError:
             # The queue was closed before we could read a start.
             # This may happen with fast terminations.
             # The invoker expects an outcome.
             # So send back a manually constructed outcome.
             return Start(worker_id=None, call=None)
-        self._handle_start(start)
-        self._count_start += 1
+        with self._lock:
+            if isinstance(start, Batch):
+                # The worker started a whole chunk of calls at once.
+                for start_single in start.messages:
+                    self._handle_start(start_single)
+                self._handle_chunk(start)
+            else:
+                self._handle_start(start)
         self._queue_start.task_done()
         return start
 
     @stoppable
-    def wait_for_one_outcome(self):
+    def wait_for_start(self, task):
         """
-        Blocks till an outcome was gotten from the outcome queue and processed.
+        Blocks till the given task or chunk of tasks was started, handling the
+        starts of other tasks gotten meanwhile, e.g. of requeued ones or of
+        tasks other threads issued, which may handle this task's start in turn.
         """
-        try:
-            #outcome = self._queue_outcome.get()
+        if isinstance(task, Chunk):
+            task = task.tasks[0]
+        call_id = task.call.id
+        while True:
+            with self._lock:
+                if call_id in self._starts_running or \
+                        call_id in self._outcomes_archived:
+                    return
+            try:
+                start = self.wait_for_one_start(timeout=POLL_START)
+            except Empty:
+                # Another thread may have gotten the start meanwhile.
+                continue
+            if not isinstance(start, Batch) and start.call is None:
+                # The start queue was closed, so the task will never start.
+                return
 
-            # TODO this is polling which is bad.
-            # Unfortunately this is necessary because of the concurrent stop.
-            while True:
+    @stoppable
+    def wait_for_one_outcome(self, timeout=None):
+        """
+        Blocks till an outcome was gotten from the outcome queue and processed,
+        or raises Empty if none arrived within the given seconds.
+
+        Outcomes that arrive in a batch are handed out one at a time, so
+        outcomes may be returned from a buffer without touching the queue.
+        Stale outcomes are skipped.
+        """
+        time_end = None if timeout is None else time() + timeout
+        while True:
+            if self._outcomes_buffered:
+                outcome = self._outcomes_buffered.popleft()
+            else:
+                remaining = None
+                if time_end is not None:
+                    remaining = max(time_end - time(), 0)
                 try:
-                    outcome = self._queue_outcome.get(timeout=1)
-                    break
-                except Empty:
-                    pass
-                if self._stopped:
-                    raise StoppedError()
-
-        except EOFError:
-            # The outcome queue was closed on the other end.
-            # That must have been the queue's manager
-            # This means that the invoker tries to stop.
-            # So get out of the way.
-            return Layoff(worker_id=None, call=None, value=None)
-
-        self._handle_outcome(outcome)
-        self._count_outcome += 1
-        self._queue_outcome.task_done()
-        return outcome
+                    outcome = self._get(self._queue_outcome, timeout=remaining)
+                except EOFError:
+                    # The outcome queue was closed on the other end.
+                    # That must have been the queue's manager
+                    # This means that the invoker tries to stop.
+                    # So get out of the way.
+                    return Layoff(worker_id=None, call=None, value=None)
+                self._queue_outcome.task_done()
+
+                if isinstance(outcome, Batch):
+                    self._handle_batch(outcome)
+                    continue
+
+            with self._lock:
+                outcome = self._handle_outcome(outcome)
+            if outcome is not None:
+                return outcome
+
+    def _handle_batch(self, batch):
+        """Buffers the outcomes of a batch and measures the call duration."""
+        if batch.messages and batch.duration is not None:
+            call_duration = batch.duration / len(batch.messages)
+            if self._call_duration is None:
+                self._call_duration = call_duration
+            else:
+                self._call_duration = \
+                    0.8 * self._call_duration + 0.2 * call_duration
+        self._outcomes_buffered.extend(batch.messages)
 
     @stoppable
     def count_running_tasks(self):
         """Returns the number of tasks currently executed by workers."""
-        # alternate formulation
-        # while len([f for f in self._call_status_dict.values() if t]) > 0:
         with self._lock:
-            count = 0
-            for status in self._call_status_dict.values():
-                if isinstance(status, Start):
-                    count += 1
-            return count
+            return len(self._starts_running)
+
+    def count_busy_workers(self):
+        """Returns the number of workers currently executing a task."""
+        with self._lock:
+            return len(self._call_ids_by_worker)
+
+    def get_busy_worker_ids(self):
+        """Returns the ids of all workers currently executing a task."""
+        with self._lock:
+            return list(self._call_ids_by_worker)
 
     def get_worker_id(self, call_id):
         """
         Returns the worker id for a given task id.
 
-        Raises KeyError if there was no worker for that task id. That means,
-        all workers were killed before one could start working on the task.
+        Raises KeyError if no worker is running the task. That means, either
+        no worker started the task yet or the task already ended.
         """
         with self._lock:
-            status = self._call_status_dict[call_id]
-            return status.worker_id
+            return self._starts_running[call_id].worker_id
 
     def get_running_call(self, worker_id):
-        task_found = False
-        for status in self._call_status_dict.values():
+        """
+        Returns a call the worker given by id started, but not ended.
+
+        Like all calls this database hands to workers and employers, the call
+        is detached from its args and kwargs, so it can be sent via a queue.
+        """
+        with self._lock:
             try:
-                if not status.worker_id == worker_id:
-                    continue
-            except AttributeError:
-                # The status is idle.
-                # We do not know the worker, yet.
-                # So just check the next status
-                continue
-            if not isinstance(status, Start):
-                continue
-            task_found = True
-            break
+                call_ids = self._call_ids_by_worker[worker_id]
+            except KeyError:
+                raise KeyError("No status for the worker with id: %s" %
+                               worker_id)
+            return _detach(self._starts_running[next(iter(call_ids))].call)
 
-        if not task_found:
-            raise KeyError("No status for the worker with id: %s" % worker_id)
+    def get_running_calls(self, worker_id):
+        """
+        Returns all calls the worker given by id started, but not ended.
 
-        return status.call
+        The calls are detached from their args and kwargs.
+        """
+        with self._lock:
+            call_ids = self._call_ids_by_worker.get(worker_id, ())
+            return [_detach(self._starts_running[call_id].call)
+                    for call_id in call_ids]
 
     def pop_idle_call(self):
-        for [call_id, status] in self._call_status_dict.items():
-            if isinstance(status, Task):
-                del self._call_status_dict[call_id]
-                return status.call
+        """
+        Gives up the oldest task no worker started yet, returning its call.
 
-        raise ValueError("No call idling at the moment.")
+        The call is detached from its args and kwargs. It stays pending till
+        its outcome arrives, which is usually the layoff of its worker.
+        """
+        with self._lock:
+            try:
+                _, task = self._tasks_idle.popitem(last=False)
+            except KeyError:
+                raise ValueError("No call idling at the moment.")
+            self._tasks_lost[task.call.id] = task
+            self._call_ids_requeued.discard(task.call.id)
+            return _detach(task.call)
+
+    def get_chunk_call_ids(self, call_id):
+        """
+        Returns the ids of the other calls that did not end yet of the chunk
+        the call given by id was started in, if any.
+        """
+        with self._lock:
+            return [call_id_chunk
+                    for call_id_chunk in self._chunks.get(call_id, ())
+                    if call_id_chunk != call_id and
+                    call_id_chunk in self._starts_running]
+
+    def requeue(self, call_ids):
+        """
+        Hands the calls given by id, which a worker started but did not end,
+        to another worker, e.g. the other calls of a chunk whose worker was
+        laid off for one of them.
 
-    def get_idle_call(self, worker_id):
+        The calls are issued again as one task or chunk of tasks and stay
+        awaited till they end. Outcomes the first worker still sends for them
+        are skipped, if the calls ended already.
+        """
+        tasks = []
         with self._lock:
-            for status in self._call_status_dict.values():
-                if not status.worker_id == worker_id:
-                    return status  # TODO
+            for call_id in call_ids:
+                start = self._starts_running.pop(call_id, None)
+                if start is None:
+                    # The call ended meanwhile.
+                    continue
+                self._release(start)
+                self._chunks.pop(call_id, None)
+                task = Task(call=start.call)
+                self._tasks_idle[call_id] = task
+                self._call_ids_requeued.add(call_id)
+                self._call_ids_rerun.add(call_id)
+                tasks.append(task)
+
+        if not tasks:
+            return
+        try:
+            if len(tasks) == 1:
+                self._put(tasks[0])
+            else:
+                self._put(Chunk(tasks=tasks))
+        except (EOFError, IOError):
+            # The task queue was closed, since the invoker stops.
+            # It reports the layoffs of all pending calls itself.
+            pass
 
     @stoppable
     def issue_task(self, task):
-        """"""
-        self._queue_task.put(task)
-        self._handle_task(task)
-        self._count_task += 1
-
-    def _empty_queue_task(self):
-        """"""
-        # *One* task may got issued after all workers were terminated.
-        # So try to get this last task.
-        while not self._queue_task.empty():
-            task = self.wait_for_one_task()
-            self._handle_task(task)
+        """
+        Puts the given task or chunk of tasks into the task queue.
 
-    def _empty_queue_start(self):
-        """Empties the start queue, handling all starts."""
-        while not self._queue_start.empty():
-            start = self.wait_for_one_start()
-            self._handle_start(start)
-
-    def _empty_queue_outcome(self):
-        """Empties the outcome queue, handling all outcomes."""
-        while not self._queue_outcome.empty():
-            outcome = self.wait_for_one_outcome()
-            self._handle_outcome(outcome)
-            #try:
-            #
-            #except ValueError:
-            #    # Duplicate result. Should not happen. TODO
-            #    raise ValueError("Got a duplicate outcome. " +
-            #                     "Make sure IDs are unique.")
+        The tasks are detached from the args and kwargs of their calls, so the
+        workers get the raw values of the args, only.
+
+        The tasks are recorded before they are put, since another thread may
+        get the outcome of a fast call before this one returns.
+        """
+        with self._lock:
+            if isinstance(task, Chunk):
+                # The chunk is a single message, but consists of several tasks.
+                for task_single in task.tasks:
+                    self._handle_task(task_single)
+            else:
+                self._handle_task(task)
+        self._put(task)
+
+    def _put(self, task):
+        """Puts the given task or chunk of tasks into the task queue."""
+        if isinstance(task, Chunk):
+            self._queue_task.put(Chunk(tasks=[Task(call=_detach(single.call))
+                                              for single in task.tasks]))
+        else:
+            self._queue_task.put(Task(call=_detach(task.call)))
+
+    def pop_outcomes(self):
+        """
+        Returns all outcomes received so far, handling them without blocking.
+
+        Meant for reporting the outcomes that are left after a stop. Since this
+        may take the wake-up of a concurrently waiting thread, it wakes up
+        waiting threads once again afterwards.
+        """
+        outcomes = []
+        while True:
+            if self._outcomes_buffered:
+                outcome = self._outcomes_buffered.popleft()
+            else:
+                try:
+                    outcome = self._queue_outcome.get_nowait()
+                except (Empty, EOFError, IOError):
+                    # There is no outcome left or the queue was closed already.
+                    break
+                self._queue_outcome.task_done()
+
+                if isinstance(outcome, Wakeup):
+                    continue
+                if isinstance(outcome, Batch):
+                    self._handle_batch(outcome)
+                    continue
+
+            with self._lock:
+                outcome = self._handle_outcome(outcome)
+            if outcome is not None:
+                outcomes.append(outcome)
+
+        self._wake_up()
+        return outcomes
+
+    def _wake_up(self):
+        """
+        Wakes up threads waiting for a start or an outcome. Each of them puts
+        the wake-up back for the next one, see :meth:`_get`.
+        """
+        try:
+            self._queue_start.put(Wakeup())
+            self._queue_outcome.put(Wakeup())
+        except (EOFError, IOError):
+            # The queues were closed already, so nobody is waiting on them.
+            pass
 
-    @stopping
     @stoppable
+    @stopping
     def stop(self, reason=None):
-        """Stops this status database."""
+        """
+        Stops this status database.
 
-        # TODO This loop should not be necessary.
-        while not self._queue_task.empty():
-            self._empty_queue_task()
-            time.sleep(0.001)
-        assert self._queue_task.empty()
+        Threads waiting for a start or an outcome raise a StoppedError.
+        """
+        del reason  # the invoker reports the reason via layoffs
+        self._wake_up()
 
-        # issue task done for all unchecked messages of the task queue
-        # TODO this should not be necessary
-        while True:
-            try:
-                self._queue_task.task_done()
-            except ValueError:
-                # no more task done allowed, we are done here
-                break
-        self._queue_task.join()
-
-        self._empty_queue_start()
-        assert self._queue_start.empty()
-        self._queue_start.join()
-
-        # We may have recorded a task in this database that was never started.
-        # This happens when all workers get stopped before one starts the task.
-        # So send back a layoff to the caller for all not yet started tasks.
-        for task in self._call_status_dict.values():
-            if not isinstance(task, Task):
-                continue
-            # layoff = Layoff(worker_id=None, call=task.call, value=reason)
-            # self._queue_outcome.put(layoff)
+    @property
+    def outcomes_buffered(self):
+        """Returns the number of outcomes received, but not yet handed out."""
+        return len(self._outcomes_buffered)
 
-        self._empty_queue_outcome()
-        assert self._queue_outcome.empty()
-        self._queue_outcome.join()
+    @property
+    def call_duration(self):
+        """
+        Returns the moving average of the duration of a call in seconds.
+
+        Returns None, if no batch of outcomes was received yet.
+        """
+        return self._call_duration
 
     @property
     def outcomes_awaited(self):
@@ -329,8 +591,19 @@ class StatusDB(Stoppable):
             if self._stopped:
                 return 0
 
-            # Note that we use the start count instead of the the task count.
+            # Note that we count started calls instead of issued tasks.
             # Some issued tasks might never get started if a stop occurs.
             # In that case, no worker will start them.
             # Thus await only started tasks to have a result.
-            return self._count_start - self._count_outcome
+            # Requeued tasks were started before, so they are awaited, too.
+            return len(self._starts_running) + len(self._call_ids_requeued)
+
+
+def _detach(call):
+    """Returns the given call with the raw values of its args only."""
+    if call.args is None:
+        args = None
+    else:
+        # args that are no Arg objects are sent as they are
+        args = [getattr(arg, "value", arg) for arg in call.args]
+    return Call(id=call.id, job_id=call.job_id, args=args, kwargs=None)
@@ -0,0 +1,631 @@
+# -*- coding: utf-8 -*-
+"""
+Transports that carry tasks, starts and outcomes between invokers and workers.
+
+The manager transport proxies all queues through a separate manager process.
+The pipe transport connects every worker process directly to the invoker via
+its own pipe, so no manager process is involved at all. The local transport
+connects worker threads of the invoker's own process. The TCP transport
+connects worker agents running on other machines.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import multiprocessing
+import socket
+from collections import OrderedDict, deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from threading import Condition, Lock, Thread
+
+# First Party
+from metaopt.concurrent.model.call_lifecycle import Batch, Chunk, \
+    Retirement, Wakeup
+
+try:
+    from Queue import Full, Queue
+except ImportError:
+    # Queue was renamed to queue in Python 3
+    from queue import Full, Queue
+
+
+class ManagerTransport(object):
+    """Transport that shares managed queues with all worker processes."""
+
+    def __init__(self, context=multiprocessing):
+        """
+        :param context: Multiprocessing context to start the manager with.
+        """
+        self._manager = context.Manager()
+        self.queue_task = self._manager.Queue(maxsize=1)
+        self.queue_start = self._manager.Queue()
+        self.queue_outcome = self._manager.Queue()
+
+    def connect(self):
+        """Returns the queues a new worker process should use."""
+        return dict(queue_tasks=self.queue_task,
+                    queue_start=self.queue_start,
+                    queue_outcome=self.queue_outcome)
+
+    def connected(self, queues):
+        """Notes that a worker process was started with the given queues."""
+        del queues  # the managed queues are shared, nothing to do
+
+    def close(self):
+        """Shuts down the manager process and thereby all queues."""
+        try:
+            self._manager.shutdown()
+        except OSError:
+            # The manager has already shutdown.
+            # This may happen when all it's queue got closed.
+            # That is OK since we wanted to shut it down anyway.
+            pass
+
+
+class PipeTransport(object):
+    """
+    Transport that connects each worker process via a pipe of its own.
+
+    The invoker side still sees ordinary queues, but they are local to the
+    invoker's process. A dispatcher thread hands tasks to workers that asked
+    for one and a reader thread per worker sorts the starts and outcomes it
+    sends into the local queues. Since no worker shares a lock with another
+    one, terminating a worker can not block the remaining ones.
+    """
+
+    def __init__(self, context=multiprocessing):
+        """
+        :param context: Multiprocessing context to create the pipes with.
+        """
+        self.queue_task = Queue(maxsize=1)
+        self.queue_start = Queue()
+        self.queue_outcome = Queue()
+        self._context = context
+
+        # connections of workers that asked for a task and did not get one yet
+        self._queue_ready = Queue()
+        self._connections_dead = set()
+        self._lock = Lock()
+        self._closed = False
+
+        dispatcher = Thread(target=self._dispatch)
+        dispatcher.daemon = True
+        dispatcher.start()
+
+    def connect(self):
+        """Creates a pipe and returns the worker's end wrapped as queues."""
+        connection_invoker, connection_worker = self._context.Pipe()
+
+        reader = Thread(target=self._read, args=(connection_invoker,))
+        reader.daemon = True
+        reader.start()
+
+        return dict(queue_tasks=PipeEndpoint(connection_worker, "task"),
+                    queue_start=PipeEndpoint(connection_worker, "start"),
+                    queue_outcome=PipeEndpoint(connection_worker, "outcome"))
+
+    def connected(self, queues):
+        """
+        Closes this process' copy of the worker's end of the pipe.
+
+        Afterwards, the worker holds the only copy, so its termination is
+        noticed as the end of the pipe.
+        """
+        queues["queue_tasks"].close()
+
+    def _read(self, connection):
+        """Sorts messages received from one worker into the local queues."""
+        while True:
+            try:
+                name, message = connection.recv()
+            except (EOFError, IOError, OSError):
+                # The worker terminated, so there is nothing left to read.
+                break
+
+            if name == "task":
+                # The worker asks for the next task.
+                self._queue_ready.put(connection)
+            elif name == "start":
+                self.queue_start.put(message)
+            else:
+                self.queue_outcome.put(message)
+
+        with self._lock:
+            self._connections_dead.add(connection)
+        connection.close()
+
+    def _dispatch(self):
+        """Hands each task to the next worker that asks for one."""
+        while True:
+            task = self.queue_task.get()
+            if task is None:
+                # The transport was closed.
+                break
+
+            while True:
+                connection = self._queue_ready.get()
+                if connection is None:
+                    # The transport was closed.
+                    return
+                with self._lock:
+                    if connection in self._connections_dead:
+                        continue
+                try:
+                    connection.send(task)
+                    break
+                except (IOError, OSError):
+                    # The worker terminated since it asked for a task.
+                    # So try the next one.
+                    continue
+
+            try:
+                self.queue_task.task_done()
+            except ValueError:
+                # The status database marked all tasks done while stopping.
+                pass
+
+    def close(self):
+        """Ends the dispatcher, which makes all remaining workers idle."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue_ready.put(None)
+        self.queue_task.put(None)
+
+
+class PipeEndpoint(object):
+    """
+    Worker end of a pipe of the pipe transport.
+
+    It offers the small part of the queue interface that workers use. The
+    endpoints for tasks, starts and outcomes of a worker share one pipe, so
+    every message is sent along with the name of its queue.
+    """
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def qsize(self):
+        """Returns 0, since tasks are sent to this worker on request, only."""
+        return 0
+
+    def get(self):
+        """Asks the invoker for the next task and blocks till it arrives."""
+        self._connection.send((self._name, None))
+        return self._connection.recv()
+
+    def put(self, item):
+        """Sends the given start or outcome to the invoker."""
+        self._connection.send((self._name, item))
+
+    def task_done(self):
+        """Does nothing, since the invoker tracks tasks by their starts."""
+        pass
+
+    def close(self):
+        """Closes this end of the pipe."""
+        self._connection.close()
+
+
+class LocalTransport(object):
+    """
+    Transport that shares plain queues with worker threads.
+
+    The queues can not be shared with other processes, so this transport is
+    meant for workers running in the invoker's own process.
+    """
+
+    def __init__(self):
+        self.queue_task = Queue()
+        self.queue_start = Queue()
+        self.queue_outcome = Queue()
+
+        self._count_connections = 0
+        self._lock = Lock()
+
+    def connect(self):
+        """Returns the queues a new worker thread should use."""
+        with self._lock:
+            self._count_connections += 1
+        return dict(queue_tasks=self.queue_task,
+                    queue_start=self.queue_start,
+                    queue_outcome=self.queue_outcome)
+
+    def connected(self, queues):
+        """Notes that a worker thread was started with the given queues."""
+        del queues  # the queues are shared, nothing to do
+
+    def close(self):
+        """Makes every worker thread that waits for a task quit."""
+        with self._lock:
+            count_connections = self._count_connections
+            self._count_connections = 0
+        for _ in range(count_connections):
+            self.queue_task.put(None)
+
+
+class TCPTransport(object):
+    """
+    Transport that connects worker agents via TCP, e.g. on other machines.
+
+    Agents connect to the address this transport listens on and advertise
+    their slots, i.e. the number of calls they execute at once. Like for the
+    pipe transport, a dispatcher thread hands each task to the next agent that
+    asked for one and a reader thread per agent sorts the starts and outcomes
+    it sends into the local queues. Every job is sent to each agent before the
+    first task that refers to it.
+
+    Tasks of an agent that disconnects before ending them are handed to the
+    remaining agents again, so their calls start once more.
+    """
+
+    def __init__(self, address=("localhost", 0), authkey=None):
+        """
+        :param address: Host and port to listen on. Port 0 picks a free one.
+        :param authkey: Bytes that agents must know to connect. Messages are
+                        pickled, so anyone who can connect can run code in
+                        this process. Required unless the host is a loopback
+                        address, which only this machine can reach.
+
+        Raises ValueError if no authkey is given for any other host.
+        """
+        if authkey is None and not _is_loopback(address[0]):
+            raise ValueError("Listening on %s needs an authkey, since anyone "
+                             "who can connect can run code in this process."
+                             % address[0])
+
+        self.queue_task = Queue(maxsize=1)
+        self.queue_start = Queue()
+        self.queue_outcome = Queue()
+
+        self._listener = Listener(address, authkey=authkey)
+
+        # connected agents, all jobs published so far by id and the tasks of
+        # disconnected agents, which are handed out before any new ones
+        self._agents = set()
+        self._jobs = OrderedDict()
+        self._tasks_reissued = deque()
+
+        # agents that asked for a task, once for every asking worker
+        self._queue_ready = Queue()
+
+        # agents of the workers that started calls, by worker id
+        self._agents_by_worker = dict()
+
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._closed = False
+
+        for target in (self._accept, self._dispatch):
+            thread = Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    @property
+    def address(self):
+        """Returns the host and port that agents connect to."""
+        return self._listener.address
+
+    @property
+    def slot_count(self):
+        """Returns the number of slots of all connected agents."""
+        with self._lock:
+            return sum(agent.slots for agent in self._agents)
+
+    def wait_for_slots(self):
+        """Blocks till an agent is connected or this transport was closed."""
+        with self._condition:
+            while not self._closed and not self._agents:
+                self._condition.wait()
+
+    def publish(self, job):
+        """Sends the given job to all agents, including future ones."""
+        with self._lock:
+            if job.id in self._jobs:
+                return
+            self._jobs[job.id] = job
+            agents = list(self._agents)
+        for agent in agents:
+            agent.send("job", job)
+
+    def discard(self, job_id):
+        """Makes all agents free the job given by id, which no call needs."""
+        with self._lock:
+            if self._jobs.pop(job_id, None) is None:
+                return
+            agents = list(self._agents)
+        for agent in agents:
+            agent.send("drop", job_id)
+
+    def lay_off(self, worker_id):
+        """
+        Makes the agent of the worker given by id replace it by a new one.
+
+        The calls of the worker are not handed to other agents, since the
+        caller of this method ends them.
+        """
+        with self._lock:
+            agent = self._agents_by_worker.pop(worker_id, None)
+            if agent is None:
+                return
+            agent.forget(worker_id)
+        agent.send("layoff", worker_id)
+
+    def _accept(self):
+        """Accepts connecting agents till this transport is closed."""
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, EOFError):
+                # The agent does not know the authkey or was the wakeup.
+                connection = None
+            except (IOError, OSError):
+                # The listener was closed.
+                break
+
+            with self._lock:
+                if self._closed:
+                    if connection is not None:
+                        connection.close()
+                    break
+            if connection is None:
+                continue
+
+            reader = Thread(target=self._read, args=(connection,))
+            reader.daemon = True
+            reader.start()
+
+    def _read(self, connection):
+        """Sorts messages received from one agent into the local queues."""
+        try:
+            name, slots = connection.recv()
+        except (EOFError, IOError, OSError, TypeError, ValueError):
+            # The peer is no agent or disconnected right away.
+            name, slots = None, 0
+        agent = AgentConnection(connection, slots)
+        with self._condition:
+            if name != "hello" or self._closed:
+                connection.close()
+                return
+            self._agents.add(agent)
+            jobs = list(self._jobs.values())
+            self._condition.notify_all()
+        for job in jobs:
+            agent.send("job", job)
+
+        while True:
+            try:
+                name, message = connection.recv()
+            except (EOFError, IOError, OSError):
+                # The agent disconnected, so there is nothing left to read.
+                break
+
+            if name == "task":
+                # One of the agent's workers asks for the next task.
+                self._queue_ready.put(agent)
+            elif name == "start":
+                with self._lock:
+                    for start in _unbatch(message):
+                        agent.start(start)
+                        self._agents_by_worker[start.worker_id] = agent
+                self.queue_start.put(message)
+            else:
+                with self._lock:
+                    for outcome in _unbatch(message):
+                        agent.end(outcome)
+                self.queue_outcome.put(message)
+
+        self._disconnect(agent)
+
+    def _disconnect(self, agent):
+        """Hands the tasks the given agent did not end to other agents."""
+        with self._condition:
+            agent.connected = False
+            self._agents.discard(agent)
+            for worker_id in agent.worker_ids:
+                if self._agents_by_worker.get(worker_id) is agent:
+                    del self._agents_by_worker[worker_id]
+            tasks = agent.pop_tasks()
+            if not self._closed:
+                self._tasks_reissued.extend(tasks)
+            self._condition.notify_all()
+        agent.close()
+
+        if tasks:
+            try:
+                # Wake up the dispatcher, if it waits for a new task.
+                self.queue_task.put_nowait(Wakeup())
+            except Full:
+                # The dispatcher will get the reissued tasks first anyway.
+                pass
+
+    def _next_task(self):
+        """
+        Blocks till there is a task to hand out, returning it along with
+        whether it came from the task queue. Returns None when closed.
+        """
+        while True:
+            with self._lock:
+                if self._tasks_reissued:
+                    return self._tasks_reissued.popleft(), False
+            task = self.queue_task.get()
+            if not isinstance(task, Wakeup):
+                return task, True
+            self._task_done()
+
+    def _task_done(self):
+        """Marks a task gotten from the task queue as processed."""
+        try:
+            self.queue_task.task_done()
+        except ValueError:
+            # The status database marked all tasks done while stopping.
+            pass
+
+    def _dispatch(self):
+        """Hands each task to the next agent that asks for one."""
+        while True:
+            task, queued = self._next_task()
+            if task is None:
+                # The transport was closed.
+                break
+
+            while True:
+                agent = self._queue_ready.get()
+                if agent is None:
+                    # The transport was closed.
+                    return
+                with self._lock:
+                    if not agent.connected:
+                        continue
+                    # Should the agent disconnect from now on, the task is
+                    # handed to another agent.
+                    agent.hand(task)
+                agent.send("task", task)
+                break
+
+            if queued:
+                self._task_done()
+
+    def close(self):
+        """Makes all agents quit and stops listening for new ones."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            agents = list(self._agents)
+            self._condition.notify_all()
+        for agent in agents:
+            agent.send("close", None)
+
+        # Closing the listener does not wake up a blocking accept, so
+        # connecting once does.
+        try:
+            socket.create_connection(self.address, timeout=1).close()
+        except (IOError, OSError):
+            pass
+        self._listener.close()
+
+        self._queue_ready.put(None)
+        try:
+            self.queue_task.put_nowait(None)
+        except Full:
+            # The dispatcher ended already, since it leaves tasks queued
+            # only when closed.
+            pass
+
+
+class AgentConnection(object):
+    """
+    Connection of the TCP transport to one agent.
+
+    It keeps track of the tasks handed to the agent and not ended yet, so they
+    can be handed to other agents if this one disconnects.
+    """
+
+    def __init__(self, connection, slots):
+        """
+        :param connection: Connection to the agent.
+        :param      slots: Number of calls the agent executes at once.
+        """
+        self.slots = slots
+        self.connected = True
+        self._connection = connection
+        self._lock = Lock()
+
+        # tasks handed to the agent, but not ended yet, by call id and the ids
+        # of the workers that started them, by call id
+        self._tasks = OrderedDict()
+        self._worker_ids = dict()
+
+    @property
+    def worker_ids(self):
+        """Returns the ids of the workers that started pending tasks."""
+        return set(self._worker_ids.values())
+
+    def send(self, name, message):
+        """Sends the given message along with its name to the agent."""
+        with self._lock:
+            try:
+                self._connection.send((name, message))
+            except (IOError, OSError):
+                # The agent disconnected, which its reader notices, too.
+                pass
+
+    def hand(self, task):
+        """Notes that the given task or chunk is handed to the agent."""
+        tasks = task.tasks if isinstance(task, Chunk) else [task]
+        for task_single in tasks:
+            self._tasks[task_single.call.id] = task_single
+
+    def start(self, start):
+        """Notes the given start of a task handed to the agent."""
+        if start.call.id in self._tasks:
+            self._worker_ids[start.call.id] = start.worker_id
+
+    def end(self, outcome):
+        """Notes the given outcome of a task handed to the agent."""
+        if isinstance(outcome, Retirement):
+            return
+        self._tasks.pop(outcome.call.id, None)
+        self._worker_ids.pop(outcome.call.id, None)
+
+    def forget(self, worker_id):
+        """Forgets the tasks started by the worker given by id."""
+        for call_id, worker_id_started in list(self._worker_ids.items()):
+            if worker_id_started == worker_id:
+                del self._worker_ids[call_id]
+                del self._tasks[call_id]
+
+    def pop_tasks(self):
+        """Returns all tasks the agent did not end and forgets them."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self._worker_ids.clear()
+        return tasks
+
+    def close(self):
+        """Closes the connection to the agent."""
+        with self._lock:
+            self._connection.close()
+
+
+def _is_loopback(host):
+    """Returns whether the given host resolves to loopback addresses only."""
+    try:
+        addresses = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        # An empty host, for example, stands for all interfaces.
+        return False
+    return all(address[4][0].startswith("127.") or address[4][0] == "::1"
+               for address in addresses)
+
+
+def _unbatch(message):
+    """Returns the starts or outcomes contained in the given message."""
+    if isinstance(message, Batch):
+        return message.messages
+    return [message]
+
+
+TRANSPORTS = {
+    "manager": ManagerTransport,
+    "pipe": PipeTransport,
+}
+
+
+def create_transport(name, context=multiprocessing):
+    """
+    Creates a transport given by name, which is a key of TRANSPORTS.
+
+    :param context: Multiprocessing context of the worker processes.
+    """
+    try:
+        transport_class = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError("Unknown transport: %s (choose one of: %s)" %
+                         (name, ", ".join(sorted(TRANSPORTS.keys()))))
+    return transport_class(context=context)
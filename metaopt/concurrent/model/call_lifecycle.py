@@ -10,8 +10,13 @@ from __future__ import absolute_import, division, print_function, \
 from collections import namedtuple
 
 
+# data structure for the objective function and specifications of all calls
+# (shipped to each worker once, calls refer to it by its id)
+Job = namedtuple("Job", ["id", "function", "param_spec", "return_spec"])
+
 # data structure for tasks given to the workers
-Call = namedtuple("Call", ["id", "function", "args", "kwargs", "param_spec", "return_spec"])
+# (workers get the raw values of the args only and no kwargs)
+Call = namedtuple("Call", ["id", "job_id", "args", "kwargs"])
 
 # data structure for declaring a task is idle before being executed by a worker
 Task = namedtuple("Task", ["call"])
@@ -27,3 +32,21 @@ Error = namedtuple("Error", ["worker_id", "call", "value"])
 
 # data structure for declaring that a worker was terminated
 Layoff = namedtuple("Layoff", ["worker_id", "call", "value"])
+
+# data structure for declaring that a worker quits by itself, e.g. to free
+# leaked memory (the value is the reason)
+Retirement = namedtuple("Retirement", ["worker_id", "value"])
+
+# data structure for asking whichever worker gets it to retire, e.g. to shrink
+# the pool of workers (the worker reports it as the value of its retirement)
+Dismissal = namedtuple("Dismissal", ["value"])
+
+# data structure for handing several tasks to one worker at once
+Chunk = namedtuple("Chunk", ["tasks"])
+
+# data structure for declaring several starts or outcomes of a worker at once
+# (the duration is the time in seconds the worker needed for the outcomes)
+Batch = namedtuple("Batch", ["worker_id", "messages", "duration"])
+
+# data structure for waking up threads waiting for a start or an outcome
+Wakeup = namedtuple("Wakeup", [])
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Agent that executes calls of a distributed invoker with local worker processes.
+
+Run it on each machine that should execute calls as::
+
+    metaopt-worker HOST:PORT --slots 4
+
+where HOST:PORT is the address of the :class:`DistributedInvoker`.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import argparse
+import os
+from importlib import import_module
+from multiprocessing.connection import Client
+from threading import Lock, Thread
+
+# First Party
+from metaopt.concurrent.employer.util.determine_worker_count import \
+    determine_worker_count
+from metaopt.concurrent.employer.util.exception import LayoffError
+from metaopt.concurrent.employer.util.start_method import get_context, \
+    get_start_method, preload_modules
+from metaopt.concurrent.invoker.util.job_store import FileJobStore
+from metaopt.concurrent.invoker.util.transport import PipeEndpoint
+from metaopt.concurrent.model.call_lifecycle import Batch, Layoff, Retirement
+from metaopt.concurrent.worker.process import ProcessWorker
+from metaopt.concurrent.worker.util.memory import check_address_space_limit
+
+try:
+    from Queue import Queue
+except ImportError:
+    # Queue was renamed to queue in Python 3
+    from queue import Queue
+
+
+class WorkerAgent(object):
+    """
+    Agent that executes the calls of a distributed invoker on this machine.
+
+    The agent connects to the invoker via TCP, advertises its slots and runs a
+    worker process per slot, each connected to the agent by a pipe. Whenever
+    a worker asks for a task, the agent asks the invoker for one. It relays the
+    tasks to the workers and their starts and outcomes to the invoker.
+
+    Workers the invoker lays off are replaced right away, as are workers that
+    retire or die. Calls of a worker that died are reported as laid off.
+    """
+
+    def __init__(self, address, slots=None, authkey=None, initializer=None,
+                 max_tasks=None, max_rss=None, max_memory=None,
+                 start_method=None, preload=None):
+        """
+        :param      address: Host and port of the invoker.
+        :param        slots: Number of worker processes, i.e. calls executed
+                             at once. Defaults to the number of CPUs.
+        :param      authkey: Bytes the invoker expects agents to know.
+                             (optional)
+        :param  initializer: Function each worker calls once when it starts.
+                             Its return value is passed to every call of the
+                             worker as the kwarg ``context``. (optional)
+        :param    max_tasks: Number of tasks after which a worker is replaced
+                             by a fresh one. (optional)
+        :param      max_rss: Bytes of resident memory after exceeding which a
+                             worker is replaced by a fresh one. (optional)
+        :param   max_memory: Bytes of address space each worker is limited
+                             to. (optional)
+        :param start_method: Either "fork", "spawn" or "forkserver". Defaults
+                             to the platform's default start method.
+        :param      preload: Names of modules to import once for all workers.
+                             (optional)
+        """
+        self._address = address
+        self._slots = determine_worker_count(slots)
+        self._authkey = authkey
+        self._initializer = initializer
+        self._max_tasks = max_tasks
+        self._max_rss = max_rss
+        check_address_space_limit(max_memory)
+        self._max_memory = max_memory
+        self._start_method = start_method
+        self._preload = preload
+        self._context = get_context(start_method)
+        preload_modules(self._context, preload or [])
+
+        # jobs sent by the invoker, which the workers read from files
+        self._job_store = FileJobStore()
+
+        # worker processes and the agent's ends of their pipes, by worker id,
+        # and the calls each worker started, but did not end, by worker id
+        self._workers = dict()
+        self._calls_running = dict()
+
+        # tasks sent by the invoker and the pipes of workers that asked for
+        # one, which a dispatcher thread pairs up
+        self._queue_task = Queue()
+        self._queue_ready = Queue()
+
+        self._connection = None
+        self._lock_send = Lock()
+        self._lock = Lock()
+        self._closed = False
+
+    def run(self):
+        """
+        Connects to the invoker and executes its calls till it closes the
+        connection, e.g. when it is stopped.
+        """
+        self._connection = Client(self._address, authkey=self._authkey)
+        dispatcher = Thread(target=self._dispatch)
+        dispatcher.daemon = True
+        dispatcher.start()
+
+        try:
+            self._send("hello", self._slots)
+            with self._lock:
+                for _ in range(self._slots):
+                    self._start_worker()
+            self._receive()
+        finally:
+            self._close()
+
+    def _receive(self):
+        """Handles the messages of the invoker till it hangs up."""
+        while True:
+            try:
+                name, message = self._connection.recv()
+            except (EOFError, IOError, OSError):
+                # The invoker is gone, so there is nothing left to do.
+                break
+
+            if name == "job":
+                self._job_store.publish(message)
+            elif name == "drop":
+                self._job_store.discard(message)
+            elif name == "task":
+                self._queue_task.put(message)
+            elif name == "layoff":
+                self._lay_off(worker_id=message)
+            else:
+                # The invoker was stopped.
+                break
+
+    def _send(self, name, message):
+        """Sends the given message along with its name to the invoker."""
+        with self._lock_send:
+            try:
+                self._connection.send((name, message))
+            except (IOError, OSError):
+                # The invoker is gone, which the receiving loop notices, too.
+                pass
+
+    def _start_worker(self):
+        """Starts a worker process connected to this agent by a pipe."""
+        connection_agent, connection_worker = self._context.Pipe()
+        connections_inherited = []
+        if get_start_method(self._context) == "fork":
+            connections_inherited.append(self._connection)
+            connections_inherited.extend(
+                connection for _, connection in self._workers.values())
+            connections_inherited.append(connection_agent)
+        worker = AgentWorker(
+            connections_inherited=connections_inherited,
+            queue_tasks=PipeEndpoint(connection_worker, "task"),
+            queue_start=PipeEndpoint(connection_worker, "start"),
+            queue_outcome=PipeEndpoint(connection_worker, "outcome"),
+            job_store=self._job_store, initializer=self._initializer,
+            max_tasks=self._max_tasks, max_rss=self._max_rss,
+            max_memory=self._max_memory, start_method=self._start_method,
+            preload=self._preload)
+        # The worker holds the only copy of its end of the pipe now, so its
+        # termination is noticed as the end of the pipe.
+        connection_worker.close()
+
+        self._workers[worker.worker_id] = (worker, connection_agent)
+        self._calls_running[worker.worker_id] = dict()
+
+        reader = Thread(target=self._read,
+                        args=(worker.worker_id, connection_agent))
+        reader.daemon = True
+        reader.start()
+
+    def _read(self, worker_id, connection):
+        """Relays the messages of one worker to the invoker."""
+        while True:
+            try:
+                name, message = connection.recv()
+            except (EOFError, IOError, OSError):
+                # The worker terminated, so there is nothing left to read.
+                break
+
+            if name == "task":
+                # The worker asks for the next task, so ask the invoker.
+                self._queue_ready.put(connection)
+                self._send("task", None)
+            elif name == "start":
+                with self._lock:
+                    calls = self._calls_running.get(worker_id, dict())
+                    for start in _unbatch(message):
+                        calls[start.call.id] = start.call
+                self._send("start", message)
+            elif isinstance(message, Retirement):
+                # The worker quits by itself after sending its last outcomes.
+                # Its replacement is none of the invoker's business.
+                pass
+            else:
+                with self._lock:
+                    calls = self._calls_running.get(worker_id, dict())
+                    for outcome in _unbatch(message):
+                        calls.pop(outcome.call.id, None)
+                self._send("outcome", message)
+
+        connection.close()
+        self._replace(worker_id)
+
+    def _replace(self, worker_id):
+        """
+        Replaces the worker given by id, which ended by itself, and reports its
+        calls as laid off, if it died while executing them.
+        """
+        with self._lock:
+            entry = self._workers.pop(worker_id, None)
+            calls = self._calls_running.pop(worker_id, dict())
+            if entry is None or self._closed:
+                # The worker was laid off or the agent is closing.
+                return
+            self._start_worker()
+
+        worker, _ = entry
+        worker.join()
+        for call in calls.values():
+            self._send("outcome", Layoff(
+                worker_id=worker_id, call=call,
+                value=LayoffError("The worker process died.")))
+
+    def _lay_off(self, worker_id):
+        """Terminates the worker given by id and starts a new one instead."""
+        with self._lock:
+            entry = self._workers.pop(worker_id, None)
+            self._calls_running.pop(worker_id, None)
+            if entry is None:
+                # The worker ended meanwhile.
+                return
+            if not self._closed:
+                self._start_worker()
+
+        worker, _ = entry
+        _terminate(worker)
+
+    def _dispatch(self):
+        """Hands each task to the next worker that asks for one."""
+        while True:
+            task = self._queue_task.get()
+            if task is None:
+                # The agent was closed.
+                break
+
+            while True:
+                connection = self._queue_ready.get()
+                if connection is None:
+                    # The agent was closed.
+                    return
+                try:
+                    connection.send(task)
+                    break
+                except (IOError, OSError):
+                    # The worker terminated since it asked for a task.
+                    # So try the next one.
+                    continue
+
+    def _close(self):
+        """Terminates all workers and disconnects from the invoker."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._calls_running.clear()
+
+        for worker, _ in workers:
+            _terminate(worker)
+        self._queue_ready.put(None)
+        self._queue_task.put(None)
+        self._connection.close()
+        self._job_store.close()
+
+
+class AgentWorker(ProcessWorker):
+    """
+    Worker process of an agent.
+
+    Forked workers inherit the agent's connection to the invoker and its ends
+    of the pipes of all workers. They close them first thing, so they do not
+    keep the connections of a dead agent alive and notice its death instead.
+    """
+
+    def __init__(self, connections_inherited=(), **kwargs):
+        """
+        :param connections_inherited: Connections of the agent to close in the
+                                      worker process.
+        """
+        # set before starting the process, which the worker's init does
+        self._connections_inherited = list(connections_inherited)
+        super(AgentWorker, self).__init__(**kwargs)
+
+    def run(self):
+        """Closes the inherited connections, then executes all tasks."""
+        for connection in self._connections_inherited:
+            connection.close()
+        self._connections_inherited = []
+        super(AgentWorker, self).run()
+
+
+def _terminate(worker):
+    """Terminates the given worker process and waits for it to end."""
+    try:
+        worker.terminate()
+        worker.join()
+    except OSError:
+        # The worker has already terminated.
+        # That is OK, just carry on.
+        pass
+
+
+def _unbatch(message):
+    """Returns the starts or outcomes contained in the given message."""
+    if isinstance(message, Batch):
+        return message.messages
+    return [message]
+
+
+def _import_function(name):
+    """Imports the function given as "package.module:function"."""
+    module_name, _, function_name = name.partition(":")
+    return getattr(import_module(module_name), function_name)
+
+
+def main(argv=None):
+    """Runs a worker agent configured by the given command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="metaopt-worker",
+        description="Executes the calls of a distributed invoker with a "
+                    "worker process per slot.")
+    parser.add_argument("address",
+                        help="host and port of the invoker, e.g. "
+                             "localhost:5000")
+    parser.add_argument("--slots", type=int,
+                        help="number of worker processes, defaults to the "
+                             "number of CPUs")
+    parser.add_argument("--authkey", default=os.environ.get("METAOPT_AUTHKEY"),
+                        help="key the invoker expects, defaults to the "
+                             "environment variable METAOPT_AUTHKEY")
+    parser.add_argument("--initializer",
+                        help="function each worker calls once to set up the "
+                             "context of its calls, e.g. package.module:setup")
+    parser.add_argument("--preload", action="append", default=[],
+                        help="module to import once for all workers, may be "
+                             "given several times")
+    parser.add_argument("--max-tasks", type=int,
+                        help="number of tasks to replace a worker after")
+    parser.add_argument("--max-rss", type=int,
+                        help="bytes of resident memory to replace a worker "
+                             "after")
+    parser.add_argument("--max-memory", type=int,
+                        help="bytes of address space each worker is limited "
+                             "to")
+    parser.add_argument("--start-method",
+                        choices=["fork", "spawn", "forkserver"],
+                        help="how to start worker processes")
+    args = parser.parse_args(argv)
+
+    host, _, port = args.address.rpartition(":")
+    authkey = args.authkey.encode("utf-8") if args.authkey else None
+    initializer = _import_function(args.initializer) \
+        if args.initializer else None
+
+    agent = WorkerAgent(address=(host or "localhost", int(port)),
+                        slots=args.slots, authkey=authkey,
+                        initializer=initializer, max_tasks=args.max_tasks,
+                        max_rss=args.max_rss, max_memory=args.max_memory,
+                        start_method=args.start_method, preload=args.preload)
+    agent.run()
+
+
+if __name__ == '__main__':
+    main()
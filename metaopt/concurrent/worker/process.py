@@ -10,18 +10,16 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
-import pickle
-import traceback
 import uuid
 from multiprocessing import Process
-from pickle import PicklingError
-from tempfile import TemporaryFile
 
 # First Party
-from metaopt.concurrent.model.call_lifecycle import Error, Result, Start
-from metaopt.concurrent.worker.util.import_function import import_function
+from metaopt.concurrent.employer.util.start_method import get_context, \
+    get_popen, import_modules
+from metaopt.concurrent.worker.util.affinity import pin_to_cpus
+from metaopt.concurrent.worker.util.interrupt import Interrupter
+from metaopt.concurrent.worker.util.memory import limit_address_space
 from metaopt.concurrent.worker.worker import Worker
-from metaopt.core.call.call import call
 
 
 class ProcessWorker(Process, Worker):
@@ -31,12 +29,47 @@ class ProcessWorker(Process, Worker):
     It calls functions with arguments, both of which it gets from a queue.
     """
 
-    def __init__(self, queue_outcome, queue_start, queue_tasks):
+    def __init__(self, queue_outcome, queue_start, queue_tasks,
+                 job_store=None, initializer=None, max_tasks=None,
+                 max_rss=None, max_memory=None, start_method=None,
+                 preload=None, spare=False, cpus=None):
+        """
+        :param   job_store: Store to look up the jobs of calls in.
+        :param initializer: Function whose return value is passed to every call
+                            as the kwarg ``context``. Gets called once, when
+                            this worker starts. (optional)
+        :param   max_tasks: Number of tasks to retire after. (optional)
+        :param     max_rss: Bytes of resident memory to retire after exceeding.
+                            (optional)
+        :param  max_memory: Bytes of address space this worker is limited to.
+                            Calls exceeding it are laid off with a
+                            MemoryLimitError. (optional)
+        :param start_method: Either "fork", "spawn" or "forkserver". Defaults
+                             to the platform's default start method.
+        :param     preload: Names of modules to import before the first task.
+                            (optional)
+        :param       spare: Whether this worker starts up, but takes no task
+                            till it is promoted.
+        :param        cpus: CPUs to pin this worker to, which also sets the
+                            number of threads of OpenMP, MKL and OpenBLAS.
+                            (optional)
+        """
         super(ProcessWorker, self).__init__()
         self._worker_id = uuid.uuid4()
         self._queue_outcome = queue_outcome
         self._queue_start = queue_start
         self._queue_task = queue_tasks
+        self._job_store = job_store
+        self._initializer = initializer
+        self._max_tasks = max_tasks
+        self._max_rss = max_rss
+        self._max_memory = max_memory
+        self._start_method = start_method
+        self._preload = preload or []
+        self._cpus = cpus
+        self._interrupter = Interrupter(get_context(start_method))
+        if spare:
+            self._promotion = get_context(start_method).Event()
 
         self.daemon = True  # workers don't spawn processes
         self.start()
@@ -46,57 +79,40 @@ class ProcessWorker(Process, Worker):
         """Property for the worker_id attribute of this class."""
         return self._worker_id
 
+    @property
+    def cpus(self):
+        """Returns the CPUs this worker is pinned to, if any."""
+        return self._cpus
+
+    def promote(self):
+        """Makes this spare worker take tasks from now on."""
+        if self._promotion is not None:
+            self._promotion.set()
+
+    def interrupt(self, call_id):
+        """
+        Interrupts the call given by id, if this worker still executes it.
+
+        Returns whether the interrupt was sent, which needs a Unix signal.
+        """
+        return self._interrupter.interrupt(pid=self.pid, call_id=call_id)
+
+    def executes(self, call_id):
+        """Returns whether this worker executes the call given by id."""
+        return self._interrupter.executes(call_id)
+
+    def _Popen(self, process_obj):
+        """Starts the given process, i.e. this worker, by its start method."""
+        return get_popen(self._start_method)(process_obj)
+
     def run(self):
         """Makes this worker execute all tasks incoming from the call queue."""
-
-        while True:
-            try:
-                self._queue_task.qsize()
-            except Exception:
-                # call_handle queue seems closed, so terminate
-                break
-            try:
-                # get call_handle from the queue, execute call and report back
-                task = self._queue_task.get()
-                self._queue_start.put(Start(worker_id=self._worker_id,
-                                            call=task.call))
-                self._execute(task)
-                self._queue_task.task_done()
-            except (EOFError, IOError):
-                # the queue was closed by the invoker, so terminate
-                # call_handle queue seems closed, so terminate
-                break
-
-    def _execute(self, task):
-        """Executes the given call_handle."""
-
-        # make the actual call
-        function = task.call.function
-        try:
-            try:
-                value = call(f=function, fargs=task.call.args,
-                             param_spec=task.call.param_spec,
-                             return_spec=task.call.return_spec)
-            except AttributeError:
-                # function had no return type specification
-                value = call(f=function, fargs=task.call.args,
-                             param_spec=function.param_spec)
-            self._queue_outcome.put(Result(worker_id=self._worker_id,
-                                           call=task.call,
-                                           value=value))
-        except Exception as value:
-            # the objective function may raise any exception
-            # we can not do anything more helpful than propagate the exception
-            # we need to send the exception to the main process via a queue
-            # we need to make sure the exception is pickleable for the queue
-            # so test pickleability and fall back to sending the exception
-
-            with TemporaryFile() as tmp_file:
-                try:
-                    pickle.dump(value, tmp_file)
-                except PicklingError:
-                    value = traceback.format_exc()
-
-            self._queue_outcome.put(Error(worker_id=self._worker_id,
-                                          call=task.call,
-                                          value=value))
+        # Libraries size their thread pools when imported, so pin first.
+        if self._cpus is not None:
+            pin_to_cpus(self._cpus)
+        # Forked workers inherited the modules, spawned ones import them now.
+        import_modules(self._preload)
+        self._interrupter.install()
+        if self._max_memory is not None:
+            limit_address_space(self._max_memory)
+        self._work()
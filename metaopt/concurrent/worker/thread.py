@@ -7,16 +7,59 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
+import uuid
 from threading import Thread
 
 # First Party
-from metaopt.worker.worker import Worker
+from metaopt.concurrent.worker.worker import Worker
 
 
 class ThreadWorker(Thread, Worker):
     """
     Worker implementation that executes objective functions in Python threads.
+
+    Python offers no means to terminate a thread. So a terminated thread worker
+    finishes its current call in the background, but executes no further tasks.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, queue_outcome, queue_start, queue_tasks,
+                 job_store=None, initializer=None):
+        """
+        :param   job_store: Store to look up the jobs of calls in.
+        :param initializer: Function whose return value is passed to every call
+                            as the kwarg ``context``. Gets called once, when
+                            this worker starts. (optional)
+        """
+        super(ThreadWorker, self).__init__()
+        self._worker_id = uuid.uuid4()
+        self._queue_outcome = queue_outcome
+        self._queue_start = queue_start
+        self._queue_task = queue_tasks
+        self._job_store = job_store
+        self._initializer = initializer
+
+        self.daemon = True  # do not keep the interpreter alive for workers
+        self.start()
+
+    @property
+    def worker_id(self):
+        """Property for the worker_id attribute of this class."""
+        return self._worker_id
+
+    def run(self):
+        """Makes this worker execute all tasks incoming from the call queue."""
+        self._work()
+
+    def terminate(self):
+        """Makes this worker quit as soon as its current call returns."""
+        self._laid_off = True
+
+    def interrupt(self, call_id):
+        """Returns False, since Python offers no means to interrupt threads."""
+        del call_id  # threads can not be interrupted
+        return False
+
+    def executes(self, call_id):
+        """Returns False, since threads are never interrupted."""
+        del call_id  # threads can not be interrupted
+        return False
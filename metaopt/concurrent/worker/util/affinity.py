@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities that pin a worker process to CPUs and size its thread pools.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import ctypes
+import os
+
+# environment variables that numerical libraries size their thread pools by
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
+                    "OPENBLAS_NUM_THREADS")
+
+# functions that resize the thread pools of numerical libraries that were
+# loaded already, by a part of their file names, tried in the given order
+# OpenBLAS builds, e.g. the one bundled with NumPy, may prefix or suffix them.
+THREAD_SETTERS = (
+    ("openblas", ("openblas_set_num_threads",
+                  "openblas_set_num_threads64_",
+                  "scipy_openblas_set_num_threads",
+                  "scipy_openblas_set_num_threads64_")),
+    ("mkl_rt", ("MKL_Set_Num_Threads",)),
+    ("gomp", ("omp_set_num_threads",)),
+    ("iomp", ("omp_set_num_threads",)),
+    ("libomp", ("omp_set_num_threads",)),
+)
+
+
+def pin_to_cpus(cpus):
+    """
+    Pins the current process to the given CPUs and makes OpenMP, MKL and
+    OpenBLAS use as many threads as there are CPUs, see
+    :func:`limit_threads`.
+
+    Returns whether the process was pinned, which needs Linux and Python 3.
+    The thread counts are limited either way.
+    """
+    try:
+        os.sched_setaffinity(0, cpus)
+        pinned = True
+    except AttributeError:
+        # The affinity mask is only available on Linux with Python 3.
+        # The limited thread counts still keep the workers from competing.
+        pinned = False
+
+    # Threads started from now on inherit the affinity mask, so limit the
+    # thread pools only now.
+    limit_threads(len(cpus))
+    return pinned
+
+
+def limit_threads(count):
+    """
+    Makes OpenMP, MKL and OpenBLAS use the given number of threads.
+
+    Libraries loaded afterwards read the limit from the environment. Libraries
+    loaded already, e.g. by the parent of a forked worker or by preloading
+    them, ignore the environment, so their thread pools are resized via their
+    own functions instead. That needs Linux, which lists the loaded libraries.
+
+    Returns the paths of the loaded libraries that were resized.
+    """
+    for name in THREAD_VARIABLES:
+        os.environ[str(name)] = str(count)
+
+    resized = []
+    for path in _read_loaded_libraries():
+        name = os.path.basename(path)
+        for fragment, setter_names in THREAD_SETTERS:
+            if fragment in name and _call_setter(path, setter_names, count):
+                resized.append(path)
+                break
+    return resized
+
+
+def _read_loaded_libraries():
+    """Returns the paths of the shared libraries this process loaded."""
+    try:
+        with open("/proc/self/maps") as maps:
+            lines = maps.readlines()
+    except (IOError, OSError):
+        # There is no proc file system, e.g. on Mac OS X or Windows.
+        return []
+
+    paths = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 6 or ".so" not in fields[-1]:
+            continue
+        if fields[-1] not in paths:
+            paths.append(fields[-1])
+    return paths
+
+
+def _call_setter(path, setter_names, count):
+    """
+    Calls the first of the given functions the library at the given path
+    exports with the given thread count. Returns whether there was one.
+    """
+    try:
+        library = ctypes.CDLL(path)
+    except OSError:
+        return False
+
+    for setter_name in setter_names:
+        setter = getattr(library, setter_name, None)
+        if setter is not None:
+            setter(ctypes.c_int(count))
+            return True
+    return False
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Means for invokers to interrupt a call inside the worker process executing it.
+
+The invoker notes the id of the call to interrupt in memory shared with the
+worker and sends it a signal. The worker raises :class:`Interrupted` from its
+signal handler, but only if it still executes that very call, so a signal that
+arrives late does not hit the next call.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import multiprocessing
+import os
+import signal
+
+# signal the worker interrupts calls on, if the platform has one
+SIGNAL_INTERRUPT = getattr(signal, "SIGUSR1", None)
+
+# number of bytes of a call id, which is a UUID
+CALL_ID_SIZE = 16
+
+# call id noted while no call is executed
+CALL_ID_NONE = b"\0" * CALL_ID_SIZE
+
+
+class Interrupted(BaseException):
+    """
+    Raised inside a call the invoker interrupts.
+
+    It derives from BaseException, so objective functions that catch all
+    exceptions do not swallow it by accident.
+    """
+
+
+class Interrupter(object):
+    """
+    Interrupts calls executed by a worker process.
+
+    Create it before starting the worker, which installs it via
+    :meth:`install` and notes each call it executes via :meth:`executing`.
+    """
+
+    def __init__(self, context=multiprocessing):
+        """
+        :param context: Multiprocessing context the worker is started with.
+        """
+        self._call_id_executed = context.RawArray(str("c"), CALL_ID_SIZE)
+        self._call_id_interrupted = context.RawArray(str("c"), CALL_ID_SIZE)
+
+    @property
+    def available(self):
+        """Whether this platform offers a signal to interrupt calls with."""
+        return SIGNAL_INTERRUPT is not None
+
+    def install(self):
+        """Makes the current process, i.e. the worker, handle interrupts."""
+        if not self.available:
+            return
+        signal.signal(SIGNAL_INTERRUPT, self._handle)
+        # restart system calls, e.g. reading the next task, after interrupts
+        signal.siginterrupt(SIGNAL_INTERRUPT, False)
+
+    def executing(self, call_id):
+        """Notes the call given by id as executed, None if there is none."""
+        if call_id is None:
+            self._call_id_executed.raw = CALL_ID_NONE
+        else:
+            self._call_id_executed.raw = call_id.bytes
+
+    def executes(self, call_id):
+        """Returns whether the worker executes the call given by id."""
+        return self._call_id_executed.raw == call_id.bytes
+
+    def interrupt(self, pid, call_id):
+        """
+        Interrupts the call given by id in the worker process given by pid.
+
+        Returns whether a signal was sent, which is not the case if this
+        platform has no signal for it.
+        """
+        if not self.available:
+            return False
+        self._call_id_interrupted.raw = call_id.bytes
+        try:
+            os.kill(pid, SIGNAL_INTERRUPT)
+        except OSError:
+            # The worker process terminated already.
+            return False
+        return True
+
+    def _handle(self, signum, frame):
+        """Raises Interrupted, if the worker executes the call to interrupt."""
+        del signum, frame  # not needed
+        call_id = self._call_id_executed.raw
+        if call_id != CALL_ID_NONE and \
+                call_id == self._call_id_interrupted.raw:
+            raise Interrupted()
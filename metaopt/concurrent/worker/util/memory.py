@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities that measure and limit the memory of a worker process.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    # The resource module is only available on Unix.
+    resource = None
+
+
+def measure_rss():
+    """
+    Returns the resident set size of the current process in bytes.
+
+    Returns the peak resident set size, if the current one can not be read,
+    and None, if neither can be measured on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf(str("SC_PAGE_SIZE"))
+    except (IOError, OSError, ValueError, IndexError):
+        # There is no proc file system, e.g. on Mac OS X.
+        # Moving on to the peak resident set size.
+        pass
+
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # Mac OS X reports bytes already.
+        return rss
+    return rss * 1024  # the others report kilobytes
+
+
+def check_address_space_limit(limit):
+    """
+    Raises NotImplementedError if the given limit, unless None, can not be
+    set on this platform.
+
+    Worker processes limit themselves when they start, when a failure could
+    only be noticed by their missing outcomes. So check before starting them.
+    """
+    if limit is not None and resource is None:
+        raise NotImplementedError("Memory limits need the resource module.")
+
+
+def limit_address_space(limit):
+    """
+    Limits the address space of the current process to the given bytes.
+
+    Allocations beyond the limit raise a MemoryError in the current process.
+    """
+    check_address_space_limit(limit)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
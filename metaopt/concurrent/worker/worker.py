@@ -6,16 +6,69 @@ Minimal worker implementation.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+import pickle
+import traceback
+from pickle import PicklingError
+from tempfile import TemporaryFile
+from time import time
+
 # First Party
+from metaopt.concurrent.employer.util.exception import LayoffError, \
+    MemoryLimitError
+from metaopt.concurrent.model.call_lifecycle import Batch, Chunk, \
+    Dismissal, Error, Layoff, Result, Retirement, Start
 from metaopt.concurrent.worker.base import BaseWorker
+from metaopt.concurrent.worker.util.interrupt import Interrupted
+from metaopt.concurrent.worker.util.memory import measure_rss
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.call.call import call
 
 
 class Worker(BaseWorker):
-    """Minimal worker implementation."""
+    """
+    Minimal worker implementation.
+
+    Subclasses that set the task, start and outcome queues and the job store
+    may use :meth:`_work` to execute all tasks incoming from the task queue.
+    If they set an initializer, too, it is called once before the first task
+    and its return value is passed to every call as the kwarg ``context``.
+    If they set limits, the worker retires once it exceeds one of them.
+    If they set a promotion event, the worker starts up, but takes no task till
+    the event is set.
+    """
+
+    # set when the worker was laid off, but could not be terminated
+    _laid_off = False
+
+    # function that sets up the context passed to every call of this worker
+    _initializer = None
+
+    # number of tasks and bytes of resident memory to retire after, if any
+    _max_tasks = None
+    _max_rss = None
+
+    # bytes of address space this worker is limited to, if any
+    _max_memory = None
+
+    # number of tasks executed so far
+    _count_tasks = 0
+
+    # set when a call exceeded the memory limit
+    _memory_exceeded = False
+
+    # means for the invoker to interrupt calls of this worker, if any
+    _interrupter = None
+
+    # event that spare workers wait for till they take tasks, if any
+    _promotion = None
 
     def __init__(self):
         super(Worker, self).__init__()
         self._worker_id = None
+        self._job_store = None
+        self._context = None
+        self._context_error = None
 
     @property
     def worker_id(self):
@@ -23,3 +76,202 @@ class Worker(BaseWorker):
 
     def run(self):
         raise NotImplementedError()
+
+    def _initialize(self):
+        """
+        Sets up the context of this worker by calling the initializer once.
+
+        If the initializer fails, every call of this worker fails with the
+        same error, which reports it to the invoker.
+        """
+        self._context = None
+        self._context_error = None
+        if self._initializer is None:
+            return
+
+        try:
+            self._context = self._initializer()
+        except Exception as error:
+            self._context_error = error
+
+    def _work(self):
+        """Makes this worker execute all tasks incoming from the call queue."""
+
+        self._initialize()
+
+        # A spare worker is ready now, but waits till it replaces another one.
+        if self._promotion is not None:
+            self._promotion.wait()
+
+        while not self._laid_off:
+            try:
+                self._queue_task.qsize()
+            except Exception:
+                # call_handle queue seems closed, so terminate
+                break
+            try:
+                # get call_handle from the queue, execute call and report back
+                task = self._queue_task.get()
+                if task is None:
+                    # the transport was closed, so terminate
+                    break
+                if self._laid_off:
+                    # This worker was laid off while it waited for the task.
+                    # So leave the task to another worker.
+                    self._queue_task.put(task)
+                    self._queue_task.task_done()
+                    break
+                if isinstance(task, Dismissal):
+                    # The invoker shrinks its pool, so quit like retiring.
+                    self._queue_outcome.put(Retirement(
+                        worker_id=self._worker_id, value=task))
+                    self._queue_task.task_done()
+                    break
+                if isinstance(task, Chunk):
+                    retired = self._execute_chunk(task)
+                else:
+                    self._queue_start.put(Start(worker_id=self._worker_id,
+                                                call=task.call))
+                    outcome = self._execute(task)
+                    retired = self._retire_if_exhausted(count_tasks=1)
+                    self._queue_outcome.put(outcome)
+                self._queue_task.task_done()
+                if retired:
+                    break
+            except (EOFError, IOError):
+                # the queue was closed by the invoker, so terminate
+                # call_handle queue seems closed, so terminate
+                break
+
+    def _retire_if_exhausted(self, count_tasks):
+        """
+        Counts the given executed tasks and retires if a limit was exceeded.
+
+        The retirement is reported before the outcomes of the tasks, so the
+        invoker replaces this worker before it counts on it to be idle again.
+        Returns whether this worker retired.
+        """
+        self._count_tasks += count_tasks
+
+        if self._memory_exceeded:
+            reason = "A call exceeded the memory limit."
+        elif self._max_tasks is not None and \
+                self._count_tasks >= self._max_tasks:
+            reason = "Executed %s tasks." % self._count_tasks
+        elif self._max_rss is not None and \
+                (measure_rss() or 0) > self._max_rss:
+            reason = "Exceeded %s bytes of resident memory." % self._max_rss
+        else:
+            return False
+
+        self._queue_outcome.put(Retirement(worker_id=self._worker_id,
+                                           value=reason))
+        return True
+
+    def _execute_chunk(self, chunk):
+        """
+        Executes all tasks of the given chunk and reports them at once.
+
+        Returns whether this worker retired afterwards.
+        """
+        starts = [Start(worker_id=self._worker_id, call=task.call)
+                  for task in chunk.tasks]
+        self._queue_start.put(Batch(worker_id=self._worker_id,
+                                    messages=starts, duration=None))
+
+        time_start = time()
+        outcomes = []
+        for task in chunk.tasks:
+            if self._laid_off:
+                # This worker was laid off for one of the calls, so the
+                # invoker handed the rest of them to another worker.
+                break
+            outcomes.append(self._execute(task))
+        duration = time() - time_start
+
+        retired = self._retire_if_exhausted(count_tasks=len(chunk.tasks))
+        self._queue_outcome.put(Batch(worker_id=self._worker_id,
+                                      messages=outcomes, duration=duration))
+        return retired
+
+    def _execute(self, task):
+        """
+        Executes the given call_handle and returns its outcome.
+
+        If the invoker interrupts the call, it is reported as laid off and
+        this worker carries on with the next task.
+        """
+        if self._interrupter is None:
+            return self._execute_call(task)
+
+        try:
+            try:
+                self._interrupter.executing(task.call.id)
+                return self._execute_call(task)
+            finally:
+                self._interrupter.executing(None)
+        except Interrupted:
+            # The invoker interrupted the call, e.g. since it took too long.
+            # It reports its own reason to the caller.
+            return Layoff(worker_id=self._worker_id, call=task.call,
+                          value=LayoffError("The call was interrupted."))
+
+    def _execute_call(self, task):
+        """Makes the call of the given call_handle and returns its outcome."""
+
+        # make the actual call
+        try:
+            job = self._job_store.get(task.call.job_id)
+            function = job.function
+            param_spec = job.param_spec
+            if param_spec is None:
+                # the job had no parameter specification
+                param_spec = function.param_spec
+
+            # the call carries the raw values of the args only
+            if task.call.args is None:
+                fargs = None
+            else:
+                fargs = ArgsCreator(param_spec).args(values=task.call.args)
+
+            # pass the context set up by the initializer, if any
+            if self._context_error is not None:
+                raise self._context_error
+            if self._initializer is None:
+                extra_kwargs = None
+            else:
+                extra_kwargs = dict(context=self._context)
+
+            # send back the raw return values, the invoker wraps them again
+            value = call(f=function, fargs=fargs, param_spec=param_spec,
+                         extra_kwargs=extra_kwargs).raw_values
+            return Result(worker_id=self._worker_id, call=task.call,
+                          value=value)
+        except MemoryError as value:
+            if self._max_memory is None:
+                return Error(worker_id=self._worker_id, call=task.call,
+                             value=value)
+
+            # The call exceeded the memory limit of this worker.
+            # This is no error of the objective function, so report a layoff.
+            # This worker retires afterwards to free all of its memory.
+            self._memory_exceeded = True
+            return Layoff(worker_id=self._worker_id, call=task.call,
+                          value=MemoryLimitError(
+                              "The call exceeded the memory limit of %s bytes."
+                              % self._max_memory))
+        except Exception as value:
+            # the objective function may raise any exception
+            # we can not do anything more helpful than propagate the exception
+            # we need to send the exception to the main process via a queue
+            # we need to make sure the exception is pickleable for the queue
+            # so test pickleability and fall back to sending the exception
+
+            with TemporaryFile() as tmp_file:
+                try:
+                    pickle.dump(value, tmp_file)
+                except PicklingError:
+                    value = traceback.format_exc()
+
+            return Error(worker_id=self._worker_id, call=task.call,
+                         value=value)
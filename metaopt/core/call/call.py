@@ -15,13 +15,21 @@ from metaopt.core.call.util.exception import CallNotPossibleError
 from metaopt.core.returnspec.util.wrap_return_values import wrap_return_values
 
 
-def call(f, fargs, param_spec, return_spec=None):
-    """Call a function using a list of args"""
+def call(f, fargs, param_spec, return_spec=None, extra_kwargs=None):
+    """
+    Call a function using a list of args
+
+    :param extra_kwargs: Kwargs to pass in addition to the extra kwargs of the
+                         parameter specification. (optional)
+    """
 
     if fargs is None:
         fargs = []
 
-    extra_kwargs = param_spec.extra_kwargs or {}
+    if extra_kwargs:
+        extra_kwargs = dict(param_spec.extra_kwargs or {}, **extra_kwargs)
+    else:
+        extra_kwargs = param_spec.extra_kwargs or {}
 
     args, vargs, kwargs, _ = getargspec(f)
 
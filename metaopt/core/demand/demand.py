@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Classes to describe the resources that calls of objective functions need
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+
+class Demand(object):
+    """
+    This class describes the CPUs and memory a call needs while it runs
+
+    Objective functions that are parallel themselves, e.g. a random forest with
+    ``n_jobs=4``, keep more than one CPU busy. Invokers reserve the demand of
+    each call before they start it, so parallel calls do not oversubscribe the
+    machine.
+
+    Either demand may be a number or a function of the values of the call's
+    parameters, passed as kwargs by name. So
+    ``cpus=lambda n_jobs, **_: n_jobs`` describes calls that keep as many CPUs
+    busy as their ``n_jobs`` parameter.
+
+    """
+    def __init__(self, cpus=1, memory=0):
+        """
+        :param   cpus: Number of CPUs a call keeps busy.
+        :param memory: Bytes of memory a call needs at most.
+        """
+        self.cpus = cpus
+        self.memory = memory
+
+    def resolve(self, fargs):
+        """
+        Returns the demand of the call with the given args, as numbers.
+        """
+        values = dict((farg.param.name, farg.value) for farg in fargs or [])
+        return Demand(cpus=_resolve(self.cpus, values),
+                      memory=_resolve(self.memory, values))
+
+    def __eq__(self, other):
+        return isinstance(other, Demand) and \
+            (self.cpus, self.memory) == (other.cpus, other.memory)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Demand(cpus=%r, memory=%r)" % (self.cpus, self.memory)
+
+
+def _resolve(demand, values):
+    """Returns the given demand, calling it with the given values first."""
+    if callable(demand):
+        return demand(**values)
+    return demand
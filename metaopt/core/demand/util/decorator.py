@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Decorator to declare the resources each call of a function needs. For example::
+
+    from metaopt.core.demand.util.decorator import demand
+
+    @demand(cpus=lambda n_jobs, **_: n_jobs, memory=2 * 1024 ** 3)
+    @param.int("n_jobs", interval=[1, 4])
+    def f(n_jobs):
+        pass
+
+This code declares that each call of f keeps as many CPUs busy as its n_jobs
+parameter says and needs up to 2 GB of memory.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# First Party
+from metaopt.core.demand.demand import Demand
+
+
+def demand(cpus=1, memory=0):
+    def decorator(f):
+        f.demand = Demand(cpus=cpus, memory=memory)
+        return f
+
+    return decorator
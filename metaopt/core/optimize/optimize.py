@@ -10,6 +10,7 @@ from threading import Timer
 # First Party
 from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
 from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+from metaopt.concurrent.invoker.session import InvokerSession
 from metaopt.core.optimize.util.exception import GlobalTimeoutError, \
     NoParamSpecError, OptimizerError
 from metaopt.core.returnspec.returnspec import ReturnSpec
@@ -83,7 +84,8 @@ def custom_optimize(f, invoker, param_spec=None, return_spec=None,
 
 
 def optimize(f, param_spec=None, return_spec=None, extra_kwargs=None,
-             timeout=None, plugins=[], optimizer=SAESOptimizer()):
+             timeout=None, plugins=[], optimizer=SAESOptimizer(),
+             initializer=None, invoker=None):
     """
     Optimizes the given objective function.
 
@@ -91,10 +93,25 @@ def optimize(f, param_spec=None, return_spec=None, extra_kwargs=None,
     :param timeout: Available time for optimization (in seconds)
     :param plugins: List of plugins
     :param optimizer: Optimizer
+    :param initializer: Function each worker process calls once, whose return
+                        value is passed to f as the kwarg ``context``
+    :param invoker: Long-lived invoker to optimize with, e.g. a
+                    MultiProcessInvoker shared by many optimizations run back
+                    to back. It keeps its workers between optimizations and
+                    is not stopped by this one. Defaults to a new
+                    MultiProcessInvoker for this optimization only.
 
     """
 
-    invoker = PluggableInvoker(invoker=MultiProcessInvoker(), plugins=plugins)
+    if invoker is None:
+        invoker = MultiProcessInvoker(initializer=initializer)
+    elif initializer is not None:
+        raise ValueError("The workers of the given invoker are set up "
+                         "already. Pass the initializer to the invoker.")
+    else:
+        invoker = InvokerSession(invoker=invoker)
+
+    invoker = PluggableInvoker(invoker=invoker, plugins=plugins)
 
     return custom_optimize(f, invoker=invoker, param_spec=param_spec,
                            return_spec=return_spec, extra_kwargs=extra_kwargs,
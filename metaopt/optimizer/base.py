@@ -55,6 +55,10 @@ class BaseCaller(object):
 class BaseOptimizer(BaseCaller):
     """
     Abstract base class for objects optimizing objective functions.
+
+    Optimizers either drive the evaluations themselves via :meth:`optimize`,
+    or let someone else drive them via :meth:`ask` and :meth:`tell`, e.g. an
+    external scheduler that evaluates candidates in batches of its own size.
     """
 
     __metaclass__ = ABCMeta
@@ -72,3 +76,36 @@ class BaseOptimizer(BaseCaller):
         :returns: Optimal arguments
         """
         pass
+
+    @abstractmethod
+    def prepare(self, param_spec):
+        """
+        Prepares optimizing an objective function for a given parameters
+        specification, before candidates are asked for.
+
+        :param param_spec: Parameters specification for `function`
+        """
+        pass
+
+    @abstractmethod
+    def ask(self, n=None):
+        """
+        Returns arguments to evaluate the objective function for next.
+
+        :param n: Number of arguments to return, or None for those the
+                  optimizer would evaluate next at once, e.g. the rest of a
+                  generation.
+        :returns: List of arguments
+        """
+        pass
+
+    @abstractmethod
+    def tell(self, candidates, fitnesses):
+        """
+        Reports the fitnesses of arguments returned by :meth:`ask`.
+
+        :param candidates: Arguments returned by :meth:`ask`
+        :param fitnesses: Return value of the objective function for each of
+                          the arguments, or None if evaluating them failed
+        """
+        pass
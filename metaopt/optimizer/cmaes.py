@@ -13,10 +13,13 @@ from __future__ import absolute_import, division, print_function, \
 # Standard Library
 from math import exp
 from copy import deepcopy
+from threading import Lock
 
 # First Party
 from metaopt.core.arg.util.creator import ArgsCreator
 from metaopt.optimizer.optimizer import Optimizer
+from metaopt.optimizer.util.candidates import Candidates
+from metaopt.optimizer.util.generation import CANCEL, Generation
 from metaopt.core.optimize.util.exception import WrongArgumentTypeError
 from metaopt.core.optimize.util.exception import MissingRequirementsError
 from metaopt.core.stoppable.util.exception import StoppedError
@@ -41,16 +44,35 @@ class CMAESOptimizer(Optimizer):
 
     This optimizer should be combined with a global timeout, otherwise it will
     run indefinitely.
+
+    In steady-state mode, there are no generations to wait for. Each worker
+    that becomes idle gets a new sample of the current distribution, which is
+    updated every lamb results, so workers stay busy even if calls take varying
+    time.
+
+    With a quorum, each generation is closed once that share of its calls
+    ended, so a single slow call does not hold it up. The calls still running
+    are either cancelled or invoked again on idle workers, where the first
+    outcome wins.
     """
 
     MU = 15
     LAMBDA = 100
     STEP_SIZE = 1.0
 
-    def __init__(self, mu=MU, lamb=LAMBDA, global_step_size=STEP_SIZE):
+    def __init__(self, mu=MU, lamb=LAMBDA, global_step_size=STEP_SIZE,
+                 steady_state=False, quorum=None, stragglers=CANCEL):
         """
         :param mu: Number of parent arguments
         :param lamb: Number of offspring arguments
+        :param steady_state: Whether to invoke a sample whenever a worker
+                             becomes idle instead of a generation at once.
+        :param quorum: Share of the calls of a generation, greater 0 and at
+                       most 1, after whose outcomes it is closed. Waits for
+                       all calls, if None.
+        :param stragglers: Either "cancel" to stop the calls still running
+                           once a generation is closed or "speculate" to
+                           invoke them again on idle workers.
         """
         super(CMAESOptimizer, self).__init__()
 
@@ -65,16 +87,44 @@ class CMAESOptimizer(Optimizer):
         self._lambd = lamb
         self._sigma = global_step_size
 
+        self.steady_state = steady_state
+
+        self.quorum = quorum
+        self.stragglers = stragglers
+
+        # samples of the open generation not asked for yet are the population
+        self._generation_open = False
+        self._asked = Candidates()
+        # ask and tell may run on different threads, e.g. if the invoker
+        # reports outcomes on a dispatcher thread
+        self._lock = Lock()
+
     def optimize(self, invoker, param_spec, return_spec=None, minimize=True):
         del return_spec
         del minimize
 
+        self._invoker = invoker
+        self.prepare(param_spec)
+
+        if self.steady_state:
+            return self.optimize_steady_state()
+
+        while not self.exit_condition():
+            self.score_population()
+
+            if self.aborted:
+                return self.best_scored_indivual[0]
+
+            self.close_generation()
+
+        return self.best_scored_indivual[0]
+
+    def prepare(self, param_spec):
         # param constraint check
         for param in param_spec.params.values():
             if not param.type == 'float':
                 raise WrongArgumentTypeError()
 
-        self._invoker = invoker
         self.param_spec = param_spec
 
         # dimensions for equation setup
@@ -83,23 +133,11 @@ class CMAESOptimizer(Optimizer):
         # start position as numpy array, numpify
         args_creator = ArgsCreator(self.param_spec)
         start = args_creator.random()
-        self._xmean = array(map(lambda arg : arg.value, start))
+        self._xmean = array([arg.value for arg in start])
 
         # initialize the parameters with member variables
         self.initialize_parameters()
 
-        while not self.exit_condition():
-            self.add_offspring()
-            self.score_population()
-
-            if self.aborted:
-                return self.best_scored_indivual[0]
-
-            self.select_parents()
-            self.generation += 1
-
-        return self.best_scored_indivual[0]
-
     def initialize_parameters(self):
         # alias
         n = self._n
@@ -155,6 +193,99 @@ class CMAESOptimizer(Optimizer):
         invD = diag([1.0/d for d in self._D])
         self._invsqrtC = self._B * invD * transpose(self._B)
 
+    def optimize_steady_state(self):
+        """
+        Invokes a sample of the current distribution after another, each as
+        soon as a worker becomes idle.
+        """
+        try:
+            while not self.exit_condition():
+                for individual in self.ask(1):
+                    self._invoker.invoke(
+                        caller=self, fargs=individual,
+                        **self._asked.call_kwargs(individual))
+        except StoppedError:
+            self.aborted = True
+
+        self._invoker.wait()
+
+        return self.best_scored_indivual[0]
+
+    def ask(self, n=None):
+        """
+        Returns n samples of the current distribution as arguments. The first
+        lamb samples make up a generation, further ones join it.
+
+        Returns the rest of the generation if n is None. In steady-state mode,
+        that is a single sample.
+        """
+        with self._lock:
+            self.open_generation()
+            if n is None:
+                n = max(len(self.population), 1)
+
+            candidates = []
+            for _ in xrange(n):
+                if self.population:
+                    individual = self.population.pop(0)
+                else:
+                    individual = self.create_args(self.create_offspring())
+                candidates.append(self._asked.add(individual, individual))
+            return candidates
+
+    def tell(self, candidates, fitnesses, tokens=None):
+        """
+        Scores the given samples. Updates the distribution once all samples of
+        the generation were scored.
+
+        The tokens the calls of the candidates carried back, see
+        :meth:`Candidates.call_kwargs`, tell apart equal candidates. Without
+        them, the candidates are looked up by identity or value.
+        """
+        with self._lock:
+            if tokens is None:
+                tokens = [None] * len(candidates)
+            for args, fitness, token in zip(candidates, fitnesses, tokens):
+                individual = self._asked.pop(args, token=token)
+                if fitness is not None:
+                    self.score_individual(individual, fitness)
+
+            if not self.population and not self._asked:
+                self.close_generation()
+
+    def open_generation(self):
+        """
+        Samples lamb arguments of the current distribution, unless the current
+        generation is still open.
+        """
+        if self._generation_open:
+            return
+
+        if not self.steady_state:
+            self.add_offspring()
+            self.scored_population = []
+        self._generation_open = True
+
+    def close_generation(self):
+        """
+        Updates the distribution by the samples of the current generation
+        scored so far, if there are mu of them at least. Samples not scored by
+        then are left out.
+
+        In steady-state mode, the distribution is updated every lamb results,
+        so there is no generation to close.
+        """
+        if self.steady_state or not self._generation_open:
+            return
+
+        self._generation_open = False
+        self.population = []
+        self._asked.clear()
+
+        if len(self.scored_population) >= self._mu:
+            self.select_parents()
+        self.generation += 1
+
     def exit_condition(self):
         pass
 
@@ -169,38 +300,46 @@ class CMAESOptimizer(Optimizer):
 
     def add_offspring(self):
         for _ in xrange(self._lambd):
-            normals = transpose(matrix([normal(0.0, d) for d in self._D]))
-            value = self._xmean + transpose(self._sigma * self._B * normals)
-            value = self.limit_to_interval(value)
-            self.population.append(value)
+            self.population.append(self.create_args(self.create_offspring()))
 
-    def score_population(self):
-        self.scored_population = []
+    def create_offspring(self):
+        """Returns a sample of the current distribution."""
+        normals = transpose(matrix([normal(0.0, d) for d in self._D]))
+        value = self._xmean + transpose(self._sigma * self._B * normals)
+        return self.limit_to_interval(value)
 
-        for individual in self.population:
-            # metaoptify
-            args_creator = ArgsCreator(self.param_spec)
-            individual = individual.getA1().tolist()
-            individual = args_creator.args(individual)
-            args = individual
-
-            try:
-                self._invoker.invoke(caller=self, fargs=args,
-                                     individual=individual)
-            except StoppedError:
-                self.aborted = True
-                break
+    def create_args(self, value):
+        """Returns the arguments of the objective function for a sample."""
+        # metaoptify
+        args_creator = ArgsCreator(self.param_spec)
+        return args_creator.args(value.getA1().tolist())
 
-        self._invoker.wait()
+    def score_population(self):
+        generation = Generation(invoker=self._invoker, caller=self,
+                                quorum=self.quorum, minimum=self._mu,
+                                stragglers=self.stragglers)
+        try:
+            fargs_list = self.ask()
+            generation.invoke_many(
+                fargs_list=fargs_list,
+                kwargs_list=[self._asked.call_kwargs(individual)
+                             for individual in fargs_list])
+        except StoppedError:
+            self.aborted = True
+
+        generation.wait()
+        if self._invoker.stopped:
+            # The invoker was stopped while waiting for the outcomes.
+            self.aborted = True
 
     def select_parents(self):
         self.scored_population.sort(key=lambda s: s[1])
         new_scored_population = self.scored_population[0:self._mu]
-        values = map(lambda s: s[0], new_scored_population)
+        values = [s[0] for s in new_scored_population]
 
         # numpify
-        numpify = lambda val : array(map(lambda arg : arg.value, val))
-        values = map(numpify, values)
+        numpify = lambda val : array([arg.value for arg in val])
+        values = [numpify(value) for value in values]
 
         # alias
         n = self._n
@@ -253,11 +392,8 @@ class CMAESOptimizer(Optimizer):
         invD = diag([1.0/d for d in self._D])
         self._invsqrtC = self._B * invD * transpose(self._B)
 
-    def on_result(self, value, fargs, individual, **kwargs):
-        del fargs
-        del kwargs
-        # _, fitness = result
-        fitness = value
+    def score_individual(self, individual, fitness):
+        """Adds the given sample to the scored population."""
         scored_individual = (individual, fitness)
         self.scored_population.append(scored_individual)
 
@@ -266,8 +402,17 @@ class CMAESOptimizer(Optimizer):
         if best_fitness is None or fitness < best_fitness:
             self.best_scored_indivual = scored_individual
 
-    def on_error(self, value, fargs, individual, **kwargs):
+        if self.steady_state and len(self.scored_population) == self._lambd:
+            # update the distribution by the last lamb results
+            self.select_parents()
+            self.scored_population = []
+            self.generation += 1
+
+    def on_result(self, value, fargs, candidate=None, **kwargs):
+        del kwargs
+        self.tell([fargs], [value], tokens=[candidate])
+
+    def on_error(self, value, fargs, candidate=None, **kwargs):
         del value  # TODO
-        del fargs  # TODO
-        del individual  # TODO
         del kwargs  # TODO
+        self.tell([fargs], [None], tokens=[candidate])
@@ -3,6 +3,9 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+from itertools import islice
+
 # First Party
 from metaopt.core.arg.util.creator import ArgsCreator
 from metaopt.core.stoppable.util.exception import StoppedError
@@ -10,19 +13,24 @@ from metaopt.optimizer.optimizer import Optimizer
 
 
 class GridSearchOptimizer(Optimizer):
-    """Optimizer that systematically tests parameters in a grid pattern."""
+    """
+    Optimizer that systematically tests parameters in a grid pattern.
+
+    Once the grid is exhausted, :meth:`ask` returns no arguments anymore.
+    """
 
     def __init__(self):
         super(GridSearchOptimizer, self).__init__()
         self.best = (None, None) # (args, fitness)
+        self._grid = iter([])
 
     def optimize(self, invoker, param_spec, return_spec=None):
         del return_spec  # TODO
-        args_creator = ArgsCreator(param_spec)
+        self.prepare(param_spec)
 
-        for args in args_creator.product():
+        for args in iter(lambda: self.ask(1), []):
             try:
-                invoker.invoke(caller=self, fargs=args)
+                invoker.invoke(caller=self, fargs=args[0])
             except StoppedError:
                 return self.best[0]
 
@@ -30,13 +38,25 @@ class GridSearchOptimizer(Optimizer):
 
         return self.best[0]
 
+    def prepare(self, param_spec):
+        self._grid = ArgsCreator(param_spec).product()
+
+    def ask(self, n=None):
+        """Returns the next n arguments of the grid, or all of the rest."""
+        return list(islice(self._grid, n))
+
+    def tell(self, candidates, fitnesses):
+        for args, fitness in zip(candidates, fitnesses):
+            if fitness is None:
+                continue
+            _, best_fitness = self.best
+
+            if best_fitness is None or fitness < best_fitness:
+                self.best = (args, fitness)
+
     def on_result(self, value, fargs, **kwargs):
         del kwargs  # TODO
-        fitness = value
-        _, best_fitness = self.best
-
-        if best_fitness is None or fitness < best_fitness:
-            self.best = (fargs, fitness)
+        self.tell([fargs], [value])
 
     def on_error(self, value, fargs, **kwargs):
         pass
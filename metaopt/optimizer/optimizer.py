@@ -26,3 +26,12 @@ class Optimizer(BaseOptimizer):
 
     def optimize(self, invoker, param_spec, return_spec):
         raise NotImplementedError()
+
+    def prepare(self, param_spec):
+        raise NotImplementedError()
+
+    def ask(self, n=None):
+        raise NotImplementedError()
+
+    def tell(self, candidates, fitnesses):
+        raise NotImplementedError()
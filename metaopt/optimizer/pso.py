@@ -7,10 +7,15 @@ Particle Swarm Optimizer (PSO)
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+from threading import Lock
+
 # First Party
 from metaopt.core.arg.util.creator import ArgsCreator
 from metaopt.optimizer.optimizer import Optimizer
+from metaopt.optimizer.util.candidates import Candidates
 from metaopt.core.optimize.util.exception import WrongArgumentTypeError
+from metaopt.core.optimize.util.exception import MissingRequirementsError
 from metaopt.core.stoppable.util.exception import StoppedError
 
 try:
@@ -31,6 +36,11 @@ class PSOOptimizer(Optimizer):
 
     This optimizer should be combined with a global timeout, otherwise it will
     run indefinitely.
+
+    In steady-state mode, there are no generations to wait for. Each particle
+    moves on as soon as its result arrives, towards the best position known by
+    then, and is invoked again right away, so workers stay busy even if calls
+    take varying time. This needs more particles than workers.
     """
 
     LAMBDA = 100
@@ -40,67 +50,208 @@ class PSOOptimizer(Optimizer):
     SPEED = 1.0
 
     def __init__(self, lamb=LAMBDA, c1=C_1, c2=C_2,
-                 inertia_weight=INERTIA_WEIGHT, speed=SPEED):
+                 inertia_weight=INERTIA_WEIGHT, speed=SPEED,
+                 steady_state=False):
+        """
+        :param steady_state: Whether to invoke each particle again as soon as
+                             its result arrives instead of a generation at
+                             once. The generation count then advances every
+                             lamb results.
+        """
         super(PSOOptimizer, self).__init__()
 
         self.population = []
         self.aborted = False
         self.generation = 1
 
+        self.best_gpos = None
+        self.best_fitness = None
+
+        self.steady_state = steady_state
+        self.result_count = 0
+        self.particles_ready = []  # moved particles, in steady-state mode
+
         self._lambd = lamb
         self._c1 = c1
         self._c2 = c2
         self._inertia_weight = inertia_weight
         self._speed = speed
 
+        # particles of the open generation not asked for yet
+        self._queue = []
+        self._generation_open = False
+        self._asked = Candidates()
+        # ask and tell may run on different threads, e.g. if the invoker
+        # reports outcomes on a dispatcher thread
+        self._lock = Lock()
+
     def optimize(self, invoker, param_spec, return_spec=None):
         del return_spec
 
+        self._invoker = invoker
+        self.prepare(param_spec)
+
+        args_creator = ArgsCreator(self.param_spec)
+
+        if self.steady_state:
+            return self.optimize_steady_state()
+
+        while not self.exit_condition():
+            self.score_population()
+
+            if self.aborted:
+                return args_creator.args(self.best_gpos.tolist())
+
+            self.close_generation()
+
+        return args_creator.args(self.best_gpos.tolist())
+
+    def optimize_steady_state(self):
+        """
+        Invokes the swarm and then each particle again as soon as its result
+        arrived and a worker becomes idle.
+        """
+        try:
+            for args in self.ask():
+                self._invoker.invoke(caller=self, fargs=args,
+                                     **self._asked.call_kwargs(args))
+
+            while not self.exit_condition():
+                if not self.particles_ready:
+                    # All particles are in flight, so wait for their results.
+                    self._invoker.wait()
+                    if not self.particles_ready:
+                        # The invoker was stopped meanwhile.
+                        self.aborted = True
+                        break
+                    continue
+                for args in self.ask(1):
+                    self._invoker.invoke(caller=self, fargs=args,
+                                         **self._asked.call_kwargs(args))
+        except StoppedError:
+            self.aborted = True
+
+        self._invoker.wait()
+
+        args_creator = ArgsCreator(self.param_spec)
+        return args_creator.args(self.best_gpos.tolist())
+
+    def prepare(self, param_spec):
         # param constraint check
         for param in param_spec.params.values():
             if not param.type == 'float':
-                raise WrongArgumentTypeException()
+                raise WrongArgumentTypeError()
 
-        self._invoker = invoker
         self.param_spec = param_spec
 
         # initialize population
-        args_creator = ArgsCreator(self.param_spec)
-        dims = self.param_spec.dimensions
         while len(self.population) < self._lambd:
-            pos = args_creator.random() # numpify
-            pos = array(map(lambda arg : arg.value, pos))
-            velocity = array([self._speed] * dims)
-            particle = pos, velocity
-            self.population.append(particle)
-
-        while not self.exit_condition():
-            if self.aborted:
-                return args_creator.args(self.best_gpos)
-
-            self.score_population()
+            self.population.append(self.create_particle())
+
+    def ask(self, n=None):
+        """
+        Returns the positions of n particles of the swarm as arguments. Once
+        all particles of the generation were asked for, further ones are new
+        particles that join the swarm.
+
+        Returns the rest of the generation if n is None. In steady-state mode,
+        that is the swarm at first and a single particle that moved on since,
+        afterwards.
+        """
+        with self._lock:
+            self.open_generation()
+            if n is None:
+                n = max(len(self._queue), 1)
+
+            candidates = []
+            for _ in xrange(n):
+                if self._queue:
+                    particle = self._queue.pop(0)
+                elif self.particles_ready:
+                    particle = self.particles_ready.pop(0)
+                else:
+                    particle = self.create_particle()
+                # metaoptify
+                args_creator = ArgsCreator(self.param_spec)
+                pos = args_creator.args(particle[0].tolist())
+                candidates.append(self._asked.add(pos, particle))
+            return candidates
+
+    def tell(self, candidates, fitnesses, tokens=None):
+        """
+        Scores the particles at the given positions. Moves the swarm once all
+        particles of the generation were scored.
+
+        The tokens the calls of the candidates carried back, see
+        :meth:`Candidates.call_kwargs`, tell apart equal candidates. Without
+        them, the candidates are looked up by identity or value.
+        """
+        with self._lock:
+            if tokens is None:
+                tokens = [None] * len(candidates)
+            for pos, fitness, token in zip(candidates, fitnesses, tokens):
+                particle = self._asked.pop(pos, token=token)
+                if fitness is None:
+                    if self.steady_state:
+                        # restart the particle somewhere else
+                        self.particles_ready.append(self.create_particle())
+                    continue
+                self.score_particle(particle, fitness)
+
+            if not self._queue and not self._asked:
+                self.close_generation()
+
+    def open_generation(self):
+        """Starts a generation of the swarm, unless one is still open."""
+        if self._generation_open:
+            return
+
+        self._queue = list(self.population)
+        self._generation_open = True
+        if not self.steady_state:
+            self.scored_population = []
+
+    def close_generation(self):
+        """
+        Moves the particles of the current generation scored so far. Particles
+        not scored by then are left behind.
+
+        In steady-state mode, each particle moves on with its result, so there
+        is no generation to close.
+        """
+        if self.steady_state or not self._generation_open:
+            return
+
+        self._generation_open = False
+        self._queue = []
+        self._asked.clear()
+
+        if self.scored_population:
             self.update()
-            self.generation += 1
+        self.generation += 1
 
-        return args_creator.args(self.best_gpos)
+    def create_particle(self):
+        """Returns a particle at a random position."""
+        args_creator = ArgsCreator(self.param_spec)
+        pos = args_creator.random() # numpify
+        pos = array([arg.value for arg in pos])
+        velocity = array([self._speed] * self.param_spec.dimensions)
+        return pos, velocity
 
     def score_population(self):
-        self.scored_population = []
-
-        for particle in self.population:
-            # metaoptify
-            args_creator = ArgsCreator(self.param_spec)
-            pos = particle[0].tolist()
-            pos = args_creator.args(pos)
-
-            try:
-                self._invoker.invoke(caller=self, fargs=pos,
-                                     individual=particle)
-            except StoppedError:
-                self.aborted = True
-                break
+        try:
+            fargs_list = self.ask()
+            self._invoker.invoke_many(
+                caller=self, fargs_list=fargs_list,
+                kwargs_list=[self._asked.call_kwargs(args)
+                             for args in fargs_list])
+        except StoppedError:
+            self.aborted = True
 
         self._invoker.wait()
+        if self._invoker.stopped:
+            # The invoker was stopped while waiting for the outcomes.
+            self.aborted = True
 
     def exit_condition(self):
         pass
@@ -122,49 +273,70 @@ class PSOOptimizer(Optimizer):
         self.best_fitness = self.scored_population[0][1]
 
         # update particles
-        for particle, fitness in self.scored_population:
-
-            if len(particle) < 3:
-                pos, vel = particle
-                best_pos = pos
-                best_fitness = fitness
-            else:
-                pos, vel, best_fitness, best_pos = particle
-
-            # update the best_pos, best_fitness
-            # when better fitness
-            if fitness < best_fitness:
-                best_pos = pos
-                best_fitness = fitness
-
-            # alias
-            iw, c1, c2 = self._inertia_weight, self._c1, self._c2
-            bpp, bgp = best_pos, self.best_gpos
-
-            # direction vectors
-            bppvec, bgpvec = bpp - pos, bgp - pos
-
-            # mutation
-            r1, r2 = normal(1), normal(1)
-
-            # update the velocity
-            vel = iw * vel + c1 * r1 * bppvec + c2 * r2 * bgpvec
-
-            # update the position
-            pos = self.limit_to_interval(vel * pos)
-
-        # copy population
-        self.population = map(lambda s : s[0], self.scored_population)
-
-    def on_error(self, value, fargs, **kwargs):
-        pass
+        self.population = [self.move(particle, fitness)
+                           for particle, fitness in self.scored_population]
+
+    def move(self, particle, fitness):
+        """
+        Returns the given particle, scored with the given fitness, moved
+        towards its own best position and the global best position.
+        """
+        if len(particle) < 3:
+            pos, vel = particle
+            best_pos = pos
+            best_fitness = fitness
+        else:
+            pos, vel, best_fitness, best_pos = particle
+
+        # update the best_pos, best_fitness
+        # when better fitness
+        if fitness < best_fitness:
+            best_pos = pos
+            best_fitness = fitness
+
+        # alias
+        iw, c1, c2 = self._inertia_weight, self._c1, self._c2
+        bpp, bgp = best_pos, self.best_gpos
+
+        # direction vectors
+        bppvec, bgpvec = bpp - pos, bgp - pos
+
+        # mutation
+        r1, r2 = normal(1), normal(1)
+
+        # update the velocity
+        vel = iw * vel + c1 * r1 * bppvec + c2 * r2 * bgpvec
+
+        # update the position
+        pos = self.limit_to_interval(pos + vel)
+
+        return pos, vel, best_fitness, best_pos
+
+    def score_particle(self, particle, fitness):
+        """
+        Adds the given particle to the scored population, or moves it on right
+        away in steady-state mode.
+        """
+        scored_individual = (particle, fitness)
+
+        if not self.steady_state:
+            self.scored_population.append(scored_individual)
+            return
+
+        if self.best_fitness is None or fitness < self.best_fitness:
+            self.best_gpos = particle[0]
+            self.best_fitness = fitness
+        self.particles_ready.append(self.move(particle, fitness))
+
+        self.result_count += 1
+        if self.result_count % self._lambd == 0:
+            self.generation += 1
 
-    def on_result(self, value, fargs, individual, **kwargs):
-        del fargs
+    def on_error(self, value, fargs, candidate=None, **kwargs):
+        del value
         del kwargs
-        # _, fitness = result
-        fitness = value
-        scored_individual = (individual, fitness)
-
-        self.scored_population.append(scored_individual)
+        self.tell([fargs], [None], tokens=[candidate])
 
+    def on_result(self, value, fargs, candidate=None, **kwargs):
+        del kwargs
+        self.tell([fargs], [value], tokens=[candidate])
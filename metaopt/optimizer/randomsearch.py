@@ -9,6 +9,12 @@ from metaopt.core.stoppable.util.exception import StoppedError
 from metaopt.optimizer.optimizer import Optimizer
 
 
+try:
+    xrange  # will work in python2, only @UndefinedVariable
+except NameError:
+    xrange = range  # rename range to xrange in python3
+
+
 class RandomSearchOptimizer(Optimizer):
     """
     Optimizer that randomly tests parameters.
@@ -21,24 +27,37 @@ class RandomSearchOptimizer(Optimizer):
     def __init__(self):
         super(RandomSearchOptimizer, self).__init__()
         self.best = (None, None)
+        self._args_creator = None
 
     def optimize(self, invoker, param_spec, return_spec=None):
-        args_creator = ArgsCreator(param_spec)
+        self.prepare(param_spec)
 
         try:
             while True:
-                args = args_creator.random()
+                args, = self.ask(1)
                 invoker.invoke(self, args)
         except StoppedError:
             return self.best[0]
 
+    def prepare(self, param_spec):
+        self._args_creator = ArgsCreator(param_spec)
+
+    def ask(self, n=None):
+        """Returns n random arguments, or a single one if None."""
+        return [self._args_creator.random() for _ in xrange(n or 1)]
+
+    def tell(self, candidates, fitnesses):
+        for args, fitness in zip(candidates, fitnesses):
+            if fitness is None:
+                continue
+            _, best_fitness = self.best
+
+            if best_fitness is None or fitness < best_fitness:
+                self.best = (args, fitness)
+
     def on_result(self, value, fargs, **kwargs):
         del kwargs
-        fitness = value
-        _, best_fitness = self.best
-
-        if best_fitness is None or fitness < best_fitness:
-            self.best = (fargs, fitness)
+        self.tell([fargs], [value])
 
     def on_error(self, value, fargs, **kwargs):
         pass
@@ -5,12 +5,15 @@ from __future__ import absolute_import, division, print_function, \
 
 # Standard Library
 from random import sample
+from threading import Lock
 
 # First Party
 from metaopt.core.arg.util.creator import ArgsCreator
 from metaopt.core.arg.util.modifier import ArgsModifier
 from metaopt.core.stoppable.util.exception import StoppedError
 from metaopt.optimizer.optimizer import Optimizer
+from metaopt.optimizer.util.candidates import Candidates
+from metaopt.optimizer.util.generation import CANCEL, Generation
 from metaopt.optimizer.util. \
     default_mutation_stength import default_mutation_stength
 
@@ -28,15 +31,35 @@ class RechenbergOptimizer(Optimizer):
     This optimizer should be combined with a global timeout, otherwise it will
     run indefinitely.
 
+    In steady-state mode, there are no generations to wait for. Each result is
+    inserted into the parents right away and each worker that becomes idle
+    gets a new offspring of the current parents, so workers stay busy even if
+    calls take varying time. The mutation strength is adapted every lamb
+    results.
+
+    With a quorum, each generation is closed once that share of its calls
+    ended, so a single slow call does not hold it up. The calls still running
+    are either cancelled or invoked again on idle workers, where the first
+    outcome wins.
     """
     MU = 15
     LAMBDA = 100
     A = 0.1
 
-    def __init__(self, mu=MU, lamb=LAMBDA, a=A):
+    def __init__(self, mu=MU, lamb=LAMBDA, a=A, steady_state=False,
+                 quorum=None, stragglers=CANCEL):
         """
         :param mu: Number of parent arguments
         :param lamb: Number of offspring arguments
+        :param steady_state: Whether to invoke an offspring whenever a worker
+                             becomes idle instead of a generation at once. The
+                             generation count then advances every lamb results.
+        :param quorum: Share of the calls of a generation, greater 0 and at
+                       most 1, after whose outcomes it is closed. Waits for
+                       all calls, if None.
+        :param stragglers: Either "cancel" to stop the calls still running
+                           once a generation is closed or "speculate" to
+                           invoke them again on idle workers.
         """
         super(RechenbergOptimizer, self).__init__()
 
@@ -59,31 +82,151 @@ class RechenbergOptimizer(Optimizer):
         self.generation = 1
         self.aborted = False
 
+        self.steady_state = steady_state
+        self.fitnesses_generation = []  # in steady-state mode
+
+        self.quorum = quorum
+        self.stragglers = stragglers
+
+        # individuals of the open generation not asked for yet
+        self._queue = []
+        self._generation_open = False
+        self._asked = Candidates()
+        # ask and tell may run on different threads, e.g. if the invoker
+        # reports outcomes on a dispatcher thread
+        self._lock = Lock()
+
     def optimize(self, invoker, param_spec, return_spec=None, minimize=True):
         self._invoker = invoker
-        self.param_spec = param_spec
+        self.prepare(param_spec)
 
-        params = param_spec.params.values()
-        self.sigmas = [default_mutation_stength(param) for param in params]
-
-        self.initalize_population()
-        self.score_population()
+        if self.steady_state:
+            return self.optimize_steady_state()
 
         while not self.exit_condition():
-            self.add_offspring()
             self.score_population()
 
             if self.aborted:
                 return self.best_scored_indivual[0]
 
-            self.select_parents()
-            self.change_mutation_strength()
+            self.close_generation()
 
-            self.previous_best_fitness = self.best_fitness
-            self.generation += 1
+        return self.best_scored_indivual[0]
+
+    def optimize_steady_state(self):
+        """
+        Invokes the initial population and then an offspring of the current
+        parents after another, each as soon as a worker becomes idle.
+        """
+        try:
+            for individual in self.ask():
+                self._invoker.invoke(self, individual,
+                                     **self._asked.call_kwargs(individual))
+
+            while not self.exit_condition():
+                for individual in self.ask(1):
+                    self._invoker.invoke(
+                        self, individual,
+                        **self._asked.call_kwargs(individual))
+        except StoppedError:
+            self.aborted = True
+
+        self._invoker.wait()
 
         return self.best_scored_indivual[0]
 
+    def prepare(self, param_spec):
+        self.param_spec = param_spec
+
+        params = param_spec.params.values()
+        self.sigmas = [default_mutation_stength(param) for param in params]
+
+    def ask(self, n=None):
+        """
+        Returns n individuals of the current generation, which is created first
+        if there is none. Once all individuals of the generation were asked
+        for, further ones are offspring that join it.
+
+        Returns the rest of the generation if n is None. In steady-state mode,
+        that is the initial population or a single offspring of the current
+        parents.
+        """
+        with self._lock:
+            self.open_generation()
+            if n is None:
+                n = max(len(self._queue), 1)
+
+            candidates = []
+            for _ in xrange(n):
+                if self._queue:
+                    individual = self._queue.pop(0)
+                else:
+                    individual = self.create_offspring()
+                candidates.append(self._asked.add(individual, individual))
+            return candidates
+
+    def tell(self, candidates, fitnesses, tokens=None):
+        """
+        Scores the given individuals. Closes the generation once all of its
+        individuals were scored.
+
+        The tokens the calls of the candidates carried back, see
+        :meth:`Candidates.call_kwargs`, tell apart equal candidates. Without
+        them, the candidates are looked up by identity or value.
+        """
+        with self._lock:
+            if tokens is None:
+                tokens = [None] * len(candidates)
+            for args, fitness, token in zip(candidates, fitnesses, tokens):
+                individual = self._asked.pop(args, token=token)
+                if fitness is not None:
+                    self.score_individual(individual, fitness)
+
+            if not self._queue and not self._asked:
+                self.close_generation()
+
+    def open_generation(self):
+        """
+        Creates the initial population or adds offspring to the parents, unless
+        the current generation is still open.
+        """
+        if self._generation_open:
+            return
+
+        if not self.population:
+            self.initalize_population()
+        elif not self.steady_state:
+            self.add_offspring()
+
+        self._queue = list(self.population)
+        self._generation_open = True
+        if not self.steady_state:
+            self.scored_population = []
+
+    def close_generation(self):
+        """
+        Selects the parents among the individuals of the current generation
+        scored so far and adapts the mutation strength. Individuals not scored
+        by then are left out.
+
+        In steady-state mode, the parents are selected with each result, so
+        there is no generation to close.
+        """
+        if self.steady_state or not self._generation_open:
+            return
+
+        self._generation_open = False
+        self._queue = []
+        self._asked.clear()
+
+        # offspring need two parents at least
+        if len(self.scored_population) >= 2:
+            self.select_parents()
+        self.change_mutation_strength()
+
+        self.previous_best_fitness = self.best_fitness
+        self.generation += 1
+
     def exit_condition(self):
         pass
 
@@ -96,49 +239,70 @@ class RechenbergOptimizer(Optimizer):
 
     def add_offspring(self):
         for _ in xrange(self.lamb):
-            mother, father = sample(self.population, 2)
+            self.population.append(self.create_offspring())
 
-            child = ArgsModifier.combine(mother, father)
-            child = ArgsModifier.mutate(child, self.sigmas)
+    def create_offspring(self):
+        """
+        Returns a child of two random individuals of the population. In
+        steady-state mode, the parents are the best individuals scored so far,
+        once there are two of them.
+        """
+        if self.steady_state and len(self.scored_population) >= 2:
+            parents = [individual for individual, _ in self.scored_population]
+        else:
+            parents = self.population
+        mother, father = sample(parents, 2)
 
-            self.population.append(child)
+        child = ArgsModifier.combine(mother, father)
+        return ArgsModifier.mutate(child, self.sigmas)
 
     def score_population(self):
-        self.scored_population = []
-
-        for individual in self.population:
-            try:
-                self._invoker.invoke(self, individual)
-            except StoppedError:
-                self.aborted = True
-                break
-
-        self._invoker.wait()
+        # offspring need two parents at least
+        generation = Generation(invoker=self._invoker, caller=self,
+                                quorum=self.quorum, minimum=2,
+                                stragglers=self.stragglers)
+        try:
+            fargs_list = self.ask()
+            generation.invoke_many(
+                fargs_list=fargs_list,
+                kwargs_list=[self._asked.call_kwargs(individual)
+                             for individual in fargs_list])
+        except StoppedError:
+            self.aborted = True
+
+        generation.wait()
+        if self._invoker.stopped:
+            # The invoker was stopped while waiting for the outcomes.
+            self.aborted = True
 
     def select_parents(self):
         self.scored_population.sort(key=lambda s: s[1])
         new_scored_population = self.scored_population[0:self.mu]
-        self.population = map(lambda s: s[0], new_scored_population)
+        self.population = [s[0] for s in new_scored_population]
 
-    def change_mutation_strength(self):
+    def change_mutation_strength(self, fitnesses=None):
+        """
+        Adapts the mutation strength by the share of the given fitnesses, or
+        those of the scored population, that beat the previous best fitness.
+        """
         if self.previous_best_fitness is None:
             return  # We can't estimate success probability yet
 
-        successes = len(filter(lambda scored: scored[1] <
-                               self.previous_best_fitness,
-                               self.scored_population))
+        if fitnesses is None:
+            fitnesses = [fitness for _, fitness in self.scored_population]
+        successes = len([fitness for fitness in fitnesses
+                         if fitness < self.previous_best_fitness])
 
         probablity = successes / self.lamb
 
         # TODO: What happens if sigmas get too large or small
         if probablity > (1 / 5):
-            self.sigmas = map(lambda sigma: sigma / self.a, self.sigmas)
+            self.sigmas = [sigma / self.a for sigma in self.sigmas]
         elif probablity < (1 / 5):
-            self.sigmas = map(lambda sigma: sigma * self.a, self.sigmas)
+            self.sigmas = [sigma * self.a for sigma in self.sigmas]
 
-    def on_result(self, value, fargs, **kwargs):
-        fitness = value
-        individual = fargs
+    def score_individual(self, individual, fitness):
+        """Adds the given individual to the scored population."""
         scored_individual = (individual, fitness)
         self.scored_population.append(scored_individual)
 
@@ -148,7 +312,24 @@ class RechenbergOptimizer(Optimizer):
             self.best_scored_indivual = scored_individual
             self.best_fitness = fitness
 
-    def on_error(self, value, fargs, **kwargs):
-            del value  # TODO
-            del fargs  # TODO
-            del kwargs  # TODO
+        if self.steady_state:
+            # keep the best mu individuals as parents of further offspring
+            self.scored_population.sort(key=lambda s: s[1])
+            del self.scored_population[self.mu:]
+
+            # adapt the mutation strength by the last lamb results
+            self.fitnesses_generation.append(fitness)
+            if len(self.fitnesses_generation) == self.lamb:
+                self.change_mutation_strength(self.fitnesses_generation)
+                self.fitnesses_generation = []
+                self.previous_best_fitness = self.best_fitness
+                self.generation += 1
+
+    def on_result(self, value, fargs, candidate=None, **kwargs):
+        del kwargs
+        self.tell([fargs], [value], tokens=[candidate])
+
+    def on_error(self, value, fargs, candidate=None, **kwargs):
+        del value  # TODO
+        del kwargs  # TODO
+        self.tell([fargs], [None], tokens=[candidate])
@@ -9,12 +9,15 @@ from __future__ import absolute_import, division, print_function, \
 # Standard Library
 from math import exp, sqrt
 from random import gauss, sample
+from threading import Lock
 
 # First Party
 from metaopt.core.arg.util.creator import ArgsCreator
 from metaopt.core.arg.util.modifier import ArgsModifier
 from metaopt.core.stoppable.util.exception import StoppedError
 from metaopt.optimizer.optimizer import Optimizer
+from metaopt.optimizer.util.candidates import Candidates
+from metaopt.optimizer.util.generation import CANCEL, Generation
 from metaopt.optimizer.util. \
     default_mutation_stength import default_mutation_stength
 
@@ -32,14 +35,33 @@ class SAESOptimizer(Optimizer):
     This optimizer should be combined with a global timeout, otherwise it will
     run indefinitely.
 
+    In steady-state mode, there are no generations to wait for. Each result is
+    inserted into the parents right away and each worker that becomes idle
+    gets a new offspring of the current parents, so workers stay busy even if
+    calls take varying time.
+
+    With a quorum, each generation is closed once that share of its calls
+    ended, so a single slow call does not hold it up. The calls still running
+    are either cancelled or invoked again on idle workers, where the first
+    outcome wins.
     """
     MU = 15
     LAMBDA = 100
 
-    def __init__(self, mu=MU, lamb=LAMBDA, tau0=None, tau1=None):
+    def __init__(self, mu=MU, lamb=LAMBDA, tau0=None, tau1=None,
+                 steady_state=False, quorum=None, stragglers=CANCEL):
         """
         :param mu: Number of parent arguments
         :param lamb: Number of offspring arguments
+        :param steady_state: Whether to invoke an offspring whenever a worker
+                             becomes idle instead of a generation at once. The
+                             generation count then advances every lamb results.
+        :param quorum: Share of the calls of a generation, greater 0 and at
+                       most 1, after whose outcomes it is closed. Waits for
+                       all calls, if None.
+        :param stragglers: Either "cancel" to stop the calls still running
+                           once a generation is closed or "speculate" to
+                           invoke them again on idle workers.
         """
         super(SAESOptimizer, self).__init__()
 
@@ -52,6 +74,12 @@ class SAESOptimizer(Optimizer):
         self.tau0 = tau0
         self.tau1 = tau1
 
+        self.steady_state = steady_state
+        self.result_count = 0
+
+        self.quorum = quorum
+        self.stragglers = stragglers
+
         self.param_spec = None
         self._invoker = None
 
@@ -62,10 +90,55 @@ class SAESOptimizer(Optimizer):
         self.aborted = False
         self.generation = 1
 
+        # individuals of the open generation not asked for yet
+        self._queue = []
+        self._generation_open = False
+        self._asked = Candidates()
+        # ask and tell may run on different threads, e.g. if the invoker
+        # reports outcomes on a dispatcher thread
+        self._lock = Lock()
+
     def optimize(self, invoker, param_spec, return_spec=None, minimize=True):
         del return_spec
         del minimize
         self._invoker = invoker
+        self.prepare(param_spec)
+
+        if self.steady_state:
+            return self.optimize_steady_state()
+
+        while not self.exit_condition():
+            self.score_population()
+
+            if self.aborted:
+                return self.best_scored_individual[0][0]
+
+            self.close_generation()
+
+        return self.best_scored_individual[0][0]
+
+    def optimize_steady_state(self):
+        """
+        Invokes the initial population and then an offspring of the current
+        parents after another, each as soon as a worker becomes idle.
+        """
+        try:
+            for args in self.ask():
+                self._invoker.invoke(caller=self, fargs=args,
+                                     **self._asked.call_kwargs(args))
+
+            while not self.exit_condition():
+                for args in self.ask(1):
+                    self._invoker.invoke(caller=self, fargs=args,
+                                         **self._asked.call_kwargs(args))
+        except StoppedError:
+            self.aborted = True
+
+        self._invoker.wait()
+
+        return self.best_scored_individual[0][0]
+
+    def prepare(self, param_spec):
         self.param_spec = param_spec
 
         N = self.param_spec.dimensions
@@ -81,21 +154,88 @@ class SAESOptimizer(Optimizer):
         if self.tau1 is None:
             self.tau1 = 1 / sqrt(2 * sqrt(N))
 
-        self.initalize_population()
-        self.score_population()
+    def ask(self, n=None):
+        """
+        Returns the arguments of n individuals of the current generation, which
+        is created first if there is none. Once all individuals of the
+        generation were asked for, further ones are offspring that join it.
 
-        while not self.exit_condition():
+        Returns the rest of the generation if n is None. In steady-state mode,
+        that is the initial population or a single offspring of the current
+        parents.
+        """
+        with self._lock:
+            self.open_generation()
+            if n is None:
+                n = max(len(self._queue), 1)
+
+            candidates = []
+            for _ in xrange(n):
+                if self._queue:
+                    individual = self._queue.pop(0)
+                else:
+                    individual = self.create_offspring()
+                args, _ = individual
+                candidates.append(self._asked.add(args, individual))
+            return candidates
+
+    def tell(self, candidates, fitnesses, tokens=None):
+        """
+        Scores the individuals of the given arguments. Closes the generation
+        once all of its individuals were scored.
+
+        The tokens the calls of the candidates carried back, see
+        :meth:`Candidates.call_kwargs`, tell apart equal candidates. Without
+        them, the candidates are looked up by identity or value.
+        """
+        with self._lock:
+            if tokens is None:
+                tokens = [None] * len(candidates)
+            for args, fitness, token in zip(candidates, fitnesses, tokens):
+                individual = self._asked.pop(args, token=token)
+                if fitness is not None:
+                    self.score_individual(individual, fitness)
+
+            if not self._queue and not self._asked:
+                self.close_generation()
+
+    def open_generation(self):
+        """
+        Creates the initial population or adds offspring to the parents, unless
+        the current generation is still open.
+        """
+        if self._generation_open:
+            return
+
+        if not self.population:
+            self.initalize_population()
+        elif not self.steady_state:
             self.add_offspring()
-            self.score_population()
 
-            if self.aborted:
-                return self.best_scored_individual[0][0]
+        self._queue = list(self.population)
+        self._generation_open = True
+        if not self.steady_state:
+            self.scored_population = []
 
-            self.select_parents()
+    def close_generation(self):
+        """
+        Selects the parents among the individuals of the current generation
+        scored so far. Individuals not scored by then are left out.
 
-            self.generation += 1
+        In steady-state mode, the parents are selected with each result, so
+        there is no generation to close.
+        """
+        if self.steady_state or not self._generation_open:
+            return
 
-        return self.best_scored_individual[0][0]
+        self._generation_open = False
+        self._queue = []
+        self._asked.clear()
+
+        # offspring need two parents at least
+        if len(self.scored_population) >= 2:
+            self.select_parents()
+        self.generation += 1
 
     def exit_condition(self):
         pass
@@ -112,63 +252,86 @@ class SAESOptimizer(Optimizer):
 
     def add_offspring(self):
         for _ in xrange(self.lamb):
-            mother, father = sample(self.population, 2)
+            self.population.append(self.create_offspring())
 
-            child_args = ArgsModifier.combine(mother[0], father[0])
+    def create_offspring(self):
+        """
+        Returns a child of two random individuals of the population. In
+        steady-state mode, the parents are the best individuals scored so far,
+        once there are two of them.
+        """
+        if self.steady_state and len(self.scored_population) >= 2:
+            parents = [individual for individual, _ in self.scored_population]
+        else:
+            parents = self.population
+        mother, father = sample(parents, 2)
 
-            mean = lambda x1, x2: float((x1 + x2) / 2)
-            child_args_sigma = map(mean, mother[1], father[1])
+        child_args = ArgsModifier.combine(mother[0], father[0])
 
-            child_args = ArgsModifier.mutate(child_args, child_args_sigma)
+        mean = lambda x1, x2: float((x1 + x2) / 2)
+        child_args_sigma = list(map(mean, mother[1], father[1]))
 
-            self.tau0_random = gauss(0, 1)
+        child_args = ArgsModifier.mutate(child_args, child_args_sigma)
 
-            def mutate_sigma(sigma):
-                tau0_mutated = self.tau0 * self.tau0_random
-                tau1_mutated = self.tau1 * gauss(0, 1)
-                return sigma * exp(tau0_mutated) * exp(tau1_mutated)
+        self.tau0_random = gauss(0, 1)
 
-            child_args_sigma = map(mutate_sigma, child_args_sigma)
+        def mutate_sigma(sigma):
+            tau0_mutated = self.tau0 * self.tau0_random
+            tau1_mutated = self.tau1 * gauss(0, 1)
+            return sigma * exp(tau0_mutated) * exp(tau1_mutated)
 
-            child = (child_args, child_args_sigma)
+        child_args_sigma = list(map(mutate_sigma, child_args_sigma))
 
-            self.population.append(child)
+        return (child_args, child_args_sigma)
 
     def score_population(self):
-        self.scored_population = []
-
-        for individual in self.population:
-            args, _ = individual
-
-            try:
-                self._invoker.invoke(caller=self, fargs=args,
-                                     individual=individual)
-            except StoppedError:
-                self.aborted = True
-                break
-
-        self._invoker.wait()
+        # offspring need two parents at least
+        generation = Generation(invoker=self._invoker, caller=self,
+                                quorum=self.quorum, minimum=2,
+                                stragglers=self.stragglers)
+        try:
+            fargs_list = self.ask()
+            generation.invoke_many(
+                fargs_list=fargs_list,
+                kwargs_list=[self._asked.call_kwargs(args)
+                             for args in fargs_list])
+        except StoppedError:
+            self.aborted = True
+
+        generation.wait()
+        if self._invoker.stopped:
+            # The invoker was stopped while waiting for the outcomes.
+            self.aborted = True
 
     def select_parents(self):
         self.scored_population.sort(key=lambda s: s[1])
         new_scored_population = self.scored_population[0:self.mu]
-        self.population = map(lambda s: s[0], new_scored_population)
+        self.population = [s[0] for s in new_scored_population]
 
-    def on_result(self, value, fargs, individual, **kwargs):
-        del fargs
-        del kwargs
-        # _, fitness = result
-        fitness = value
+    def score_individual(self, individual, fitness):
+        """Adds the given individual to the scored population."""
         scored_individual = (individual, fitness)
         self.scored_population.append(scored_individual)
 
+        if self.steady_state:
+            # keep the best mu individuals as parents of further offspring
+            self.scored_population.sort(key=lambda s: s[1])
+            del self.scored_population[self.mu:]
+
+            self.result_count += 1
+            if self.result_count % self.lamb == 0:
+                self.generation += 1
+
         _, best_fitness = self.best_scored_individual
 
         if best_fitness is None or fitness < best_fitness:
             self.best_scored_individual = scored_individual
 
-    def on_error(self, value, fargs, individual, **kwargs):
+    def on_result(self, value, fargs, candidate=None, **kwargs):
+        del kwargs
+        self.tell([fargs], [value], tokens=[candidate])
+
+    def on_error(self, value, fargs, candidate=None, **kwargs):
         del value  # TODO
-        del fargs  # TODO
-        del individual  # TODO
         del kwargs  # TODO
+        self.tell([fargs], [None], tokens=[candidate])
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Candidates an optimizer handed out via ask and awaits the fitnesses of.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from itertools import count
+
+
+class Candidates(object):
+    """
+    Candidates an optimizer handed out, each along with the individual it was
+    created from, e.g. arguments along with their mutation strengths.
+
+    Each candidate gets a token when it is handed out, which its call carries
+    back to the optimizer as a keyword argument, see :meth:`call_kwargs`.
+    Candidates told back without their token are looked up by identity, or by
+    the values of their arguments if they were copied meanwhile, e.g. by an
+    external scheduler. Copies of equal arguments are matched in the order
+    they were handed out.
+    """
+
+    def __init__(self):
+        self._candidates = dict()  # (candidate, individual), by token
+        self._tokens_by_id = dict()  # token, by id of the candidate
+        self._tokens_by_values = dict()  # tokens, by the values of the args
+        self._tokens = count()
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def add(self, args, individual):
+        """
+        Notes that the given arguments are handed out for an individual.
+
+        Returns the candidate to hand out, a copy of the arguments, so the
+        candidates of individuals handed out twice are distinct objects.
+        """
+        candidate = list(args)
+        token = next(self._tokens)
+        self._candidates[token] = (candidate, individual)
+        self._tokens_by_id[id(candidate)] = token
+        self._tokens_by_values.setdefault(_values(candidate), []).append(token)
+        return candidate
+
+    def token(self, args):
+        """
+        Returns the token of the given candidate, which must be the very one
+        that was handed out.
+
+        Raises ValueError if the candidate was not handed out.
+        """
+        try:
+            return self._tokens_by_id[id(args)]
+        except KeyError:
+            raise ValueError("%s was not asked for." % args)
+
+    def call_kwargs(self, args):
+        """
+        Returns the keyword arguments to invoke the call of the given arguments
+        with, so on_result and on_error get the token as `candidate`.
+        """
+        return dict(candidate=self.token(args))
+
+    def pop(self, args, token=None):
+        """
+        Returns the individual the given arguments were handed out for and
+        forgets about them. The candidate is looked up by the given token, if
+        any, so equal arguments of different individuals are told apart.
+
+        Raises ValueError if the arguments were not handed out.
+        """
+        if token is None:
+            token = self._tokens_by_id.get(id(args))
+        if token is None:
+            tokens = self._tokens_by_values.get(_values(args))
+            if not tokens:
+                raise ValueError("%s was not asked for." % args)
+            token = tokens[0]
+
+        try:
+            candidate, individual = self._candidates.pop(token)
+        except KeyError:
+            raise ValueError("%s was not asked for." % args)
+
+        del self._tokens_by_id[id(candidate)]
+        tokens = self._tokens_by_values[_values(candidate)]
+        tokens.remove(token)
+        if not tokens:
+            del self._tokens_by_values[_values(candidate)]
+        return individual
+
+    def clear(self):
+        """Forgets about all candidates, e.g. once a generation was closed."""
+        self._candidates.clear()
+        self._tokens_by_id.clear()
+        self._tokens_by_values.clear()
+
+
+def _values(args):
+    """Returns the values of the given arguments as a key of a dict."""
+    return tuple(arg.value for arg in args)
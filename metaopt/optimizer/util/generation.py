@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Generation of calls that an optimizer closes before its slowest calls ended.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from math import ceil
+
+# First Party
+from metaopt.concurrent.employer.util.exception import LayoffError
+from metaopt.core.stoppable.util.exception import StoppedError
+from metaopt.optimizer.base import BaseCaller
+
+# ways to deal with the calls still running once a generation is closed
+CANCEL = "cancel"
+SPECULATE = "speculate"
+STRAGGLERS = (CANCEL, SPECULATE)
+
+
+class Generation(BaseCaller):
+    """
+    Calls of one generation of an optimizer, which is closed once a quorum of
+    them ended, e.g. so a single slow call does not hold up the optimization.
+
+    The calls still running then, the stragglers, are either stopped via their
+    call handles and left out of the generation, or invoked a second time, so
+    idle workers execute them speculatively. The first outcome of each call is
+    reported to the optimizer, and the other execution of it is stopped.
+    """
+
+    def __init__(self, invoker, caller, quorum=None, minimum=0,
+                 stragglers=CANCEL):
+        """
+        :param    invoker: Invoker to invoke the calls with.
+        :param     caller: Optimizer to report the outcomes to.
+        :param     quorum: Share of the calls, greater 0 and at most 1, after
+                           whose outcomes the generation is closed. Waits for
+                           all calls, if None.
+        :param    minimum: Number of outcomes to wait for at least, e.g. the
+                           number of parents to select.
+        :param stragglers: Either "cancel" to stop the calls still running
+                           once the generation is closed or "speculate" to
+                           invoke them a second time and wait for the first
+                           outcome of each.
+        """
+        super(Generation, self).__init__()
+
+        if quorum is not None and not 0 < quorum <= 1:
+            raise ValueError("quorum needs to be greater 0 and at most 1.")
+        if stragglers not in STRAGGLERS:
+            raise ValueError("stragglers needs to be one of: %s" %
+                             ", ".join(STRAGGLERS))
+
+        self._invoker = invoker
+        self._caller = caller
+        self._quorum = quorum
+        self._minimum = minimum
+        self._stragglers = stragglers
+
+        self._fargs_list = []
+        self._kwargs_list = []
+        self._executions = dict()  # number of executions, by call index
+        self._handles = dict()  # handles of executions, by call index
+        self._ended = set()  # (call index, execution index) of ended ones
+        self._stopped = set()  # (call index, execution index) of stopped ones
+        self._reported = set()  # indexes of calls reported to the caller
+
+    def invoke_many(self, fargs_list, kwargs_list=None):
+        """Invokes the calls of this generation."""
+        if kwargs_list is None:
+            kwargs_list = [dict() for _ in fargs_list]
+
+        self._fargs_list = list(fargs_list)
+        self._kwargs_list = list(kwargs_list)
+        self._invoke(list(range(len(self._fargs_list))))
+
+    def _invoke(self, indexes):
+        """Invokes an execution of each of the calls given by index."""
+        # Outcomes may be reported before the handles are returned.
+        # So count the executions of each call right away.
+        executions = []
+        for index in indexes:
+            executions.append(self._executions.get(index, 0))
+            self._executions[index] = executions[-1] + 1
+
+        handles = self._invoker.invoke_many(
+            caller=self,
+            fargs_list=[self._fargs_list[index] for index in indexes],
+            kwargs_list=[dict(self._kwargs_list[index],
+                              generation_call=(index, execution))
+                         for index, execution in zip(indexes, executions)])
+        for index, handle in zip(indexes, handles):
+            self._handles.setdefault(index, []).append(handle)
+
+    def wait(self):
+        """
+        Blocks till the quorum of calls ended, deals with the stragglers and
+        waits for their executions to end.
+        """
+        if self._quorum is None:
+            self._invoker.wait()
+            return
+
+        count = len(self._fargs_list)
+        quorum = min(max(int(ceil(self._quorum * count)), self._minimum),
+                     count)
+        while len(self._reported) < quorum:
+            if not self._invoker.wait_for_one():
+                break
+
+        stragglers = [index for index in range(len(self._fargs_list))
+                      if index not in self._reported]
+        if stragglers and self._stragglers == SPECULATE:
+            self._speculate(stragglers)
+
+        self._stop_executions(indexes=stragglers)
+        self._invoker.wait()
+
+    def _speculate(self, indexes):
+        """
+        Invokes the calls given by index a second time and waits for the first
+        outcome of each.
+        """
+        try:
+            self._invoke(indexes)
+        except StoppedError:
+            # The invoker was stopped meanwhile.
+            # So nothing runs anymore.
+            return
+
+        while any(index not in self._reported for index in indexes):
+            self._stop_executions(indexes=self._reported)
+            if not self._invoker.wait_for_one():
+                break
+
+    def _stop_executions(self, indexes):
+        """Stops the running executions of the calls given by index."""
+        for index in list(indexes):
+            for execution, handle in enumerate(self._handles.get(index, [])):
+                key = (index, execution)
+                if handle is None or key in self._ended or \
+                        key in self._stopped:
+                    continue
+                self._stopped.add(key)
+                handle.stop(reason=LayoffError(
+                    "The generation was closed without this call."))
+
+    def on_result(self, value, fargs, generation_call, **kwargs):
+        """Reports the first outcome of each call to the optimizer."""
+        index, execution = generation_call
+        self._ended.add((index, execution))
+        if index in self._reported:
+            # Another execution of the call ended first.
+            return
+
+        self._reported.add(index)
+        self._caller.on_result(value=value, fargs=fargs, **kwargs)
+
+    def on_error(self, value, fargs, generation_call, **kwargs):
+        """
+        Reports the error of a call to the optimizer, unless it was stopped or
+        another execution of it may still succeed.
+        """
+        index, execution = generation_call
+        self._ended.add((index, execution))
+        if index in self._reported or (index, execution) in self._stopped:
+            return
+        if any((index, other) not in self._ended
+               for other in range(self._executions[index])):
+            # Another execution of the call is still running.
+            return
+
+        self._reported.add(index)
+        self._caller.on_error(value=value, fargs=fargs, **kwargs)
@@ -41,6 +41,25 @@ class TestCall(object):
 
         f_mock.assert_called_with(arg_a.value, 1)
 
+    def test_call_func_with_extra_kwargs_given(self):
+        param_spec = ParamSpec()
+        param_spec.int("a", interval=(1, 2))
+        param_spec.extra_kwargs = {"b": 1}
+
+        param_a = param_spec.params["a"]
+
+        arg_a = Arg(param_a, 0)
+
+        f_mock = Mock()
+
+        def f(a, b, context):
+            f_mock(a, b, context)
+
+        call(f, [arg_a], param_spec, extra_kwargs={"context": 2})
+
+        f_mock.assert_called_with(arg_a.value, 1, 2)
+        assert param_spec.extra_kwargs == {"b": 1}
+
     def test_call_func_with_kwargs_and_extra_kwargs(self):
         param_spec = ParamSpec()
         param_spec.int("a", interval=(1, 2))
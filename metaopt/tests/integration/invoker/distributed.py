@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for the distributed invoker with agents on localhost.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+from multiprocessing import AuthenticationError, Process
+from threading import Thread
+from time import sleep
+
+# Third Party
+import nose
+from mock import Mock
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.invoker.distributed import DistributedInvoker
+from metaopt.concurrent.worker.agent import WorkerAgent, main
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import maximize
+from metaopt.core.returnspec.util.wrapper import ReturnValuesWrapper
+from metaopt.core.stoppable.util.exception import StoppedError
+from metaopt.objective.integer.fast.explicit.f import f as f_working
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging(x):
+    sleep(60)
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_pid(x):
+    del x
+    sleep(0.2)  # keeps the worker busy, so other workers get the next calls
+    return os.getpid()
+
+
+def run_agent(address, authkey=None):
+    WorkerAgent(address=address, slots=1, authkey=authkey).run()
+
+
+class TestDistributedInvoker(object):
+    """
+    Integration tests for the distributed invoker.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def setup(self):
+        self._invoker = DistributedInvoker(authkey=b"secret")
+
+    def teardown(self):
+        try:
+            self._invoker.stop()
+        except StoppedError:
+            pass
+
+    def _start_agent(self):
+        """Starts an agent with one slot in a thread of this process."""
+        agent = Thread(target=run_agent,
+                       args=(self._invoker.address, b"secret"))
+        agent.daemon = True
+        agent.start()
+
+    def _start_agent_process(self):
+        """Starts an agent with one slot in a process that may be killed."""
+        # not a daemon, since the agent starts worker processes itself
+        agent = Process(target=run_agent,
+                        args=(self._invoker.address, b"secret"))
+        agent.start()
+        return agent
+
+    def _prepare(self, function):
+        self._invoker.f = function
+        self._invoker.param_spec = function.param_spec
+        self._invoker.return_spec = ReturnSpec(function)
+        return ArgsCreator(function.param_spec).args()
+
+    def test_invoke_calls_on_result(self):
+        self._start_agent()
+        args = self._prepare(f_working)
+
+        caller = Mock()
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+
+        caller.on_result.assert_called_once_with(
+            value=ReturnValuesWrapper(None, 0),
+            fargs=args,
+        )
+        assert not caller.on_error.called
+
+    def test_invoke_many_uses_workers_of_all_agents(self):
+        self._start_agent()
+        self._start_agent()
+        while self._invoker._employer.worker_count < 2:
+            sleep(0.01)
+        args = self._prepare(f_pid)
+
+        caller = Mock()
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 4)
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 4
+        pids = set(kwargs["value"].raw_values
+                   for _, kwargs in caller.on_result.call_args_list)
+        assert len(pids) == 2
+
+    def test_stop_call_replaces_remote_worker(self):
+        self._start_agent()
+        args = self._prepare(f_pid)
+        caller = Mock()
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+        pid = caller.on_result.call_args[1]["value"].raw_values
+
+        args = self._prepare(f_hanging)
+        caller = Mock()
+        handle = self._invoker.invoke(caller=caller, fargs=args)
+        handle.stop(reason=ValueError("Stopped on purpose."))
+        self._invoker.wait()
+        assert not caller.on_result.called
+        assert isinstance(caller.on_error.call_args[1]["value"], ValueError)
+
+        args = self._prepare(f_pid)
+        caller = Mock()
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+        assert caller.on_result.call_args[1]["value"].raw_values != pid
+
+    def test_calls_of_disconnected_agent_are_reassigned(self):
+        agent = self._start_agent_process()
+        args = self._prepare(f_pid)
+
+        caller = Mock()
+        self._invoker.invoke(caller=caller, fargs=args)  # started by agent
+        self._start_agent()
+        agent.terminate()
+        agent.join()
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 1
+        assert not caller.on_error.called
+
+    @raises(AuthenticationError)
+    def test_agent_with_wrong_authkey_is_refused(self):
+        run_agent(self._invoker.address, authkey=b"wrong")
+
+    @raises(ValueError)
+    def test_listening_on_all_interfaces_without_authkey_raises_error(self):
+        DistributedInvoker(address=("0.0.0.0", 0))
+
+    def test_listening_on_loopback_without_authkey_is_allowed(self):
+        invoker = DistributedInvoker(address=("127.0.0.1", 0))
+        invoker.stop()
+
+    def test_command_line_agent_executes_calls(self):
+        host, port = self._invoker.address
+        os.environ["METAOPT_AUTHKEY"] = "secret"
+        try:
+            agent = Thread(target=main,
+                           args=(["%s:%s" % (host, port), "--slots", "1"],))
+            agent.daemon = True
+            agent.start()
+            args = self._prepare(f_working)
+
+            caller = Mock()
+            self._invoker.invoke(caller=caller, fargs=args)
+            self._invoker.wait()
+        finally:
+            del os.environ["METAOPT_AUTHKEY"]
+
+        assert caller.on_result.called
+
+if __name__ == '__main__':
+    nose.runmodule()
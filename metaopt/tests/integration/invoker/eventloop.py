@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for the asyncio invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Timer
+from time import time
+
+# Third Party
+import nose
+from mock import Mock
+from nose.plugins.skip import SkipTest
+
+# First Party
+from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.optimize.optimize import custom_optimize
+from metaopt.core.optimize.util.exception import MissingRequirementsError
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import maximize
+from metaopt.core.stoppable.util.exception import StoppedError
+from metaopt.objective.integer.fast.explicit.f import f as f_working
+from metaopt.optimizer.gridsearch import GridSearchOptimizer
+
+try:
+    import asyncio
+    from metaopt.concurrent.invoker.eventloop import AsyncioInvoker
+except (ImportError, MissingRequirementsError):
+    raise SkipTest("asyncio is not available")
+
+
+f_working = f_working
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_sleeping(x):
+    return asyncio.sleep(0.5, result=x)
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging(x):
+    return asyncio.sleep(60, result=x)
+
+
+@asyncio.coroutine
+def _raise():
+    raise ValueError("Failing on purpose.")
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_failing(x):
+    del x
+    return _raise()
+
+
+class TestAsyncioInvoker(object):
+    """
+    Integration tests for the asyncio invoker.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def setup(self):
+        self._invoker = AsyncioInvoker(concurrency=100)
+
+    def teardown(self):
+        try:
+            self._invoker.stop()
+        except StoppedError:
+            pass
+
+    def _use(self, function):
+        self._invoker.f = function
+        self._invoker.param_spec = function.param_spec
+        self._invoker.return_spec = ReturnSpec(function)
+        return ArgsCreator(function.param_spec).args()
+
+    def test_invoke_coroutine_calls_on_result(self):
+        caller = Mock()
+        args = self._use(f_sleeping)
+
+        self._invoker.invoke(caller=caller, fargs=args, data=None)
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 1
+        assert caller.on_result.call_args[1]["value"].raw_values == 0
+        assert not caller.on_error.called
+
+    def test_invoke_function_calls_on_result(self):
+        caller = Mock()
+        args = self._use(f_working)
+
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 1
+        assert not caller.on_error.called
+
+    def test_invoke_not_successful_calls_on_error(self):
+        caller = Mock()
+        args = self._use(f_failing)
+
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 1
+
+    def test_invoke_awaits_calls_concurrently(self):
+        caller = Mock()
+        args = self._use(f_sleeping)
+
+        time_start = time()
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 100)
+        self._invoker.wait()
+
+        assert time() - time_start < 2
+        assert caller.on_result.call_count == 100
+
+    def test_invoke_blocks_at_concurrency_limit(self):
+        self._invoker.stop()
+        self._invoker = AsyncioInvoker(concurrency=2)
+        caller = Mock()
+        args = self._use(f_sleeping)
+
+        time_start = time()
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 4)
+        assert time() - time_start > 0.4
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 4
+
+    def test_invalid_concurrency_raises_error(self):
+        try:
+            AsyncioInvoker(concurrency=0)
+        except ValueError:
+            return
+        assert False
+
+    def test_stop_call_reports_layoff(self):
+        caller = Mock()
+        args = self._use(f_hanging)
+
+        handle = self._invoker.invoke(caller=caller, fargs=args)
+        time_start = time()
+        handle.stop()
+        self._invoker.wait()
+
+        assert time() - time_start < 1
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 1
+
+    def test_stop_wakes_up_wait_immediately(self):
+        caller = Mock()
+        args = self._use(f_hanging)
+
+        self._invoker.invoke(caller=caller, fargs=args)
+
+        timer = Timer(0.1, self._invoker.stop)
+        timer.start()
+        time_start = time()
+        self._invoker.wait()
+        timer.join()
+
+        assert time() - time_start < 1
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 1
+
+    def test_custom_optimize_via_pluggable_invoker(self):
+        invoker = PluggableInvoker(self._invoker)
+        result = custom_optimize(f_sleeping, invoker=invoker,
+                                 optimizer=GridSearchOptimizer())
+        assert result[0].value == 10
+
+if __name__ == '__main__':
+    nose.runmodule()
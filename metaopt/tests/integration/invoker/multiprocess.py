@@ -6,14 +6,33 @@ Integration tests for the multiprocess invoker.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+import os
+import uuid
+from threading import Thread, Timer
+from time import sleep, time
+
 # Third Party
 import nose
-from mock import Mock
+from mock import Mock, patch
+from nose.plugins.skip import SkipTest
+from nose.tools.nontrivial import raises
 
 # First Party
+from metaopt.concurrent.employer.util.cpu_sets import read_available_cpus
+from metaopt.concurrent.employer.util.determine_memory import \
+    measure_available_memory
+from metaopt.concurrent.employer.pool import WorkerPool
+from metaopt.concurrent.employer.util.exception import MemoryLimitError
 from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+from metaopt.concurrent.invoker.util.call_handle import CallHandle, \
+    TimeoutError
+from metaopt.concurrent.invoker.util.scaling import ScalingPolicy
 from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.demand.util.decorator import demand
+from metaopt.core.paramspec.util import param
 from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import maximize
 from metaopt.core.returnspec.util.wrapper import ReturnValuesWrapper
 from metaopt.core.stoppable.util.exception import StoppedError
 from metaopt.objective.integer.failing.f import f as f_failing
@@ -25,6 +44,117 @@ f_working = f_working
 f_failing = f_failing
 
 
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging(x):
+    sleep(60)
+    return x
+
+
+def initialize_pid():
+    return os.getpid()
+
+
+def initialize_time():
+    return time()
+
+
+def initialize_failing():
+    raise ValueError("Failing on purpose.")
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_context(x, context):
+    del x
+    return context
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging_context(x, context):
+    del context
+    sleep(60)
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_pid(x):
+    del x
+    return os.getpid()
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging_stubbornly(x):
+    while True:
+        try:
+            sleep(60)
+        except BaseException:
+            # ignores even interrupts
+            pass
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging_at_zero(x):
+    if x == 0:
+        sleep(60)
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_allocating(x):
+    # far beyond the memory limit of the tests, so it fails right away
+    return len(bytearray(8 * 1024 ** 3)) + x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_start_time(x):
+    del x
+    time_start = time()
+    sleep(0.3)
+    return time_start
+
+
+@demand(cpus=2)
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_start_time_demanding(x):
+    del x
+    time_start = time()
+    sleep(0.3)
+    return time_start
+
+
+@demand(cpus=lambda x: x + 2)
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_start_time_demanding_x(x):
+    del x
+    time_start = time()
+    sleep(0.3)
+    return time_start
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_thread_count(x):
+    del x
+    return int(os.environ.get("OMP_NUM_THREADS", 0))
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_cpu_count(x):
+    del x
+    return len(os.sched_getaffinity(0))
+
+
 class TestMultiProcessInvoker(object):
     """
     Integration tests for the multiprocess invoker.
@@ -47,6 +177,9 @@ class TestMultiProcessInvoker(object):
     def test_instanciation(self):
         return  # really do nothing here, setup and teardown do everything.
 
+    def test_sizing_reason_tells_worker_count(self):
+        assert self._invoker.sizing_reason.startswith("1 worker as requested.")
+
     def test_single_call(self):
         self._invoker.f = f_working
         caller = Mock()
@@ -130,5 +263,609 @@ class TestMultiProcessInvoker(object):
         assert not caller.on_result.called
         assert caller.on_error.called
 
+    def test_invoke_many_calls_on_result_for_each_call(self):
+        caller = Mock()
+        caller.on_result = Mock()
+        caller.on_error = Mock()
+
+        self._invoker.f = f_working
+        self._invoker.param_spec = f_working.param_spec
+        self._invoker.return_spec = ReturnSpec(f_working)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        fargs_list = [args] * 10
+        kwargs_list = [dict(data=index) for index in range(10)]
+
+        handles = self._invoker.invoke_many(caller=caller,
+                                            fargs_list=fargs_list,
+                                            kwargs_list=kwargs_list)
+        self._invoker.wait()
+
+        assert len(handles) == 10
+        assert not caller.on_error.called
+        assert caller.on_result.call_count == 10
+        for index in range(10):
+            caller.on_result.assert_any_call(
+                value=ReturnValuesWrapper(None, 0), fargs=args, data=index)
+
+    def test_invoke_many_not_successful_calls_on_error_for_each_call(self):
+        caller = Mock()
+        caller.on_result = Mock()
+        caller.on_error = Mock()
+
+        self._invoker.f = f_failing
+        self._invoker.param_spec = f_failing.param_spec
+        self._invoker.return_spec = ReturnSpec(f_failing)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 10)
+        self._invoker.wait()
+
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 10
+
+    def test_stop_wakes_up_wait_immediately(self):
+        caller = Mock()
+        caller.on_result = Mock()
+        caller.on_error = Mock()
+
+        self._invoker.f = f_hanging
+        self._invoker.param_spec = f_hanging.param_spec
+        self._invoker.return_spec = ReturnSpec(f_hanging)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        self._invoker.invoke(caller=caller, fargs=args)
+
+        timer = Timer(0.1, self._invoker.stop)
+        timer.start()
+        time_start = time()
+        self._invoker.wait()
+        timer.join()
+
+        assert time() - time_start < 1
+        assert not caller.on_result.called
+        assert caller.on_error.called
+
+    def test_stop_call_after_stop_employs_no_worker(self):
+        self._invoker.f = f_working
+        self._invoker.param_spec = f_working.param_spec
+        self._invoker.return_spec = ReturnSpec(f_working)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+        self._invoker.wait()
+        self._invoker.stop()
+
+        # e.g. a timeout that fires after the optimization ended
+        handle.stop()
+        assert self._invoker._employer.worker_count == 0
+
+    def test_handles_get_the_outcomes_of_their_calls(self):
+        self._invoker.f = f_working
+        self._invoker.param_spec = f_working.param_spec
+        self._invoker.return_spec = ReturnSpec(f_working)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        handles = self._invoker.invoke_many(caller=Mock(),
+                                            fargs_list=[args] * 5)
+        handles_completed = list(self._invoker.as_completed(handles,
+                                                            timeout=10))
+
+        assert sorted(handles_completed, key=id) == sorted(handles, key=id)
+        assert all(handle.result() == ReturnValuesWrapper(None, 0)
+                   for handle in handles)
+
+    def test_handle_result_times_out_while_call_runs(self):
+        self._invoker.f = f_hanging
+        self._invoker.param_spec = f_hanging.param_spec
+        self._invoker.return_spec = ReturnSpec(f_hanging)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+
+        time_start = time()
+        try:
+            handle.result(timeout=0.2)
+        except TimeoutError:
+            pass
+        else:
+            assert False
+        assert time() - time_start < 1
+        assert not handle.done()
+
+    def test_handle_is_running_between_start_and_end_of_call(self):
+        self._invoker.f = f_hanging
+        self._invoker.param_spec = f_hanging.param_spec
+        self._invoker.return_spec = ReturnSpec(f_hanging)
+
+        args = ArgsCreator(self._invoker.param_spec).args()
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+        assert handle.running()
+
+        handle.stop()
+        self._invoker.wait()
+        assert handle.done()
+        assert not handle.running()
+
+    def test_handle_is_not_running_before_call_starts(self):
+        # no worker started a call of this id
+        handle = CallHandle(invoker=self._invoker, call_id=uuid.uuid4())
+
+        assert not handle.running()
+        assert not handle.done()
+
+
+class TestMultiProcessInvokerChunked(TestMultiProcessInvoker):
+    """
+    Integration tests for the multiprocess invoker using chunks of calls.
+    """
+
+    def setup(self):
+        resources = 1  # Use only one CPU for reproducible results.
+        self._invoker = MultiProcessInvoker(resources=resources,
+                                            chunk_size=4)
+
+    @raises(NotImplementedError)
+    def test_invalid_chunk_size_raises_error(self):
+        MultiProcessInvoker(chunk_size=0)
+
+    def test_stop_call_hands_rest_of_chunk_to_another_worker(self):
+        self._invoker.f = f_hanging_at_zero
+        self._invoker.param_spec = f_hanging_at_zero.param_spec
+        self._invoker.return_spec = ReturnSpec(f_hanging_at_zero)
+
+        args_creator = ArgsCreator(self._invoker.param_spec)
+        caller = Mock()
+        handles = self._invoker.invoke_many(
+            caller=caller,
+            fargs_list=[args_creator.args([x]) for x in range(4)])
+        handles[0].stop()
+        self._invoker.wait()
+
+        assert caller.on_error.call_count == 1
+        assert caller.on_result.call_count == 3
+        assert [handle.result().raw_values for handle in handles[1:]] == \
+            [1, 2, 3]
+
+
+class TestMultiProcessInvokerAdaptiveChunks(TestMultiProcessInvoker):
+    """
+    Integration tests for the multiprocess invoker using adaptive chunks.
+    """
+
+    def setup(self):
+        resources = 1  # Use only one CPU for reproducible results.
+        self._invoker = MultiProcessInvoker(resources=resources,
+                                            transport="pipe", chunk_size=None)
+
+
+class TestMultiProcessInvokerPipeTransport(TestMultiProcessInvoker):
+    """
+    Integration tests for the multiprocess invoker using the pipe transport.
+    """
+
+    def setup(self):
+        resources = 1  # Use only one CPU for reproducible results.
+        self._invoker = MultiProcessInvoker(resources=resources,
+                                            transport="pipe")
+
+    @raises(ValueError)
+    def test_unknown_transport_raises_error(self):
+        MultiProcessInvoker(transport="carrier pigeon")
+
+
+class TestMultiProcessInvokerDispatch(TestMultiProcessInvoker):
+    """
+    Integration tests for the multiprocess invoker reporting outcomes on a
+    dispatcher thread.
+    """
+
+    def setup(self):
+        resources = 1  # Use only one CPU for reproducible results.
+        self._invoker = MultiProcessInvoker(resources=resources,
+                                            dispatch=True)
+
+
+class TestMultiProcessInvokerSpawn(TestMultiProcessInvoker):
+    """
+    Integration tests for the multiprocess invoker spawning its workers.
+    """
+
+    start_method = "spawn"
+
+    def setup(self):
+        resources = 1  # Use only one CPU for reproducible results.
+        try:
+            self._invoker = MultiProcessInvoker(resources=resources,
+                                                transport="pipe",
+                                                start_method=self.start_method)
+        except ValueError:
+            raise SkipTest("Start method %s is not available" %
+                           self.start_method)
+
+    @raises(ValueError)
+    def test_unknown_start_method_raises_error(self):
+        MultiProcessInvoker(start_method="hatch")
+
+
+class TestMultiProcessInvokerForkServer(TestMultiProcessInvokerSpawn):
+    """
+    Integration tests for the multiprocess invoker using a fork server.
+    """
+
+    start_method = "forkserver"
+
+
+class MultiProcessInvokerFixture(object):
+    """
+    Fixture of the integration tests below, which creates a multiprocess
+    invoker of the keyword arguments of the class for each test, if any, and
+    stops all invokers of a test after it.
+    """
+
+    invoker_kwargs = None
+
+    def __init__(self):
+        self._invoker = None
+        self._invokers = []
+
+    def setup(self):
+        self._invokers = []
+        if self.invoker_kwargs is not None:
+            self._create_invoker(**self.invoker_kwargs)
+
+    def teardown(self):
+        for invoker in self._invokers:
+            try:
+                invoker.stop()
+            except StoppedError:
+                pass
+
+    def _create_invoker(self, **kwargs):
+        """Creates an invoker, which the helpers below use from now on."""
+        self._invoker = MultiProcessInvoker(**kwargs)
+        self._invokers.append(self._invoker)
+        return self._invoker
+
+    def _use(self, function, invoker=None):
+        """
+        Lets the given invoker, or the current one, call the given function.
+        Returns arguments of the function.
+        """
+        if invoker is None:
+            invoker = self._invoker
+        invoker.f = function
+        invoker.param_spec = function.param_spec
+        invoker.return_spec = ReturnSpec(function)
+        return ArgsCreator(function.param_spec).args()
+
+    def _invoke(self, function, stop=False):
+        """
+        Invokes the given function and returns the caller notified. Stops the
+        call once the worker entered it, if asked to.
+        """
+        args = self._use(function)
+        caller = Mock()
+        handle = self._invoker.invoke(caller=caller, fargs=args)
+        if stop:
+            sleep(0.1)  # let the worker enter the call
+            handle.stop(reason=ValueError("Stopped on purpose."))
+        self._invoker.wait()
+        return caller
+
+    def _invoke_many(self, function, count, invoker=None):
+        """
+        Invokes the given function count times via the given invoker, or the
+        current one, and returns the caller notified.
+        """
+        if invoker is None:
+            invoker = self._invoker
+        args = self._use(function, invoker=invoker)
+        caller = Mock()
+        invoker.invoke_many(caller=caller, fargs_list=[args] * count)
+        invoker.wait()
+        return caller
+
+    def _invoke_for_values(self, function, count=1, invoker=None):
+        """
+        Invokes the given function count times like :meth:`_invoke_many` and
+        returns the sorted return values of the calls, which all succeed.
+        """
+        caller = self._invoke_many(function, count, invoker=invoker)
+        assert not caller.on_error.called
+        return sorted(call[1]["value"].raw_values
+                      for call in caller.on_result.call_args_list)
+
+
+class TestMultiProcessInvokerPrewarm(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker starting workers up front.
+    """
+
+    invoker_kwargs = dict(resources=2, prewarm=True,
+                          initializer=initialize_pid,
+                          preload=["xml.dom.minidom"])
+
+    def test_prewarm_employs_all_workers(self):
+        assert self._invoker._employer.worker_count == 2
+
+    def test_prewarmed_workers_execute_calls(self):
+        caller = self._invoke_many(f_context, count=4)
+        assert caller.on_result.call_count == 4
+        assert self._invoker._employer.worker_count == 2
+
+
+class TestMultiProcessInvokerGracePeriod(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker interrupting stopped calls.
+    """
+
+    invoker_kwargs = dict(resources=1, grace_period=0.5)
+
+    def _invoke_for_pid(self):
+        caller = self._invoke(f_pid)
+        return caller.on_result.call_args[1]["value"].raw_values
+
+    def test_stop_interrupts_call_and_keeps_worker(self):
+        pid = self._invoke_for_pid()
+
+        time_start = time()
+        caller = self._invoke(f_hanging, stop=True)
+        assert time() - time_start < 0.5
+        assert not caller.on_result.called
+        assert isinstance(caller.on_error.call_args[1]["value"], ValueError)
+
+        assert self._invoke_for_pid() == pid
+
+    def test_stop_terminates_worker_ignoring_interrupt(self):
+        pid = self._invoke_for_pid()
+
+        caller = self._invoke(f_hanging_stubbornly, stop=True)
+        assert not caller.on_result.called
+        assert isinstance(caller.on_error.call_args[1]["value"], ValueError)
+
+        assert self._invoke_for_pid() != pid
+
+
+class TestMultiProcessInvokerSpares(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker keeping spare workers.
+    """
+
+    invoker_kwargs = dict(resources=1, spares=1, initializer=initialize_time)
+
+    def _wait_for_spares(self, spare_count):
+        """Waits till the employer started the given number of spares."""
+        for _ in range(100):
+            if self._invoker._employer.spare_count == spare_count:
+                return
+            sleep(0.05)
+        assert self._invoker._employer.spare_count == spare_count
+
+    def test_spares_are_started_up_front(self):
+        assert self._invoker._employer.spare_count == 1
+        assert self._invoker._employer.worker_count == 0
+
+    def test_stop_promotes_spare_started_before(self):
+        caller = self._invoke(f_context)
+        assert caller.on_result.called
+        self._wait_for_spares(1)
+        sleep(0.5)  # let the spare start up
+
+        time_stop = time()
+        caller = self._invoke(f_hanging_context, stop=True)
+        assert isinstance(caller.on_error.call_args[1]["value"], ValueError)
+
+        # the spare took the place of the terminated worker
+        assert self._invoker._employer.worker_count == 1
+        caller = self._invoke(f_context)
+        assert caller.on_result.call_args[1]["value"].raw_values < time_stop
+
+        # and was replaced by a new spare in the background
+        self._wait_for_spares(1)
+
+
+class TestMultiProcessInvokerDemand(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker packing calls by demand.
+    """
+
+    invoker_kwargs = dict(resources=2, transport="pipe")
+
+    def test_calls_without_demand_run_in_parallel(self):
+        starts = self._invoke_for_values(f_start_time, 2)
+        assert starts[1] - starts[0] < 0.3
+
+    def test_calls_demanding_all_cpus_run_one_after_another(self):
+        starts = self._invoke_for_values(f_start_time_demanding, 3)
+        assert starts[1] - starts[0] >= 0.3
+        assert starts[2] - starts[1] >= 0.3
+
+    def test_calls_demanding_cpus_by_param_value(self):
+        starts = self._invoke_for_values(f_start_time_demanding_x, 2)
+        assert starts[1] - starts[0] >= 0.3
+
+
+class TestMultiProcessInvokerScaling(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker with a scaling policy.
+    """
+
+    def test_idle_workers_are_dismissed_after_cooldown(self):
+        self._create_invoker(
+            resources=1, scaling=ScalingPolicy(cooldown=0.2, interval=0.05))
+        pids = self._invoke_for_values(f_pid)
+        sleep(0.5)
+        assert self._invoker._employer.worker_count == 0
+
+        # a fresh worker executes the next call
+        assert self._invoke_for_values(f_pid) != pids
+
+    def test_min_workers_are_kept(self):
+        self._create_invoker(
+            resources=1, scaling=ScalingPolicy(min_workers=1, cooldown=0.2,
+                                               interval=0.05))
+        pids = self._invoke_for_values(f_pid)
+        sleep(0.5)
+        assert self._invoker._employer.worker_count == 1
+        assert self._invoke_for_values(f_pid) == pids
+
+    def test_no_worker_is_employed_while_memory_is_short(self):
+        if measure_available_memory() is None:
+            raise SkipTest("The available memory can not be measured")
+        self._create_invoker(
+            resources=2,
+            scaling=ScalingPolicy(min_available_memory=2 ** 62))
+        starts = self._invoke_for_values(f_start_time, count=2)
+        assert starts[1] - starts[0] >= 0.3
+
+
+class TestMultiProcessInvokerPool(MultiProcessInvokerFixture):
+    """
+    Integration tests for multiprocess invokers sharing a worker pool.
+    """
+
+    def _start_times(self, invoker, count):
+        """Invokes the given number of calls and returns their start times."""
+        return self._invoke_for_values(f_start_time, count, invoker=invoker)
+
+    def test_greedy_invoker_yields_to_another_one(self):
+        pool = WorkerPool(resources=2)
+        greedy = self._create_invoker(tenant=pool.attach())
+        other = self._create_invoker(tenant=pool.attach())
+
+        starts_greedy = []
+        thread = Thread(target=lambda: starts_greedy.extend(
+            self._start_times(greedy, count=8)))
+        thread.start()
+        sleep(0.2)  # let the greedy invoker take all slots
+        starts_other = self._start_times(other, count=1)
+        thread.join()
+
+        # the other call started before the greedy invoker was done
+        assert starts_other[0] < starts_greedy[-1]
+
+    def test_idle_invoker_yields_to_another_one(self):
+        pool = WorkerPool(resources=1)
+        idle = self._create_invoker(tenant=pool.attach())
+        other = self._create_invoker(tenant=pool.attach())
+
+        # the idle invoker keeps its worker, but gives it up once needed
+        self._start_times(idle, count=1)
+        assert pool.slot_count == 1
+        assert len(self._start_times(other, count=1)) == 1
+
+    def test_max_workers_caps_invoker(self):
+        pool = WorkerPool(resources=2)
+        invoker = self._create_invoker(tenant=pool.attach(max_workers=1))
+        starts = self._start_times(invoker, count=2)
+        assert starts[1] - starts[0] >= 0.3
+
+
+class TestMultiProcessInvokerPin(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker pinning workers to CPUs.
+    """
+
+    invoker_kwargs = dict(resources=1, pin=True)
+
+    def test_thread_count_is_the_share_of_cpus(self):
+        # a single worker gets all CPUs this process may use
+        assert self._invoke_for_values(f_thread_count) == \
+            [len(read_available_cpus())]
+
+    def test_worker_is_pinned_to_its_cpus(self):
+        if not hasattr(os, "sched_getaffinity"):
+            raise SkipTest("Pinning needs the affinity mask of Linux")
+        assert self._invoke_for_values(f_cpu_count) == \
+            [len(read_available_cpus())]
+
+
+class TestMultiProcessInvokerInitializer(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker with a worker initializer.
+    """
+
+    invoker_kwargs = dict(resources=1, initializer=initialize_pid)
+
+    def _invoke_for_context(self):
+        """Invokes a call that returns the context of its worker."""
+        context, = self._invoke_for_values(f_context)
+        return context
+
+    def test_initializer_context_is_passed_to_every_call(self):
+        contexts = set(self._invoke_for_values(f_context, count=5))
+        assert len(contexts) == 1
+        assert contexts.pop() != os.getpid()
+
+    def test_initializer_runs_again_for_replacing_worker(self):
+        context = self._invoke_for_context()
+
+        caller = self._invoke(f_hanging_context, stop=True)
+        assert caller.on_error.call_count == 1
+
+        assert self._invoke_for_context() != context
+
+    def test_initializer_failing_calls_on_error(self):
+        self._invoker.stop()
+        self._create_invoker(resources=1, initializer=initialize_failing)
+        caller = self._invoke_many(f_context, count=3)
+
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 3
+        assert isinstance(caller.on_error.call_args[1]["value"], ValueError)
+
+
+class TestMultiProcessInvokerLimits(MultiProcessInvokerFixture):
+    """
+    Integration tests for the multiprocess invoker with worker limits.
+    """
+
+    def _invoke_with_limits(self, function, count, **kwargs):
+        """Invokes the given function count times with a single worker."""
+        self._create_invoker(resources=1, **kwargs)
+        return self._invoke_many(function, count)
+
+    def _pids(self, caller):
+        return [call[1]["value"].raw_values
+                for call in caller.on_result.call_args_list]
+
+    def test_without_limits_one_worker_executes_all_calls(self):
+        caller = self._invoke_with_limits(f_pid, count=4)
+        assert len(set(self._pids(caller))) == 1
+
+    def test_max_tasks_replaces_worker_after_each_task(self):
+        caller = self._invoke_with_limits(f_pid, count=4, max_tasks=1)
+        assert not caller.on_error.called
+        assert len(set(self._pids(caller))) == 4
+
+    def test_max_tasks_replaces_worker_after_each_chunk(self):
+        caller = self._invoke_with_limits(f_pid, count=4, max_tasks=2,
+                                          chunk_size=2)
+        assert not caller.on_error.called
+        assert len(set(self._pids(caller))) == 2
+
+    def test_max_rss_replaces_worker_exceeding_it(self):
+        caller = self._invoke_with_limits(f_pid, count=3, max_rss=1)
+        assert not caller.on_error.called
+        assert len(set(self._pids(caller))) == 3
+
+    def test_max_memory_lays_off_call_exceeding_it(self):
+        caller = self._invoke_with_limits(f_allocating, count=2,
+                                          max_memory=4 * 1024 ** 3)
+        assert not caller.on_result.called
+        assert caller.on_error.call_count == 2
+        for call in caller.on_error.call_args_list:
+            assert isinstance(call[1]["value"], MemoryLimitError)
+
+        # the replacing workers carry on with the optimization
+        caller = self._invoke(f_pid)
+        assert caller.on_result.call_count == 1
+
+    @raises(NotImplementedError)
+    def test_max_memory_without_resource_module_raises_error(self):
+        with patch("metaopt.concurrent.worker.util.memory.resource", None):
+            MultiProcessInvoker(resources=1, max_memory=4 * 1024 ** 3)
+
 if __name__ == '__main__':
     nose.runmodule()
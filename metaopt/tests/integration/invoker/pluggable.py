@@ -7,22 +7,35 @@ Tests for the pluggable invoker.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
+# Standard Library
+from time import sleep, time
+
 # Third Party
 import nose
 from mock import Mock
 from nose.tools import eq_
 
 # First Party
+from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
 from metaopt.concurrent.invoker.pluggable import PluggableInvoker
 from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
 from metaopt.core.returnspec.returnspec import ReturnSpec
 from metaopt.objective.integer.fast.implicit.f import f
+from metaopt.plugin.timeout import TimeoutPlugin
 from metaopt.tests.util.matcher import EqualityMatcher
 
 
 f = f  # helps static code checkers identify attributes.
 
 
+@param.int("a", interval=(0, 2))
+def f_hanging(a):
+    if a == 0:
+        sleep(60)
+    return a
+
+
 class TestPluggable(object):
 
     def test_before_first_invoke_sets_up_plugins(self):
@@ -215,5 +228,28 @@ class TestPluggable(object):
         args = ArgsCreator(f.param_spec).args()
         invoker.invoke(stub_caller, args)
 
+    def test_invoke_many_times_out_calls_while_issuing_others(self):
+        # The hanging call occupies the only worker, so the other calls can
+        # only be issued once it was timed out.
+        invoker = PluggableInvoker(MultiProcessInvoker(resources=1),
+                                   plugins=[TimeoutPlugin(0.5)])
+        invoker.f = f_hanging
+        invoker.param_spec = f_hanging.param_spec
+        invoker.return_spec = ReturnSpec(f_hanging)
+
+        args_creator = ArgsCreator(f_hanging.param_spec)
+        caller = Mock()
+        try:
+            time_start = time()
+            invoker.invoke_many(caller=caller, fargs_list=[
+                args_creator.args([a]) for a in [0, 1, 2]])
+            invoker.wait()
+            assert time() - time_start < 5
+        finally:
+            invoker.stop()
+
+        assert caller.on_error.call_count == 1
+        assert caller.on_result.call_count == 2
+
 if __name__ == '__main__':
     nose.runmodule()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for sessions of optimizations on a long-lived invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Thread
+from time import sleep, time
+
+# Third Party
+import nose
+from mock import Mock
+from nose.tools import raises
+
+# First Party
+from metaopt.concurrent.invoker.multiprocess import MultiProcessInvoker
+from metaopt.concurrent.invoker.session import InvokerSession
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.optimize.optimize import optimize
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import maximize
+from metaopt.core.stoppable.util.exception import StoppedError
+from metaopt.optimizer.singleinvoke import SingleInvokeOptimizer
+from metaopt.tests.integration.invoker.multiprocess import f_hanging, f_pid
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_one(x):
+    del x
+    return 1
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_two(x):
+    del x
+    return 2
+
+
+class TestInvokerSession(object):
+    """
+    Integration tests for sessions of optimizations on a long-lived invoker.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def setup(self):
+        self._invoker = MultiProcessInvoker(resources=2)
+
+    def teardown(self):
+        try:
+            self._invoker.stop()
+        except StoppedError:
+            pass
+
+    def _invoke(self, session, function, caller):
+        """Invokes the given function once within the given session."""
+        session.f = function
+        session.param_spec = function.param_spec
+        session.return_spec = ReturnSpec(function)
+        args = ArgsCreator(function.param_spec).args()
+        session.invoke(caller=caller, fargs=args)
+
+    def test_sessions_reuse_workers(self):
+        pids = []
+        for _ in range(2):
+            session = InvokerSession(invoker=self._invoker)
+            caller = Mock()
+            self._invoke(session, f_pid, caller)
+            session.wait()
+            session.stop()
+            pids.append(caller.on_result.call_args[1]["value"].raw_values)
+
+        assert not self._invoker.stopped
+        assert pids[0] == pids[1]
+
+    def test_stopping_session_stops_its_calls_only(self):
+        session_stopped = InvokerSession(invoker=self._invoker)
+        caller_stopped = Mock()
+        self._invoke(session_stopped, f_hanging, caller_stopped)
+        sleep(0.1)  # let the worker enter the call
+        session_stopped.stop(reason=ValueError("Stopped on purpose."))
+
+        session = InvokerSession(invoker=self._invoker)
+        caller = Mock()
+        self._invoke(session, f_pid, caller)
+        session.wait()
+
+        assert isinstance(caller_stopped.on_error.call_args[1]["value"],
+                          ValueError)
+        assert not caller_stopped.on_result.called
+        assert caller.on_result.called
+        assert not caller.on_error.called
+
+    def test_optimize_keeps_given_invoker(self):
+        pids = []
+        for _ in range(2):
+            optimizer = SingleInvokeOptimizer()
+            optimize(f_pid, invoker=self._invoker, optimizer=optimizer)
+            pids.append(optimizer._outcome.raw_values)
+
+        assert not self._invoker.stopped
+        assert pids[0] == pids[1]
+
+    def test_sessions_keep_their_own_objective_functions(self):
+        session_one = InvokerSession(invoker=self._invoker)
+        session_two = InvokerSession(invoker=self._invoker)
+        caller_one = Mock()
+        caller_two = Mock()
+
+        session_one.f = f_one
+        session_two.f = f_two
+        for session, caller in [(session_one, caller_one),
+                                (session_two, caller_two)]:
+            args = ArgsCreator(session.param_spec).args()
+            session.invoke(caller=caller, fargs=args)
+        session_one.wait()
+        session_two.wait()
+
+        assert caller_one.on_result.call_args[1]["value"].raw_values == 1
+        assert caller_two.on_result.call_args[1]["value"].raw_values == 2
+
+    def test_session_waits_for_its_own_calls_only(self):
+        session_hanging = InvokerSession(invoker=self._invoker)
+        self._invoke(session_hanging, f_hanging, Mock())
+
+        session = InvokerSession(invoker=self._invoker)
+        caller = Mock()
+        time_start = time()
+        self._invoke(session, f_pid, caller)
+        session.wait()
+
+        assert time() - time_start < 5
+        assert caller.on_result.called
+        session_hanging.stop()
+
+    def test_concurrent_optimizations_get_their_own_results(self):
+        optimizers = dict()
+
+        def optimize_in_turns(function):
+            optimizers[function] = []
+            for _ in range(5):
+                optimizer = SingleInvokeOptimizer()
+                optimize(function, invoker=self._invoker,
+                         optimizer=optimizer)
+                optimizers[function].append(optimizer)
+
+        threads = [Thread(target=optimize_in_turns, args=(function,))
+                   for function in [f_one, f_two]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [optimizer._outcome.raw_values
+                for optimizer in optimizers[f_one]] == [1] * 5
+        assert [optimizer._outcome.raw_values
+                for optimizer in optimizers[f_two]] == [2] * 5
+
+    @raises(KeyError)
+    def test_stopping_session_drops_its_job(self):
+        session = InvokerSession(invoker=self._invoker)
+        self._invoke(session, f_pid, Mock())
+        session.wait()
+        session.stop()
+
+        self._invoker._job_store.get(session.job.id)
+
+    @raises(ValueError)
+    def test_optimize_rejects_initializer_for_given_invoker(self):
+        optimize(f_pid, invoker=self._invoker, initializer=lambda: None)
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for the thread pool invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Timer, current_thread
+from time import sleep, time
+from uuid import uuid4
+
+# Third Party
+import nose
+from mock import Mock, patch
+
+# First Party
+from metaopt.concurrent.invoker.pluggable import PluggableInvoker
+from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
+from metaopt.concurrent.invoker.util.call_handle import CallHandle, \
+    CancelledError, TimeoutError
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.optimize.optimize import custom_optimize
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import maximize
+from metaopt.core.returnspec.util.wrapper import ReturnValuesWrapper
+from metaopt.core.stoppable.util.exception import StoppedError
+from metaopt.objective.integer.failing.f import f as f_failing
+from metaopt.objective.integer.fast.explicit.f import f as f_working
+from metaopt.optimizer.gridsearch import GridSearchOptimizer
+
+
+f_working = f_working
+f_failing = f_failing
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging(x):
+    sleep(60)
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_sleeping(x):
+    sleep(x / 10)
+    return x
+
+
+@maximize("y")
+@param.int("x", interval=[0, 10])
+def f_hanging_at_zero(x):
+    if x == 0:
+        sleep(60)
+    return x
+
+
+class TestThreadPoolInvoker(object):
+    """
+    Integration tests for the thread pool invoker.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def setup(self):
+        self._invoker = ThreadPoolInvoker(resources=2)
+
+    def teardown(self):
+        try:
+            self._invoker.stop()
+        except StoppedError:
+            pass
+
+    def _use(self, function):
+        self._invoker.f = function
+        self._invoker.param_spec = function.param_spec
+        self._invoker.return_spec = ReturnSpec(function)
+        return ArgsCreator(function.param_spec).args()
+
+    def test_invoke_calls_on_result(self):
+        caller = Mock()
+        args = self._use(f_working)
+
+        self._invoker.invoke(caller=caller, fargs=args, data=None)
+        self._invoker.wait()
+
+        caller.on_result.assert_called_once_with(
+            value=ReturnValuesWrapper(None, 0), fargs=args, data=None)
+        assert not caller.on_error.called
+
+    def test_invoke_not_successful_calls_on_error(self):
+        caller = Mock()
+        args = self._use(f_failing)
+
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+
+        assert not caller.on_result.called
+        assert caller.on_error.called
+
+    def test_invoke_many_calls_on_result_for_each_call(self):
+        caller = Mock()
+        args = self._use(f_working)
+
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 10)
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 10
+        assert not caller.on_error.called
+
+    def test_stop_call_hands_rest_of_chunk_to_another_worker(self):
+        self._invoker.stop()
+        self._invoker = ThreadPoolInvoker(resources=1, chunk_size=4)
+        self._use(f_hanging_at_zero)
+        caller = Mock()
+
+        handles = self._invoker.invoke_many(
+            caller=caller, fargs_list=[(x,) for x in range(4)])
+        handles[0].stop()
+        self._invoker.wait()
+
+        assert caller.on_error.call_count == 1
+        assert [handle.result().raw_values for handle in handles[1:]] == \
+            [1, 2, 3]
+
+    def test_stop_call_reports_layoff_and_keeps_working(self):
+        caller = Mock()
+        args = self._use(f_hanging)
+
+        handle = self._invoker.invoke(caller=caller, fargs=args)
+        time_start = time()
+        handle.stop()
+        self._invoker.wait()
+        assert time() - time_start < 1
+        assert caller.on_error.call_count == 1
+
+        args = self._use(f_working)
+        self._invoker.invoke(caller=caller, fargs=args)
+        self._invoker.wait()
+        assert caller.on_result.call_count == 1
+
+    def test_stop_wakes_up_wait_immediately(self):
+        caller = Mock()
+        args = self._use(f_hanging)
+
+        self._invoker.invoke(caller=caller, fargs=args)
+
+        timer = Timer(0.1, self._invoker.stop)
+        timer.start()
+        time_start = time()
+        self._invoker.wait()
+        timer.join()
+
+        assert time() - time_start < 1
+        assert not caller.on_result.called
+        assert caller.on_error.called
+
+    def test_custom_optimize_via_pluggable_invoker(self):
+        invoker = PluggableInvoker(self._invoker)
+        result = custom_optimize(f_working, invoker=invoker,
+                                 optimizer=GridSearchOptimizer())
+        assert result[0].value == 10
+
+    def test_handle_result_returns_value(self):
+        args = self._use(f_working)
+
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+
+        assert handle.result() == ReturnValuesWrapper(None, 0)
+        assert handle.done()
+        assert handle.exception() is None
+
+    def test_handle_result_raises_error(self):
+        args = self._use(f_failing)
+
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+
+        try:
+            handle.result()
+        except CancelledError:
+            assert False
+        except Exception:
+            pass
+        else:
+            assert False
+        assert handle.exception() is not None
+
+    def test_handle_result_times_out(self):
+        args = self._use(f_hanging)
+
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+
+        time_start = time()
+        try:
+            handle.result(timeout=0.2)
+        except TimeoutError:
+            pass
+        else:
+            assert False
+        assert time() - time_start < 1
+        assert not handle.done()
+
+    def test_handle_cancel_raises_cancelled_error(self):
+        # no worker started a call of this id
+        handle = CallHandle(invoker=self._invoker, call_id=uuid4())
+
+        assert handle.cancel()
+        assert handle.cancelled()
+        assert handle.done()
+        try:
+            handle.result()
+        except CancelledError:
+            pass
+        else:
+            assert False
+        assert handle.cancel()
+
+    def test_handle_cancel_leaves_running_call_alone(self):
+        caller = Mock()
+        args = self._use(f_hanging)
+
+        handle = self._invoker.invoke(caller=caller, fargs=args)
+
+        assert not handle.cancel()
+        assert not handle.cancelled()
+        assert handle.running()
+
+        handle.stop()
+        self._invoker.wait()
+        assert caller.on_error.call_count == 1
+        assert not handle.cancel()
+
+    def test_handle_calls_done_callbacks(self):
+        args = self._use(f_working)
+        handles_done = []
+
+        handle = self._invoker.invoke(caller=Mock(), fargs=args)
+        handle.add_done_callback(handles_done.append)
+        self._invoker.wait()
+        handle.add_done_callback(handles_done.append)
+
+        assert handles_done == [handle, handle]
+
+    def test_as_completed_yields_handles_as_calls_end(self):
+        self._use(f_sleeping)
+
+        handles = self._invoker.invoke_many(
+            caller=Mock(), fargs_list=[(5,), (1,)])
+        handles_completed = list(self._invoker.as_completed(handles))
+
+        assert handles_completed == handles[::-1]
+        assert [handle.result().raw_values for handle in handles] == [5, 1]
+
+    def test_as_completed_via_pluggable_invoker(self):
+        invoker = PluggableInvoker(self._invoker)
+        self._use(f_sleeping)
+
+        handles = invoker.invoke_many(caller=Mock(),
+                                      fargs_list=[(5,), (1,), (2,)])
+        values = [handle.result().raw_values
+                  for handle in invoker.as_completed(handles, timeout=5)]
+
+        assert values == [1, 2, 5]
+
+
+class TestThreadPoolInvokerDispatch(TestThreadPoolInvoker):
+    """
+    Integration tests for the thread pool invoker reporting outcomes on a
+    dispatcher thread.
+    """
+
+    def setup(self):
+        self._invoker = ThreadPoolInvoker(resources=2, dispatch=True,
+                                          backlog=4)
+
+    def test_slow_callbacks_do_not_hold_up_invokes(self):
+        caller = Mock()
+        caller.on_result.side_effect = lambda **kwargs: sleep(0.2)
+        args = self._use(f_working)
+
+        time_start = time()
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 4)
+        assert time() - time_start < 0.2
+
+        self._invoker.wait()
+        assert caller.on_result.call_count == 4
+
+    def test_callbacks_run_on_the_dispatcher_thread(self):
+        threads = []
+        caller = Mock()
+        caller.on_result.side_effect = \
+            lambda **kwargs: threads.append(current_thread())
+        args = self._use(f_working)
+
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 5)
+        self._invoker.wait()
+
+        assert len(threads) == 5
+        assert current_thread() not in threads
+
+    def test_callbacks_may_invoke_again(self):
+        caller = Mock()
+        args = self._use(f_working)
+        caller.on_result.side_effect = \
+            lambda **kwargs: self._invoker.invoke(caller=Mock(), fargs=args)
+
+        self._invoker.invoke_many(caller=caller, fargs_list=[args] * 10)
+        self._invoker.wait()
+
+        assert caller.on_result.call_count == 10
+
+    def test_failing_callbacks_are_logged(self):
+        caller = Mock()
+        caller.on_result.side_effect = ValueError()
+        args = self._use(f_working)
+
+        with patch("metaopt.concurrent.invoker.multiprocess.LOGGER") as logger:
+            self._invoker.invoke_many(caller=caller, fargs_list=[args] * 3)
+            self._invoker.wait()
+
+        assert caller.on_result.call_count == 3
+        assert logger.exception.call_count == 3
+
+if __name__ == '__main__':
+    nose.runmodule()
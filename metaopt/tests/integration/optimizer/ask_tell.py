@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for driving optimizers via ask and tell.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Third Party
+import nose
+from nose.tools import raises
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.paramspec.util import param
+from metaopt.optimizer.cmaes import CMAESOptimizer
+from metaopt.optimizer.gridsearch import GridSearchOptimizer
+from metaopt.optimizer.pso import PSOOptimizer
+from metaopt.optimizer.randomsearch import RandomSearchOptimizer
+from metaopt.optimizer.rechenberg import RechenbergOptimizer
+from metaopt.optimizer.saes import SAESOptimizer
+
+
+@param.float("a", interval=[-1, 1])
+@param.float("b", interval=[-1, 1])
+def f(a, b):
+    return a ** 2 + b ** 2
+
+
+@param.int("a", interval=(1, 2))
+@param.int("b", interval=(1, 2))
+def f_grid(a, b):
+    return -(a + b)
+
+
+def evaluate(function, candidates):
+    """Returns the fitnesses of the given candidates, like a scheduler."""
+    return [function(*[arg.value for arg in args]) for args in candidates]
+
+
+class TestAskTell(object):
+    """
+    Integration tests for driving optimizers via ask and tell.
+    """
+
+    def _drive(self, optimizer, batch_size=7, batch_count=40):
+        """
+        Evaluates batches of candidates of the given optimizer for f and
+        returns the best fitness told.
+        """
+        optimizer.prepare(f.param_spec)
+
+        fitnesses_told = []
+        for _ in range(batch_count):
+            candidates = optimizer.ask(batch_size)
+            assert len(candidates) == batch_size
+
+            fitnesses = evaluate(f, candidates)
+            optimizer.tell(candidates, fitnesses)
+            fitnesses_told.extend(fitnesses)
+        return min(fitnesses_told)
+
+    def test_saes_advances_generations(self):
+        optimizer = SAESOptimizer(mu=3, lamb=6)
+        assert self._drive(optimizer) < 0.1
+        assert optimizer.generation > 10
+
+    def test_saes_steady_state(self):
+        optimizer = SAESOptimizer(mu=3, lamb=6, steady_state=True)
+        assert self._drive(optimizer) < 0.1
+        assert optimizer.generation > 10
+
+    def test_rechenberg_advances_generations(self):
+        optimizer = RechenbergOptimizer(mu=3, lamb=6)
+        self._drive(optimizer)
+        assert optimizer.generation > 10
+
+    def test_cmaes_advances_generations(self):
+        optimizer = CMAESOptimizer(mu=3, lamb=6)
+        self._drive(optimizer)
+        assert optimizer.generation > 10
+
+    def test_pso_advances_generations(self):
+        optimizer = PSOOptimizer(lamb=6)
+        self._drive(optimizer)
+        assert optimizer.generation > 10
+        assert optimizer.best_fitness is not None
+
+    def test_random_search_keeps_best(self):
+        optimizer = RandomSearchOptimizer()
+        best_fitness = self._drive(optimizer, batch_count=3)
+        assert optimizer.best[1] == best_fitness
+
+    def test_generation_closes_once_all_candidates_were_told(self):
+        optimizer = SAESOptimizer(mu=3, lamb=6)
+        optimizer.prepare(f.param_spec)
+
+        candidates = optimizer.ask()
+        assert len(candidates) == 3
+
+        optimizer.tell(candidates[:2], evaluate(f, candidates[:2]))
+        assert optimizer.generation == 1
+        optimizer.tell(candidates[2:], [None])
+        assert optimizer.generation == 2
+
+        # the two parents scored and their offspring
+        assert len(optimizer.ask()) == 2 + 6
+
+    def test_tell_accepts_copies_of_candidates(self):
+        optimizer = RechenbergOptimizer(mu=3, lamb=6)
+        optimizer.prepare(f.param_spec)
+
+        candidates = optimizer.ask()
+        args_creator = ArgsCreator(f.param_spec)
+        copies = [args_creator.args([arg.value for arg in args])
+                  for args in candidates]
+        optimizer.tell(copies, evaluate(f, candidates))
+
+        assert optimizer.generation == 2
+
+    def _ask_equal_candidates(self):
+        """
+        Returns an SAES optimizer whose first three candidates have equal
+        arguments but different mutation strengths, along with them.
+        """
+        optimizer = SAESOptimizer(mu=3, lamb=6)
+        optimizer.prepare(f.param_spec)
+
+        args = ArgsCreator(f.param_spec).args([0.5, 0.5])
+        optimizer.population = [(args, [sigma, sigma])
+                                for sigma in (0.1, 0.2, 0.3)]
+        return optimizer, optimizer.ask()[:3]
+
+    def test_tell_tells_apart_equal_candidates(self):
+        optimizer, candidates = self._ask_equal_candidates()
+
+        optimizer.tell(candidates[::-1], [3, 2, 1])
+
+        sigmas = [individual[1][0]
+                  for individual, _ in optimizer.scored_population]
+        assert sigmas == [0.3, 0.2, 0.1]
+
+    def test_calls_carry_tokens_of_equal_candidates(self):
+        optimizer, candidates = self._ask_equal_candidates()
+        args_creator = ArgsCreator(f.param_spec)
+
+        for candidate, value in zip(candidates[::-1], [3, 2, 1]):
+            kwargs = optimizer._asked.call_kwargs(candidate)
+            copy = args_creator.args([arg.value for arg in candidate])
+            optimizer.on_result(value=value, fargs=copy, **kwargs)
+
+        sigmas = [individual[1][0]
+                  for individual, _ in optimizer.scored_population]
+        assert sigmas == [0.3, 0.2, 0.1]
+
+    @raises(ValueError)
+    def test_tell_rejects_candidates_not_asked_for(self):
+        optimizer = SAESOptimizer(mu=3, lamb=6)
+        optimizer.prepare(f.param_spec)
+
+        optimizer.ask(1)
+        args = ArgsCreator(f.param_spec).args([2, 2])
+        optimizer.tell([args], [8])
+
+    def test_grid_search_runs_out_of_candidates(self):
+        optimizer = GridSearchOptimizer()
+        optimizer.prepare(f_grid.param_spec)
+
+        candidates = optimizer.ask(3) + optimizer.ask()
+        assert len(candidates) == 4
+        assert optimizer.ask(1) == []
+
+        optimizer.tell(candidates, evaluate(f_grid, candidates))
+        assert optimizer.best[0] == candidates[-1]
+
+if __name__ == '__main__':
+    nose.runmodule()
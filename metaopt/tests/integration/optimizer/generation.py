@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for generations closed before their slowest calls ended.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Lock
+from time import sleep, time
+
+# Third Party
+import nose
+from mock import Mock
+from nose.tools import raises
+
+# First Party
+from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.optimize.optimize import custom_optimize
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.returnspec import ReturnSpec
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.saes import SAESOptimizer
+from metaopt.optimizer.util.generation import CANCEL, SPECULATE, Generation
+
+calls = []  # calls of the objective functions, which share this process
+calls_lock = Lock()
+
+
+@minimize("y")
+@param.int("x", interval=[1, 4])
+def f_straggling(x):
+    """Takes a second for the first call with x=1, but not for later ones."""
+    with calls_lock:
+        calls.append(x)
+        first = calls.count(1) == 1
+    sleep(1 if x == 1 and first else 0.01)
+    return x
+
+
+@minimize("y")
+@param.float("a", interval=[-1, 1])
+def f_slow_first(a):
+    """Takes a second for its first call, but not for later ones."""
+    with calls_lock:
+        calls.append(a)
+        first = len(calls) == 1
+    sleep(1 if first else 0.01)
+    return a ** 2
+
+
+class TestGeneration(object):
+    """
+    Integration tests for generations closed before their slowest calls ended.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def setup(self):
+        del calls[:]
+        self._invoker = ThreadPoolInvoker(resources=4)
+        self._invoker.f = f_straggling
+        self._invoker.param_spec = f_straggling.param_spec
+        self._invoker.return_spec = ReturnSpec(f_straggling)
+
+    def teardown(self):
+        self._invoker.stop()
+
+    def _run(self, **kwargs):
+        """
+        Runs a generation of f_straggling for x in 1..4 and returns the caller
+        notified and the seconds it took.
+        """
+        caller = Mock()
+        generation = Generation(invoker=self._invoker, caller=caller,
+                                **kwargs)
+        args_creator = ArgsCreator(f_straggling.param_spec)
+        time_start = time()
+        generation.invoke_many(
+            fargs_list=[args_creator.args(values=[x]) for x in range(1, 5)],
+            kwargs_list=[dict(x=x) for x in range(1, 5)])
+        generation.wait()
+        return caller, time() - time_start
+
+    def _reported(self, callback):
+        """Returns the kwarg x of each call of the given callback."""
+        return sorted(kwargs["x"] for _, kwargs in callback.call_args_list)
+
+    def test_waits_for_all_calls_without_quorum(self):
+        caller, duration = self._run()
+        assert duration >= 1
+        assert self._reported(caller.on_result) == [1, 2, 3, 4]
+
+    def test_cancels_stragglers(self):
+        caller, duration = self._run(quorum=0.75, stragglers=CANCEL)
+        assert duration < 0.5
+        assert self._reported(caller.on_result) == [2, 3, 4]
+        assert not caller.on_error.called
+
+    def test_speculation_reports_first_outcome(self):
+        caller, duration = self._run(quorum=0.75, stragglers=SPECULATE)
+        assert duration < 0.5
+        assert self._reported(caller.on_result) == [1, 2, 3, 4]
+        assert not caller.on_error.called
+        assert calls.count(1) == 2
+
+    def test_minimum_overrides_quorum(self):
+        caller, duration = self._run(quorum=0.25, minimum=4)
+        assert duration >= 1
+        assert self._reported(caller.on_result) == [1, 2, 3, 4]
+
+    @raises(ValueError)
+    def test_quorum_needs_to_be_a_share(self):
+        Generation(invoker=self._invoker, caller=Mock(), quorum=1.5)
+
+    @raises(ValueError)
+    def test_stragglers_need_to_be_known(self):
+        Generation(invoker=self._invoker, caller=Mock(), stragglers="ignore")
+
+
+class TestSAESQuorum(object):
+    """
+    Integration tests for SAES closing generations once a quorum ended.
+    """
+
+    def setup(self):
+        del calls[:]
+
+    def test_straggler_does_not_hold_up_generations(self):
+        optimizer = SAESOptimizer(mu=3, lamb=4, quorum=0.5)
+        custom_optimize(f_slow_first, invoker=ThreadPoolInvoker(resources=2),
+                        timeout=0.5, optimizer=optimizer)
+        assert optimizer.generation > 2
+
+if __name__ == '__main__':
+    nose.runmodule()
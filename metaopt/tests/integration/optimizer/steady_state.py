@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Integration tests for the steady-state mode of the evolutionary optimizers.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+from threading import Lock
+from time import sleep
+
+# Third Party
+import nose
+
+# First Party
+from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
+from metaopt.core.optimize.optimize import custom_optimize
+from metaopt.core.paramspec.util import param
+from metaopt.core.returnspec.util.decorator import minimize
+from metaopt.optimizer.cmaes import CMAESOptimizer
+from metaopt.optimizer.pso import PSOOptimizer
+from metaopt.optimizer.rechenberg import RechenbergOptimizer
+from metaopt.optimizer.saes import SAESOptimizer
+
+calls = []  # calls of f_slow_first, which share this process
+calls_lock = Lock()
+
+
+@minimize("y")
+@param.float("a", interval=[-1, 1])
+@param.float("b", interval=[-1, 1])
+def f_slow_first(a, b):
+    """Takes a second for its first call, but not for later ones."""
+    with calls_lock:
+        calls.append((a, b))
+        first = len(calls) == 1
+    sleep(1 if first else 0.01)
+    return a ** 2 + b ** 2
+
+
+class TestSteadyState(object):
+    """
+    Integration tests for the steady-state mode of the evolutionary optimizers.
+    """
+
+    def setup(self):
+        del calls[:]
+
+    def _optimize(self, optimizer, dispatch=False):
+        """
+        Optimizes f_slow_first with two workers for less time than its first
+        call takes and returns the number of calls.
+        """
+        invoker = ThreadPoolInvoker(resources=2, dispatch=dispatch)
+        custom_optimize(f_slow_first, invoker=invoker, timeout=0.5,
+                        optimizer=optimizer)
+        return len(calls)
+
+    def test_generations_wait_for_slow_call(self):
+        # The first generation is not complete before the timeout.
+        assert self._optimize(SAESOptimizer(mu=2, lamb=4)) <= 2
+
+    def test_saes_keeps_workers_busy(self):
+        assert self._optimize(SAESOptimizer(mu=2, lamb=4,
+                                            steady_state=True)) > 10
+
+    def test_rechenberg_keeps_workers_busy(self):
+        assert self._optimize(RechenbergOptimizer(mu=2, lamb=4,
+                                                  steady_state=True)) > 10
+
+    def test_cmaes_keeps_workers_busy(self):
+        assert self._optimize(CMAESOptimizer(mu=2, lamb=4,
+                                             steady_state=True)) > 10
+
+    def test_pso_keeps_workers_busy(self):
+        assert self._optimize(PSOOptimizer(lamb=4, steady_state=True)) > 10
+
+    def test_saes_keeps_workers_busy_with_dispatcher_thread(self):
+        # The optimizer is told results on the dispatcher thread while it is
+        # asked for offspring on this one.
+        assert self._optimize(SAESOptimizer(mu=2, lamb=4, steady_state=True),
+                              dispatch=True) > 10
+
+    def test_saes_approaches_minimum(self):
+        optimizer = SAESOptimizer(mu=3, lamb=6, steady_state=True)
+        self._optimize(optimizer)
+        _, fitness = optimizer.best_scored_individual
+        assert fitness.raw_values < 0.1
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -20,6 +20,7 @@ from metaopt.concurrent.invoker.pluggable import PluggableInvoker
 from metaopt.concurrent.invoker. \
     simple_multiprocess import SimpleMultiprocessInvoker
 from metaopt.concurrent.invoker.singleprocess import SingleProcessInvoker
+from metaopt.concurrent.invoker.threadpool import ThreadPoolInvoker
 from metaopt.core.optimize.optimize import custom_optimize
 from metaopt.objective.integer.failing import FUNCTIONS_FAILING
 from metaopt.objective.integer.fast.explicit import FUNCTIONS_FAST_EXPLICIT
@@ -45,6 +46,7 @@ class TestMain(object):
     def setup(self):
         self._invokers = [
             MultiProcessInvoker,  # works
+            ThreadPoolInvoker,  # works
             #SingleProcessInvoker,  # TODO faulty result
             #SimpleMultiprocessInvoker, # TODO hangs
             ]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the worker pool shared by several invokers.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Third Party
+import nose
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.employer.pool import WorkerPool
+
+
+class TestWorkerPool(object):
+
+    def __init__(self):
+        self._pool = None
+
+    def setup(self):
+        self._pool = WorkerPool(resources=4)
+
+    def test_acquire_up_to_capacity(self):
+        tenant = self._pool.attach()
+        assert tenant.acquire(4)
+        assert not tenant.acquire()
+        assert self._pool.slot_count == 4
+
+        tenant.release()
+        assert tenant.acquire()
+
+    def test_acquire_up_to_max_workers(self):
+        tenant = self._pool.attach(max_workers=2)
+        assert tenant.worker_count_max == 2
+        assert tenant.acquire(2)
+        assert not tenant.acquire()
+
+    def test_tenant_at_its_limit_makes_nobody_yield(self):
+        greedy = self._pool.attach()
+        capped = self._pool.attach(max_workers=1)
+        assert greedy.acquire(3)
+        assert capped.acquire()
+        assert not capped.acquire()
+        assert not greedy.should_yield()
+
+    def test_greedy_tenant_yields_to_waiting_one(self):
+        greedy = self._pool.attach()
+        other = self._pool.attach()
+        assert greedy.acquire(4)
+        assert not greedy.should_yield()
+
+        # both hold their share after yielding twice
+        for _ in range(2):
+            assert not other.acquire()
+            assert greedy.should_yield()
+            greedy.release()
+            assert not greedy.acquire()
+            assert other.acquire()
+
+        assert not other.acquire()
+        assert not greedy.should_yield()
+
+    def test_idle_tenant_yields_regardless_of_share(self):
+        pool = WorkerPool(resources=1)
+        idle = pool.attach()
+        other = pool.attach()
+        assert idle.acquire()
+        assert not other.acquire()
+        assert not idle.should_yield()
+        assert idle.should_yield(idle=True)
+
+    def test_shares_follow_weights(self):
+        heavy = self._pool.attach(weight=3)
+        light = self._pool.attach(weight=1)
+        assert heavy.acquire(4)
+        assert not light.acquire()
+        assert heavy.should_yield()
+
+        heavy.release()
+        assert light.acquire()
+        assert not heavy.should_yield()
+        assert not light.acquire()
+        assert not heavy.should_yield()
+
+    def test_higher_priority_goes_first(self):
+        low = self._pool.attach(priority=0)
+        high = self._pool.attach(priority=1)
+        assert low.acquire(4)
+        assert not high.acquire()
+        assert low.should_yield()
+
+        low.release()
+        assert not low.acquire()
+        assert high.acquire()
+        assert not high.acquire()
+        assert low.should_yield()
+
+    def test_stop_waiting_makes_nobody_yield(self):
+        greedy = self._pool.attach()
+        other = self._pool.attach()
+        assert greedy.acquire(4)
+        assert not other.acquire()
+        other.stop_waiting()
+        assert not greedy.should_yield()
+
+    def test_detach_releases_slots(self):
+        tenant = self._pool.attach()
+        assert tenant.acquire(4)
+        self._pool.detach(tenant)
+        assert self._pool.slot_count == 0
+
+    @raises(ValueError)
+    def test_weight_must_be_positive(self):
+        self._pool.attach(weight=0)
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -8,6 +8,7 @@ from __future__ import absolute_import, division, print_function, \
 
 # Standard Library
 from multiprocessing import Manager
+from time import sleep
 
 # Third Party
 import nose
@@ -16,6 +17,8 @@ from nose.tools.nontrivial import raises
 
 # First Party
 from metaopt.concurrent.employer.process import ProcessWorkerEmployer
+from metaopt.concurrent.model.call_lifecycle import Dismissal, Retirement
+from metaopt.core.demand.demand import Demand
 
 
 class TestProcessWorkerEmployer(object):
@@ -37,16 +40,25 @@ class TestProcessWorkerEmployer(object):
         self._queue_outcome = manager.Queue()  # ignore error, this works
 
         self._status_db = Mock()
-        self._status_db.get_running_call = Mock(return_value=None)
-        self._employer = ProcessWorkerEmployer(queue_tasks=self._queue_task,
-                                              queue_outcome=self._queue_outcome,
-                                              queue_start=self._queue_start,
-                                              status_db=self._status_db)
+        self._status_db.get_running_calls = Mock(return_value=[None])
+        self._employer = self._create_employer()
 
     def teardown(self):
         """Nose will run this method after every test method."""
         self._employer.abandon()
 
+    def _create_employer(self, **kwargs):
+        """Creates an employer that uses the queues of this test."""
+        return ProcessWorkerEmployer(queue_tasks=self._queue_task,
+                                     queue_outcome=self._queue_outcome,
+                                     queue_start=self._queue_start,
+                                     status_db=self._status_db, **kwargs)
+
+    def _replace_employer(self, **kwargs):
+        """Replaces the employer of this test with one of the given options."""
+        self._employer.abandon()
+        self._employer = self._create_employer(**kwargs)
+
     def test_employ_once(self):
         """
         A worker process _employer can employ a worker process.
@@ -124,10 +136,7 @@ class TestProcessWorkerEmployer(object):
 
     def test_is_borg(self):
         """There can only be one instance of a worker process _employer."""
-        my_provider = ProcessWorkerEmployer(queue_tasks=self._queue_task,
-                                            queue_outcome=self._queue_outcome,
-                                            queue_start=self._queue_start,
-                                            status_db=self._status_db)
+        my_provider = self._create_employer()
 
         number_of_workers = 1
 
@@ -153,5 +162,81 @@ class TestProcessWorkerEmployer(object):
         self._employer.employ(number_of_workers=worker_count)
         self._employer.abandon()
 
+    def test_spares_take_place_of_employed_workers(self):
+        """Spare workers are promoted first and replenished meanwhile."""
+        self._replace_employer(spares=1)
+        assert self._employer.spare_count == 1
+        assert self._employer.worker_count == 0
+
+        self._employer.employ(1)
+        assert self._employer.worker_count == 1
+        for _ in range(100):
+            if self._employer.spare_count == 1:
+                break
+            sleep(0.05)
+        assert self._employer.spare_count == 1
+
+    def test_abandon_dismisses_spares(self):
+        """Abandoning all workers dismisses spare workers, too."""
+        self._replace_employer(spares=2)
+        self._employer.abandon()
+        assert self._employer.spare_count == 0
+
+    def test_dismissed_worker_retires(self):
+        """A dismissed worker retires without anybody taking its place."""
+        self._employer.employ(1)
+        self._employer.dismiss(1)
+        assert self._employer.worker_count == 0
+
+        retirement = self._queue_outcome.get(timeout=10)
+        assert isinstance(retirement, Retirement)
+        assert isinstance(retirement.value, Dismissal)
+        self._employer.retire(worker_id=retirement.worker_id, dismissed=True)
+        assert self._employer.worker_count == 0
+        self._employer.employ(1)
+        assert self._employer.worker_count == 1
+
+    def _create_employer_with_budget(self):
+        """Creates an employer for two CPUs and 100 bytes of memory."""
+        self._replace_employer(resources=2, memory=100)
+
+    @raises(IndexError)
+    def test_reserve_more_cpus_than_left_raises(self):
+        self._create_employer_with_budget()
+        self._employer.reserve(call_ids=[1], demand=Demand(cpus=2))
+        self._employer.reserve(call_ids=[2], demand=Demand(cpus=1))
+
+    @raises(IndexError)
+    def test_reserve_more_memory_than_left_raises(self):
+        self._create_employer_with_budget()
+        self._employer.reserve(call_ids=[1], demand=Demand(memory=60))
+        self._employer.reserve(call_ids=[2], demand=Demand(memory=60))
+
+    def test_release_frees_resources_once_all_calls_ended(self):
+        self._create_employer_with_budget()
+        self._employer.reserve(call_ids=[1, 2], demand=Demand(cpus=2))
+
+        self._employer.release(call_id=1)
+        try:
+            self._employer.reserve(call_ids=[3], demand=Demand(cpus=1))
+            assert False, "call 2 still holds the CPUs"
+        except IndexError:
+            pass
+
+        self._employer.release(call_id=2)
+        self._employer.reserve(call_ids=[3], demand=Demand(cpus=1))
+
+    def test_reserve_demand_exceeding_all_resources_runs_alone(self):
+        self._create_employer_with_budget()
+        self._employer.reserve(call_ids=[1], demand=Demand(cpus=8, memory=999))
+        self._employer.release(call_id=1)
+        self._employer.reserve(call_ids=[2], demand=Demand(cpus=8))
+
+    def test_abandon_frees_resources(self):
+        self._create_employer_with_budget()
+        self._employer.reserve(call_ids=[1], demand=Demand(cpus=2))
+        self._employer.abandon()
+        self._employer.reserve(call_ids=[2], demand=Demand(cpus=2))
+
 if __name__ == '__main__':
     nose.runmodule()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the cgroup utilities, reading fake cgroup trees.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+import shutil
+from tempfile import mkdtemp
+
+# Third Party
+import nose
+
+# First Party
+from metaopt.concurrent.employer.util.cgroup import read_cpu_quota, \
+    read_memory_left, read_memory_limit
+from metaopt.concurrent.employer.util.determine_memory import explain_memory, \
+    measure_available_memory
+
+
+def _write(root, path, content):
+    """Writes the given content to the given path below the given root."""
+    path = os.path.join(root, path.lstrip("/"))
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "w") as fake_file:
+        fake_file.write(content)
+
+
+def write_cgroup_v2(root, files, group="/"):
+    """
+    Writes a fake cgroup v2 tree below the given root, where this process is
+    in the given group, whose directory gets the given files.
+    """
+    _write(root, "/proc/self/mountinfo",
+           "42 32 0:38 / /sys/fs/cgroup rw - cgroup2 cgroup2 rw\n")
+    _write(root, "/proc/self/cgroup", "0::%s\n" % group)
+    for name, content in files.items():
+        _write(root, os.path.join("/sys/fs/cgroup", group.lstrip("/"), name),
+               content)
+
+
+def write_cgroup_v1(root, files, group="/"):
+    """
+    Writes a fake cgroup v1 tree below the given root with the cpu and memory
+    controllers, where this process is in the given group, whose directories
+    get the given files.
+    """
+    _write(root, "/proc/self/mountinfo",
+           "33 32 0:29 / /sys/fs/cgroup/cpu,cpuacct rw - cgroup cgroup "
+           "rw,cpu,cpuacct\n"
+           "36 32 0:32 / /sys/fs/cgroup/memory rw - cgroup cgroup rw,memory\n")
+    _write(root, "/proc/self/cgroup",
+           "4:memory:%s\n2:cpu,cpuacct:%s\n" % (group, group))
+    for name, content in files.items():
+        controller = "memory" if name.startswith("memory") else "cpu,cpuacct"
+        _write(root, os.path.join("/sys/fs/cgroup", controller,
+                                  group.lstrip("/"), name), content)
+
+
+class TestCgroup(object):
+
+    def __init__(self):
+        self._root = None
+
+    def setup(self):
+        self._root = mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self._root)
+
+    def test_without_cgroups_there_are_no_limits(self):
+        assert read_cpu_quota(root=self._root) == (None, None)
+        assert read_memory_limit(root=self._root) == (None, None)
+
+    def test_read_cpu_quota_v2(self):
+        write_cgroup_v2(self._root, {"cpu.max": "250000 100000"})
+        quota, path = read_cpu_quota(root=self._root)
+        assert quota == 2.5
+        assert path.endswith("/sys/fs/cgroup/cpu.max")
+
+    def test_read_cpu_quota_v2_max_is_no_quota(self):
+        write_cgroup_v2(self._root, {"cpu.max": "max 100000"})
+        assert read_cpu_quota(root=self._root) == (None, None)
+
+    def test_read_cpu_quota_v2_of_ancestor_applies(self):
+        write_cgroup_v2(self._root, {"cpu.max": "max 100000"},
+                        group="/parent/child")
+        _write(self._root, "/sys/fs/cgroup/parent/cpu.max", "100000 100000")
+        quota, path = read_cpu_quota(root=self._root)
+        assert quota == 1
+        assert path.endswith("/sys/fs/cgroup/parent/cpu.max")
+
+    def test_read_cpu_quota_v1(self):
+        write_cgroup_v1(self._root, {"cpu.cfs_quota_us": "400000",
+                                     "cpu.cfs_period_us": "100000"},
+                        group="/docker/abc")
+        quota, path = read_cpu_quota(root=self._root)
+        assert quota == 4
+        assert path.endswith("/cpu,cpuacct/docker/abc/cpu.cfs_quota_us")
+
+    def test_read_cpu_quota_v1_negative_is_no_quota(self):
+        write_cgroup_v1(self._root, {"cpu.cfs_quota_us": "-1",
+                                     "cpu.cfs_period_us": "100000"})
+        assert read_cpu_quota(root=self._root) == (None, None)
+
+    def test_read_memory_limit_v2(self):
+        write_cgroup_v2(self._root, {"memory.max": "1073741824"})
+        assert read_memory_limit(root=self._root)[0] == 1073741824
+
+    def test_read_memory_limit_v1(self):
+        write_cgroup_v1(self._root, {"memory.limit_in_bytes": "2147483648"})
+        assert read_memory_limit(root=self._root)[0] == 2147483648
+
+    def test_explain_memory_respects_memory_limit(self):
+        write_cgroup_v2(self._root, {"memory.max": "1024"})
+        memory, reason = explain_memory(root=self._root)
+        assert memory == 1024
+        assert "memory.max" in reason
+
+    def test_read_memory_left_v2(self):
+        write_cgroup_v2(self._root, {"memory.max": "1024",
+                                     "memory.current": "1000"})
+        assert read_memory_left(root=self._root) == 24
+
+    def test_read_memory_left_v1(self):
+        write_cgroup_v1(self._root, {"memory.limit_in_bytes": "1024",
+                                     "memory.usage_in_bytes": "24"})
+        assert read_memory_left(root=self._root) == 1000
+
+    def test_measure_available_memory_respects_memory_left(self):
+        _write(self._root, "/proc/meminfo",
+               "MemTotal:       16384 kB\nMemAvailable:    8192 kB\n")
+        assert measure_available_memory(root=self._root) == 8192 * 1024
+
+        write_cgroup_v2(self._root, {"memory.max": "1024",
+                                     "memory.current": "1000"})
+        assert measure_available_memory(root=self._root) == 24
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for splitting the CPUs of a process into sets to pin workers to.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+import shutil
+from tempfile import mkdtemp
+
+# Third Party
+import nose
+
+# First Party
+from metaopt.concurrent.employer.util.cpu_sets import parse_cpu_list, \
+    read_numa_nodes, split_cpus
+
+
+def write_numa_nodes(root, nodes):
+    """Writes a fake list of CPUs for each of the given NUMA nodes."""
+    for node, cpu_list in nodes.items():
+        directory = os.path.join(root, "sys/devices/system/node",
+                                 "node%s" % node)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "cpulist"), "w") as cpu_list_file:
+            cpu_list_file.write(cpu_list + "\n")
+
+
+class TestCpuSets(object):
+
+    def __init__(self):
+        self._root = None
+
+    def setup(self):
+        self._root = mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self._root)
+
+    def test_parse_cpu_list(self):
+        assert parse_cpu_list("0-3,8,10-11\n") == set([0, 1, 2, 3, 8, 10, 11])
+
+    def test_read_numa_nodes(self):
+        write_numa_nodes(self._root, {0: "0-1", 1: "2-3"})
+        assert read_numa_nodes(self._root) == {0: 0, 1: 0, 2: 1, 3: 1}
+
+    def test_read_numa_nodes_without_nodes(self):
+        assert read_numa_nodes(self._root) == dict()
+
+    def test_split_cpus_into_disjoint_sets(self):
+        cpu_sets = split_cpus(2, cpus=set(range(4)), root=self._root)
+        assert cpu_sets == [frozenset([0, 1]), frozenset([2, 3])]
+
+    def test_split_cpus_keeps_sets_within_numa_nodes(self):
+        write_numa_nodes(self._root, {0: "0,2,4,6", 1: "1,3,5,7"})
+        cpu_sets = split_cpus(2, cpus=set(range(8)), root=self._root)
+        assert cpu_sets == [frozenset([0, 2, 4, 6]), frozenset([1, 3, 5, 7])]
+
+    def test_split_cpus_into_more_sets_than_cpus(self):
+        cpu_sets = split_cpus(4, cpus=set([0, 1]), root=self._root)
+        assert cpu_sets == [frozenset([0]), frozenset([1])]
+
+    def test_split_cpus_leaves_over_cpus(self):
+        cpu_sets = split_cpus(2, cpus=set(range(5)), root=self._root)
+        assert cpu_sets == [frozenset([0, 1]), frozenset([2, 3])]
+
+    def test_split_cpus_this_process_may_use(self):
+        cpu_sets = split_cpus(1)
+        assert len(cpu_sets) == 1 and cpu_sets[0]
+
+
+if __name__ == '__main__':
+    nose.runmodule()
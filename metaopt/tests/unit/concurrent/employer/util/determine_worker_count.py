@@ -7,21 +7,48 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals, with_statement
 
 # Standard Library
+import os
+import shutil
 from multiprocessing import cpu_count
+from tempfile import mkdtemp
 
 # Third Party
 import nose
+from nose.plugins.skip import SkipTest
 from nose.tools.nontrivial import raises
 
 # First Party
 from metaopt.concurrent.employer.util. \
-    determine_worker_count import determine_worker_count
+    determine_worker_count import determine_worker_count, explain_worker_count
+from metaopt.tests.unit.concurrent.employer.util.cgroup import \
+    write_cgroup_v2
 
 
 class TestDetermineWorkerCount(object):
 
     def test_determine_worker_count(self):
-        assert determine_worker_count() is cpu_count()
+        assert 1 <= determine_worker_count() <= cpu_count()
+
+    def test_determine_worker_count_respects_affinity_mask(self):
+        try:
+            affinity = len(os.sched_getaffinity(0))
+        except AttributeError:
+            raise SkipTest("The affinity mask is unknown.")
+        assert determine_worker_count() <= affinity
+
+    def test_explain_worker_count_respects_cpu_quota(self):
+        root = mkdtemp()
+        try:
+            write_cgroup_v2(root, {"cpu.max": "50000 100000"})
+            count, reason = explain_worker_count(root=root)
+        finally:
+            shutil.rmtree(root)
+        assert count == 1
+        assert "worker" in reason
+
+    def test_explain_worker_count_of_request(self):
+        assert explain_worker_count(request=3) == \
+            (3, "3 workers as requested.")
 
     def test_determine_worker_count_none(self):
         assert determine_worker_count(request=None) >= 1
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the start method utilities.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import sys
+
+# Third Party
+import nose
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.employer.util.start_method import get_context, \
+    get_popen, get_start_method, import_modules, preload_modules
+
+
+class TestStartMethod(object):
+
+    def test_get_context_fork(self):
+        assert get_start_method(get_context("fork")) == "fork"
+
+    def test_get_context_default(self):
+        assert get_start_method(get_context()) in \
+            ("fork", "spawn", "forkserver")
+
+    def test_get_popen_fork(self):
+        assert callable(get_popen("fork"))
+
+    @raises(ValueError)
+    def test_get_context_unknown_raises(self):
+        get_context("unknown")
+
+    def test_import_modules(self):
+        sys.modules.pop("xml.dom.minidom", None)
+        import_modules(["xml.dom.minidom"])
+        assert "xml.dom.minidom" in sys.modules
+
+    def test_preload_modules_imports_them_for_forked_workers(self):
+        sys.modules.pop("xml.dom.minidom", None)
+        preload_modules(get_context("fork"), ["xml.dom.minidom"])
+        assert "xml.dom.minidom" in sys.modules
+
+    @raises(ImportError)
+    def test_import_unknown_module_raises(self):
+        import_modules(["metaopt.unknown"])
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the determine_chunk_size utility.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Third Party
+import nose
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.invoker.util. \
+    determine_chunk_size import CHUNK_DURATION, determine_chunk_size
+
+
+class TestDetermineChunkSize(object):
+
+    def test_determine_chunk_size_unmeasured(self):
+        assert determine_chunk_size() == 1
+
+    def test_determine_chunk_size_requested(self):
+        assert determine_chunk_size(request=7, call_duration=1e-9) == 7
+
+    def test_determine_chunk_size_fast_calls(self):
+        call_duration = CHUNK_DURATION / 10
+        assert determine_chunk_size(call_duration=call_duration,
+                                    call_count=100) == 10
+
+    def test_determine_chunk_size_slow_calls(self):
+        call_duration = CHUNK_DURATION * 10
+        assert determine_chunk_size(call_duration=call_duration,
+                                    call_count=100) == 1
+
+    def test_determine_chunk_size_spreads_calls_over_workers(self):
+        assert determine_chunk_size(call_duration=0, call_count=100,
+                                    worker_count=4) == 25
+
+    @raises(NotImplementedError)
+    def test_determine_chunk_size_zero(self):
+        determine_chunk_size(request=0)
+
+    @raises(NotImplementedError)
+    def test_determine_chunk_size_string(self):
+        determine_chunk_size(request="a")
+
+if __name__ == '__main__':
+    nose.runmodule()
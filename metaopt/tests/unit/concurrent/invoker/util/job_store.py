@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the stores that ship jobs to workers.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import mmap
+import os
+import pickle
+from copy import deepcopy
+from uuid import uuid4
+
+# Third Party
+import nose
+from nose.plugins.skip import SkipTest
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.invoker.util.job_store import FileJobStore, JobStore
+from metaopt.concurrent.invoker.util.shared_data import SHARE_SIZE, \
+    SharedBytes
+from metaopt.concurrent.model.call_lifecycle import Job
+from metaopt.objective.integer.fast.explicit.f import f
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestFileJobStore(object):
+
+    def __init__(self):
+        self._job_store = None
+
+    def setup(self):
+        self._job_store = FileJobStore()
+
+    def teardown(self):
+        self._job_store.close()
+
+    def _job(self, extra_kwargs=None):
+        param_spec = deepcopy(f.param_spec)
+        param_spec.extra_kwargs = extra_kwargs
+        return Job(id=uuid4(), function=f, param_spec=param_spec,
+                   return_spec=None)
+
+    def _get_copied(self, job):
+        """Publishes the job and gets it from a copy, like a worker does."""
+        copy = pickle.loads(pickle.dumps(self._job_store))
+        self._job_store.publish(job)
+        return copy.get(job.id)
+
+    def test_get_published_job(self):
+        job = self._job()
+        self._job_store.publish(job)
+        assert self._job_store.get(job.id) is job
+
+    def test_copy_gets_job_published_after_copying(self):
+        copy = pickle.loads(pickle.dumps(self._job_store))
+
+        job = self._job()
+        self._job_store.publish(job)
+
+        job_copied = copy.get(job.id)
+        assert job_copied.id == job.id
+        assert job_copied.function is f
+        assert copy.get(job.id) is job_copied
+
+    def test_copy_reads_job_published_before_copying_from_file(self):
+        data = SharedBytes(b"x" * SHARE_SIZE)
+        job = self._job(extra_kwargs=dict(data=data))
+        self._job_store.publish(job)
+        copy = pickle.loads(pickle.dumps(self._job_store))
+
+        data = copy.get(job.id).param_spec.extra_kwargs["data"]
+        assert isinstance(data, mmap.mmap)
+
+    def test_shared_bytes_are_mapped_read_only(self):
+        data = SharedBytes(b"x" * SHARE_SIZE)
+        small = SharedBytes(b"y")
+        job = self._job(extra_kwargs=dict(data=data, small=small))
+
+        job_copied = self._get_copied(job)
+        extra_kwargs = job_copied.param_spec.extra_kwargs
+        assert isinstance(extra_kwargs["data"], mmap.mmap)
+        assert extra_kwargs["data"][:] == data
+        assert extra_kwargs["small"][:] == b"y"
+
+        # the published job keeps the original values
+        assert job.param_spec.extra_kwargs["data"] is data
+
+    def test_large_bytes_are_not_mapped(self):
+        data = b"x" * SHARE_SIZE
+        job = self._job(extra_kwargs=dict(data=data))
+
+        data_copied = self._get_copied(job).param_spec.extra_kwargs["data"]
+        assert type(data_copied) is bytes
+        assert data_copied == data
+
+    @raises(TypeError)
+    def test_mapped_bytes_can_not_be_written(self):
+        data = SharedBytes(b"x" * SHARE_SIZE)
+        job = self._job(extra_kwargs=dict(data=data))
+        data = self._get_copied(job).param_spec.extra_kwargs["data"]
+        data[0] = b"y"
+
+    def test_large_arrays_are_mapped_read_only(self):
+        if numpy is None:
+            raise SkipTest("NumPy is not available")
+
+        array = numpy.arange(SHARE_SIZE, dtype=numpy.float64). \
+            reshape((-1, 8), order="F")
+        job = self._job(extra_kwargs=dict(array=array))
+
+        array_copied = self._get_copied(job).param_spec.extra_kwargs["array"]
+        assert not array_copied.flags.writeable
+        assert array_copied.shape == array.shape
+        assert (array_copied == array).all()
+
+    def test_close_removes_shared_files(self):
+        data = SharedBytes(b"x" * SHARE_SIZE)
+        job = self._job(extra_kwargs=dict(data=data))
+        self._job_store.publish(job)
+        directory = self._job_store._directory
+        assert os.listdir(directory)
+
+        self._job_store.close()
+        assert not os.path.exists(directory)
+
+    @raises(KeyError)
+    def test_get_unpublished_job_raises(self):
+        self._job_store.get(uuid4())
+
+    @raises(KeyError)
+    def test_get_job_after_close_raises(self):
+        copy = pickle.loads(pickle.dumps(self._job_store))
+
+        job = self._job()
+        self._job_store.publish(job)
+        self._job_store.close()
+
+        copy.get(job.id)
+
+
+class TestJobStore(object):
+
+    def test_get_published_job(self):
+        job_store = JobStore()
+        job = Job(id=uuid4(), function=f, param_spec=f.param_spec,
+                  return_spec=None)
+        job_store.publish(job)
+        assert job_store.get(job.id) is job
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the policy that scales the workers of an invoker.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Third Party
+import nose
+from nose.plugins.skip import SkipTest
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.employer.util.determine_memory import \
+    measure_available_memory
+from metaopt.concurrent.invoker.util.scaling import ScalingPolicy
+
+
+class TestScalingPolicy(object):
+
+    def test_no_dismissals_before_cooldown(self):
+        policy = ScalingPolicy(cooldown=10)
+        assert policy.count_dismissals(worker_count=4, idle_count=2,
+                                       idle_duration=5) == 0
+
+    def test_idle_workers_are_dismissed_after_cooldown(self):
+        policy = ScalingPolicy(cooldown=10)
+        assert policy.count_dismissals(worker_count=4, idle_count=2,
+                                       idle_duration=10) == 2
+
+    def test_min_workers_are_kept(self):
+        policy = ScalingPolicy(min_workers=3, cooldown=10)
+        assert policy.count_dismissals(worker_count=4, idle_count=2,
+                                       idle_duration=10) == 1
+        assert policy.count_dismissals(worker_count=2, idle_count=2,
+                                       idle_duration=10) == 0
+
+    def test_may_employ_below_max_load(self):
+        assert ScalingPolicy(max_load=float("inf")).may_employ()
+        assert not ScalingPolicy(max_load=0).may_employ()
+
+    def test_short_memory_stops_employing_and_dismisses_right_away(self):
+        if measure_available_memory() is None:
+            raise SkipTest("The available memory can not be measured")
+        policy = ScalingPolicy(cooldown=10, min_available_memory=2 ** 62,
+                               max_load=float("inf"))
+        assert not policy.may_employ()
+        assert policy.count_dismissals(worker_count=4, idle_count=2,
+                                       idle_duration=0) == 2
+
+    @raises(ValueError)
+    def test_negative_min_workers_raises(self):
+        ScalingPolicy(min_workers=-1)
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -9,6 +9,7 @@ from __future__ import absolute_import, division, print_function, \
 
 # Standard Library
 from multiprocessing.dummy import Manager
+from threading import Thread
 from uuid import uuid4
 
 # Third Party
@@ -17,7 +18,10 @@ from nose.tools.nontrivial import raises
 
 # First Party
 from metaopt.concurrent.invoker.util.status_db import StatusDB
-from metaopt.concurrent.model.call_lifecycle import Call, Result, Start
+from metaopt.concurrent.model.call_lifecycle import Batch, Call, Chunk, \
+    Layoff, Result, Start, Task
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.stoppable.util.exception import StoppedError
 from metaopt.objective.integer.fast.explicit.f import f
 
 
@@ -52,11 +56,11 @@ class TestStatusDB(object):
     def test_handle_status_start_once(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         self._queue_start.put(start)
@@ -66,11 +70,11 @@ class TestStatusDB(object):
         """Duplicate starts are handled quietly and do not issue errors."""
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         # once
@@ -86,12 +90,12 @@ class TestStatusDB(object):
     def test_handle_status_start_result_duplicate_raises(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         value = None
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         self._queue_start.put(start)
@@ -113,11 +117,11 @@ class TestStatusDB(object):
     def test_handle_status_start_wait(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         self._queue_start.put(start)
@@ -126,11 +130,11 @@ class TestStatusDB(object):
     def test_handle_status_increments_active_tasks_upon_start_once(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         self._queue_start.put(start)
@@ -142,15 +146,15 @@ class TestStatusDB(object):
     def test_handle_status_increments_active_tasks_upon_start_twice(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         call_id = uuid4()
-        call1 = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call1 = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start1 = Start(worker_id=worker_id, call=call1)
 
         # once
@@ -164,32 +168,35 @@ class TestStatusDB(object):
         count_tasks = self._status_db.count_running_tasks()
         assert count_tasks == 2
 
-    @raises(KeyError)
-    def test_handle_status_passes_outcome_of_immediate_result(self):
+    def test_result_of_unknown_call_is_skipped(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
         value = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         result = Result(worker_id=worker_id, call=call, value=value)
         self._queue_outcome.put(result)
 
         # there is no task that could have been finished
-        # so a key error is risen
-        _ = self._status_db.wait_for_one_outcome()
+        # so the result is skipped like a stale one
+        call1 = self._start(worker_id)
+        result1 = Result(worker_id=worker_id, call=call1, value=None)
+        self._queue_outcome.put(result1)
+
+        assert self._status_db.wait_for_one_outcome() is result1
 
     def test_handle_status_passes_outcome_of_result_following_start(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         value = None
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
         self._queue_start.put(start)
@@ -205,11 +212,11 @@ class TestStatusDB(object):
     def test_handle_status_decrements_active_tasks_upon_result_once(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         value = None
         args = None
         kwargs = None
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
 
         start = Start(worker_id=worker_id, call=call)
         self._queue_start.put(start)
@@ -225,15 +232,15 @@ class TestStatusDB(object):
 
     def test_handle_status_decrements_active_tasks_upon_result_twice(self):
         worker_id = uuid4()
-        function = f
+        job_id = uuid4()
         value = None
         args = None
         kwargs = None
 
-        call = Call(id=uuid4(), function=function, args=args, kwargs=kwargs)
+        call = Call(id=uuid4(), job_id=job_id, args=args, kwargs=kwargs)
         start = Start(worker_id=worker_id, call=call)
 
-        call1 = Call(id=uuid4(), function=function, args=args, kwargs=kwargs)
+        call1 = Call(id=uuid4(), job_id=job_id, args=args, kwargs=kwargs)
         start1 = Start(worker_id=worker_id, call=call1)
 
         # once
@@ -259,12 +266,12 @@ class TestStatusDB(object):
     def test_handle_outcome_start_result_once(self):
         worker_id = uuid4()
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         value = None
         args = None
         kwargs = None
 
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
 
         start = Start(worker_id=worker_id, call=call)
         self._queue_start.put(start)
@@ -277,10 +284,10 @@ class TestStatusDB(object):
     @raises(ValueError)
     def test_handle_outcome_start_result_twice(self):
         call_id = uuid4()
-        function = f
+        job_id = uuid4()
         args = None
         kwargs = None
-        call = Call(id=call_id, function=function, args=args, kwargs=kwargs)
+        call = Call(id=call_id, job_id=job_id, args=args, kwargs=kwargs)
 
         value = None
 
@@ -300,5 +307,196 @@ class TestStatusDB(object):
         self._queue_outcome.put(result)
         _ = self._status_db.wait_for_one_outcome()
 
+    def _start(self, worker_id):
+        """Starts a new call on the given worker and returns the call."""
+        call = Call(id=uuid4(), job_id=uuid4(), args=None, kwargs=None)
+        self._queue_start.put(Start(worker_id=worker_id, call=call))
+        _ = self._status_db.wait_for_one_start()
+        return call
+
+    def test_handle_outcome_skips_stale_result_of_laid_off_call(self):
+        worker_id = uuid4()
+        call = self._start(worker_id)
+
+        layoff = Layoff(worker_id=worker_id, call=call, value=None)
+        self._queue_outcome.put(layoff)
+        assert self._status_db.wait_for_one_outcome() is layoff
+
+        # the result of the laid off call arrives late
+        result = Result(worker_id=worker_id, call=call, value=None)
+        self._queue_outcome.put(result)
+
+        call1 = self._start(uuid4())
+        result1 = Result(worker_id=worker_id, call=call1, value=None)
+        self._queue_outcome.put(result1)
+
+        assert self._status_db.wait_for_one_outcome() is result1
+        assert self._status_db.outcomes_awaited == 0
+
+    @raises(KeyError)
+    def test_get_worker_id_of_ended_call_raises(self):
+        worker_id = uuid4()
+        call = self._start(worker_id)
+        assert self._status_db.get_worker_id(call.id) == worker_id
+
+        result = Result(worker_id=worker_id, call=call, value=None)
+        self._queue_outcome.put(result)
+        _ = self._status_db.wait_for_one_outcome()
+
+        self._status_db.get_worker_id(call.id)
+
+    def test_start_by_another_worker_moves_call_to_it(self):
+        worker_id = uuid4()
+        call = self._start(worker_id)
+
+        worker_id_new = uuid4()
+        self._queue_start.put(Start(worker_id=worker_id_new, call=call))
+        _ = self._status_db.wait_for_one_start()
+
+        assert self._status_db.get_worker_id(call.id) == worker_id_new
+        assert self._status_db.get_busy_worker_ids() == [worker_id_new]
+        assert self._status_db.count_running_tasks() == 1
+
+    def test_ended_calls_take_bounded_memory(self):
+        self._status_db = StatusDB(queue_task=self._queue_task,
+                                   queue_start=self._queue_start,
+                                   queue_outcome=self._queue_outcome,
+                                   archive_size=2)
+        worker_id = uuid4()
+        for _ in range(10):
+            call = self._start(worker_id)
+            result = Result(worker_id=worker_id, call=call, value=None)
+            self._queue_outcome.put(result)
+            _ = self._status_db.wait_for_one_outcome()
+
+        assert self._status_db.count_running_tasks() == 0
+        assert self._status_db.count_busy_workers() == 0
+        assert len(self._status_db._outcomes_archived) == 2
+
+    def test_late_result_of_evicted_call_is_skipped(self):
+        self._status_db = StatusDB(queue_task=self._queue_task,
+                                   queue_start=self._queue_start,
+                                   queue_outcome=self._queue_outcome,
+                                   archive_size=1)
+        worker_id = uuid4()
+        call_laid_off = self._start(worker_id)
+        layoff = Layoff(worker_id=worker_id, call=call_laid_off, value=None)
+        self._queue_outcome.put(layoff)
+        _ = self._status_db.wait_for_one_outcome()
+
+        # another call ends, which evicts the outcome of the laid off one
+        call = self._start(worker_id)
+        self._queue_outcome.put(Result(worker_id=worker_id, call=call,
+                                       value=None))
+        _ = self._status_db.wait_for_one_outcome()
+
+        # the result of the laid off call arrives late
+        self._queue_outcome.put(Result(worker_id=worker_id,
+                                       call=call_laid_off, value=None))
+        call = self._start(worker_id)
+        result = Result(worker_id=worker_id, call=call, value=None)
+        self._queue_outcome.put(result)
+
+        assert self._status_db.wait_for_one_outcome() is result
+        assert self._status_db.outcomes_awaited == 0
+
+    def test_requeued_calls_of_chunk_stay_awaited(self):
+        worker_id = uuid4()
+        calls = [Call(id=uuid4(), job_id=uuid4(), args=None, kwargs=None)
+                 for _ in range(3)]
+        self._queue_start.put(Batch(
+            worker_id=worker_id, duration=None,
+            messages=[Start(worker_id=worker_id, call=call)
+                      for call in calls]))
+        _ = self._status_db.wait_for_one_start()
+
+        call_ids_chunk = self._status_db.get_chunk_call_ids(calls[0].id)
+        assert sorted(call_ids_chunk) == sorted(call.id for call in calls[1:])
+
+        self._status_db.requeue(call_ids_chunk)
+        assert self._status_db.outcomes_awaited == 3
+        assert self._status_db.get_running_calls(worker_id) == [calls[0]]
+
+        chunk = self._queue_task.get()
+        assert isinstance(chunk, Chunk)
+        assert [task.call.id for task in chunk.tasks] == call_ids_chunk
+
+        # the first worker still sends a result of a requeued call, which
+        # is skipped once another worker sent its own
+        worker_id_other = uuid4()
+        self._queue_start.put(Start(worker_id=worker_id_other,
+                                    call=calls[1]))
+        _ = self._status_db.wait_for_one_start()
+        result = Result(worker_id=worker_id_other, call=calls[1], value=1)
+        self._queue_outcome.put(result)
+        self._queue_outcome.put(Result(worker_id=worker_id, call=calls[1],
+                                       value=2))
+        layoff = Layoff(worker_id=worker_id, call=calls[0], value=None)
+        self._queue_outcome.put(layoff)
+
+        assert self._status_db.wait_for_one_outcome() is result
+        assert self._status_db.wait_for_one_outcome() is layoff
+        assert self._status_db.outcomes_awaited == 1
+
+    def test_stop_wakes_up_all_waiting_threads(self):
+        stopped = []
+
+        def wait():
+            try:
+                self._status_db.wait_for_one_outcome()
+            except StoppedError:
+                stopped.append(True)
+
+        threads = [Thread(target=wait) for _ in range(3)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        self._status_db.stop()
+        for thread in threads:
+            thread.join(5)
+
+        assert stopped == [True] * 3
+
+    def test_threads_waiting_for_starts_get_each_others_starts(self):
+        calls = [Call(id=uuid4(), job_id=uuid4(), args=None, kwargs=None)
+                 for _ in range(2)]
+        threads = [Thread(target=self._status_db.wait_for_start,
+                          args=(Task(call=call),))
+                   for call in calls]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        # either thread may get the start the other one waits for
+        for call in reversed(calls):
+            self._queue_start.put(Start(worker_id=uuid4(), call=call))
+        for thread in threads:
+            thread.join(5)
+
+        assert not any(thread.is_alive() for thread in threads)
+
+    def test_issue_task_detaches_call_for_workers(self):
+        args = ArgsCreator(f.param_spec).args()
+        call = Call(id=uuid4(), job_id=uuid4(), args=args,
+                    kwargs=dict(data=object()))
+        self._status_db.issue_task(Task(call=call))
+
+        task = self._queue_task.get()
+        assert task.call.id == call.id
+        assert task.call.job_id == call.job_id
+        assert task.call.args == [arg.value for arg in args]
+        assert task.call.kwargs is None
+
+        # the worker sends back the detached call
+        worker_id = uuid4()
+        self._queue_start.put(Start(worker_id=worker_id, call=task.call))
+        _ = self._status_db.wait_for_one_start()
+        self._queue_outcome.put(Result(worker_id=worker_id, call=task.call,
+                                       value=None))
+
+        outcome = self._status_db.wait_for_one_outcome()
+        assert outcome.call is call
+
 if __name__ == "__main__":
     nose.runmodule()
@@ -17,9 +17,9 @@ import nose
 from nose.tools.nontrivial import raises
 
 # First Party
-from metaopt.concurrent.invoker.util.determine_package import determine_package
-from metaopt.concurrent.model.call_lifecycle import Call, Error, Result, \
-    Start, Task
+from metaopt.concurrent.invoker.util.job_store import FileJobStore
+from metaopt.concurrent.model.call_lifecycle import Call, Error, Job, \
+    Result, Start, Task
 from metaopt.concurrent.worker.process import ProcessWorker
 from metaopt.concurrent.worker.worker import Worker
 from metaopt.objective.integer.fast import FUNCTIONS_FAST
@@ -32,6 +32,7 @@ class TestWorkerProcess(object):
         self._queue_outcome = None
         self._queue_start = None
         self._queue_task = None
+        self._job_store = None
         self.worker_process = None
 
     def setup(self):
@@ -41,10 +42,12 @@ class TestWorkerProcess(object):
         self._queue_task = manager.Queue()  # ignore error, this works
         self._queue_start = manager.Queue()  # ignore error, this works
         self._queue_outcome = manager.Queue()  # ignore error, this works
+        self._job_store = FileJobStore()
 
         self.worker_process = ProcessWorker(queue_outcome=self._queue_outcome,
                                             queue_start=self._queue_start,
-                                            queue_tasks=self._queue_task)
+                                            queue_tasks=self._queue_task,
+                                            job_store=self._job_store)
 
     def teardown(self):
         """Nose will run this method after every test method."""
@@ -54,6 +57,14 @@ class TestWorkerProcess(object):
             self.worker_process.join()
         # check postcondition
         assert not self.worker_process.is_alive()
+        self._job_store.close()
+
+    def _publish(self, function):
+        """Publishes a job for the given function and returns its id."""
+        job = Job(id=uuid.uuid4(), function=function,
+                  param_spec=function.param_spec, return_spec=None)
+        self._job_store.publish(job)
+        return job.id
 
     def test_worker_inheritance(self):
         """Tests that is worker process is a worker."""
@@ -95,9 +106,9 @@ class TestWorkerProcess(object):
     def test_worker_process_start_task(self):
         """Tests that issuing task works does not raise an exception."""
 
-        function = determine_package(FUNCTIONS_FAST[0])
+        job_id = self._publish(FUNCTIONS_FAST[0])
         call_id = uuid.uuid4()
-        self._queue_task.put(Task(call=Call(id=call_id, function=function,
+        self._queue_task.put(Task(call=Call(id=call_id, job_id=job_id,
                                             args=None, kwargs=None)))
 
     def test_worker_process_start_task_status_repeated(self):
@@ -112,9 +123,9 @@ class TestWorkerProcess(object):
             print("next function: %s" % function.__module__)
 
             # run
-            function = determine_package(function)
+            job_id = self._publish(function)
             call_id = uuid.uuid4()
-            call = Call(id=call_id, function=function, args=None, kwargs=None)
+            call = Call(id=call_id, job_id=job_id, args=None, kwargs=None)
             task = Task(call=call)
             self._queue_task.put(task)
 
@@ -137,9 +148,9 @@ class TestWorkerProcess(object):
             print("next function: %s" % function.__module__)
 
             # run
-            function = determine_package(function)
+            job_id = self._publish(function)
             call_id = uuid.uuid4()
-            call = Call(id=call_id, function=function, args=None, kwargs=None)
+            call = Call(id=call_id, job_id=job_id, args=None, kwargs=None)
             task = Task(call=call)
             self._queue_task.put(task)
 
@@ -162,5 +173,19 @@ class TestWorkerProcess(object):
             assert outcome.worker_id == self.worker_process.worker_id
             assert outcome.call.id == call_id
 
+    def test_worker_process_gets_job_published_after_its_start(self):
+        """Tests that a worker process reads jobs published after its start."""
+
+        function = FUNCTIONS_FAST[0]
+        job_id = self._publish(function)
+        args = [1] * function.param_spec.dimensions
+        call = Call(id=uuid.uuid4(), job_id=job_id, args=args, kwargs=None)
+        self._queue_task.put(Task(call=call))
+
+        _ = self._queue_start.get()
+        outcome = self._queue_outcome.get()
+        assert isinstance(outcome, Result)
+        assert outcome.call == call
+
 if __name__ == '__main__':
     nose.runmodule()
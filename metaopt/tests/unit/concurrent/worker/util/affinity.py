@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the utilities that size the thread pools of worker processes.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import multiprocessing
+import os
+
+# Third Party
+import nose
+from nose.plugins.skip import SkipTest
+
+# First Party
+from metaopt.concurrent.worker.util.affinity import THREAD_VARIABLES, \
+    _read_loaded_libraries, limit_threads
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestLimitThreads(object):
+
+    def __init__(self):
+        self._environ = None
+
+    def setup(self):
+        self._environ = dict((name, os.environ.get(name))
+                             for name in THREAD_VARIABLES)
+
+    def teardown(self):
+        for name, value in self._environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def test_limit_threads_sets_environment(self):
+        limit_threads(3)
+        for name in THREAD_VARIABLES:
+            assert os.environ[name] == "3"
+
+    def test_limit_threads_resizes_loaded_openblas(self):
+        if numpy is None:
+            raise SkipTest("NumPy is not available")
+        if not os.path.exists("/proc/self/maps"):
+            raise SkipTest("The loaded libraries are not listed")
+
+        # NumPy was imported before, like by the parent of a forked worker.
+        openblas = [path for path in _read_loaded_libraries()
+                    if "openblas" in os.path.basename(path)]
+        if not openblas:
+            raise SkipTest("NumPy uses no OpenBLAS here")
+
+        # keep the default thread count of this process, one per CPU
+        resized = limit_threads(multiprocessing.cpu_count())
+        assert set(openblas) <= set(resized)
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the means to interrupt calls inside workers.
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Standard Library
+import os
+import signal
+from time import sleep
+from uuid import uuid4
+
+# Third Party
+import nose
+from nose.plugins.skip import SkipTest
+from nose.tools.nontrivial import raises
+
+# First Party
+from metaopt.concurrent.worker.util.interrupt import SIGNAL_INTERRUPT, \
+    Interrupted, Interrupter
+
+
+class TestInterrupter(object):
+
+    def __init__(self):
+        self._interrupter = None
+        self._handler = None
+
+    def setup(self):
+        if SIGNAL_INTERRUPT is None:
+            raise SkipTest("There is no signal to interrupt calls with")
+        self._handler = signal.getsignal(SIGNAL_INTERRUPT)
+        self._interrupter = Interrupter()
+        self._interrupter.install()
+
+    def teardown(self):
+        if SIGNAL_INTERRUPT is not None:
+            signal.signal(SIGNAL_INTERRUPT, self._handler)
+
+    @raises(Interrupted)
+    def test_interrupt_executed_call_raises(self):
+        call_id = uuid4()
+        self._interrupter.executing(call_id)
+        assert self._interrupter.executes(call_id)
+        self._interrupter.interrupt(pid=os.getpid(), call_id=call_id)
+        sleep(1)
+
+    def test_interrupt_other_call_is_ignored(self):
+        self._interrupter.executing(uuid4())
+        assert self._interrupter.interrupt(pid=os.getpid(), call_id=uuid4())
+        sleep(0.01)
+
+    def test_interrupt_ended_call_is_ignored(self):
+        call_id = uuid4()
+        self._interrupter.executing(call_id)
+        self._interrupter.executing(None)
+        assert not self._interrupter.executes(call_id)
+        assert self._interrupter.interrupt(pid=os.getpid(), call_id=call_id)
+        sleep(0.01)
+
+if __name__ == '__main__':
+    nose.runmodule()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Test for the demand decorator
+"""
+# Future
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals, with_statement
+
+# Third Party
+import nose
+
+# First Party
+from metaopt.core.arg.util.creator import ArgsCreator
+from metaopt.core.demand.demand import Demand
+from metaopt.core.demand.util.decorator import demand
+from metaopt.core.paramspec.util import param
+
+
+class TestDecorators(object):
+
+    def test_demand_creates_demand(self):
+        @demand(cpus=4, memory=1024)
+        def f():
+            pass
+
+        assert f.demand == Demand(cpus=4, memory=1024)
+
+    def test_demand_resolves_functions_of_param_values(self):
+        @demand(cpus=lambda n_jobs, **_: n_jobs)
+        @param.int("n_jobs", interval=[3, 4])
+        def f(n_jobs):
+            pass
+
+        args = ArgsCreator(f.param_spec).args()
+        assert f.demand.resolve(args) == Demand(cpus=3, memory=0)
+
+if __name__ == '__main__':
+    nose.runmodule()
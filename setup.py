@@ -65,6 +65,11 @@ setup(
     data_files=[("", ["README.rst", "LICENSE.rst", "requirements_examples.txt",
                       "requirements_lint.txt", "requirements_test.txt"])],
     description=DESCRIPTION,
+    entry_points={
+        'console_scripts': [
+            'metaopt-worker = metaopt.concurrent.worker.agent:main',
+        ],
+    },
     ext_modules=[],
     install_requires=[],
     license=metaopt.__license__,